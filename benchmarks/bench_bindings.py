@@ -0,0 +1,55 @@
+# bench_bindings.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the resolution of a recognized gesture to what is put on the command queue, in the recognition callback:
+the compiled bindings (gesture_bindings.py: gesture ID lookup and table indexing) against the name-based path they replace
+(mapping lookup, scan of COMMANDS and macro prefix check), and the size of the command frames on the wire.
+"""
+
+import time
+
+from bench_common import metric
+
+from client_constants import COMMANDS, GESTURES, MACRO_PREFIX
+from gesture_bindings import BINDING_DISCRETE, GestureBindings
+from send_command_to_server import command_frame
+
+# Mapping of the benchmark: every built-in gesture bound to a command, the last ones of COMMANDS (the longest scans)
+MAPPING = dict(zip(GESTURES, COMMANDS[-len(GESTURES):]))
+
+
+def run(args) -> dict:
+    """
+    Resolves gestures with both paths for `args.duration` / 2 seconds each.
+    Args:
+        args: Parsed command line arguments (uses `duration`).
+    Returns:
+        dict: The metrics of the scenario.
+    """
+    # A batch of gesture names, iterated directly so that the loop adds as little as possible to the measure
+    names = [GESTURES[i % len(GESTURES)] for i in range(10_000)]
+
+    resolved, start = 0, time.perf_counter()
+    while time.perf_counter() - start < args.duration / 2:
+        for name in names:
+            command = MAPPING.get(name)
+            if command is not None and (command in COMMANDS or command.startswith(MACRO_PREFIX)):
+                resolved += 1
+    names_ns = (time.perf_counter() - start) / resolved * 1e9
+
+    bindings = GestureBindings(MAPPING)
+    resolved, start = 0, time.perf_counter()
+    while time.perf_counter() - start < args.duration / 2:
+        for name in names:
+            gesture_id = bindings.gesture_ids[name]
+            if bindings.kinds[gesture_id] == BINDING_DISCRETE:
+                bindings.items[gesture_id]
+                resolved += 1
+    ids_ns = (time.perf_counter() - start) / resolved * 1e9
+
+    return {
+        "name_lookup_ns": metric(names_ns, "ns", higher_is_better=False),
+        "compiled_lookup_ns": metric(ids_ns, "ns", higher_is_better=False),
+        "text_frame_bytes": metric(sum(len((command + "|").encode()) for command in COMMANDS) / len(COMMANDS), "bytes", higher_is_better=False),
+        "id_frame_bytes": metric(sum(len(command_frame(command)) for command in COMMANDS) / len(COMMANDS), "bytes", higher_is_better=False),
+    }
@@ -0,0 +1,130 @@
+# bench_capture_sessions.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the browser-capture mode: an InferenceService with `--capture-workers` workers serves a growing number
+of simulated browser sessions, every one posting the frames of `--video` (downscaled and JPEG-encoded like capture.js does)
+at CAPTURE_FPS. A session count is sustained if every session gets at least 90% of its frames recognized and the p95
+submit-to-result latency stays under `--max-latency` milliseconds; reports the largest sustained count per worker (core).
+"""
+
+import os
+import threading
+import time
+
+from bench_common import metric, skipped
+
+# Fraction of the submitted frames that must be recognized for a session count to be sustained
+MIN_RESULT_RATIO = 0.9
+
+
+def load_frames(video: str, width: int, height: int, quality: float, count: int = 100) -> list:
+    """
+    Reads the first `count` frames of a video file and encodes them like the browser page.
+    Args:
+        video (str): Path of the video file.
+        width (int): Width of the encoded frames.
+        height (int): Height of the encoded frames.
+        quality (float): JPEG quality, between 0 and 1.
+        count (int): Maximum number of frames.
+    Returns:
+        list: The JPEG-encoded frames (bytes).
+    """
+    import cv2
+
+    capture = cv2.VideoCapture(video)
+    frames = []
+    while len(frames) < count:
+        success, frame = capture.read()
+        if not success:
+            break
+        frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        frames.append(cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, int(quality * 100)])[1].tobytes())
+    capture.release()
+    return frames
+
+
+def measure(service, frames: list, sessions: int, fps: float, duration: float) -> dict:
+    """
+    Runs `sessions` simulated browser sessions for `duration` seconds.
+    Args:
+        service (InferenceService): The started service.
+        frames (list): JPEG frames posted in a loop by every session.
+        sessions (int): Number of concurrent sessions.
+        fps (float): Frames per second posted by every session.
+        duration (float): Measurement time in seconds.
+    Returns:
+        dict: Worst result ratio and worst p95 latency over the sessions.
+    """
+    ids = [service.open_session({}) for _ in range(sessions)]
+    if None in ids:
+        raise RuntimeError("the inference service refused a session")
+
+    def post(session_id: str) -> None:
+        start = time.perf_counter()
+        i = 0
+        while time.perf_counter() - start < duration:
+            delay = start + i / fps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            service.submit_frame(session_id, frames[i % len(frames)], (time.perf_counter() - start) * 1000)
+            i += 1
+
+    threads = [threading.Thread(target=post, args=(session_id,)) for session_id in ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Let the workers finish the queued frames
+    time.sleep(1.0)
+    stats = service.stats()["sessions"]
+    for session_id in ids:
+        service.close_session(session_id)
+    ratios = [stats[s]["results"] / max(stats[s]["frames"], 1) for s in ids]
+    latencies = [stats[s]["latency_p95_ms"] or float("inf") for s in ids]
+    return {"min_result_ratio": min(ratios), "worst_latency_p95_ms": max(latencies)}
+
+
+def run(args) -> dict:
+    """
+    Sweeps the number of sessions (1, 2, 4, ...) until one is not sustained.
+    Args:
+        args: Parsed command line arguments (uses `video`, `duration`, `capture_workers` and `max_latency`).
+    Returns:
+        dict: The metrics of the scenario.
+    """
+    if not args.video:
+        return skipped("no video file (use --video)")
+    from src.gesture_recognizer.inference_service import (CAPTURE_FPS, CAPTURE_HEIGHT, CAPTURE_JPEG_QUALITY, CAPTURE_WIDTH,
+                                                          MAX_SESSIONS_PER_WORKER, InferenceService)
+    from src.gesture_recognizer.recognizer_profile import DEFAULT_PROFILE, model_path
+    if not os.path.isfile(model_path(DEFAULT_PROFILE)):
+        return skipped(f"model not found: {model_path(DEFAULT_PROFILE)}")
+
+    frames = load_frames(args.video, CAPTURE_WIDTH, CAPTURE_HEIGHT, CAPTURE_JPEG_QUALITY)
+    if not frames:
+        return skipped(f"cannot read the video file: {args.video}")
+    service = InferenceService(workers=args.capture_workers).start()
+    try:
+        if not service.wait_until_ready(60):
+            raise RuntimeError(f"the inference workers did not start: {service.error}")
+        sustained, sweep = 0, {}
+        sessions = 1
+        while sessions <= args.capture_workers * MAX_SESSIONS_PER_WORKER:
+            result = measure(service, frames, sessions, CAPTURE_FPS, args.duration)
+            sweep[sessions] = result
+            print(f"[INFO] {sessions} sessions: {result}")
+            if result["min_result_ratio"] < MIN_RESULT_RATIO or result["worst_latency_p95_ms"] > args.max_latency:
+                break
+            sustained = sessions
+            sessions *= 2
+    finally:
+        service.stop()
+
+    # Metrics of the largest sustained count (of the single session if even one session was not sustained)
+    last = sweep[sustained or 1]
+    return {
+        "workers": args.capture_workers,
+        "sessions_per_core": metric(sustained / args.capture_workers, "sessions"),
+        "min_result_ratio": metric(last["min_result_ratio"], "ratio"),
+        "worst_latency_p95_ms": metric(last["worst_latency_p95_ms"], "ms", higher_is_better=False),
+    }
@@ -0,0 +1,90 @@
+# bench_command_path.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the command path: commands put on the gesture_recognizer_to_socket_queue are sent by
+send_command_to_server (in its own process, like in main.py) to server.py running the recording backend,
+which records when handle_client receives them.
+Reports the executed commands per second and the queue-to-server latency percentiles.
+"""
+
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import ctypes
+
+from bench_common import SERVER_DIR, free_port, metric, percentile
+
+from replay_harness import DEFAULT_COMMANDS, match_frames, read_server_records
+
+
+def run(args) -> dict:
+    """
+    Sends `args.commands` commands (at `args.rate` commands/s, 0 for as fast as possible) through the command path.
+    Args:
+        args: Parsed command line arguments (uses `commands` and `rate`).
+    Returns:
+        dict: The metrics of the scenario.
+    """
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        record_file = os.path.join(tmp_dir, "recorded_commands.jsonl")
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(SERVER_DIR, "server.py"), "--backend", "recording",
+             "--record-file", record_file, "--host", "127.0.0.1", "--port", str(port),
+             # Measure the command path itself, not the rate limits (see the noisy_client scenario)
+             "--client-rate", "0", "--command-rate", "0"],
+            stdout=subprocess.DEVNULL
+        )
+        # send_command_to_server reads the server address from the environment when its module is imported
+        os.environ["GESTURE_SERVER_IP"] = "127.0.0.1"
+        os.environ["GESTURE_SERVER_PORT"] = str(port)
+        from send_command_to_server import send_command_to_server
+
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        server_is_running = context.Value(ctypes.c_bool, False)
+        sender = context.Process(target=send_command_to_server, args=(queue, server_is_running))
+        try:
+            time.sleep(0.5)
+            sender.start()
+            # Wait for the connection to the server
+            deadline = time.time() + 10
+            while not server_is_running.value and time.time() < deadline:
+                time.sleep(0.05)
+            if not server_is_running.value:
+                raise RuntimeError("send_command_to_server did not connect to the server")
+
+            sent = []
+            start = time.time()
+            for i in range(args.commands):
+                if args.rate:
+                    delay = start + i / args.rate - time.time()
+                    if delay > 0:
+                        time.sleep(delay)
+                command = DEFAULT_COMMANDS[i % len(DEFAULT_COMMANDS)]
+                sent.append((time.time(), command))
+                queue.put(command)
+            time.sleep(1.0)
+
+            records = read_server_records(record_file, start)
+            frames = [frame for peer_frames in records.values() for frame in peer_frames]
+            matched = match_frames(sent, frames)
+        finally:
+            queue.put(None)
+            sender.join(5)
+            if sender.is_alive():
+                sender.terminate()
+            server.terminate()
+            server.wait()
+
+    latencies = sorted(matched["latencies"])
+    last_received = frames[-1][0] if frames else start
+    return {
+        "commands_per_s": metric(matched["executed"] / (last_received - start) if last_received > start else 0.0, "commands/s"),
+        "executed_ratio": metric(matched["executed"] / args.commands, "ratio"),
+        "latency_p50_ms": metric(percentile(latencies, 50) * 1000, "ms", higher_is_better=False),
+        "latency_p99_ms": metric(percentile(latencies, 99) * 1000, "ms", higher_is_better=False),
+    }
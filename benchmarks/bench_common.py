@@ -0,0 +1,61 @@
+# bench_common.py
+# -*- coding: utf-8 -*-
+"""
+This module contains helpers shared by the benchmark scenarios.
+It makes the client and server modules importable from the benchmarks directory
+and defines how a scenario reports its metrics.
+"""
+
+import os
+import socket
+import sys
+
+# Root of the repository and directories of the client and server applications
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLIENT_DIR = os.path.join(REPO_DIR, "client")
+SERVER_DIR = os.path.join(REPO_DIR, "server")
+
+# The client modules import each other relative to the client directory (like start_client.sh does with PYTHONPATH=.)
+for path in (CLIENT_DIR, SERVER_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# Re-exported for the scenarios
+from replay_harness import percentile
+
+
+def metric(value: float, unit: str, higher_is_better: bool = True) -> dict:
+    """
+    Builds a metric entry of a benchmark result.
+    Args:
+        value (float): Measured value.
+        unit (str): Unit of the value (e.g., "frames/s", "ms").
+        higher_is_better (bool): Direction used to detect regressions.
+    Returns:
+        dict: The metric entry.
+    """
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+def skipped(reason: str) -> dict:
+    """
+    Builds the result of a scenario that could not run in the current environment.
+    Args:
+        reason (str): Why the scenario was skipped.
+    Returns:
+        dict: The scenario result.
+    """
+    return {"skipped": reason}
+
+
+def free_port() -> int:
+    """
+    Finds a free TCP port on the loopback interface.
+    Args:
+        None
+    Returns:
+        int: The port number.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
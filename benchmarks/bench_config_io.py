@@ -0,0 +1,54 @@
+# bench_config_io.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the configuration I/O routes of the Flask client:
+requests per second of index() (GET /) and get_json_file (GET /get_json_file)
+with hundreds of saved configurations.
+"""
+
+import os
+import tempfile
+import time
+
+from bench_common import metric
+
+import flask_client
+from config_index import ConfigIndex
+from config_store import ConfigStore
+
+
+def run(args) -> dict:
+    """
+    Saves `args.configs` configurations in a temporary store and measures the request rate of the configuration routes.
+    Args:
+        args: Parsed command line arguments (uses `configs` and `duration`).
+    Returns:
+        dict: The metrics of the scenario.
+    """
+    with tempfile.TemporaryDirectory() as config_dir:
+        mapping = dict(zip(flask_client.GESTURES, flask_client.COMMANDS))
+        store = ConfigStore(os.path.join(config_dir, "configs.sqlite3"))
+        for i in range(args.configs):
+            store.save(f"Config_{i}", mapping)
+
+        original_store, original_index = flask_client.config_store, flask_client.config_index
+        flask_client.config_store = store
+        flask_client.config_index = ConfigIndex(store)
+        try:
+            client = flask_client.app.test_client()
+            results = {}
+            for name, url_for_request in (
+                ("index_rps", lambda i: "/"),
+                ("get_json_file_rps", lambda i: f"/get_json_file?file=Config_{i % args.configs}"),
+            ):
+                requests = 0
+                end = time.perf_counter() + args.duration
+                while time.perf_counter() < end:
+                    response = client.get(url_for_request(requests))
+                    assert response.status_code == 200, response.status_code
+                    requests += 1
+                results[name] = metric(requests / args.duration, "requests/s")
+            return results
+        finally:
+            flask_client.config_store, flask_client.config_index = original_store, original_index
+            store.close()
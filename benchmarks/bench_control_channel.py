@@ -0,0 +1,98 @@
+# bench_control_channel.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the continuous-control channel: a ControlSender streams volume and pointer updates at `--control-rate` Hz
+(like the gesture recognizer does while a continuous gesture is shown) to server.py running the recording backend,
+then streams a constant scroll velocity.
+Reports the send-to-apply latency percentiles, the fraction of updates applied (the others are coalesced or lost),
+and how accurately the scroll velocity is integrated.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_common import SERVER_DIR, free_port, metric, percentile
+
+from control_channel import CONTROL_POINTER, CONTROL_SCROLL, CONTROL_VOLUME, ControlSender
+
+
+def stream(sender: ControlSender, kinds: list, rate: float, duration: float, values) -> dict:
+    """
+    Sends updates at a fixed rate.
+    Args:
+        sender (ControlSender): The sender.
+        kinds (list): Kinds of control to send on every tick.
+        rate (float): Ticks per second.
+        duration (float): Seconds to stream for.
+        values (callable): Function of the tick number returning the (value1, value2) of the updates.
+    Returns:
+        dict: Sequence number -> send time of every sent update.
+    """
+    sent = {}
+    start = time.time()
+    ticks = int(duration * rate)
+    for i in range(ticks):
+        delay = start + i / rate - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        for kind in kinds:
+            if sender.send(kind, *values(i)):
+                sent[sender.seq] = time.time()
+    return sent
+
+
+def run(args) -> dict:
+    """
+    Streams the updates and reads back what the server applied.
+    Args:
+        args: Parsed command line arguments (uses `control_rate` and `duration`).
+    Returns:
+        dict: The metrics of the scenario.
+    """
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        record_file = os.path.join(tmp_dir, "recorded_commands.jsonl")
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(SERVER_DIR, "server.py"), "--backend", "recording",
+             "--record-file", record_file, "--host", "127.0.0.1", "--port", str(port), "--control-port", str(port)],
+            stdout=subprocess.DEVNULL
+        )
+        sender = ControlSender("127.0.0.1", port)
+        try:
+            time.sleep(0.5)
+            sent = stream(sender, [CONTROL_VOLUME, CONTROL_POINTER], args.control_rate, args.duration,
+                          lambda i: ((i % 100) / 100, 0.5))
+            # Constant scroll velocity (one notch per second per 120 units/s) for a second
+            scroll_velocity = 1200.0
+            scroll_start = time.time()
+            stream(sender, [CONTROL_SCROLL], args.control_rate, 1.0, lambda i: (scroll_velocity, 0.0))
+            scroll_time = time.time() - scroll_start
+            time.sleep(0.5)
+        finally:
+            sender.close()
+            server.terminate()
+            server.wait()
+
+        latencies = []
+        scrolled = 0
+        with open(record_file, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if record.get("control") == "scroll":
+                    scrolled += record["values"][0]
+                elif "control" in record and record["seq"] in sent:
+                    latencies.append(record["t"] - sent[record["seq"]])
+
+    latencies.sort()
+    return {
+        "updates_sent": len(sent),
+        "applied_ratio": metric(len(latencies) / max(len(sent), 1), "ratio"),
+        "p50_latency_ms": metric(percentile(latencies, 50) * 1000, "ms", higher_is_better=False),
+        "p99_latency_ms": metric(percentile(latencies, 99) * 1000, "ms", higher_is_better=False),
+        # The server keeps scrolling up to CONTROL_TIMEOUT_S after the last update
+        "scroll_accuracy": metric(scrolled / (scroll_velocity * scroll_time), "ratio"),
+    }
@@ -0,0 +1,69 @@
+# bench_event_log.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the gesture event log: the time EventLog.log takes in the caller (the recognition callback),
+and the time load_events takes to load `--events` events (about a week of use at the default value)
+spread over rotated files, followed by a vectorized aggregation (events per gesture and outcome).
+"""
+
+import tempfile
+import time
+
+import numpy as np
+
+from bench_common import metric, percentile
+
+from client_constants import COMMANDS, GESTURES
+from event_log import EVENT_DTYPE, EventLog, OUTCOME_SENT, load_events
+
+# Events logged one by one, timing every call
+TIMED_CALLS = 20_000
+
+
+def run(args) -> dict:
+    """
+    Logs `args.events` events to a temporary directory and loads them back.
+    Args:
+        args: Parsed command line arguments (uses `events`).
+    Returns:
+        dict: The metrics of the scenario.
+    """
+    with tempfile.TemporaryDirectory() as log_dir:
+        # Small files, to exercise the rotation
+        event_log = EventLog(log_dir, max_file_bytes=max(args.events * EVENT_DTYPE.itemsize // 20, 1 << 20), max_files=0,
+                             flush_interval=0.05).start()
+        gestures = GESTURES + ("My Custom Gesture",)
+        call_times = []
+        for i in range(TIMED_CALLS):
+            start = time.perf_counter()
+            event_log.log(gestures[i % len(gestures)], COMMANDS[i % len(COMMANDS)], OUTCOME_SENT, 0.9, 0, "Right")
+            call_times.append(time.perf_counter() - start)
+        # The other events are logged as fast as the buffer drains (only the loading time is measured for them)
+        logged = TIMED_CALLS
+        write_start = time.perf_counter()
+        while logged < args.events:
+            for i in range(min(10_000, args.events - logged)):
+                event_log.log(gestures[i % len(gestures)], COMMANDS[i % len(COMMANDS)], OUTCOME_SENT, 0.9, 0, "Right")
+            logged += 10_000
+            while event_log.pending > 50_000:
+                time.sleep(0.01)
+        event_log.close()
+        write_time = time.perf_counter() - write_start
+
+        start = time.perf_counter()
+        loaded = load_events(log_dir)
+        events = loaded["events"]
+        # Events per (gesture, outcome): a single bincount over the combined IDs
+        counts = np.bincount((events["gesture"].astype(np.int64) + 1) * 256 + events["outcome"])
+        load_time = time.perf_counter() - start
+        if len(events) != event_log.written or counts.sum() != len(events):
+            raise RuntimeError(f"{event_log.written} events written but {len(events)} loaded")
+
+    call_times.sort()
+    return {
+        "events": len(events),
+        "dropped": event_log.dropped,
+        "log_call_p99_us": metric(percentile(call_times, 99) * 1e6, "us", higher_is_better=False),
+        "write_events_per_s": metric(max(args.events - TIMED_CALLS, 0) / write_time, "events/s"),
+        "load_and_aggregate_s": metric(load_time, "s", higher_is_better=False),
+    }
@@ -0,0 +1,102 @@
+# bench_fanout.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the fan-out of commands to several target servers: commands put on the gesture_recognizer_to_socket_queue
+are sent by send_command_to_server to `--targets` servers (server.py with the recording backend) and to one stalled target,
+which accepts the connection but never reads from it nor answers the heartbeat.
+Reports the worst executed ratio and latency percentiles over the healthy targets, which must not be delayed by the stalled one.
+"""
+
+import ctypes
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_common import SERVER_DIR, free_port, metric, percentile
+
+from replay_harness import DEFAULT_COMMANDS, match_frames, read_server_records
+
+
+def run(args) -> dict:
+    """
+    Sends `args.commands` commands (at `args.rate` commands/s) to `args.targets` healthy targets and a stalled one.
+    Args:
+        args: Parsed command line arguments (uses `commands`, `rate` and `targets`).
+    Returns:
+        dict: The metrics of the scenario.
+    """
+    from send_command_to_server import HEARTBEAT_LAST_PONG, TARGET_SENT, TARGET_STATS_SIZE, send_command_to_server
+
+    ports = [free_port() for _ in range(args.targets)]
+    # The stalled target: the kernel accepts the connection (backlog), but nobody reads from it
+    stalled = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    stalled.bind(("127.0.0.1", 0))
+    stalled.listen(8)
+    targets = [("127.0.0.1", port) for port in ports] + [stalled.getsockname()]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        record_files = [os.path.join(tmp_dir, f"recorded_commands_{port}.jsonl") for port in ports]
+        servers = [
+            subprocess.Popen(
+                [sys.executable, os.path.join(SERVER_DIR, "server.py"), "--backend", "recording",
+                 "--record-file", record_file, "--host", "127.0.0.1", "--port", str(port),
+                 "--client-rate", "0", "--command-rate", "0", "--control-port", "0"],
+                stdout=subprocess.DEVNULL
+            )
+            for port, record_file in zip(ports, record_files)
+        ]
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        server_is_running = context.Value(ctypes.c_bool, False)
+        target_stats = context.Array(ctypes.c_double, len(targets) * TARGET_STATS_SIZE)
+        sender = context.Process(target=send_command_to_server, args=(queue, server_is_running, target_stats, targets))
+        try:
+            time.sleep(0.5)
+            sender.start()
+            # Wait for the connections (a ping is sent on every new connection, so the healthy targets answer at once)
+            deadline = time.time() + 10
+            connected = lambda: all(target_stats[i * TARGET_STATS_SIZE + HEARTBEAT_LAST_PONG] > 0 for i in range(len(ports)))
+            while not connected() and time.time() < deadline:
+                time.sleep(0.05)
+            if not connected():
+                raise RuntimeError("send_command_to_server did not connect to the servers")
+
+            sent = []
+            start = time.time()
+            for i in range(args.commands):
+                if args.rate:
+                    delay = start + i / args.rate - time.time()
+                    if delay > 0:
+                        time.sleep(delay)
+                command = DEFAULT_COMMANDS[i % len(DEFAULT_COMMANDS)]
+                sent.append((time.time(), command))
+                queue.put(command)
+            time.sleep(1.0)
+
+            matched = []
+            for record_file in record_files:
+                records = read_server_records(record_file, start)
+                matched.append(match_frames(sent, [frame for peer_frames in records.values() for frame in peer_frames]))
+            stalled_sent = int(target_stats[len(ports) * TARGET_STATS_SIZE + TARGET_SENT])
+        finally:
+            queue.put(None)
+            sender.join(5)
+            if sender.is_alive():
+                sender.terminate()
+            for server in servers:
+                server.terminate()
+                server.wait()
+            stalled.close()
+
+    p50 = [percentile(sorted(m["latencies"]), 50) for m in matched]
+    p99 = [percentile(sorted(m["latencies"]), 99) for m in matched]
+    return {
+        "targets": args.targets,
+        "stalled_target_commands": stalled_sent,
+        "min_executed_ratio": metric(min(m["executed"] for m in matched) / args.commands, "ratio"),
+        "worst_latency_p50_ms": metric(max(p50) * 1000, "ms", higher_is_better=False),
+        "worst_latency_p99_ms": metric(max(p99) * 1000, "ms", higher_is_better=False),
+    }
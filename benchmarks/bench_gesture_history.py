@@ -0,0 +1,52 @@
+# bench_gesture_history.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the recent-gesture history (gesture_history.py): time to append an event in the recognition callback,
+and time of a /gesture_events read, incremental (the events of one polling interval) and full (the whole ring).
+"""
+
+import time
+
+from bench_common import metric
+
+from event_log import OUTCOME_SENT
+from gesture_history import HISTORY_SIZE, GestureHistory
+
+# Events appended between two polls of the web interface (one event every 10 results at 30 frames/s, polled every 333 ms)
+EVENTS_PER_POLL = 2
+
+
+def run(args) -> dict:
+    """
+    Appends events for `args.duration` / 2 seconds, then reads the history for `args.duration` / 2 seconds.
+    Args:
+        args: Parsed command line arguments (uses `duration`).
+    Returns:
+        dict: The metrics of the scenario.
+    """
+    history = GestureHistory()
+    appended = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < args.duration / 2:
+        history.append("Thumb_Up", OUTCOME_SENT, 0.9, 0, "Right")
+        appended += 1
+    append_us = (time.perf_counter() - start) / appended * 1e6
+
+    reads = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < args.duration / 4:
+        history.since(history.last_seq - EVENTS_PER_POLL)
+        reads += 1
+    incremental_us = (time.perf_counter() - start) / reads * 1e6
+    reads = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < args.duration / 4:
+        history.since(0)
+        reads += 1
+    full_us = (time.perf_counter() - start) / reads * 1e6
+
+    return {
+        "append_us": metric(append_us, "us", higher_is_better=False),
+        "incremental_read_us": metric(incremental_us, "us", higher_is_better=False),
+        f"full_read_{HISTORY_SIZE}_us": metric(full_us, "us", higher_is_better=False),
+    }
@@ -0,0 +1,58 @@
+# bench_input_injection.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the input injection of the server (input_injection.py): time to compile a macro command
+into INPUT arrays (first time and cached), and system calls per command (SendInput batches)
+compared to the inputs they carry (one keybd_event call each before batching).
+SendInput itself only exists on Windows, so the submission is not measured here.
+"""
+
+import time
+
+from bench_common import metric
+
+from input_injection import compile_macro, macro_inputs
+
+# Macros of the scenario: a chord, a sequence with waits, and a long key sequence
+MACROS = (
+    "ctrl+shift+t",
+    "ctrl+c,wait 100,ctrl+v",
+    "down alt,tab,wait 2500,up alt",
+    ",".join(["volumeup"] * 10) + ",win+d,f5,ctrl+alt+delete",
+)
+
+
+def run(args) -> dict:
+    """
+    Compiles the macros of the scenario for `args.duration` seconds.
+    Args:
+        args: Parsed command line arguments (uses `duration`).
+    Returns:
+        dict: The metrics of the scenario.
+    """
+    compiled = 0
+    end = time.perf_counter() + args.duration / 2
+    started = time.perf_counter()
+    while time.perf_counter() < end:
+        for macro in MACROS:
+            compile_macro.__wrapped__(macro)
+        compiled += len(MACROS)
+    compile_time = (time.perf_counter() - started) / compiled
+
+    lookups = 0
+    end = time.perf_counter() + args.duration / 2
+    started = time.perf_counter()
+    while time.perf_counter() < end:
+        for macro in MACROS:
+            compile_macro(macro)
+        lookups += len(MACROS)
+    cached_time = (time.perf_counter() - started) / lookups
+
+    inputs = sum(macro_inputs(compile_macro(macro)) for macro in MACROS)
+    calls = sum(sum(1 for step in compile_macro(macro) if not isinstance(step, float)) for macro in MACROS)
+    return {
+        "macros": len(MACROS),
+        "compile_us_per_macro": metric(compile_time * 1e6, "us", higher_is_better=False),
+        "cached_compile_us_per_macro": metric(cached_time * 1e6, "us", higher_is_better=False),
+        "inputs_per_call": metric(inputs / calls, "inputs/call"),
+    }
@@ -0,0 +1,44 @@
+# bench_landmark_classifier.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the custom gesture classifier: time to normalize and classify one hand
+against an index of `--templates` templates (synthetic landmarks), i.e. the cost added to every recognized hand.
+"""
+
+import time
+
+import numpy as np
+
+from bench_common import metric
+
+from src.gesture_recognizer.landmark_classifier import NUM_LANDMARKS, TemplateIndex
+
+
+def run(args) -> dict:
+    """
+    Classifies synthetic hands for `args.duration` seconds.
+    Args:
+        args: Parsed command line arguments (uses `templates` and `duration`).
+    Returns:
+        dict: The metrics of the scenario.
+    """
+    rng = np.random.default_rng(0)
+    templates = [(f"Gesture_{i % 10}", rng.random(NUM_LANDMARKS * 3).tolist(), bool(i % 2)) for i in range(args.templates)]
+    started = time.perf_counter()
+    index = TemplateIndex.from_templates(templates)
+    build_time = time.perf_counter() - started
+
+    hands = rng.random((64, NUM_LANDMARKS, 3)).astype(np.float32)
+    classified = 0
+    end = time.perf_counter() + args.duration
+    started = time.perf_counter()
+    while time.perf_counter() < end:
+        for hand in hands:
+            index.classify_hand(hand, left_handed=False)
+        classified += len(hands)
+    elapsed = time.perf_counter() - started
+    return {
+        "templates": args.templates,
+        "classify_us_per_hand": metric(elapsed / classified * 1e6, "us", higher_is_better=False),
+        "index_build_ms": metric(build_time * 1e3, "ms", higher_is_better=False),
+    }
@@ -0,0 +1,131 @@
+# bench_lifecycle.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the lifecycle of the worker processes (process_supervisor.py), scripted like a user clicking Start and Stop:
+`--cycles` start/stop cycles of a fake recognizer, which streams frames of the size of a JPEG webcam frame into its webcam queue
+as fast as the webcam (the reader stops before the process, like the frame broadcaster, so the queue is full when it stops),
+then a crash of the recognizer (SIGKILL) and a stop of the command sender with commands queued for an unreachable server.
+Reports the start time (until the first frame), the stop time, the stops that needed SIGTERM or SIGKILL,
+the restart time after the crash and the processes left running (which must be 0).
+"""
+
+import ctypes
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+
+from bench_common import free_port, metric, percentile
+
+from process_supervisor import SupervisedProcess, STOP_COOPERATIVE
+
+# Size of a frame of the fake recognizer (a 640x480 JPEG frame) and frames per second
+FRAME_SIZE = 150_000
+FRAME_RATE = 30.0
+# Time the frames are read in every cycle, in seconds
+CYCLE_READ_S = 0.3
+
+
+def fake_recognizer(webcam_queue: "multiprocessing.Queue", stop_event: "multiprocessing.Event" = None) -> None:
+    """
+    Target of the fake recognition process: puts a frame in the webcam queue every 1 / FRAME_RATE seconds until `stop_event`
+    is set, and exits without flushing the frames not read yet, like start_gesture_recognition.
+    Args:
+        webcam_queue (multiprocessing.Queue): Queue of the frames.
+        stop_event (multiprocessing.Event): Set to stop the process.
+    Returns:
+        None
+    """
+    frame = bytes(FRAME_SIZE)
+    try:
+        while not stop_event.is_set():
+            webcam_queue.put(frame)
+            stop_event.wait(1.0 / FRAME_RATE)
+    finally:
+        webcam_queue.cancel_join_thread()
+
+
+def read_frames(webcam_queue: "multiprocessing.Queue", first_frame: threading.Event, stop: threading.Event) -> None:
+    """Body of the reader thread (the frame broadcaster): reads the frames until `stop` is set."""
+    while not stop.is_set():
+        try:
+            webcam_queue.get(timeout=0.05)
+        except queue.Empty:
+            continue
+        first_frame.set()
+
+
+def run(args) -> dict:
+    """
+    Runs `args.cycles` start/stop cycles, a crash and a stop of the command sender.
+    Args:
+        args: Parsed command line arguments (uses `cycles`).
+    Returns:
+        dict: The metrics of the scenario.
+    """
+    from send_command_to_server import TARGET_STATS_SIZE, send_command_to_server
+
+    context = multiprocessing.get_context("spawn")
+    recognizer = SupervisedProcess("recognizer", fake_recognizer, stop_event_kwarg="stop_event")
+    start_ms, stop_ms = [], []
+    forced = 0
+    for _ in range(args.cycles):
+        webcam_queue = context.Queue()
+        first_frame, stop_reading = threading.Event(), threading.Event()
+        reader = threading.Thread(target=read_frames, args=(webcam_queue, first_frame, stop_reading), daemon=True)
+        reader.start()
+        started = time.perf_counter()
+        recognizer.start(args=(webcam_queue,), drain_queues=(webcam_queue,))
+        first_frame.wait(30.0)
+        start_ms.append((time.perf_counter() - started) * 1000)
+        time.sleep(CYCLE_READ_S)
+        # Like /stop: the broadcaster stops reading, then the process is stopped and the queue closed
+        stop_reading.set()
+        reader.join()
+        time.sleep(0.2)
+        transition = recognizer.stop()
+        webcam_queue.close()
+        stop_ms.append(transition["duration_ms"])
+        forced += transition["how"] != STOP_COOPERATIVE
+
+    # Crash: SIGKILL the running process, and measure the time until the restarted one streams frames again
+    webcam_queue = context.Queue()
+    first_frame, stop_reading = threading.Event(), threading.Event()
+    reader = threading.Thread(target=read_frames, args=(webcam_queue, first_frame, stop_reading), daemon=True)
+    reader.start()
+    recognizer.start(args=(webcam_queue,), drain_queues=(webcam_queue,))
+    first_frame.wait(30.0)
+    pid = recognizer.metrics()["pid"]
+    first_frame.clear()
+    crashed = time.perf_counter()
+    os.kill(pid, signal.SIGKILL)
+    restarted = first_frame.wait(30.0)
+    restart_ms = (time.perf_counter() - crashed) * 1000
+    stop_reading.set()
+    reader.join()
+    recognizer.stop()
+    webcam_queue.close()
+
+    # Command sender: commands queued for an unreachable server, then the cooperative stop (None in its queue)
+    commands = context.Queue()
+    sender = SupervisedProcess("command sender", send_command_to_server, request_stop=lambda: commands.put(None))
+    sender.start(args=(commands, context.Value(ctypes.c_bool, False), context.Array(ctypes.c_double, TARGET_STATS_SIZE),
+                       [("127.0.0.1", free_port())]))
+    time.sleep(1.0)
+    for _ in range(100):
+        commands.put("MUTE")
+    sender_stop = sender.stop()
+
+    leaked = len(multiprocessing.active_children())
+    return {
+        "start_p50_ms": metric(percentile(start_ms, 50), "ms", higher_is_better=False),
+        "stop_p50_ms": metric(percentile(stop_ms, 50), "ms", higher_is_better=False),
+        "stop_max_ms": metric(max(stop_ms), "ms", higher_is_better=False),
+        "forced_stops": metric(forced, "stops", higher_is_better=False),
+        "restart_ms": metric(restart_ms if restarted else None, "ms", higher_is_better=False),
+        "sender_stop_ms": metric(sender_stop["duration_ms"], "ms", higher_is_better=False),
+        "sender_stop_cooperative": metric(int(sender_stop["how"] == STOP_COOPERATIVE), "bool"),
+        "leaked_processes": metric(leaked, "processes", higher_is_better=False),
+    }
@@ -0,0 +1,74 @@
+# bench_noisy_client.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the rate limits and fair scheduling of the command server: a noisy client floods server.py
+(recording backend, default limits) with "Scroll Down" at `--noisy-rate` commands/s while a quiet client sends
+a command every half second from another address (127.0.0.2, Linux only).
+Reports the commands of the quiet client that were executed and their latency, and how many commands
+of the noisy client were executed and throttled.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from bench_common import SERVER_DIR, free_port, metric, percentile
+
+from replay_harness import DEFAULT_COMMANDS, match_frames, read_server_records, run_connection, synthetic_schedule
+
+# Commands per second of the quiet client
+QUIET_RATE = 2.0
+
+
+def run(args) -> dict:
+    """
+    Runs the noisy and the quiet client for `args.duration` seconds.
+    Args:
+        args: Parsed command line arguments (uses `noisy_rate` and `duration`).
+    Returns:
+        dict: The metrics of the scenario.
+    """
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        record_file = os.path.join(tmp_dir, "recorded_commands.jsonl")
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(SERVER_DIR, "server.py"), "--backend", "recording",
+             "--record-file", record_file, "--host", "127.0.0.1", "--port", str(port), "--control-port", "0"],
+            stdout=subprocess.DEVNULL
+        )
+        try:
+            time.sleep(0.5)
+            noisy_schedule = synthetic_schedule(args.noisy_rate, args.duration, commands=("Scroll Down",))
+            quiet_schedule = synthetic_schedule(QUIET_RATE, args.duration, commands=DEFAULT_COMMANDS)
+            noisy, quiet = {}, {}
+            start_time = time.time() + 0.2
+            threads = [
+                threading.Thread(target=run_connection, args=("127.0.0.1", port, noisy_schedule, start_time, noisy)),
+                threading.Thread(target=run_connection, args=("127.0.0.1", port, quiet_schedule, start_time, quiet, ("127.0.0.2", 0))),
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            time.sleep(1.0)
+            records = read_server_records(record_file, start_time)
+        finally:
+            server.terminate()
+            server.wait()
+
+    for result in (noisy, quiet):
+        if result["error"]:
+            raise RuntimeError(result["error"])
+    noisy_report = match_frames(noisy["sent"], records.get(noisy["peer"], []))
+    quiet_report = match_frames(quiet["sent"], records.get(quiet["peer"], []))
+    latencies = sorted(quiet_report["latencies"])
+    return {
+        "quiet_executed_ratio": metric(quiet_report["executed"] / max(len(quiet["sent"]), 1), "ratio"),
+        "quiet_latency_p99_ms": metric(percentile(latencies, 99) * 1000, "ms", higher_is_better=False),
+        "noisy_sent": len(noisy["sent"]),
+        "noisy_executed_per_s": metric(noisy_report["executed"] / args.duration, "commands/s", higher_is_better=False),
+        "noisy_throttled": noisy_report["throttled"],
+    }
@@ -0,0 +1,90 @@
+# bench_preview.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the two previews of the web interface, per recognized frame with two detected hands:
+the "mjpeg" preview (landmarks drawn on the frame, JPEG-encoded and sent as an MJPEG part)
+and the "landmarks" preview (landmark_preview message sent as a Server-Sent Event and drawn by the browser).
+Reports the bytes streamed to every viewer and the time spent by the recognition process to build the preview.
+"""
+
+import time
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from bench_common import metric
+
+from frame_broadcaster import mjpeg_part, preview_event
+from src.gesture_recognizer.gesture_recognizer import landmark_preview
+
+# Size of the frames (the capture resolution of the recognizer)
+FRAME_SHAPE = (480, 640, 3)
+# Connections of the hand landmarks drawn by the MJPEG preview (same count as mediapipe's HAND_CONNECTIONS)
+HAND_CONNECTIONS = [(0, 1), (1, 2), (2, 3), (3, 4), (0, 5), (5, 6), (6, 7), (7, 8), (5, 9), (9, 10), (10, 11),
+                    (11, 12), (9, 13), (13, 14), (14, 15), (15, 16), (13, 17), (0, 17), (17, 18), (18, 19), (19, 20)]
+
+
+def fake_result(rng: "np.random.Generator", hands: int = 2) -> SimpleNamespace:
+    """
+    Builds an object shaped like a GestureRecognizerResult, with random landmarks.
+    Args:
+        rng (np.random.Generator): Random generator.
+        hands (int): Number of detected hands.
+    Returns:
+        SimpleNamespace: The fake result (hand_landmarks, gestures, handedness).
+    """
+    category = lambda name, score: SimpleNamespace(category_name=name, score=score)
+    return SimpleNamespace(
+        hand_landmarks=[[SimpleNamespace(x=x, y=y) for x, y in rng.random((21, 2))] for _ in range(hands)],
+        gestures=[[category("Open_Palm", 0.87)] for _ in range(hands)],
+        handedness=[[category("Left" if i % 2 else "Right", 0.99)] for i in range(hands)],
+    )
+
+
+def run(args) -> dict:
+    """
+    Builds `args.duration` seconds worth of previews of each kind and measures their size and cost.
+    Args:
+        args: Parsed command line arguments (uses `duration`).
+    Returns:
+        dict: The metrics of the scenario.
+    """
+    rng = np.random.default_rng(0)
+    # A blurred noisy frame: JPEG size close to a webcam image
+    frame = cv2.GaussianBlur(rng.integers(0, 256, FRAME_SHAPE, dtype=np.uint8), (9, 9), 0)
+    result = fake_result(rng)
+    height, width = FRAME_SHAPE[:2]
+
+    # MJPEG preview: draw the landmarks on a copy of the frame, encode it and build the MJPEG part
+    count, size = 0, 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < args.duration / 2:
+        image = frame.copy()
+        for landmarks in result.hand_landmarks:
+            points = [(int(p.x * width), int(p.y * height)) for p in landmarks]
+            for a, b in HAND_CONNECTIONS:
+                cv2.line(image, points[a], points[b], (0, 255, 0), 2)
+            for point in points:
+                cv2.circle(image, point, 3, (0, 0, 255), -1)
+        size += len(mjpeg_part(cv2.imencode(".jpg", image)[1].tobytes()))
+        count += 1
+    mjpeg_us = (time.perf_counter() - start) / count * 1e6
+    mjpeg_bytes = size / count
+
+    # Landmark preview: build the message and its Server-Sent Event
+    count, size = 0, 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < args.duration / 2:
+        size += len(preview_event(landmark_preview(result, ["Open_Palm", None], width, height)))
+        count += 1
+    landmarks_us = (time.perf_counter() - start) / count * 1e6
+    landmarks_bytes = size / count
+
+    return {
+        "mjpeg_bytes_per_frame": metric(mjpeg_bytes, "bytes", higher_is_better=False),
+        "landmarks_bytes_per_frame": metric(landmarks_bytes, "bytes", higher_is_better=False),
+        "mjpeg_us_per_frame": metric(mjpeg_us, "us", higher_is_better=False),
+        "landmarks_us_per_frame": metric(landmarks_us, "us", higher_is_better=False),
+        "bandwidth_reduction": metric(mjpeg_bytes / landmarks_bytes, "x"),
+    }
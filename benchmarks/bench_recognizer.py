@@ -0,0 +1,65 @@
+# bench_recognizer.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the recognition loop: frames per second processed by start_gesture_recognition,
+reading a recorded video file instead of the webcam. The processed frames are counted on the webcam frame queue.
+"""
+
+import ctypes
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from queue import Empty
+
+from bench_common import metric, skipped
+
+
+def run(args) -> dict:
+    """
+    Runs start_gesture_recognition over `args.video` for `args.duration` seconds and measures the processed frame rate.
+    Args:
+        args: Parsed command line arguments (uses `video`, `duration` and `warmup`).
+    Returns:
+        dict: The metrics of the scenario.
+    """
+    if not args.video:
+        return skipped("no video file (use --video)")
+    from src.gesture_recognizer.gesture_recognizer import MODEL_PATH, start_gesture_recognition
+    if not os.path.isfile(MODEL_PATH):
+        return skipped(f"model not found: {MODEL_PATH}")
+
+    context = multiprocessing.get_context("spawn")
+    webcam_queue = context.Queue()
+    command_queue = context.Queue()
+    last_gesture = context.Array(ctypes.c_char, 11 + 1)
+    # The event log is written like in the client, to a temporary directory
+    event_log_dir = tempfile.mkdtemp()
+    process = context.Process(
+        target=start_gesture_recognition,
+        args=({}, webcam_queue, command_queue, last_gesture, os.path.abspath(args.video)),
+        kwargs={"event_log_dir": event_log_dir},
+    )
+    process.start()
+    try:
+        # Wait for the first frame, then let the recognizer warm up
+        webcam_queue.get(timeout=60)
+        end_warmup = time.perf_counter() + args.warmup
+        while time.perf_counter() < end_warmup:
+            webcam_queue.get(timeout=10)
+        frames = 0
+        start = time.perf_counter()
+        end = start + args.duration
+        while time.perf_counter() < end:
+            try:
+                webcam_queue.get(timeout=1)
+            except Empty:
+                continue
+            frames += 1
+        elapsed = time.perf_counter() - start
+    finally:
+        process.terminate()
+        process.join()
+        shutil.rmtree(event_log_dir, ignore_errors=True)
+    return {"fps": metric(frames / elapsed, "frames/s")}
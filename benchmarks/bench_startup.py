@@ -0,0 +1,147 @@
+# bench_startup.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the client startup: starts `python main.py` (like start_client.sh does) and measures the time
+until the configuration page is served, and the resident memory of the Flask process and of its child processes.
+The client uses a temporary copy of the saved configurations, already migrated to the configuration database.
+"""
+
+import glob
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from bench_common import CLIENT_DIR, free_port, metric
+
+from config_store import ConfigStore
+
+
+def rss_mb(pid: int) -> float:
+    """
+    Returns the resident memory of a process (Linux only).
+    Args:
+        pid (int): Process id.
+    Returns:
+        float: Resident memory in MB, or None if it cannot be read.
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def child_pids(pid: int) -> list:
+    """
+    Returns the ids of the child processes of a process (Linux only).
+    Args:
+        pid (int): Process id.
+    Returns:
+        list: The child process ids.
+    """
+    children = []
+    for stat_path in glob.glob("/proc/[0-9]*/stat"):
+        try:
+            with open(stat_path) as f:
+                # The 4th field (after the parenthesized command name) is the parent process id
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(stat_path.split("/")[2]))
+    return children
+
+
+def start_client(port: int, config_dir: str, timeout: float = 30.0) -> tuple:
+    """
+    Starts the client and waits until the configuration page is served.
+    Args:
+        port (int): Port of the Flask client.
+        config_dir (str): Configuration directory of the client.
+        timeout (float): Maximum time to wait, in seconds.
+    Returns:
+        tuple: (process, seconds from the start of the process to the first 200 response).
+    """
+    env = dict(os.environ, PYTHONPATH=".", CLIENT_PORT=str(port), CLIENT_CONFIG_DIR=config_dir,
+               # No command server is needed: the sender keeps retrying in the background
+               GESTURE_SERVER_IP="127.0.0.1", GESTURE_SERVER_PORT=str(free_port()))
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "main.py"], cwd=CLIENT_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = started + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                if response.status == 200:
+                    return process, time.perf_counter() - started
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.01)
+    process.kill()
+    raise RuntimeError("the client did not serve the configuration page in time")
+
+
+def stop_client(process: "subprocess.Popen", port: int) -> None:
+    """
+    Stops the client through /stop_client (killing it if it does not stop).
+    Args:
+        process (subprocess.Popen): The client process.
+        port (int): Port of the Flask client.
+    Returns:
+        None
+    """
+    try:
+        urllib.request.urlopen(f"http://127.0.0.1:{port}/stop_client", timeout=2).close()
+    except (urllib.error.URLError, ConnectionError, OSError):
+        pass
+    try:
+        process.wait(10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def run(args) -> dict:
+    """
+    Starts and stops the client `args.starts` times.
+    Args:
+        args: Parsed command line arguments (uses `starts`).
+    Returns:
+        dict: The metrics of the scenario (medians over the starts).
+    """
+    times, flask_rss, children_rss = [], [], []
+    with tempfile.TemporaryDirectory() as config_dir:
+        for path in glob.glob(os.path.join(CLIENT_DIR, "static", "configs", "*.json")):
+            shutil.copy(path, config_dir)
+        store = ConfigStore(os.path.join(config_dir, "configs.sqlite3"))
+        store.import_json_dir(config_dir)
+        store.close()
+
+        for _ in range(args.starts):
+            port = free_port()
+            process, elapsed = start_client(port, config_dir)
+            try:
+                times.append(elapsed)
+                # Let the child processes finish their own startup
+                time.sleep(1.0)
+                flask_rss.append(rss_mb(process.pid))
+                children_rss.append(sum(rss_mb(pid) or 0 for pid in child_pids(process.pid)))
+            finally:
+                stop_client(process, port)
+
+    result = {
+        "starts": args.starts,
+        "time_to_first_page_s": metric(statistics.median(times), "s", higher_is_better=False),
+    }
+    if None not in flask_rss:
+        result["flask_rss_mb"] = metric(statistics.median(flask_rss), "MB", higher_is_better=False)
+        result["child_processes_rss_mb"] = metric(statistics.median(children_rss), "MB", higher_is_better=False)
+    return result
@@ -0,0 +1,149 @@
+# bench_video_feed.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the /video_feed MJPEG stream of the Flask client with N concurrent viewers.
+A producer thread feeds synthetic JPEG-encoded frames into the webcam frame queue (in place of the recognizer process),
+and every viewer reads the multipart stream over HTTP and counts the frames it receives.
+Before that, the viewers are connected for a while without frames, to measure the CPU used by idle streams.
+"""
+
+import http.client
+import multiprocessing
+import threading
+import time
+
+import cv2
+import numpy as np
+from werkzeug.serving import make_server
+
+from bench_common import free_port, metric
+
+import flask_client
+
+# Size of the synthetic frames (the capture resolution of the recognizer)
+FRAME_SHAPE = (480, 640, 3)
+
+
+def produce_frames(queue: "multiprocessing.Queue", stop_event: threading.Event, fps: float) -> None:
+    """
+    Puts synthetic JPEG-encoded frames into the webcam frame queue at the given rate, like the recognizer process does.
+    Args:
+        queue (multiprocessing.Queue): The webcam frame queue.
+        stop_event (threading.Event): Set to stop producing.
+        fps (float): Frames per second.
+    Returns:
+        None
+    """
+    rng = np.random.default_rng(0)
+    # A few noisy frames, so that the JPEG images have a realistic (large) size
+    frames = [cv2.imencode(".jpg", rng.integers(0, 256, FRAME_SHAPE, dtype=np.uint8))[1].tobytes() for _ in range(4)]
+    i = 0
+    next_frame = time.perf_counter()
+    while not stop_event.is_set():
+        queue.put(frames[i % len(frames)])
+        i += 1
+        next_frame += 1.0 / fps
+        delay = next_frame - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def view_stream(port: int, duration: float, result: dict) -> None:
+    """
+    Reads the MJPEG stream for `duration` seconds and counts the received frames and bytes.
+    Args:
+        port (int): Port of the Flask client.
+        duration (float): Seconds to read the stream for.
+        result (dict): Filled with "frames" and "bytes".
+    Returns:
+        None
+    """
+    result["frames"] = 0
+    result["bytes"] = 0
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=duration + 5)
+    connection.request("GET", "/video_feed")
+    response = connection.getresponse()
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        chunk = response.read1(65536)
+        if not chunk:
+            break
+        result["bytes"] += len(chunk)
+        result["frames"] += chunk.count(b"--frame\r\n")
+    connection.close()
+
+
+def measure_idle_cpu(port: int, viewers: int, duration: float) -> float:
+    """
+    Connects `viewers` viewers to the stream while no frames are produced and measures the CPU time used by the process.
+    Args:
+        port (int): Port of the Flask client.
+        viewers (int): Number of viewers.
+        duration (float): Measurement time in seconds.
+    Returns:
+        float: CPU time used per second of wall time (1.0 is a full core).
+    """
+    connections = []
+    for _ in range(viewers):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=duration + 5)
+        connection.request("GET", "/video_feed")
+        connections.append(connection)
+    # Let the server threads reach the stream generator
+    time.sleep(0.2)
+    cpu_start = time.process_time()
+    time.sleep(duration)
+    cpu_used = time.process_time() - cpu_start
+    for connection in connections:
+        connection.close()
+    return cpu_used / duration
+
+
+def run(args) -> dict:
+    """
+    Starts the Flask client on a free port and measures the MJPEG throughput with `args.viewers` viewers.
+    Args:
+        args: Parsed command line arguments (uses `viewers`, `duration` and `fps`).
+    Returns:
+        dict: The metrics of the scenario.
+    """
+    port = free_port()
+    server = make_server("127.0.0.1", port, flask_client.app, threaded=True)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+
+    queue = multiprocessing.Queue()
+    stop_event = threading.Event()
+    producer = threading.Thread(target=produce_frames, args=(queue, stop_event, args.fps), daemon=True)
+    flask_client.webcam_frame_queue = queue
+    flask_client.recognition_active = True
+    flask_client.frame_broadcaster.start(queue)
+    try:
+        idle_cpu = measure_idle_cpu(port, args.viewers, min(args.duration, 2.0))
+        producer.start()
+        cpu_start = time.process_time()
+        results = [{} for _ in range(args.viewers)]
+        viewers = [threading.Thread(target=view_stream, args=(port, args.duration, result)) for result in results]
+        for viewer in viewers:
+            viewer.start()
+        for viewer in viewers:
+            viewer.join()
+        # Includes the CPU used by the viewers, which run in this process too
+        streaming_cpu = (time.process_time() - cpu_start) / args.duration
+    finally:
+        flask_client.recognition_active = False
+        flask_client.frame_broadcaster.stop()
+        stop_event.set()
+        if producer.is_alive():
+            producer.join()
+        server.shutdown()
+
+    frames = sum(result["frames"] for result in results)
+    total_bytes = sum(result["bytes"] for result in results)
+    return {
+        "viewers": args.viewers,
+        "delivered_fps": metric(frames / args.duration, "frames/s"),
+        "per_viewer_fps": metric(frames / args.duration / args.viewers, "frames/s"),
+        "throughput_mb_s": metric(total_bytes / args.duration / 1e6, "MB/s"),
+        "idle_cpu_cores": metric(idle_cpu, "cores", higher_is_better=False),
+        "streaming_cpu_cores": metric(streaming_cpu, "cores", higher_is_better=False),
+    }
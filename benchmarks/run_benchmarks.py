@@ -0,0 +1,170 @@
+# run_benchmarks.py
+# -*- coding: utf-8 -*-
+"""
+This module runs the benchmark suite and writes the results to a JSON file,
+so that results of different releases can be compared and regressions can gate a release.
+
+Usage (from the repository root):
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --only config_io command_path --compare baseline.json --max-regression 0.1
+
+The output file contains the environment (Python version, platform, git commit) and, for every scenario,
+its metrics as {"value", "unit", "higher_is_better"} entries (or {"skipped": reason}).
+With --compare, the exit status is 1 if any metric regressed more than --max-regression with respect to the baseline.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import bench_common
+
+# Scenario name -> module implementing it (every module exposes run(args) -> dict)
+SCENARIOS = {
+    "recognizer": "bench_recognizer",
+    "video_feed": "bench_video_feed",
+    "preview": "bench_preview",
+    "command_path": "bench_command_path",
+    "config_io": "bench_config_io",
+    "startup": "bench_startup",
+    "landmark_classifier": "bench_landmark_classifier",
+    "control_channel": "bench_control_channel",
+    "noisy_client": "bench_noisy_client",
+    "event_log": "bench_event_log",
+    "gesture_history": "bench_gesture_history",
+    "input_injection": "bench_input_injection",
+    "bindings": "bench_bindings",
+    "fanout": "bench_fanout",
+    "capture_sessions": "bench_capture_sessions",
+    "lifecycle": "bench_lifecycle",
+}
+
+
+def git_commit() -> str:
+    """
+    Returns the current git commit of the repository, if available.
+    Args:
+        None
+    Returns:
+        str: The commit hash, or None.
+    """
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=bench_common.REPO_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_scenarios(names: list, args) -> dict:
+    """
+    Runs the given scenarios.
+    Args:
+        names (list): Names of the scenarios to run (keys of SCENARIOS).
+        args: Parsed command line arguments, passed to every scenario.
+    Returns:
+        dict: Scenario name -> scenario result.
+    """
+    results = {}
+    for name in names:
+        print(f"[INFO] Running benchmark: {name}")
+        module = importlib.import_module(SCENARIOS[name])
+        started = time.perf_counter()
+        try:
+            results[name] = module.run(args)
+        except Exception as e:
+            print(f"[ERROR] Benchmark {name} failed: {e}")
+            results[name] = {"error": str(e)}
+        print(f"[INFO] {name}: {json.dumps(results[name])} ({time.perf_counter() - started:.1f} s)")
+    return results
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list:
+    """
+    Compares the results with a baseline.
+    Args:
+        results (dict): Scenario results of the current run.
+        baseline (dict): Scenario results of the baseline run.
+        max_regression (float): Maximum allowed relative regression (e.g., 0.1 for 10%).
+    Returns:
+        list: Descriptions of the metrics that regressed more than `max_regression`.
+    """
+    regressions = []
+    for scenario, metrics in results.items():
+        for name, entry in metrics.items():
+            if not isinstance(entry, dict) or "value" not in entry:
+                continue
+            old = baseline.get(scenario, {}).get(name)
+            if not isinstance(old, dict) or not old.get("value"):
+                continue
+            change = (entry["value"] - old["value"]) / abs(old["value"])
+            # A regression is a decrease for higher-is-better metrics and an increase for the others
+            regression = -change if entry["higher_is_better"] else change
+            status = "REGRESSION" if regression > max_regression else "ok"
+            print(f"[COMPARE] {scenario}.{name}: {old['value']:.4g} -> {entry['value']:.4g} {entry['unit']} ({change:+.1%}) {status}")
+            if regression > max_regression:
+                regressions.append(f"{scenario}.{name} ({change:+.1%})")
+    return regressions
+
+
+def main(argv: list = None) -> int:
+    """
+    Command line entry point of the benchmark suite.
+    Args:
+        argv (list): Command line arguments (defaults to sys.argv[1:]).
+    Returns:
+        int: Exit status (1 if a regression was detected).
+    """
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument("--only", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS), help="Scenarios to run.")
+    parser.add_argument("--output", default="bench_results.json", help="JSON file where the results are written.")
+    parser.add_argument("--compare", help="Baseline results file to compare with.")
+    parser.add_argument("--max-regression", type=float, default=0.1, help="Maximum allowed relative regression.")
+    parser.add_argument("--duration", type=float, default=5.0, help="Measurement time of every scenario, in seconds.")
+    # Scenario parameters
+    parser.add_argument("--video", help="recognizer: video file used in place of the webcam.")
+    parser.add_argument("--warmup", type=float, default=2.0, help="recognizer: warm-up time in seconds.")
+    parser.add_argument("--viewers", type=int, default=8, help="video_feed: number of concurrent viewers.")
+    parser.add_argument("--fps", type=float, default=30.0, help="video_feed: frames per second produced by the fake recognizer.")
+    parser.add_argument("--commands", type=int, default=2000, help="command_path: number of commands to send.")
+    parser.add_argument("--rate", type=float, default=200.0, help="command_path: commands per second (0 for as fast as possible).")
+    parser.add_argument("--configs", type=int, default=300, help="config_io: number of saved configurations.")
+    parser.add_argument("--starts", type=int, default=3, help="startup: number of client starts.")
+    parser.add_argument("--templates", type=int, default=200, help="landmark_classifier: number of custom gesture templates.")
+    parser.add_argument("--control-rate", type=float, default=60.0, help="control_channel: updates per second of every kind.")
+    parser.add_argument("--noisy-rate", type=float, default=500.0, help="noisy_client: commands per second of the noisy client.")
+    parser.add_argument("--targets", type=int, default=3, help="fanout: number of healthy target servers.")
+    parser.add_argument("--capture-workers", type=int, default=1, help="capture_sessions: inference workers of the service.")
+    parser.add_argument("--max-latency", type=float, default=250.0, help="capture_sessions: maximum p95 latency of a sustained session count, in ms.")
+    parser.add_argument("--cycles", type=int, default=20, help="lifecycle: start/stop cycles of the recognizer.")
+    parser.add_argument("--events", type=int, default=5_000_000, help="event_log: events to write and load back.")
+    args = parser.parse_args(argv)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": run_scenarios(args.only, args),
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[INFO] Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report["results"], baseline.get("results", {}), args.max_regression)
+        if regressions:
+            print(f"[ERROR] Regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,13 @@
 This module contains constants used in the client application.
 """
 
+# List of available gestures (category names of the MediaPipe gesture recognizer model)
+GESTURES = ("Thumb_Up", "Thumb_Down", "Open_Palm", "Closed_Fist", "Victory", "ILoveYou", "Pointing_Up")
+
+# Maximum length of a gesture name (custom gestures recorded through the web interface included).
+# It is the size of the shared buffer where the gesture recognizer writes the last recognized gesture.
+MAX_GESTURE_NAME_LENGTH = 32
+
 COMMANDS = ("Volume Up", 
             "Volume Down", 
             "Open Calculator", 
@@ -13,3 +20,25 @@ COMMANDS = ("Volume Up",
             "Scroll Up", 
             "Scroll Down",
             "Task Manager")
+
+# Continuous commands: while a gesture bound to one of them is shown, the gesture recognizer streams a value
+# taken from the hand landmarks to the server (see control_channel.py) instead of sending a discrete command.
+CONTINUOUS_COMMANDS = ("Scroll (continuous)",
+                       "Volume (continuous)",
+                       "Pointer (continuous)")
+
+# Prefix of the macro commands: "Macro:<keys>" sends a user-defined sequence of keys, chords and waits,
+# e.g. "Macro:ctrl+shift+t" or "Macro:ctrl+c,wait 100,ctrl+v" (see server/input_injection.py)
+MACRO_PREFIX = "Macro:"
+
+# Registry of the numeric IDs of the gestures and of the commands: an ID is the index of the name in these tuples.
+# Command IDs are put on the command queue and sent on the wire ("#<id>|" frames, see send_command_to_server.py),
+# gesture and command IDs are also used by the event log and by the compiled bindings (see gesture_bindings.py).
+# Only append to them: COMMAND_REGISTRY must match server/server.py, and IDs are stored in the event log files.
+GESTURE_REGISTRY = ("None",) + GESTURES
+COMMAND_REGISTRY = COMMANDS + CONTINUOUS_COMMANDS
+GESTURE_IDS = {name: i for i, name in enumerate(GESTURE_REGISTRY)}
+COMMAND_IDS = {name: i for i, name in enumerate(COMMAND_REGISTRY)}
+
+# Prefix of the command frames carrying a command ID instead of the name of the command
+COMMAND_ID_PREFIX = "#"
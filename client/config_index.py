@@ -0,0 +1,127 @@
+# client/config_index.py
+# -*- coding: utf-8 -*-
+"""
+This module contains the ConfigIndex class, an in-memory index of the configurations saved in the configuration store.
+Configurations are loaded and parsed once, then refreshed incrementally: when the store revision changes,
+only the configurations whose revision changed are read again. Every configuration is kept together with its
+serialized JSON body and an ETag, so flask_client.py can serve it without querying the store.
+Listeners (e.g., ConfigStats) can be registered to be notified of every configuration change the index detects.
+"""
+
+import json
+import threading
+
+from config_store import ConfigStore
+
+
+class ConfigIndex:
+    """
+    In-memory index of the configurations of a ConfigStore.
+
+    Every access checks the store revision (a single indexed query), so changes made by any process are visible immediately,
+    and a configuration is read and serialized again only if its own revision changed.
+    """
+
+    def __init__(self, store: ConfigStore) -> None:
+        """
+        Initializes the index. The store is read on first access.
+        Args:
+            store (ConfigStore): The configuration store.
+        Returns:
+            None
+        """
+        self.store = store
+        # name -> (revision, data, body, etag)
+        self._entries = {}
+        self._revision = None
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: "callable") -> None:
+        """
+        Registers a function called for every configuration change detected by the index
+        (including the configurations loaded by the first refresh).
+        Args:
+            listener (callable): Function called as listener(name, old_mapping, new_mapping),
+                where old_mapping is None for a new configuration and new_mapping is None for a deleted one.
+        Returns:
+            None
+        """
+        self._listeners.append(listener)
+
+    @staticmethod
+    def _entry(data: dict, revision: int) -> tuple:
+        """Builds the cached entry of a configuration: (revision, data, body, etag)."""
+        body = json.dumps(data).encode()
+        # The revision identifies the content of a configuration, so it is a valid ETag
+        return revision, data, body, f"r{revision:x}"
+
+    def refresh(self) -> None:
+        """
+        Updates the index incrementally if the store changed since the last refresh.
+        Args:
+            None
+        Returns:
+            None
+        """
+        with self._lock:
+            revision = self.store.revision()
+            if revision == self._revision:
+                return
+            entries = {}
+            if not self._entries:
+                # First load: read all the configurations with a few paginated queries
+                for name, data, row_revision in self.store.iter_configs(with_revision=True):
+                    entries[name] = self._entry(data, row_revision)
+            else:
+                for name, row_revision in self.store.revisions().items():
+                    cached = self._entries.get(name)
+                    # Unchanged configuration: reuse the parsed data
+                    if cached is not None and cached[0] == row_revision:
+                        entries[name] = cached
+                        continue
+                    loaded = self.store.get_with_revision(name)
+                    if loaded is not None:
+                        entries[name] = self._entry(*loaded)
+            old_entries, self._entries = self._entries, entries
+            self._revision = revision
+            if self._listeners:
+                self._notify(old_entries, entries)
+
+    def _notify(self, old_entries: dict, new_entries: dict) -> None:
+        """Calls the listeners for every configuration that was created, changed or deleted."""
+        for name, entry in new_entries.items():
+            old = old_entries.get(name)
+            if old is entry:
+                continue
+            for listener in self._listeners:
+                listener(name, old[1] if old else None, entry[1])
+        for name, old in old_entries.items():
+            if name not in new_entries:
+                for listener in self._listeners:
+                    listener(name, old[1], None)
+
+    def names(self) -> list:
+        """
+        Returns the names of the saved configurations.
+        Args:
+            None
+        Returns:
+            list: The configuration names.
+        """
+        self.refresh()
+        return list(self._entries)
+
+    def get(self, name: str) -> tuple:
+        """
+        Returns a configuration.
+        Args:
+            name (str): Name of the configuration.
+        Returns:
+            tuple: (data, body, etag), or None if the configuration does not exist.
+        """
+        self.refresh()
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        return entry[1], entry[2], entry[3]
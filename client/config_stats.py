@@ -0,0 +1,164 @@
+# client/config_stats.py
+# -*- coding: utf-8 -*-
+"""
+This module contains the ConfigStats class, which keeps the statistics of the saved configurations
+(the gesture x command contingency matrix, gesture and command frequencies, and commands assigned to multiple gestures)
+as NumPy count arrays indexed by gesture and command.
+The counts are updated incrementally every time a configuration is saved or deleted, so they can be served in constant time,
+and can also be recomputed from scratch in vectorized batches (used by statistics/stats.ipynb).
+"""
+
+import threading
+
+import numpy as np
+
+from client_constants import COMMANDS, CONTINUOUS_COMMANDS, GESTURES
+
+# Value saved for a gesture without a command (the first option of the command <select> in index.html)
+NO_COMMAND = "-- No Command --"
+# Column used for commands that are not in COMMANDS or CONTINUOUS_COMMANDS
+OTHER_COMMAND = "Other"
+# Command columns of the count arrays
+COMMAND_COLUMNS = (NO_COMMAND,) + COMMANDS + CONTINUOUS_COMMANDS + (OTHER_COMMAND,)
+
+_COMMAND_INDEX = {command: i for i, command in enumerate(COMMAND_COLUMNS)}
+_OTHER_INDEX = len(COMMAND_COLUMNS) - 1
+# Code of a gesture missing from a configuration
+_MISSING = -1
+
+
+def encode_config(mapping: dict) -> np.ndarray:
+    """
+    Encodes a gesture-command mapping as an array of command column indexes, one per gesture.
+    Args:
+        mapping (dict): Gesture-command mapping.
+    Returns:
+        np.ndarray: Array of len(GESTURES) command column indexes (-1 for gestures missing from the mapping).
+    """
+    return np.array(
+        [_COMMAND_INDEX.get(mapping[gesture], _OTHER_INDEX) if gesture in mapping else _MISSING for gesture in GESTURES],
+        dtype=np.int64
+    )
+
+
+class ConfigStats:
+    """
+    Aggregated statistics of a set of configurations:
+    - `matrix[g, c]`: number of configurations binding gesture g to command column c;
+    - `multi[c]`: number of gestures bound to command column c, summed over the configurations where
+      command c is bound to more than one gesture.
+    Gesture and command frequencies are derived from `matrix`.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes empty statistics.
+        Args:
+            None
+        Returns:
+            None
+        """
+        self.matrix = np.zeros((len(GESTURES), len(COMMAND_COLUMNS)), dtype=np.int64)
+        self.multi = np.zeros(len(COMMAND_COLUMNS), dtype=np.int64)
+        self.configs = 0
+        self._lock = threading.Lock()
+
+    def _apply(self, codes: np.ndarray, sign: int) -> None:
+        """
+        Adds (sign=1) or subtracts (sign=-1) the counts of an encoded configuration.
+        Args:
+            codes (np.ndarray): Encoded configuration (see `encode_config`).
+            sign (int): 1 or -1.
+        Returns:
+            None
+        """
+        present = codes != _MISSING
+        self.matrix[np.nonzero(present)[0], codes[present]] += sign
+        per_command = np.bincount(codes[present], minlength=len(COMMAND_COLUMNS))
+        self.multi += sign * np.where(per_command > 1, per_command, 0)
+        self.configs += sign
+
+    def update(self, old_mapping: dict, new_mapping: dict) -> None:
+        """
+        Updates the statistics after a configuration change.
+        Args:
+            old_mapping (dict): The previous mapping of the configuration (None if it was created).
+            new_mapping (dict): The new mapping of the configuration (None if it was deleted).
+        Returns:
+            None
+        """
+        with self._lock:
+            if old_mapping is not None:
+                self._apply(encode_config(old_mapping), -1)
+            if new_mapping is not None:
+                self._apply(encode_config(new_mapping), 1)
+
+    @classmethod
+    def from_configs(cls, mappings, batch_size: int = 4096) -> "ConfigStats":
+        """
+        Computes the statistics of many configurations from scratch, in vectorized batches.
+        Args:
+            mappings: Iterable of gesture-command mappings (e.g., the mappings of ConfigStore.iter_configs()).
+            batch_size (int): Number of configurations encoded at a time.
+        Returns:
+            ConfigStats: The statistics.
+        """
+        stats = cls()
+        num_commands = len(COMMAND_COLUMNS)
+        gesture_offsets = np.arange(len(GESTURES)) * num_commands
+        batch = []
+
+        def flush() -> None:
+            codes = np.stack(batch)  # shape: (configs, gestures)
+            present = codes != _MISSING
+            # Contingency matrix: count (gesture, command) pairs through their flattened index
+            flat = (gesture_offsets + codes)[present]
+            stats.matrix += np.bincount(flat, minlength=stats.matrix.size).reshape(stats.matrix.shape)
+            # Per-configuration command counts, then keep the commands bound to more than one gesture
+            rows = np.nonzero(present)[0]
+            per_command = np.zeros((len(batch), num_commands), dtype=np.int64)
+            np.add.at(per_command, (rows, codes[present]), 1)
+            stats.multi += np.where(per_command > 1, per_command, 0).sum(axis=0)
+            stats.configs += len(batch)
+            batch.clear()
+
+        for mapping in mappings:
+            batch.append(encode_config(mapping))
+            if len(batch) == batch_size:
+                flush()
+        if batch:
+            flush()
+        return stats
+
+    def snapshot(self) -> dict:
+        """
+        Returns the statistics in a JSON-serializable format.
+        Args:
+            None
+        Returns:
+            dict: {
+                "configs": number of configurations,
+                "gestures": gesture names (rows of the matrix),
+                "commands": command names (columns of the matrix),
+                "matrix": contingency matrix as a list of rows,
+                "gesture_counts": {gesture: number of configurations binding it to a command},
+                "command_counts": {command: number of gestures bound to it, over all configurations},
+                "multi_gesture_commands": {command: number of gestures bound to it, in configurations binding it to more than one gesture}
+            }
+        """
+        with self._lock:
+            matrix = self.matrix.copy()
+            multi = self.multi.copy()
+            configs = self.configs
+        # Gestures bound to "-- No Command --" are not counted as used
+        gesture_counts = matrix[:, 1:].sum(axis=1)
+        command_counts = matrix.sum(axis=0)
+        return {
+            "configs": configs,
+            "gestures": list(GESTURES),
+            "commands": list(COMMAND_COLUMNS),
+            "matrix": matrix.tolist(),
+            "gesture_counts": dict(zip(GESTURES, gesture_counts.tolist())),
+            "command_counts": dict(zip(COMMAND_COLUMNS, command_counts.tolist())),
+            "multi_gesture_commands": dict(zip(COMMAND_COLUMNS, multi.tolist())),
+        }
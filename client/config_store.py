@@ -0,0 +1,363 @@
+# client/config_store.py
+# -*- coding: utf-8 -*-
+"""
+This module contains the ConfigStore class, which stores all the gesture-command configurations
+in a single SQLite database instead of one JSON file per configuration.
+Every save is an atomic transaction, and configurations are looked up by name through the primary key index.
+The same database also stores the templates of the custom gestures (hand landmarks recorded through the web interface).
+It also provides a bulk import from (and export to) a directory of <name>.json files,
+so existing deployments can migrate in one step.
+
+Command line usage (from the client directory):
+    python config_store.py import static/configs          # import all the JSON files into the database
+    python config_store.py export exported_configs        # write every configuration to <name>.json
+"""
+
+import argparse
+import array
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Default path of the database, inside the configuration directory (which is a Docker volume)
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), "static", "configs", "configs.sqlite3")
+
+
+class ConfigStore:
+    """
+    SQLite-backed storage of the gesture-command configurations.
+
+    Every configuration is a row (name, data, revision, updated_at), where data is the JSON-encoded mapping.
+    A store-wide revision counter is incremented by every change and stamped on the changed row,
+    so readers can detect changes (and which configurations changed) with a single indexed query.
+    The connection is shared by all the threads of the process and protected by a lock.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH) -> None:
+        """
+        Opens (and creates, if needed) the database.
+        Args:
+            db_path (str): Path of the SQLite database file.
+        Returns:
+            None
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # isolation_level=None: transactions are managed explicitly with BEGIN/COMMIT
+        self._connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            # Write-ahead log: readers are not blocked by a save, and a save is a single fsync'd append
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=FULL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS configs ("
+                "name TEXT PRIMARY KEY, data TEXT NOT NULL, revision INTEGER NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self._connection.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('revision', 0)")
+            # Custom gesture templates: landmarks is the float32 array of the 21 x 3 hand landmarks
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS templates ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, landmarks BLOB NOT NULL, "
+                "left_handed INTEGER NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS templates_name ON templates (name)")
+
+    def _next_revision(self) -> int:
+        """Increments the store revision (must be called inside a transaction) and returns it."""
+        self._connection.execute("UPDATE meta SET value = value + 1 WHERE key = 'revision'")
+        return self._connection.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0]
+
+    def _save_many(self, configs: list) -> None:
+        """
+        Saves many configurations in a single transaction.
+        Args:
+            configs (list): (name, mapping) tuples.
+        Returns:
+            None
+        """
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                revision = self._next_revision()
+                now = time.time()
+                self._connection.executemany(
+                    "INSERT INTO configs (name, data, revision, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET data = excluded.data, revision = excluded.revision, updated_at = excluded.updated_at",
+                    [(name, json.dumps(mapping), revision, now) for name, mapping in configs]
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def save(self, name: str, mapping: dict) -> None:
+        """
+        Saves (creates or replaces) a configuration atomically.
+        Args:
+            name (str): Name of the configuration.
+            mapping (dict): Gesture-command mapping.
+        Returns:
+            None
+        """
+        self._save_many([(name, mapping)])
+
+    def delete(self, name: str) -> bool:
+        """
+        Deletes a configuration.
+        Args:
+            name (str): Name of the configuration.
+        Returns:
+            bool: True if the configuration existed.
+        """
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                deleted = self._connection.execute("DELETE FROM configs WHERE name = ?", (name,)).rowcount > 0
+                if deleted:
+                    self._next_revision()
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return deleted
+
+    def get(self, name: str) -> dict:
+        """
+        Loads a configuration.
+        Args:
+            name (str): Name of the configuration.
+        Returns:
+            dict: The gesture-command mapping, or None if the configuration does not exist.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT data FROM configs WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_with_revision(self, name: str) -> tuple:
+        """
+        Loads a configuration together with the revision of its last change.
+        Args:
+            name (str): Name of the configuration.
+        Returns:
+            tuple: (mapping, revision), or None if the configuration does not exist.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT data, revision FROM configs WHERE name = ?", (name,)).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def names(self) -> list:
+        """
+        Returns the names of all the configurations, sorted.
+        Args:
+            None
+        Returns:
+            list: The configuration names.
+        """
+        with self._lock:
+            return [row[0] for row in self._connection.execute("SELECT name FROM configs ORDER BY name")]
+
+    def revisions(self) -> dict:
+        """
+        Returns the revision of the last change of every configuration.
+        Args:
+            None
+        Returns:
+            dict: name -> revision, in name order.
+        """
+        with self._lock:
+            return dict(self._connection.execute("SELECT name, revision FROM configs ORDER BY name"))
+
+    def revision(self) -> int:
+        """
+        Returns the store revision, which changes every time a configuration is saved or deleted (by any process).
+        Args:
+            None
+        Returns:
+            int: The store revision.
+        """
+        with self._lock:
+            return self._connection.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0]
+
+    def iter_configs(self, batch_size: int = 500, with_revision: bool = False):
+        """
+        Iterates over all the configurations in name order, without loading them all in memory at once.
+        Args:
+            batch_size (int): Number of rows read from the database at a time.
+            with_revision (bool): Also yield the revision of the last change of every configuration.
+        Yields:
+            tuple: (name, mapping), or (name, mapping, revision) if `with_revision` is True.
+        """
+        last_name = ""
+        while True:
+            # Keyset pagination on the primary key: the lock is only held while a batch is read
+            with self._lock:
+                rows = self._connection.execute(
+                    "SELECT name, data, revision FROM configs WHERE name > ? ORDER BY name LIMIT ?", (last_name, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for name, data, revision in rows:
+                yield (name, json.loads(data), revision) if with_revision else (name, json.loads(data))
+            last_name = rows[-1][0]
+
+    def add_template(self, name: str, landmarks: list, left_handed: bool) -> None:
+        """
+        Saves a template of a custom gesture.
+        Args:
+            name (str): Name of the custom gesture.
+            landmarks (list): The 63 coordinates of the 21 hand landmarks (x, y, z of every landmark).
+            left_handed (bool): Whether the landmarks belong to a left hand.
+        Returns:
+            None
+        """
+        blob = array.array("f", landmarks).tobytes()
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.execute(
+                    "INSERT INTO templates (name, landmarks, left_handed, created_at) VALUES (?, ?, ?, ?)",
+                    (name, blob, int(bool(left_handed)), time.time())
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def delete_templates(self, name: str) -> int:
+        """
+        Deletes all the templates of a custom gesture.
+        Args:
+            name (str): Name of the custom gesture.
+        Returns:
+            int: Number of deleted templates.
+        """
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                deleted = self._connection.execute("DELETE FROM templates WHERE name = ?", (name,)).rowcount
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return deleted
+
+    def templates(self) -> list:
+        """
+        Returns all the templates of the custom gestures.
+        Args:
+            None
+        Returns:
+            list: (name, landmarks, left_handed) tuples, where landmarks is a list of 63 floats.
+        """
+        with self._lock:
+            rows = self._connection.execute("SELECT name, landmarks, left_handed FROM templates ORDER BY id").fetchall()
+        return [(name, array.array("f", blob).tolist(), bool(left_handed)) for name, blob, left_handed in rows]
+
+    def template_counts(self) -> dict:
+        """
+        Returns the number of templates of every custom gesture.
+        Args:
+            None
+        Returns:
+            dict: name -> number of templates, in name order.
+        """
+        with self._lock:
+            return dict(self._connection.execute("SELECT name, COUNT(*) FROM templates GROUP BY name ORDER BY name"))
+
+    def __len__(self) -> int:
+        """Returns the number of configurations."""
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM configs").fetchone()[0]
+
+    def import_json_dir(self, config_dir: str) -> int:
+        """
+        Imports every <name>.json file of a directory, in a single transaction
+        (existing configurations with the same name are replaced).
+        Files that are not a configuration (a JSON object mapping gestures to commands), such as a recognizer profile
+        saved there by previous versions, are skipped. Gestures mapped to null (unbound gestures, stored by
+        previous versions of the save form) are dropped.
+        Args:
+            config_dir (str): Directory containing the JSON files.
+        Returns:
+            int: Number of imported configurations.
+        """
+        configs = []
+        for file_name in sorted(os.listdir(config_dir)):
+            if not file_name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(config_dir, file_name)) as f:
+                    mapping = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[ERROR] Cannot import configuration {file_name}: {e}")
+                continue
+            if not isinstance(mapping, dict) or not all(command is None or isinstance(command, str)
+                                                         for command in mapping.values()):
+                print(f"[INFO] Skipped {file_name}: not a configuration.")
+                continue
+            configs.append((file_name[:-5], {gesture: command for gesture, command in mapping.items()
+                                             if command is not None}))
+        if configs:
+            self._save_many(configs)
+        return len(configs)
+
+    def export_json_dir(self, config_dir: str) -> int:
+        """
+        Writes every configuration to <name>.json in a directory.
+        Every file is written to a temporary file and renamed, so readers never see a partial file.
+        Args:
+            config_dir (str): Destination directory (created if needed).
+        Returns:
+            int: Number of exported configurations.
+        """
+        os.makedirs(config_dir, exist_ok=True)
+        count = 0
+        for name, mapping in self.iter_configs():
+            path = os.path.join(config_dir, name + ".json")
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(mapping, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            count += 1
+        return count
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        with self._lock:
+            self._connection.close()
+
+
+def main(argv: list = None) -> None:
+    """
+    Command line entry point: bulk import from or export to a directory of JSON files.
+    Args:
+        argv (list): Command line arguments (defaults to sys.argv[1:]).
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Import or export the gesture-command configurations.")
+    parser.add_argument("action", choices=("import", "export"), help="import JSON files into the database, or export them.")
+    parser.add_argument("directory", help="Directory of <name>.json files.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Path of the configuration database.")
+    args = parser.parse_args(argv)
+
+    store = ConfigStore(args.db)
+    try:
+        if args.action == "import":
+            count = store.import_json_dir(args.directory)
+            print(f"[INFO] Imported {count} configurations into {args.db}")
+        else:
+            count = store.export_json_dir(args.directory)
+            print(f"[INFO] Exported {count} configurations to {args.directory}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# client/control_channel.py
+# -*- coding: utf-8 -*-
+"""
+This module contains the client side of the continuous-control channel.
+While the hand shows a gesture bound to a continuous command (see client_constants.CONTINUOUS_COMMANDS),
+the gesture recognizer streams a numeric value taken from the hand landmarks (hand height for scrolling,
+pinch distance for the volume, index fingertip for the pointer) on every frame.
+Updates are sent as small UDP datagrams, separate from the TCP command stream: a late update is useless,
+so updates are never queued or retransmitted, and the server only applies the newest one of every kind.
+
+Datagram format (network byte order, see CONTROL_PACKET): magic b"GC", kind (1 byte), session (4 bytes),
+sequence number (4 bytes), two float32 values. The session identifies the sender, so that the server can
+drop updates older than the last one it received, and restart from scratch when the recognizer restarts.
+"""
+
+import os
+import random
+import socket
+import struct
+
+import numpy as np
+
+from send_command_to_server import SERVER_PORT, SERVER_TARGETS
+
+# UDP port of the continuous-control channel (by default, the same number as the TCP command port)
+CONTROL_PORT = int(os.environ.get("GESTURE_CONTROL_PORT", str(SERVER_PORT)))
+# Servers the updates are sent to: the command targets (see send_command_to_server.SERVER_TARGETS),
+# on GESTURE_CONTROL_PORT if it is set, otherwise on the same port number as their TCP command port
+CONTROL_TARGETS = [(host, CONTROL_PORT if "GESTURE_CONTROL_PORT" in os.environ else port) for host, port in SERVER_TARGETS]
+
+CONTROL_PACKET = struct.Struct("!2sBIIff")
+CONTROL_MAGIC = b"GC"
+# Kinds of continuous control
+CONTROL_SCROLL = 1   # value1: scroll velocity in wheel units per second (positive: up)
+CONTROL_VOLUME = 2   # value1: absolute master volume level (0.0 - 1.0)
+CONTROL_POINTER = 3  # value1, value2: absolute pointer position (0.0 - 1.0 of the screen width and height)
+
+# Continuous command (see client_constants.CONTINUOUS_COMMANDS) -> kind of control
+CONTROL_KINDS = {
+    "Scroll (continuous)": CONTROL_SCROLL,
+    "Volume (continuous)": CONTROL_VOLUME,
+    "Pointer (continuous)": CONTROL_POINTER,
+}
+
+# Landmarks used to compute the control values
+WRIST = 0
+THUMB_TIP = 4
+INDEX_FINGER_TIP = 8
+MIDDLE_FINGER_MCP = 9
+
+# Scroll: vertical distance of the hand from the center of the image (fraction of the height) ignored around the center,
+# and scroll speed when the hand is at the top or bottom edge (120 wheel units is one notch)
+SCROLL_DEAD_ZONE = 0.1
+MAX_SCROLL_SPEED = 1200.0
+# Volume: pinch distances (thumb tip - index fingertip, relative to the hand size) mapped to 0% and 100%
+PINCH_MIN = 0.2
+PINCH_MAX = 1.2
+# Pointer: region of the image (fraction of the width and height, from each edge) that is not used,
+# so that the whole screen can be reached without moving the hand out of the image
+POINTER_MARGIN = 0.1
+
+
+def scroll_velocity(landmarks: np.ndarray) -> float:
+    """
+    Computes the scroll velocity from the height of the hand in the image: above the center scrolls up, below scrolls down.
+    Args:
+        landmarks (np.ndarray): Hand landmarks, shape (21, 3), with y normalized by the image height.
+    Returns:
+        float: Scroll velocity in wheel units per second.
+    """
+    offset = 0.5 - float(landmarks[MIDDLE_FINGER_MCP, 1])
+    if abs(offset) <= SCROLL_DEAD_ZONE:
+        return 0.0
+    speed = min((abs(offset) - SCROLL_DEAD_ZONE) / (0.5 - SCROLL_DEAD_ZONE), 1.0) * MAX_SCROLL_SPEED
+    return speed if offset > 0 else -speed
+
+
+def volume_level(landmarks: np.ndarray) -> float:
+    """
+    Computes the volume level from the pinch distance (thumb tip - index fingertip), relative to the hand size.
+    Args:
+        landmarks (np.ndarray): Hand landmarks, shape (21, 3), with x and y in the same unit.
+    Returns:
+        float: Volume level between 0.0 and 1.0.
+    """
+    hand_size = np.linalg.norm(landmarks[MIDDLE_FINGER_MCP, :2] - landmarks[WRIST, :2])
+    if hand_size == 0:
+        return 0.0
+    pinch = np.linalg.norm(landmarks[THUMB_TIP, :2] - landmarks[INDEX_FINGER_TIP, :2]) / hand_size
+    return float(np.clip((pinch - PINCH_MIN) / (PINCH_MAX - PINCH_MIN), 0.0, 1.0))
+
+
+def pointer_position(landmarks: np.ndarray, aspect_ratio: float = 1.0) -> tuple:
+    """
+    Computes the pointer position from the index fingertip.
+    The image is mirrored (the user faces the webcam), so moving the hand to the right moves the pointer to the right.
+    Args:
+        landmarks (np.ndarray): Hand landmarks, shape (21, 3), with x multiplied by `aspect_ratio`.
+        aspect_ratio (float): Width / height of the image.
+    Returns:
+        tuple: (x, y) between 0.0 and 1.0.
+    """
+    x = 1.0 - float(landmarks[INDEX_FINGER_TIP, 0]) / aspect_ratio
+    y = float(landmarks[INDEX_FINGER_TIP, 1])
+    scale = 1.0 - 2 * POINTER_MARGIN
+    return (min(max((x - POINTER_MARGIN) / scale, 0.0), 1.0),
+            min(max((y - POINTER_MARGIN) / scale, 0.0), 1.0))
+
+
+class ControlSender:
+    """
+    Sends continuous-control updates to the servers over UDP (every update goes to every target).
+    Sending never blocks: if the socket buffer is full, the update is dropped (a newer one follows in a frame).
+    """
+
+    def __init__(self, host: str = None, port: int = CONTROL_PORT) -> None:
+        """
+        Creates a UDP socket for every server. The server addresses are resolved once, here.
+        Args:
+            host (str): Address of the server (None for all the CONTROL_TARGETS).
+            port (int): UDP port of the continuous-control channel (only used with `host`).
+        Returns:
+            None
+        """
+        self.session = random.getrandbits(32)
+        self.seq = 0
+        self.dropped = 0
+        self._sockets = []
+        for target_host, target_port in (CONTROL_TARGETS if host is None else [(host, port)]):
+            try:
+                # The socket has the address family of the server (IPv4 or IPv6)
+                family, _, _, _, address = socket.getaddrinfo(target_host, target_port, socket.AF_UNSPEC, socket.SOCK_DGRAM)[0]
+            except OSError as e:
+                print(f"[ERROR] Continuous control disabled for {target_host}:{target_port}: cannot resolve it: {e}")
+                continue
+            sock = socket.socket(family, socket.SOCK_DGRAM)
+            sock.setblocking(False)
+            try:
+                # "Connecting" a UDP socket only sets the default destination
+                sock.connect(address)
+                self._sockets.append(sock)
+            except OSError as e:
+                print(f"[ERROR] Continuous control disabled for {target_host}:{target_port}: {e}")
+                sock.close()
+        self.connected = bool(self._sockets)
+
+    def send(self, kind: int, value1: float, value2: float = 0.0) -> bool:
+        """
+        Sends an update to every server.
+        Args:
+            kind (int): Kind of control (CONTROL_SCROLL, CONTROL_VOLUME or CONTROL_POINTER).
+            value1 (float): First value of the update.
+            value2 (float): Second value of the update (only used by the pointer).
+        Returns:
+            bool: True if the update was sent to at least one server.
+        """
+        if not self.connected:
+            return False
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        packet = CONTROL_PACKET.pack(CONTROL_MAGIC, kind, self.session, self.seq, value1, value2)
+        sent = False
+        for sock in self._sockets:
+            try:
+                sock.send(packet)
+                sent = True
+            except OSError:
+                # Full socket buffer, or no server listening (ICMP port unreachable): drop the update
+                self.dropped += 1
+        return sent
+
+    def send_hand(self, command: str, landmarks: np.ndarray, aspect_ratio: float = 1.0) -> bool:
+        """
+        Computes the value of a continuous command from the landmarks of a hand and sends it.
+        Args:
+            command (str): The continuous command bound to the gesture shown by the hand (a key of CONTROL_KINDS).
+            landmarks (np.ndarray): Hand landmarks, shape (21, 3), with x multiplied by `aspect_ratio`.
+            aspect_ratio (float): Width / height of the image.
+        Returns:
+            bool: True if the update was sent.
+        """
+        kind = CONTROL_KINDS.get(command)
+        if kind == CONTROL_SCROLL:
+            return self.send(kind, scroll_velocity(landmarks))
+        if kind == CONTROL_VOLUME:
+            return self.send(kind, volume_level(landmarks))
+        if kind == CONTROL_POINTER:
+            return self.send(kind, *pointer_position(landmarks, aspect_ratio))
+        return False
+
+    def close(self) -> None:
+        """Closes the UDP sockets."""
+        for sock in self._sockets:
+            sock.close()
@@ -0,0 +1,346 @@
+# client/event_log.py
+# -*- coding: utf-8 -*-
+"""
+This module contains the gesture/command event log: an append-only binary history of the recognized gestures
+and of what was done with them (command sent to the server, gesture not mapped, ...), for analytics and incident review.
+
+Events are fixed-size records (see EVENT_DTYPE) appended to log files in a directory:
+- EventLog.log only appends a tuple to an in-memory buffer, so it never blocks the recognition callback;
+  a background thread writes the buffered events in batches, and starts a new file when the current one
+  reaches the maximum size (the oldest files are deleted beyond the maximum number of files).
+- Every file starts with a fixed-size JSON header holding the names of the gesture and command IDs used in the file
+  (the IDs of the built-in gestures and commands are the same in every file, custom gestures are added when first seen),
+  followed by the records, so a file can be memory-mapped as a NumPy structured array (see `read_event_file`)
+  and a whole directory loaded with vectorized operations only (see `load_events`).
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from client_constants import COMMAND_IDS, COMMAND_REGISTRY, GESTURE_IDS, GESTURE_REGISTRY
+
+# Directory of the event log: next to the configurations (CLIENT_CONFIG_DIR, see flask_client.py),
+# or the directory in the GESTURE_EVENT_LOG_DIR environment variable
+EVENT_LOG_DIR = os.environ.get(
+    "GESTURE_EVENT_LOG_DIR",
+    os.path.join(os.environ.get("CLIENT_CONFIG_DIR", os.path.join(os.path.dirname(__file__), "static", "configs")), "event_logs")
+)
+
+# Record of an event (20 bytes, little endian)
+EVENT_DTYPE = np.dtype([
+    ("t", "<f8"),           # UNIX time of the event
+    ("gesture", "<i2"),     # Gesture ID (see the "gestures" list of the file header), -1 if no hand was detected
+    ("command", "<i2"),     # Command ID (see the "commands" list of the file header), -1 if no command is bound
+    ("score", "<f4"),       # Score of the gesture (0.0 for custom gestures and frames without hands)
+    ("hand", "i1"),         # Index of the hand in the frame, -1 if no hand was detected
+    ("handedness", "i1"),   # 0 for a left hand, 1 for a right hand, -1 if unknown
+    ("outcome", "u1"),      # What was done with the gesture (OUTCOME_*)
+    ("reserved", "u1"),
+])
+
+# Outcomes of an event
+OUTCOME_NO_HAND = 0      # No hand detected
+OUTCOME_NO_CONFIG = 1    # No configuration applied (gestures are only shown in the web interface)
+OUTCOME_UNMAPPED = 2     # The gesture is not bound to any command
+OUTCOME_SENT = 3         # The command was queued for the server
+OUTCOME_CONTINUOUS = 4   # The gesture is bound to a continuous command (streamed over the continuous-control channel)
+OUTCOME_NOT_SENT = 5     # The gesture is bound to a command, not sent for this result (commands are sent for one result in 10)
+OUTCOME_NAMES = ("no hand", "no configuration", "unmapped", "sent", "continuous", "not sent")
+
+# Codes of the "handedness" column
+HANDEDNESS_IDS = {"Left": 0, "Right": 1}
+
+# IDs of the built-in gestures and commands: the registry of client_constants (custom gestures get the following IDs, file by file)
+BUILTIN_GESTURES = GESTURE_REGISTRY
+BUILTIN_COMMANDS = COMMAND_REGISTRY
+
+# File format
+EVENT_LOG_MAGIC = b"GEVLOG1\n"
+# Size of the header (magic + JSON, padded with spaces): the records start at this offset
+HEADER_SIZE = 4096
+EVENT_LOG_SUFFIX = ".gevlog"
+
+# Default rotation: maximum size of a file and number of files kept (16 MB is about 800 000 events)
+DEFAULT_MAX_FILE_BYTES = 16 * 1024 * 1024
+DEFAULT_MAX_FILES = 64
+# Interval between two batches written by the background thread, and events kept in memory at most
+# (if the disk stalls for longer than the buffer lasts, the oldest events are dropped)
+FLUSH_INTERVAL_S = 0.5
+MAX_BUFFERED_EVENTS = 100_000
+
+
+class EventLog:
+    """
+    Writer of the event log.
+
+    `log` can be called from any thread (e.g., the MediaPipe result callback): it appends to a bounded deque,
+    which never blocks. The background thread owns the files: it maps the names to IDs, builds a NumPy array
+    of the batch and writes it with a single call.
+    """
+
+    def __init__(self, directory: str = EVENT_LOG_DIR, max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+                 max_files: int = DEFAULT_MAX_FILES, flush_interval: float = FLUSH_INTERVAL_S) -> None:
+        """
+        Initializes the writer. The background thread is started by `start`.
+        Args:
+            directory (str): Directory of the log files (created if needed).
+            max_file_bytes (int): Size after which a new file is started.
+            max_files (int): Number of files kept (the oldest ones are deleted), 0 to keep them all.
+            flush_interval (float): Interval between two batches, in seconds.
+        Returns:
+            None
+        """
+        self.directory = directory
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.flush_interval = flush_interval
+        self._buffer = deque(maxlen=MAX_BUFFERED_EVENTS)
+        self._stop_event = threading.Event()
+        self._thread = None
+        # Current file, and name -> ID dictionaries of the gestures and commands used in it
+        self._file = None
+        self._path = None
+        self._gesture_ids = None
+        self._command_ids = None
+        # Counters
+        self.written = 0
+        self.dropped = 0
+
+    def start(self) -> "EventLog":
+        """
+        Starts the background writer thread.
+        Args:
+            None
+        Returns:
+            EventLog: self, for chaining.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="EventLog", daemon=True)
+        self._thread.start()
+        return self
+
+    def log(self, gesture: "str | None", command: "str | None", outcome: int, score: float = 0.0,
+            hand: int = -1, handedness: "str | None" = None) -> None:
+        """
+        Logs an event (never blocks).
+        Args:
+            gesture (str | None): The recognized gesture (None if no hand was detected).
+            command (str | None): The command bound to the gesture (None if there is none).
+            outcome (int): What was done with the gesture (OUTCOME_*).
+            score (float): Score of the gesture.
+            hand (int): Index of the hand in the frame.
+            handedness (str | None): "Left" or "Right".
+        Returns:
+            None
+        """
+        if len(self._buffer) == MAX_BUFFERED_EVENTS:
+            # The deque drops the oldest event
+            self.dropped += 1
+        self._buffer.append((time.time(), gesture, command, score, hand, handedness, outcome))
+
+    @property
+    def pending(self) -> int:
+        """Number of events logged but not written yet."""
+        return len(self._buffer)
+
+    def close(self) -> None:
+        """
+        Stops the background thread, writing the buffered events first.
+        Args:
+            None
+        Returns:
+            None
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(5.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        """Body of the background thread: writes a batch every `flush_interval` seconds."""
+        try:
+            while not self._stop_event.wait(self.flush_interval):
+                self._flush()
+            self._flush()
+        except OSError as e:
+            print(f"[ERROR] Event log disabled: {e}")
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _flush(self) -> None:
+        """Writes the buffered events."""
+        batch = []
+        try:
+            while True:
+                batch.append(self._buffer.popleft())
+        except IndexError:
+            pass
+        if not batch:
+            return
+        if self._file is None or self._file.tell() + len(batch) * EVENT_DTYPE.itemsize > self.max_file_bytes:
+            self._rotate()
+        records = self._records(batch)
+        if records is None:
+            # Too many custom names for the header: continue in a new file
+            self._rotate()
+            records = self._records(batch)
+            if records is None:
+                self.dropped += len(batch)
+                return
+        self._file.write(records.tobytes())
+        self._file.flush()
+        self.written += len(batch)
+
+    def _records(self, batch: list) -> "np.ndarray | None":
+        """
+        Converts a batch of events to records, adding the new names to the header of the current file.
+        Returns None if the new names do not fit in the header.
+        """
+        times, gestures, commands, scores, hands, handedness, outcomes = zip(*batch)
+        names_before = len(self._gesture_ids) + len(self._command_ids)
+        records = np.empty(len(batch), dtype=EVENT_DTYPE)
+        records["t"] = times
+        records["gesture"] = [self._id(self._gesture_ids, gesture) for gesture in gestures]
+        records["command"] = [self._id(self._command_ids, command) for command in commands]
+        records["score"] = scores
+        records["hand"] = hands
+        records["handedness"] = [HANDEDNESS_IDS.get(name, -1) for name in handedness]
+        records["outcome"] = outcomes
+        records["reserved"] = 0
+        if len(self._gesture_ids) + len(self._command_ids) != names_before and not self._write_header():
+            return None
+        return records
+
+    @staticmethod
+    def _id(ids: dict, name: "str | None") -> int:
+        """Returns the ID of a name in a name -> ID dictionary, adding it if needed (the ID of None is -1)."""
+        if name is None:
+            return -1
+        found = ids.get(name)
+        if found is None:
+            found = ids[name] = len(ids)
+        return found
+
+    def _write_header(self) -> bool:
+        """Writes the header of the current file in place. Returns False if it does not fit in HEADER_SIZE."""
+        header = EVENT_LOG_MAGIC + json.dumps({
+            "dtype": EVENT_DTYPE.descr,
+            # Dictionaries keep the insertion order: the names are listed by ID
+            "gestures": list(self._gesture_ids),
+            "commands": list(self._command_ids),
+            "outcomes": list(OUTCOME_NAMES),
+        }).encode()
+        if len(header) >= HEADER_SIZE:
+            return False
+        position = self._file.tell()
+        self._file.seek(0)
+        self._file.write(header.ljust(HEADER_SIZE - 1) + b"\n")
+        self._file.seek(max(position, HEADER_SIZE))
+        return True
+
+    def _rotate(self) -> None:
+        """Closes the current file, starts a new one and deletes the oldest files beyond `max_files`."""
+        if self._file is not None:
+            self._file.close()
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        index = 0
+        while True:
+            path = os.path.join(self.directory, f"events-{stamp}-{index:03d}{EVENT_LOG_SUFFIX}")
+            # Exclusive creation: another writer (e.g., the recognizer of another process) may pick the same name
+            try:
+                self._file = open(path, "xb")
+                break
+            except FileExistsError:
+                index += 1
+        self._path = path
+        self._gesture_ids = dict(GESTURE_IDS)
+        self._command_ids = dict(COMMAND_IDS)
+        self._write_header()
+        if self.max_files:
+            for old_path in event_files(self.directory)[:-self.max_files]:
+                os.remove(old_path)
+
+
+def event_files(directory: str = EVENT_LOG_DIR) -> list:
+    """
+    Returns the log files of a directory, from the oldest to the newest.
+    Args:
+        directory (str): Directory of the log files.
+    Returns:
+        list: Paths of the log files.
+    """
+    # File names start with the creation time, so sorting them sorts them by time
+    return sorted(glob.glob(os.path.join(directory, f"events-*{EVENT_LOG_SUFFIX}")))
+
+
+def read_event_file(path: str) -> tuple:
+    """
+    Memory-maps a log file.
+    Args:
+        path (str): Path of the log file.
+    Returns:
+        tuple: (header dict, records as a read-only NumPy structured array of EVENT_DTYPE, memory-mapped).
+    Raises:
+        ValueError: If the file is not an event log.
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if not header.startswith(EVENT_LOG_MAGIC) or len(header) < HEADER_SIZE:
+        raise ValueError(f"Not an event log: {path}")
+    info = json.loads(header[len(EVENT_LOG_MAGIC):])
+    # A batch being written can leave a partial record at the end: it is ignored
+    count = (os.path.getsize(path) - HEADER_SIZE) // EVENT_DTYPE.itemsize
+    if count == 0:
+        return info, np.empty(0, dtype=EVENT_DTYPE)
+    return info, np.memmap(path, dtype=EVENT_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def load_events(directory: str = EVENT_LOG_DIR, since: float = None, until: float = None) -> dict:
+    """
+    Loads the events of all the log files of a directory (e.g., for a notebook).
+    The gesture and command IDs of every file are translated to a common vocabulary with a lookup array,
+    so loading is vectorized whatever the number of events.
+    Args:
+        directory (str): Directory of the log files.
+        since (float): Only events at or after this UNIX time (None for no limit).
+        until (float): Only events before this UNIX time (None for no limit).
+    Returns:
+        dict: "events" (a structured array of EVENT_DTYPE, sorted by time, with the IDs of the common vocabulary),
+            "gestures" and "commands" (names of the IDs) and "outcomes" (names of the outcomes).
+    """
+    gesture_ids = dict(GESTURE_IDS)
+    command_ids = dict(COMMAND_IDS)
+    parts = []
+    for path in event_files(directory):
+        info, records = read_event_file(path)
+        if len(records) == 0:
+            continue
+        # Skip files entirely outside the interval (records are in time order within a file)
+        if (since is not None and records["t"][-1] < since) or (until is not None and records["t"][0] >= until):
+            continue
+        mask = np.ones(len(records), dtype=bool)
+        if since is not None:
+            mask &= records["t"] >= since
+        if until is not None:
+            mask &= records["t"] < until
+        selected = np.array(records[mask])
+        for column, ids in (("gesture", gesture_ids), ("command", command_ids)):
+            # Lookup array: file ID -> common ID (index -1 maps -1 to -1)
+            lookup = np.array([EventLog._id(ids, name) for name in info[column + "s"]] + [-1], dtype=np.int16)
+            selected[column] = lookup[selected[column]]
+        parts.append(selected)
+    events = np.concatenate(parts) if parts else np.empty(0, dtype=EVENT_DTYPE)
+    return {
+        "events": events[np.argsort(events["t"], kind="stable")],
+        "gestures": list(gesture_ids),
+        "commands": list(command_ids),
+        "outcomes": list(OUTCOME_NAMES),
+    }
@@ -6,18 +6,31 @@ It provides routes for displaying the main configuration page, starting and stop
 and streaming video from the webcam.
 The application allows users to map gestures to commands, save configurations, and view the video feed
 from the webcam in real-time.
+The application can be served by the threaded development server or by a cooperative (gevent) server, see main.py:
+long-lived streams never busy-wait, so they are cheap with either of them.
 """
 import os
 import signal
-import json
 from flask import Flask, render_template, request, redirect, url_for, Response, jsonify
-import cv2
 import multiprocessing
 import ctypes
 import re
-from src.gesture_recognizer.gesture_recognizer import start_gesture_recognition
-from client_constants import COMMANDS
-from queue import Empty
+import threading
+import time
+# Entry point of the recognition process: MediaPipe and OpenCV are only imported inside that process
+from src.gesture_recognizer.worker import run_gesture_recognition
+from client_constants import COMMANDS, CONTINUOUS_COMMANDS, GESTURES, MAX_GESTURE_NAME_LENGTH
+from config_index import ConfigIndex
+from config_store import ConfigStore
+from config_stats import ConfigStats
+from frame_broadcaster import FrameBroadcaster
+from gesture_history import GestureHistory
+from process_supervisor import SupervisedProcess
+from send_command_to_server import SERVER_TARGETS, target_metrics
+from src.gesture_recognizer.landmark_classifier import SHARED_LANDMARKS_SIZE, SHARED_LEFT_HANDED, SHARED_TIMESTAMP, VECTOR_SIZE
+from src.gesture_recognizer.recognizer_profile import load_profile
+from src.gesture_recognizer.inference_service import (CAPTURE_FPS, CAPTURE_HEIGHT, CAPTURE_JPEG_QUALITY, CAPTURE_WIDTH,
+                                                      CAPTURE_WORKERS, MAX_FRAME_BYTES, InferenceService)
 
 # Flask app setup
 app = Flask(
@@ -27,9 +40,6 @@ app = Flask(
 )
 
 
-# List of available gestures
-GESTURES = ("Thumb_Up", "Thumb_Down", "Open_Palm", "Closed_Fist", "Victory", "ILoveYou", "Pointing_Up")
-
 # Gesture-command mapping
 gesture_to_command = {}
 
@@ -37,6 +47,9 @@ gesture_to_command = {}
 gesture_recognizer_to_socket_queue = None
 # Boolean value to indicate if the server is running. This will be updated by the send_command_to_server function.
 server_is_running = multiprocessing.Value(ctypes.c_bool, True)
+# Heartbeat (round-trip time, jitter, time of the last pong) and send counters of every target server,
+# updated by the send_command_to_server function (see send_command_to_server.TARGET_STATS_SIZE).
+target_stats = None
 
 # multiprocessing.Array for inter-process communication between gesture_recognizer.py and flask_client.py
 # gesture_recognizer.py will write the last recognized gesture in last_gesture multiprocessing.Array and
@@ -44,9 +57,39 @@ server_is_running = multiprocessing.Value(ctypes.c_bool, True)
 last_gesture = None
 
 
-# Directory to store configuration files
-CONFIG_DIR = os.path.join(os.path.dirname(__file__), "static/configs")
+# Directory to store configurations (it is a Docker volume).
+# Configurations are saved in a single SQLite database in this directory;
+# <name>.json files saved by previous versions are imported into the database the first time it is created.
+# The CLIENT_CONFIG_DIR environment variable can point to a different directory (e.g., for benchmarks).
+CONFIG_DIR = os.environ.get("CLIENT_CONFIG_DIR", os.path.join(os.path.dirname(__file__), "static/configs"))
 os.makedirs(CONFIG_DIR, exist_ok=True)
+CONFIG_DB = os.path.join(CONFIG_DIR, "configs.sqlite3")
+
+
+def open_config_store(config_dir: str, db_path: str) -> ConfigStore:
+    """
+    Opens the configuration store, migrating the JSON configuration files of `config_dir` if the store is empty.
+    Args:
+        config_dir (str): Directory of the <name>.json files saved by previous versions.
+        db_path (str): Path of the configuration database.
+    Returns:
+        ConfigStore: The opened store.
+    """
+    store = ConfigStore(db_path)
+    if len(store) == 0:
+        count = store.import_json_dir(config_dir)
+        if count:
+            print(f"[INFO] Imported {count} JSON configurations into {db_path}")
+    return store
+
+
+# Configuration store and its in-memory index (refreshed incrementally when the store changes)
+config_store = open_config_store(CONFIG_DIR, CONFIG_DB)
+config_index = ConfigIndex(config_store)
+
+# Statistics of the saved configurations, updated by the index every time a configuration is saved or deleted
+config_stats = ConfigStats()
+config_index.add_listener(lambda name, old_mapping, new_mapping: config_stats.update(old_mapping, new_mapping))
 
 
 def is_valid_config_name(name : str) -> bool:
@@ -65,6 +108,18 @@ def is_valid_config_name(name : str) -> bool:
 
 
 
+def all_gestures() -> list:
+    """
+    Returns the gestures that can be bound to a command: the MediaPipe gestures and the custom gestures with at least one template.
+    Args:
+        None
+    Returns:
+        list: The gesture names.
+    """
+    return list(GESTURES) + [name for name in config_store.template_counts() if name not in GESTURES]
+
+
+
 # Home route (index.html)
 @app.route("/", methods=["GET", "POST"])
 def index():
@@ -95,7 +150,9 @@ def index():
     global gesture_to_command
 
     # List of available configuration files (without .json extension)
-    config_files = [f[:-5] for f in os.listdir(CONFIG_DIR) if f.endswith(".json")]
+    config_files = config_index.names()
+    # MediaPipe gestures and custom gestures
+    gestures = all_gestures()
     
     # Used only for the "save" action
     # request.form.get("config_name_select") is used when the user selects a config from the dropdown
@@ -107,7 +164,7 @@ def index():
         action = request.form.get("action")
         if action == "apply":
             # Update gesture_to_command but does not save to file
-            for gesture in GESTURES:
+            for gesture in gestures:
                 # We receive the gesture name as a string from the form, which is a FormData JavaScript object
                 command = request.form.get(gesture)
                 if command:
@@ -118,16 +175,18 @@ def index():
         elif action == "save" and is_valid_config_name(selected_config):
             print("[INFO] Valid configuration name")
             # Update gesture_to_command and saves configuration in a file
-            for gesture in GESTURES:
+            for gesture in gestures:
                 print(f"[INFO] Processing gesture: {gesture}")
                 command = request.form.get(gesture)
                 print(f"[INFO] Associated command: {command}")
-                gesture_to_command[gesture] = command
+                # Like "apply": a gesture missing from the form (e.g., recorded after the page was loaded) is not bound
+                if command:
+                    gesture_to_command[gesture] = command
+                elif gesture in gesture_to_command:
+                    del gesture_to_command[gesture]
             if selected_config:
-                # Save the current gesture_to_command mapping to a JSON file
-                path = os.path.join(CONFIG_DIR, selected_config + ".json")
-                with open(path, "w") as f:
-                    json.dump(gesture_to_command, f, indent=2)
+                # Save the current gesture_to_command mapping in the configuration store (atomically)
+                config_store.save(selected_config, gesture_to_command)
                 return jsonify({"status": "ok", "message": "Configuration saved and applied successfully."})
             else:
                 return jsonify({"status": "error", "message": "No selected configuration."}, 400)
@@ -137,8 +196,8 @@ def index():
     # GET: only when the user opens the page for the first time
     return render_template(
         "index.html",
-        gestures=GESTURES,
-        commands=COMMANDS,
+        gestures=gestures,
+        commands=COMMANDS + CONTINUOUS_COMMANDS,
         mappings=gesture_to_command,
         active=recognition_active,
         configs=config_files,
@@ -148,46 +207,128 @@ def index():
 @app.route("/get_json_file", methods=["GET"])
 def get_json_file() -> "Response":
     """
-    Flask route to serve a JSON file from the static/configs directory.
+    Flask route to serve a saved configuration.
 
     This route is used to load configuration files dynamically based on the request parameter 'file'.
-    It ensures that the requested file exists and is a valid JSON file before serving it.
+    Configurations are served from the in-memory configuration index, with an ETag:
+    if the browser sends back the ETag of an unchanged configuration (If-None-Match), a 304 response without body is returned.
     Args:
         request (Flask request object): The request object containing query parameters.
     Returns:
         - JSON response with the content of the requested file if found.
+        - 304 response if the configuration did not change.
+        - 400 error if the file name is missing or invalid.
         - 404 error if the file does not exist or is not a valid JSON file.
     """
-    file_name = request.args.get("file") + ".json"  # Expecting a file name without path, e.g., "config1"
-    if not file_name:
+    config_name = request.args.get("file", "")  # Expecting a file name without path and extension, e.g., "config1"
+    if not is_valid_config_name(config_name):
         return jsonify({"error": "File name not provided"}), 400
 
-    # Ensure the file is in the correct directory and has a .json extension
-    if not os.path.isfile(os.path.join(CONFIG_DIR, file_name)):
+    config = config_index.get(config_name)
+    if config is None:
         return jsonify({"error": "File not found"}), 404
 
-    with open(os.path.join(CONFIG_DIR, file_name), "r") as f:
-        data = json.load(f)
-    
-    return jsonify(data)
+    _, body, etag = config
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    # Let the browser cache the configuration, but revalidate it with the ETag on every request
+    response.cache_control.no_cache = True
+    # Turns the response into a 304 Not Modified if the ETag matches the If-None-Match header
+    return response.make_conditional(request)
+
+
+@app.route("/get_json_files", methods=["GET"])
+def get_json_files() -> "Response":
+    """
+    Flask route to serve many configurations in a single response.
+    Args:
+        request (Flask request object): The request object. The optional 'files' parameter is a comma-separated
+            list of configuration names; if it is missing, all the saved configurations are returned.
+    Returns:
+        JSON response with the format:
+            {
+                "configs": {<name>: <configuration>, ...},
+                "missing": [<names that do not exist>]
+            }
+    """
+    requested = request.args.get("files")
+    names = requested.split(",") if requested else config_index.names()
+    configs = {}
+    missing = []
+    for name in names:
+        config = config_index.get(name) if is_valid_config_name(name) else None
+        if config is None:
+            missing.append(name)
+        else:
+            configs[name] = config[0]
+    return jsonify({"configs": configs, "missing": missing})
 
 
 
+@app.route("/stats", methods=["GET"])
+def stats() -> "Response":
+    """
+    Flask route to serve the statistics of the saved configurations
+    (gesture x command contingency matrix, gesture and command frequencies, commands assigned to multiple gestures).
+
+    The statistics are kept up to date incrementally, so this route does not read the configurations.
+    With the 'recompute' parameter (e.g., /stats?recompute=1), they are recomputed from scratch from the configuration store.
+    Args:
+        request (Flask request object): The request object containing query parameters.
+    Returns:
+        JSON response with the statistics (see ConfigStats.snapshot).
+    """
+    if request.args.get("recompute"):
+        recomputed = ConfigStats.from_configs(mapping for _, mapping in config_store.iter_configs())
+        return jsonify(recomputed.snapshot())
+    # Apply the configuration changes made since the last request
+    config_index.refresh()
+    return jsonify(config_stats.snapshot())
+
+
 # Global variables for gesture recognition state and process
 # Recognition state
 recognition_active = False
+# Held while the recognition is started or stopped, so that a stop never closes the queues of a start (or of another stop)
+recognition_lock = threading.Lock()
 
 # Process for gesture recognition
-# This will be set to None initially and will be started when the user clicks "Start Recognition".
-# It will be a multiprocessing.Process that runs the start_gesture_recognition function
-# with the necessary arguments.
-# It will be set to None when the user clicks "Stop Recognition"
-recognition_process = None
+# It is started when the user clicks "Start Recognition" and stopped when the user clicks "Stop Recognition".
+# It runs the start_gesture_recognition function (through run_gesture_recognition) with the necessary arguments,
+# is asked to stop through its stop event (see process_supervisor.py) and is restarted if it crashes.
+# The same supervisor is used for every start, so /lifecycle reports the metrics of all the cycles.
+# When the process ends by itself (e.g., 'q' pressed, no webcam) or fails, the recognition is marked inactive,
+# so that /start starts it again (see on_recognition_exit).
+recognition_process = SupervisedProcess("recognizer", run_gesture_recognition, stop_event_kwarg="stop_event",
+                                        on_exit=lambda state: on_recognition_exit(state))
+
+# Supervisor of the command-sending process, set by main.py (reported by /lifecycle)
+command_sender = None
 
 # Queue for webcam frames
 # This queue will be used to send webcam frames from the gesture recognition process to flask_client.py
 webcam_frame_queue = None
 
+# Reads the (JPEG-encoded) frames of webcam_frame_queue and delivers each of them to all the /video_feed viewers
+frame_broadcaster = FrameBroadcaster()
+
+# Recognizer profile of the running recognition process (its "preview" decides what the web interface streams)
+recognizer_profile = load_profile()
+
+# Ring of the recent recognition events, written by the gesture recognition process (see gesture_history.py).
+# Created at the first start and kept across restarts, so the cursors of the web interface stay valid.
+gesture_history = None
+# Maximum number of events returned by one /gesture_events request
+MAX_GESTURE_EVENTS = 256
+
+# Queue for the templates of the custom gestures, sent to the gesture recognition process every time they change
+template_queue = None
+# multiprocessing.Array where the gesture recognition process publishes the landmarks of the last detected hand
+# (see landmark_classifier.SHARED_LANDMARKS_SIZE), used to record templates
+hand_landmarks = None
+# Maximum age of the landmarks used to record a template, in seconds
+TEMPLATE_MAX_AGE_S = 1.0
+
 # Queue for recognized gestures
 flask_to_web_interface_queue = None
 # This queue will be used to send recognized gestures from gesture_recognizer.py to flask_client.py
@@ -207,28 +348,44 @@ def start_recognition() -> "Response":
         Response: A JSON response indicating the status and whether recognition is active.
     """
 
-    global recognition_active, recognition_process
-
-    if not recognition_active:
-        recognition_active = True
-        # Initialize queues for inter-process communication
-        global webcam_frame_queue
-        webcam_frame_queue = multiprocessing.Queue()
-        global last_gesture
-        # 11 is the max string length in GESTURES list. +1 for \0
-        last_gesture = multiprocessing.Array(ctypes.c_char, 11+1)
-        # global flask_to_web_interface_queue
-        # flask_to_web_interface_queue = multiprocessing.Queue()
-        # Pass gesture_to_command as an argument
-        global gesture_to_command
-        global gesture_recognizer_to_socket_queue
-        recognition_process = multiprocessing.Process(
-            target=start_gesture_recognition,
-            args=(gesture_to_command, webcam_frame_queue, gesture_recognizer_to_socket_queue, last_gesture,),
-        )
-        recognition_process.start()
-        print("[INFO] Gesture recognition process started.")
-    return jsonify({"status": "ok", "active": True})
+    global recognition_active
+
+    with recognition_lock:
+        if not recognition_active:
+            recognition_active = True
+            # Initialize queues for inter-process communication
+            global webcam_frame_queue
+            webcam_frame_queue = multiprocessing.Queue()
+            frame_broadcaster.start(webcam_frame_queue)
+            global last_gesture
+            # MAX_GESTURE_NAME_LENGTH is the max length of a gesture name (custom gestures included). +1 for \0
+            last_gesture = multiprocessing.Array(ctypes.c_char, MAX_GESTURE_NAME_LENGTH+1)
+            # Templates of the custom gestures, sent again every time they change, and landmarks of the last detected hand
+            global template_queue, hand_landmarks
+            template_queue = multiprocessing.Queue()
+            template_queue.put(config_store.templates())
+            hand_landmarks = multiprocessing.Array(ctypes.c_double, SHARED_LANDMARKS_SIZE)
+            # global flask_to_web_interface_queue
+            # flask_to_web_interface_queue = multiprocessing.Queue()
+            # Pass gesture_to_command as an argument
+            global gesture_to_command
+            global gesture_recognizer_to_socket_queue
+            # The recognizer profile is read at every start, so a profile written by the auto-tune command is used without restarting the client
+            global recognizer_profile
+            recognizer_profile = load_profile()
+            global gesture_history
+            if gesture_history is None:
+                gesture_history = GestureHistory()
+            # The webcam queue is drained while the process stops, so that it never waits for its frames to be read
+            recognition_process.start(
+                args=(gesture_to_command, webcam_frame_queue, gesture_recognizer_to_socket_queue, last_gesture,),
+                kwargs={"template_queue": template_queue, "hand_landmarks": hand_landmarks, "profile": recognizer_profile,
+                        "gesture_history": gesture_history},
+                drain_queues=(webcam_frame_queue,),
+            )
+    # The page draws the landmark preview itself, and shows the (rare) camera images only if there are any
+    return jsonify({"status": "ok", "active": True, "preview": recognizer_profile["preview"],
+                    "preview_images": recognizer_profile["preview"] == "mjpeg" or recognizer_profile["preview_image_interval"] > 0})
 
 @app.route("/stop", methods=["GET"])
 def stop_recognition() -> "Response":
@@ -237,32 +394,137 @@ def stop_recognition() -> "Response":
 
     This endpoint is accessible via the "/stop" route. It checks if the gesture recognition process is active.
     If not active, it returns a JSON response indicating that recognition is not active.
-    If active, it sets the recognition flag to False, terminates the recognition process if it is alive,
-    closes and joins the webcam frame queue, and sets the process reference to None.
-    Returns a JSON response indicating the recognition process has been stopped.
+    If active, it sets the recognition flag to False, stops the recognition process (cooperatively, then with SIGTERM and
+    SIGKILL, in a bounded time, see process_supervisor.py) and closes its queues.
+    Returns a JSON response indicating the recognition process has been stopped, and how long it took.
     Args:
         None
     Returns:
         Response: A Flask JSON response with the status and active state.
     """
-    global recognition_active, recognition_process
-    
     # Check if recognition is already inactive
-    if recognition_active is False:
+    transition = end_recognition()
+    if transition is None:
         return jsonify({"status": "no", "active": False})
-    recognition_active = False
-    
-    # If the recognition process is still running, terminate it and its associated queues with flask_client.py
-    if recognition_process and recognition_process.is_alive():
-        recognition_process.terminate()
+    return jsonify({"status": "ok", "active": False, "stop_ms": transition["duration_ms"], "stop": transition["how"]})
+
+
+def end_recognition(only_if_ended: bool = False) -> "dict | None":
+    """
+    Stops the gesture recognition process, if the recognition is active, and closes its queues.
+    The start and the stop of the recognition are serialized by `recognition_lock`, so concurrent stops close the queues once,
+    after the process stopped.
+    Args:
+        only_if_ended (bool): True to stop the recognition only if its process already ended by itself or failed
+            (a newer recognition started meanwhile is left running).
+    Returns:
+        dict | None: The stop transition (see SupervisedProcess.stop), or None if the recognition was not stopped.
+    """
+    global recognition_active
+    with recognition_lock:
+        if not recognition_active or (only_if_ended and not recognition_process.ended):
+            return None
+        recognition_active = False
+        # Stop reading the frames (this also ends the /video_feed streams) before the queue is closed
+        frame_broadcaster.stop()
+
+        # Stop the recognition process and close its queues with flask_client.py
         print("[INFO] Stopping recognition...")
-        global webcam_frame_queue
+        transition = recognition_process.stop()
+        # This process never waits for the templates it put in the queue to be read: the stopped process will not read them
+        template_queue.cancel_join_thread()
+        template_queue.close()
         webcam_frame_queue.close()
-        webcam_frame_queue.join_thread()
-        recognition_process = None
         print("[INFO] Gesture recognition process stopped.")
+    return transition
+
+
+def on_recognition_exit(state: str) -> None:
+    """
+    Called by the supervisor of the recognition process when the process ended by itself or failed:
+    marks the recognition inactive and releases its queues, so that /start starts it again.
+    Args:
+        state (str): The state of the process ("exited" or "failed", see process_supervisor.py).
+    Returns:
+        None
+    """
+    print(f"[INFO] Gesture recognition process {state}: recognition is no longer active.")
+    # The supervisor calls this from its monitor thread, which /stop joins while holding recognition_lock:
+    # the cleanup runs on its own thread, which waits for the lock
+    threading.Thread(target=end_recognition, kwargs={"only_if_ended": True}, name="recognition cleanup", daemon=True).start()
+
+def send_templates_to_recognizer() -> None:
+    """
+    Sends the current templates of the custom gestures to the gesture recognition process, if it is running.
+    Args:
+        None
+    Returns:
+        None
+    """
+    if recognition_active and template_queue is not None:
+        template_queue.put(config_store.templates())
+
+
+@app.route("/templates", methods=["GET"])
+def templates() -> "Response":
+    """
+    Flask route to list the custom gestures.
+    Args:
+        None
+    Returns:
+        JSON response with the format {"status": "ok", "templates": {<gesture name>: <number of templates>, ...}}.
+    """
+    return jsonify({"status": "ok", "templates": config_store.template_counts()})
+
+
+@app.route("/record_template", methods=["POST"])
+def record_template() -> "Response":
+    """
+    Flask route to record a template of a custom gesture from the hand currently detected by the gesture recognizer.
+    The user shows the gesture to the webcam and submits its name; recording more templates of the same gesture
+    (e.g., with slightly different poses) makes the recognition more robust.
+    The new template is sent to the running gesture recognition process, so it is used immediately.
+    Args:
+        request (Flask request object): The form contains the 'name' of the custom gesture.
+    Returns:
+        - JSON response with the number of templates of the gesture.
+        - 400 error if the name is invalid (see `is_valid_config_name`, at most MAX_GESTURE_NAME_LENGTH characters,
+          not a MediaPipe gesture).
+        - 409 error if no hand was detected in the last TEMPLATE_MAX_AGE_S seconds.
+        - 503 error if the gesture recognition process is not running.
+    """
+    name = request.form.get("name", "")
+    if not is_valid_config_name(name) or len(name) > MAX_GESTURE_NAME_LENGTH or name in GESTURES or name == "None":
+        return jsonify({"status": "error", "message": f"Invalid gesture name (letters, numbers and underscores, at most {MAX_GESTURE_NAME_LENGTH} characters)."}), 400
+    if not recognition_active or hand_landmarks is None:
+        return jsonify({"status": "error", "message": "Gesture recognizer process is not running."}), 503
+    with hand_landmarks.get_lock():
+        values = hand_landmarks[:SHARED_LANDMARKS_SIZE]
+    if time.time() - values[SHARED_TIMESTAMP] > TEMPLATE_MAX_AGE_S:
+        return jsonify({"status": "error", "message": "No hand detected: show the gesture to the webcam."}), 409
+    config_store.add_template(name, values[:VECTOR_SIZE], values[SHARED_LEFT_HANDED] > 0.5)
+    send_templates_to_recognizer()
+    count = config_store.template_counts().get(name, 0)
+    print(f"[INFO] Recorded template {count} of custom gesture {name}")
+    return jsonify({"status": "ok", "message": f"Template {count} of {name} recorded.", "name": name, "count": count})
+
+
+@app.route("/delete_template", methods=["POST"])
+def delete_template() -> "Response":
+    """
+    Flask route to delete a custom gesture (all its templates).
+    Args:
+        request (Flask request object): The form contains the 'name' of the custom gesture.
+    Returns:
+        JSON response with the number of deleted templates, or a 404 error if the gesture does not exist.
+    """
+    name = request.form.get("name", "")
+    deleted = config_store.delete_templates(name) if is_valid_config_name(name) else 0
+    if not deleted:
+        return jsonify({"status": "error", "message": "Custom gesture not found."}), 404
+    send_templates_to_recognizer()
+    return jsonify({"status": "ok", "message": f"Custom gesture {name} deleted.", "deleted": deleted})
 
-    return jsonify({"status": "ok", "active": False})
 
 @app.route("/video_feed", methods=["GET"])
 def video_feed() -> "Response":
@@ -274,43 +536,176 @@ def video_feed() -> "Response":
         Response: A Flask Response object that streams JPEG-encoded video frames
         using the multipart/x-mixed-replace MIME type.
 
-    The video stream is generated by continuously retrieving frames from the
-    `webcam_frame_queue` while `recognition_active` is True. Each frame is encoded
-    as a JPEG image and sent as part of the HTTP response. The stream can be
+    The video stream is generated from the frames of `webcam_frame_queue` while `recognition_active` is True.
+    Frames are JPEG-encoded by the recognition process and shared by all the viewers through the frame broadcaster:
+    every viewer blocks until a newer frame is available (skipping the frames it was too slow to send),
+    so a stream without new frames does not use CPU. The stream can be
     consumed by browsers or clients that support MJPEG streams.
     """
     def generate():
         print("[INFO] Starting video feed...")
+        last_seq = 0
         while recognition_active:
-            frame = webcam_frame_queue.get() if webcam_frame_queue else None
-            if frame is None:
+            # Wake up at least once per second to notice that recognition was stopped
+            last_seq, part = frame_broadcaster.wait_for_frame(last_seq, timeout=1.0)
+            if part is None:
                 continue
-            # Encode the frame as JPEG.
-            # ret is True if the encoding was successful, buffer contains the encoded image.
-            # If ret is False, we skip the frame and continue to the next iteration.
-            # buffer is a numpy array containing the encoded image data.
-            # We use cv2.imencode to convert the frame to JPEG format.
-            # ret is a boolean indicating if the encoding was successful.
-            ret, buffer = cv2.imencode(".jpg", frame)
-            if not ret:
-                continue
-            # b indicates that the string is a byte string.
-            # Yield the frame in the format required for MJPEG streaming.
-            # The frame is prefixed with the boundary string and headers.
-            # The boundary string is used to separate different frames in the stream.
-            # The frame is followed by a double CRLF sequence to indicate the end of the frame
-            # The buffer is converted to bytes using the tobytes() method.
-            # The CRLF sequence is used to separate different frames in the stream.
+            # The part is already in the format required for MJPEG streaming:
+            # the boundary string and headers, the JPEG image and a CRLF sequence.
             # The yield statement sends the frame to the client as part of the HTTP response.
             # The response is sent as a multipart/x-mixed-replace stream.
-            yield (b"--frame\r\n"
-                   b"Content-Type: image/jpeg\r\n\r\n" + buffer.tobytes() + b"\r\n")
+            yield part
     # Return a Flask Response object that streams the video feed.
     # MIME type tells the browser to expect a continuous stream of images, 
     # allowing it to display the video in real time.
     return Response(generate(), mimetype="multipart/x-mixed-replace; boundary=frame")
 
 
+@app.route("/preview_feed", methods=["GET"])
+def preview_feed() -> "Response":
+    """
+    Route that streams the landmark preview (the "landmarks" preview of the recognizer profile) as Server-Sent Events.
+    Args:
+        None
+    Returns:
+        Response: A Flask Response object that streams one text/event-stream event per recognizer result,
+        with the landmarks and the gesture of every detected hand as JSON (see gesture_recognizer.landmark_preview).
+
+    Like /video_feed, every viewer waits for a newer preview in the frame broadcaster and skips the ones it was too slow to send.
+    The page draws the landmarks on a canvas, so a preview costs a few hundred bytes instead of a JPEG frame.
+    """
+    def generate():
+        last_seq = 0
+        while recognition_active:
+            last_seq, event = frame_broadcaster.wait_for_preview(last_seq, timeout=1.0)
+            if event is None:
+                # A comment line keeps the connection alive (and notices closed connections) while no hand is recognized
+                yield b": keep-alive\n\n"
+                continue
+            yield event
+    return Response(generate(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+# Browser-capture mode: the browsers send their frames, recognized by a shared pool of workers (started on first use)
+inference_service = None
+inference_service_lock = threading.Lock()
+
+
+def get_inference_service() -> InferenceService:
+    """
+    Returns the inference service of the browser-capture mode, starting it on first use.
+    Args:
+        None
+    Returns:
+        InferenceService: The running service.
+    """
+    global inference_service
+    with inference_service_lock:
+        if inference_service is None:
+            inference_service = InferenceService(CAPTURE_WORKERS, load_profile(), gesture_recognizer_to_socket_queue).start()
+        return inference_service
+
+
+@app.route("/capture", methods=["GET"])
+def capture_page() -> str:
+    """
+    Serves the page of the browser-capture mode: the browser captures its webcam and sends the frames to this client.
+    Only the built-in gestures of the model are recognized in this mode: the custom gesture templates
+    are matched by the webcam recognizer only, so gestures bound to custom gestures never fire in a capture session.
+    Args:
+        None
+    Returns:
+        str: The rendered capture.html template.
+    """
+    return render_template("capture.html", configs=config_index.names())
+
+
+@app.route("/capture/session", methods=["POST"])
+def open_capture_session() -> "Response":
+    """
+    Opens a browser-capture session. The JSON body can name a saved configuration ({"config": name}),
+    otherwise the session uses the configuration currently applied.
+    Args:
+        None
+    Returns:
+        Response: {"status": "ok", "session", "width", "height", "fps", "quality"} (the format the browser must send),
+            404 if the configuration does not exist, 503 if the inference service cannot take more sessions.
+    """
+    body = request.get_json(silent=True) or {}
+    config_name = body.get("config")
+    if config_name:
+        config = config_index.get(config_name) if is_valid_config_name(config_name) else None
+        if config is None:
+            return jsonify({"status": "error", "message": "Configuration not found."}), 404
+        mapping = config[0]
+    else:
+        mapping = gesture_to_command
+    service = get_inference_service()
+    if service.error is not None:
+        return jsonify({"status": "error", "message": f"Inference service unavailable: {service.error}"}), 503
+    session_id = service.open_session(mapping)
+    if session_id is None:
+        return jsonify({"status": "error", "message": "No free inference worker."}), 503
+    return jsonify({"status": "ok", "session": session_id, "width": CAPTURE_WIDTH, "height": CAPTURE_HEIGHT,
+                    "fps": CAPTURE_FPS, "quality": CAPTURE_JPEG_QUALITY})
+
+
+@app.route("/capture/frame/<session_id>", methods=["POST"])
+def capture_frame(session_id: str) -> "Response":
+    """
+    Receives a JPEG frame of a browser-capture session (request body, capture time in milliseconds in the "t" parameter).
+    Frames are recognized asynchronously: the response carries the last result of the session, not the one of this frame.
+    Args:
+        session_id (str): Identifier of the session.
+    Returns:
+        Response: {"status": "ok", "accepted": bool, "result": {"seq", "gesture", "score", "command"} or null},
+            404 if the session does not exist (e.g., it expired), 413 if the frame is too large.
+    """
+    if inference_service is None:
+        return jsonify({"status": "error", "message": "Session not found."}), 404
+    if request.content_length is not None and request.content_length > MAX_FRAME_BYTES:
+        return jsonify({"status": "error", "message": "Frame too large."}), 413
+    jpeg = request.get_data(cache=False)
+    if len(jpeg) > MAX_FRAME_BYTES:
+        return jsonify({"status": "error", "message": "Frame too large."}), 413
+    timestamp_ms = request.args.get("t", type=float)
+    try:
+        accepted = inference_service.submit_frame(session_id, jpeg, timestamp_ms)
+        result = inference_service.latest(session_id)
+    except KeyError:
+        return jsonify({"status": "error", "message": "Session not found."}), 404
+    return jsonify({"status": "ok", "accepted": accepted, "result": result})
+
+
+@app.route("/capture/close/<session_id>", methods=["POST"])
+def close_capture_session(session_id: str) -> "Response":
+    """
+    Closes a browser-capture session.
+    Args:
+        session_id (str): Identifier of the session.
+    Returns:
+        Response: {"status": "ok"}, or 404 if the session does not exist.
+    """
+    if inference_service is None or not inference_service.close_session(session_id):
+        return jsonify({"status": "error", "message": "Session not found."}), 404
+    return jsonify({"status": "ok"})
+
+
+@app.route("/capture/stats", methods=["GET"])
+def capture_stats() -> "Response":
+    """
+    Returns the statistics of the inference service (see InferenceService.stats): state, sessions and recognized frames
+    of every worker, and counters and latencies of every session.
+    Args:
+        None
+    Returns:
+        Response: {"status": "ok", "workers": [...], "sessions": {...}} ("workers" is empty if the service is not started).
+    """
+    if inference_service is None:
+        return jsonify({"status": "ok", "workers": [], "sessions": {}})
+    return jsonify({"status": "ok", **inference_service.stats()})
+
+
 @app.route("/stop_client", methods=["GET"])
 def stop_client() -> "Response":
     """
@@ -333,22 +728,91 @@ def stop_client() -> "Response":
 def check_server() -> "Response":
     """
     Flask route to check if the server is running.
-    This route sends a request to the server and checks if it responds with a 200 OK status.
-    If the server is reachable, it returns a JSON response indicating success.
-    If the server is not reachable, it returns a JSON response indicating failure.
+    The connections are checked by the heartbeat of send_command_to_server: a target server is running if it answered
+    a ping in the last HEARTBEAT_TIMEOUT_S seconds, and the check succeeds if at least one target is running.
+    If a server is reachable, it returns a JSON response indicating success, with the highest round-trip time ("rtt_ms")
+    and jitter ("jitter_ms") of the running targets, the age of their oldest answer ("heartbeat_age_s"),
+    and the number of running targets ("targets_up") out of all the targets ("targets").
+    If no server is reachable, it returns a JSON response indicating failure (see /targets for the details of every target).
     Args:
         None
     Returns:
         Response: A JSON response indicating whether the server is running or not.
     """
     global server_is_running
-    if server_is_running.value:
+    running = server_is_running.value
+    response = {}
+    if running and target_stats is not None:
+        # No recent pong: the connection is half-open (or the sending process is stuck)
+        alive = [target for target in target_metrics(target_stats) if target["alive"]]
+        running = bool(alive)
+        if alive:
+            response = {"rtt_ms": max(target["rtt_ms"] for target in alive), "jitter_ms": max(target["jitter_ms"] for target in alive),
+                        "heartbeat_age_s": max(target["heartbeat_age_s"] for target in alive),
+                        "targets_up": len(alive), "targets": len(SERVER_TARGETS)}
+    if running:
         print("[INFO] Server is running.")
-        return jsonify({"status": "ok", "message": "Connection established."})
+        return jsonify({"status": "ok", "message": "Connection established.", **response})
     else:
         print("[ERROR] Server is not running.")
         return jsonify({"status": "error", "message": "Server is not running."}), 503
     
+@app.route("/targets", methods=["GET"])
+def targets() -> "Response":
+    """
+    Flask route returning the state and the metrics of every target server (see send_command_to_server.target_metrics):
+    heartbeat ("alive", "rtt_ms", "jitter_ms", "heartbeat_age_s"), smoothed time to send a command ("send_ms"),
+    and the number of commands sent and dropped and of connection failures.
+    Args:
+        None
+    Returns:
+        Response: {"status": "ok", "targets": [...]}, or a 503 error if the command-sending process is not started.
+    """
+    if target_stats is None:
+        return jsonify({"status": "error", "message": "Command sender not started."}), 503
+    return jsonify({"status": "ok", "targets": target_metrics(target_stats)})
+
+
+@app.route("/gesture_events", methods=["GET"])
+def gesture_events() -> "Response":
+    """
+    Returns the recent recognition events newer than a cursor (see GestureHistory.since), oldest first.
+    The web interface passes the cursor of the previous response as "after", so it receives every event once,
+    including the gestures shown for less than its polling interval. The recognizer records every change of the gesture
+    of a hand and every command sent. Events stay readable after recognition stops.
+    Args:
+        None (query parameters: "after", the cursor (default 0: all the events kept), and "limit", at most MAX_GESTURE_EVENTS).
+    Returns:
+        Response: JSON {"status": "ok", "events": [...], "cursor", "missed"}, where every event has
+            seq, t, gesture, score, hand, handedness, outcome and the command sent or streamed for the gesture (None if none),
+            or 400 if a parameter is not an integer.
+    """
+    try:
+        after = int(request.args.get("after", 0))
+        limit = min(int(request.args.get("limit", MAX_GESTURE_EVENTS)), MAX_GESTURE_EVENTS)
+    except ValueError:
+        return jsonify({"status": "error", "message": "after and limit must be integers."}), 400
+    if gesture_history is None:
+        return jsonify({"status": "ok", "events": [], "cursor": 0, "missed": 0})
+    history = gesture_history.since(after, max(limit, 1))
+    return jsonify({"status": "ok", **history})
+
+
+@app.route("/lifecycle", methods=["GET"])
+def lifecycle() -> "Response":
+    """
+    Returns the state and the lifecycle metrics of the worker processes (see SupervisedProcess.metrics):
+    number of starts, stops, crashes and restarts, duration of the last start and stop, how the last stop ended
+    (cooperative, terminated or killed) and the last transitions.
+    Args:
+        None
+    Returns:
+        Response: JSON {"status": "ok", "processes": [...]}, the recognizer first, then the command sender (if started by main.py).
+    """
+    supervisors = [recognition_process] + ([command_sender] if command_sender is not None else [])
+    return jsonify({"status": "ok", "processes": [supervisor.metrics() for supervisor in supervisors]})
+
+
 @app.route("/get_recognized_gesture", methods=["GET"])
 def send_recognized_gesture() -> "Response":
     """
@@ -0,0 +1,186 @@
+# client/frame_broadcaster.py
+# -*- coding: utf-8 -*-
+"""
+This module contains the FrameBroadcaster class, which delivers the webcam frames of the gesture recognition process
+to every /video_feed viewer.
+The gesture recognition process puts JPEG-encoded frames into the webcam frame queue, and with the "landmarks"
+preview of the recognizer profile also the landmark previews of its results (dictionaries), streamed to /preview_feed.
+A single reader thread takes them out of the queue and builds each MJPEG part (or Server-Sent Event) once;
+viewers wait on a condition for the next part, so an idle stream costs no CPU
+and the cost of a frame does not grow with the number of viewers.
+This module does not depend on OpenCV, so the Flask process does not have to load it.
+"""
+
+import json
+import threading
+from queue import Empty
+
+
+def mjpeg_part(jpeg: bytes) -> bytes:
+    """
+    Builds a part of a multipart/x-mixed-replace MJPEG stream (boundary "frame").
+    Args:
+        jpeg (bytes): JPEG-encoded frame.
+    Returns:
+        bytes: The part, with its boundary and headers.
+    """
+    return b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + jpeg + b"\r\n"
+
+
+def preview_event(preview: dict) -> bytes:
+    """
+    Builds a Server-Sent Event (text/event-stream) carrying a landmark preview as compact JSON.
+    Args:
+        preview (dict): The landmark preview (see gesture_recognizer.landmark_preview).
+    Returns:
+        bytes: The event.
+    """
+    return b"data: " + json.dumps(preview, separators=(",", ":")).encode() + b"\n\n"
+
+
+class FrameBroadcaster:
+    """
+    Latest-frame broadcaster of the MJPEG stream.
+
+    Frames are numbered: a viewer passes the number of the last frame it sent and waits for a newer one,
+    so a slow viewer skips frames instead of making the others (or the queue) fall behind.
+    Landmark previews are numbered and delivered the same way, independently of the frames.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes the broadcaster. The reader thread is started by `start`.
+        Args:
+            None
+        Returns:
+            None
+        """
+        self._condition = threading.Condition()
+        # Number and MJPEG part of the latest frame (0 and None before the first frame)
+        self._seq = 0
+        self._part = None
+        # Number and event of the latest landmark preview
+        self._preview_seq = 0
+        self._preview = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        """True while the reader thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, frame_queue: "multiprocessing.Queue") -> None:
+        """
+        Starts reading the frames of a webcam frame queue (stopping the previous reader, if any).
+        Args:
+            frame_queue (multiprocessing.Queue): Queue where the gesture recognition process puts its JPEG-encoded frames.
+        Returns:
+            None
+        """
+        self.stop()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._read_frames, args=(frame_queue, self._stop_event),
+                                        name="FrameBroadcaster", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """
+        Stops the reader thread and wakes up the waiting viewers.
+        Args:
+            timeout (float): Maximum time to wait for the reader thread, in seconds.
+        Returns:
+            None
+        """
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def publish(self, part: bytes) -> None:
+        """
+        Publishes a new MJPEG part and wakes up the viewers.
+        Args:
+            part (bytes): The MJPEG part (see `mjpeg_part`).
+        Returns:
+            None
+        """
+        with self._condition:
+            self._seq += 1
+            self._part = part
+            self._condition.notify_all()
+
+    def publish_preview(self, event: bytes) -> None:
+        """
+        Publishes a new landmark preview and wakes up the viewers.
+        Args:
+            event (bytes): The Server-Sent Event of the preview (see `preview_event`).
+        Returns:
+            None
+        """
+        with self._condition:
+            self._preview_seq += 1
+            self._preview = event
+            self._condition.notify_all()
+
+    def _read_frames(self, frame_queue: "multiprocessing.Queue", stop_event: threading.Event) -> None:
+        """
+        Body of the reader thread: publishes the newest frame and the newest landmark preview of the queue.
+        Args:
+            frame_queue (multiprocessing.Queue): The webcam frame queue.
+            stop_event (threading.Event): Set to stop the thread.
+        Returns:
+            None
+        """
+        while not stop_event.is_set():
+            frame = preview = None
+            try:
+                item = frame_queue.get(timeout=0.5)
+                # Only the newest frame and the newest preview are published: the ones queued before them are stale
+                while True:
+                    if isinstance(item, dict):
+                        preview = item
+                    else:
+                        frame = item
+                    item = frame_queue.get_nowait()
+            except Empty:
+                pass
+            except (OSError, ValueError, EOFError):
+                # The queue was closed (the recognition process stopped)
+                break
+            if frame is not None:
+                self.publish(mjpeg_part(frame))
+            if preview is not None:
+                self.publish_preview(preview_event(preview))
+
+    def wait_for_frame(self, last_seq: int, timeout: float = None) -> tuple:
+        """
+        Waits for a frame newer than `last_seq`.
+        Args:
+            last_seq (int): Number of the last frame the viewer received (0 for none).
+            timeout (float): Maximum time to wait, in seconds (None to wait until a frame arrives or the broadcaster stops).
+        Returns:
+            tuple: (seq, part), where part is None if no newer frame arrived before the timeout or the broadcaster stopped.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._seq != last_seq or self._stop_event.is_set(), timeout)
+            if self._seq == last_seq:
+                return last_seq, None
+            return self._seq, self._part
+
+    def wait_for_preview(self, last_seq: int, timeout: float = None) -> tuple:
+        """
+        Waits for a landmark preview newer than `last_seq`.
+        Args:
+            last_seq (int): Number of the last preview the viewer received (0 for none).
+            timeout (float): Maximum time to wait, in seconds (None to wait until a preview arrives or the broadcaster stops).
+        Returns:
+            tuple: (seq, event), where event is None if no newer preview arrived before the timeout or the broadcaster stopped.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._preview_seq != last_seq or self._stop_event.is_set(), timeout)
+            if self._preview_seq == last_seq:
+                return last_seq, None
+            return self._preview_seq, self._preview
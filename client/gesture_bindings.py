@@ -0,0 +1,102 @@
+# client/gesture_bindings.py
+# -*- coding: utf-8 -*-
+"""
+This module contains the compiled gesture bindings: the gesture -> command mapping of a configuration,
+compiled once (when recognition starts) into flat tables indexed by gesture ID, so the recognition callback
+resolves a recognized gesture with one lookup of its ID and array indexing, instead of looking up the command name
+and scanning COMMANDS for it on every result.
+
+The item of a binding is what the recognizer puts on the command queue: the command ID (see client_constants.COMMAND_REGISTRY)
+for the built-in discrete commands, the command string for macro commands (they have no ID), and the command name for
+continuous commands (used by the continuous-control sender).
+
+The gesture ID itself is still looked up by name (one dictionary lookup per recognized hand): MediaPipe does not give
+the index of the gesture categories (Category.index is always -1 in the gesture recognizer results),
+and the custom gestures matched from the landmark templates are names.
+"""
+
+from array import array
+
+from client_constants import COMMAND_IDS, COMMANDS, CONTINUOUS_COMMANDS, GESTURE_IDS, MACRO_PREFIX
+
+# Kind of the command bound to a gesture
+BINDING_NONE = 0        # No command (or an unknown one)
+BINDING_DISCRETE = 1    # A command sent to the server (built-in or macro)
+BINDING_CONTINUOUS = 2  # A continuous command (see control_channel.py)
+
+
+class GestureIds(dict):
+    """Gesture name -> gesture ID dictionary whose missing names map to the unknown ID (set `unknown_id` once built)."""
+
+    unknown_id = -1
+
+    def __missing__(self, gesture: str) -> int:
+        return self.unknown_id
+
+
+class GestureBindings:
+    """
+    Gesture -> command table of a configuration, indexed by gesture ID.
+
+    Built-in gestures have the IDs of client_constants.GESTURE_REGISTRY; the custom gestures of the mapping get
+    the following IDs, and the last ID (`unknown_id`) is bound to nothing, so every name resolves to a valid ID:
+    the recognition callback does `bindings.kinds[bindings.gesture_ids[name]]` without any check.
+    """
+
+    def __init__(self, gesture_to_command: dict = None) -> None:
+        """
+        Compiles a mapping.
+        Args:
+            gesture_to_command (dict): Gesture name -> command name (None or empty for no bindings).
+        Returns:
+            None
+        """
+        gesture_to_command = gesture_to_command or {}
+        self.gesture_ids = GestureIds(GESTURE_IDS)
+        for gesture in gesture_to_command:
+            if gesture not in self.gesture_ids:
+                self.gesture_ids[gesture] = len(self.gesture_ids)
+        self.gesture_names = tuple(self.gesture_ids)
+        self.unknown_id = self.gesture_ids.unknown_id = len(self.gesture_ids)
+        size = self.unknown_id + 1
+        # Flat tables, indexed by gesture ID
+        self.kinds = bytearray(size)
+        self.command_ids = array("h", [-1] * size)
+        self.items = [None] * size
+        self.command_names = [None] * size
+        self.bound = 0
+        for gesture, command in gesture_to_command.items():
+            if not command:
+                continue
+            gesture_id = self.gesture_ids[gesture]
+            self.command_names[gesture_id] = command
+            self.bound += 1
+            if command in COMMANDS:
+                self.kinds[gesture_id] = BINDING_DISCRETE
+                self.command_ids[gesture_id] = COMMAND_IDS[command]
+                self.items[gesture_id] = COMMAND_IDS[command]
+            elif command.startswith(MACRO_PREFIX):
+                self.kinds[gesture_id] = BINDING_DISCRETE
+                self.items[gesture_id] = command
+            elif command in CONTINUOUS_COMMANDS:
+                self.kinds[gesture_id] = BINDING_CONTINUOUS
+                self.command_ids[gesture_id] = COMMAND_IDS[command]
+                self.items[gesture_id] = command
+
+    def __len__(self) -> int:
+        """Number of gestures bound to a command."""
+        return self.bound
+
+    def gesture_id(self, gesture: "str | None") -> int:
+        """
+        Returns the ID of a gesture.
+        Args:
+            gesture (str | None): The gesture name.
+        Returns:
+            int: The ID of the gesture, `unknown_id` for the gestures missing from the registry and from the mapping.
+        """
+        return self.gesture_ids[gesture]
+
+    def has_continuous(self) -> bool:
+        """True if at least one gesture is bound to a continuous command."""
+        return BINDING_CONTINUOUS in self.kinds
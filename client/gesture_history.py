@@ -0,0 +1,146 @@
+# client/gesture_history.py
+# -*- coding: utf-8 -*-
+"""
+This module contains the recent-gesture history: a fixed-size ring of the last recognition events
+(time, gesture, score, hand, outcome, command sent) in shared memory, written by the gesture recognition process
+and read by flask_client.py for the /gesture_events endpoint.
+The recognition process records every change of the gesture of a hand (a gesture appears, changes or leaves the frame)
+and every command it sends (see gesture_recognizer.py), so the history is what was done with the gestures,
+not a copy of every frame (every frame is in the event log, see event_log.py).
+
+Unlike `last_gesture`, which holds only the latest gesture and is sampled by the web interface,
+every event gets a sequence number: a reader passes the number of the last event it received and gets
+all the newer ones (as long as they were not overwritten), so no recorded event is missed between two polls.
+The ring is a multiprocessing.Array holding a NumPy structured array, so an event is written and read
+with a few array operations under the lock of the array.
+"""
+
+import ctypes
+import multiprocessing
+import time
+
+import numpy as np
+
+from client_constants import MAX_GESTURE_NAME_LENGTH
+from event_log import HANDEDNESS_IDS, OUTCOME_NAMES
+
+# Number of events kept (a held gesture adds an event per command sent, 3 per second at 30 frames per second)
+HISTORY_SIZE = 512
+# Maximum length of the command of an event, in bytes (longer macro commands are truncated)
+MAX_HISTORY_COMMAND_LENGTH = 64
+
+# Record of an event (the sequence number lets a reader check that a slot was not overwritten while it was copied)
+HISTORY_DTYPE = np.dtype([
+    ("seq", "<u8"),                               # Sequence number of the event (the first event is 1)
+    ("t", "<f8"),                                 # UNIX time of the event
+    ("gesture", f"S{MAX_GESTURE_NAME_LENGTH}"),   # Gesture name (UTF-8), empty if no hand was detected
+    ("score", "<f4"),                             # Score of the gesture
+    ("hand", "i1"),                               # Index of the hand in the frame, -1 if no hand was detected
+    ("handedness", "i1"),                         # 0 for a left hand, 1 for a right hand, -1 if unknown
+    ("outcome", "u1"),                            # What was done with the gesture (event_log.OUTCOME_*)
+    ("command", f"S{MAX_HISTORY_COMMAND_LENGTH}"),  # Command sent or streamed for the gesture (UTF-8), empty if none
+])
+# The ring starts with the sequence number of the last event (8 bytes), followed by the records
+HISTORY_HEADER_SIZE = 8
+
+# Names of the handedness codes
+HANDEDNESS_NAMES = {code: name for name, code in HANDEDNESS_IDS.items()}
+
+
+class GestureHistory:
+    """
+    Ring of the recent recognition events, shared between processes.
+
+    Create it in the parent process and pass it to the recognition process (it is pickled as its shared array).
+    `append` is called by the writer, `since` by any number of readers.
+    """
+
+    def __init__(self, size: int = HISTORY_SIZE) -> None:
+        """
+        Allocates the ring in shared memory.
+        Args:
+            size (int): Number of events kept.
+        Returns:
+            None
+        """
+        self.size = size
+        self._shared = multiprocessing.Array(ctypes.c_char, HISTORY_HEADER_SIZE + size * HISTORY_DTYPE.itemsize)
+        self._map()
+
+    def __getstate__(self) -> dict:
+        # The NumPy views cannot be pickled: only the shared array is sent to the child process
+        return {"size": self.size, "_shared": self._shared}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._map()
+
+    def _map(self) -> None:
+        """Creates the NumPy views of the header and of the records over the shared array."""
+        buffer = self._shared.get_obj()
+        self._header = np.frombuffer(buffer, dtype="<u8", count=1)
+        self._records = np.frombuffer(buffer, dtype=HISTORY_DTYPE, count=self.size, offset=HISTORY_HEADER_SIZE)
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the last event (0 if there is none)."""
+        with self._shared.get_lock():
+            return int(self._header[0])
+
+    def append(self, gesture: "str | None", outcome: int, score: float = 0.0, hand: int = -1,
+               handedness: "str | None" = None, command: "str | None" = None, t: float = None) -> int:
+        """
+        Appends an event, overwriting the oldest one if the ring is full.
+        Args:
+            gesture (str | None): The recognized gesture (None if no hand was detected).
+            outcome (int): What was done with the gesture (event_log.OUTCOME_*).
+            score (float): Score of the gesture.
+            hand (int): Index of the hand in the frame.
+            handedness (str | None): "Left" or "Right".
+            command (str | None): The command sent or streamed for the gesture (None if there is none).
+            t (float): UNIX time of the event (None for now).
+        Returns:
+            int: The sequence number of the event.
+        """
+        record = (0, time.time() if t is None else t, (gesture or "").encode()[:MAX_GESTURE_NAME_LENGTH], score,
+                  hand, HANDEDNESS_IDS.get(handedness, -1), outcome,
+                  (command or "").encode()[:MAX_HISTORY_COMMAND_LENGTH])
+        with self._shared.get_lock():
+            seq = int(self._header[0]) + 1
+            self._records[seq % self.size] = (seq,) + record[1:]
+            self._header[0] = seq
+        return seq
+
+    def since(self, after: int, limit: int = None) -> dict:
+        """
+        Returns the events newer than a sequence number, oldest first.
+        Args:
+            after (int): Sequence number of the last event the reader received (0 for all the events kept).
+            limit (int): Maximum number of events (the oldest ones are returned first), None for no limit.
+        Returns:
+            dict: {"events": [{"seq", "t", "gesture", "score", "hand", "handedness", "outcome", "command"}], "cursor", "missed"},
+                where cursor is the sequence number to pass as `after` to get the next events, and missed is the number
+                of events newer than `after` that were already overwritten.
+        """
+        with self._shared.get_lock():
+            last = int(self._header[0])
+            # A cursor ahead of the ring (e.g., the client restarted) reads from the start
+            after = max(0, after) if after <= last else 0
+            first = max(after + 1, last - self.size + 1, 1)
+            end = last if limit is None else min(last, first + limit - 1)
+            records = self._records[np.arange(first, end + 1) % self.size].copy() if end >= first else self._records[:0].copy()
+        # tolist converts the records to tuples of Python values at once (much faster than indexing every field)
+        events = [
+            {
+                "seq": seq,
+                "t": t,
+                "gesture": gesture.decode(errors="replace") or None,
+                "score": round(score, 3),
+                "hand": hand,
+                "handedness": HANDEDNESS_NAMES.get(handedness),
+                "outcome": OUTCOME_NAMES[outcome] if outcome < len(OUTCOME_NAMES) else None,
+                "command": command.decode(errors="replace") or None,
+            }
+            for seq, t, gesture, score, hand, handedness, outcome, command in records.tolist()
+        ]
+        return {"events": events, "cursor": end if end >= first else after, "missed": first - after - 1}
@@ -1,10 +1,60 @@
 # client/main.py
 
+import time
+
+# Start time of the client, used to report how long the startup took
+STARTUP_TIME = time.perf_counter()
+
+import os
+import signal
+
+# HTTP serving mode of the Flask client:
+# - "threaded" (default): Werkzeug development server, one OS thread per connection;
+# - "gevent": gevent WSGI server, every connection (including the long-lived /video_feed streams) is a greenlet.
+CLIENT_SERVING_MODE = os.environ.get("CLIENT_SERVING_MODE", "threaded")
+CLIENT_HOST = "0.0.0.0"
+CLIENT_PORT = int(os.environ.get("CLIENT_PORT", "8080"))
+
+# gevent must patch the standard library before any other module is imported.
+# Only the main process is patched: the child processes (spawned) import this module as __mp_main__.
+if __name__ == "__main__" and CLIENT_SERVING_MODE == "gevent":
+    try:
+        from gevent import monkey
+        monkey.patch_all()
+    except ImportError:
+        print("[ERROR] gevent is not installed: falling back to the threaded server.")
+        CLIENT_SERVING_MODE = "threaded"
+
+# Only light modules are imported at module level: the spawned child processes import this module too.
+# flask_client is imported by main(), and MediaPipe and OpenCV are only imported by the gesture recognition process.
 import multiprocessing
-from send_command_to_server import send_command_to_server
-import flask_client
+from process_supervisor import SupervisedProcess
+from send_command_to_server import DRAIN_TIMEOUT_S, SERVER_TARGETS, TARGET_STATS_SIZE, send_command_to_server
 import ctypes
 
+def serve(app: "Flask", mode: str) -> None:
+    """
+    Serves the Flask application until CTRL-C (or /stop_client) stops it.
+    Args:
+        app (Flask): The Flask application.
+        mode (str): "threaded" for the Werkzeug development server, "gevent" for the gevent WSGI server
+            (the standard library must have been patched by gevent).
+    Returns:
+        None
+    """
+    print(f"[INFO] Starting Flask client ({mode} server) on port {CLIENT_PORT}, "
+          f"{time.perf_counter() - STARTUP_TIME:.2f} s after startup.")
+    if mode == "gevent":
+        import gevent
+        from gevent.pywsgi import WSGIServer
+        server = WSGIServer((CLIENT_HOST, CLIENT_PORT), app)
+        # SIGINT (CTRL-C or /stop_client) stops the server from a new greenlet, instead of interrupting the running request
+        gevent.signal_handler(signal.SIGINT, server.stop, 1)
+        server.serve_forever()
+    else:
+        app.run(host=CLIENT_HOST, port=CLIENT_PORT, threaded=True)
+
+
 def main():
     """
     Main entry point for the client application.
@@ -13,7 +63,7 @@ def main():
     - Starts a separate process to listen to the queue and send commands to the server.
     - Attaches the queue to the Flask client for global access.
     - Runs the Flask application to handle incoming HTTP requests.
-    - On Flask shutdown, signals the command-sending process to terminate and waits for it to finish.
+    - On Flask shutdown, asks the command-sending process to send the queued commands and stop, in a bounded time.
     Args:
         None
     Returns:
@@ -21,12 +71,17 @@ def main():
     Notes:
         - This function is designed to be run as the main module of the client application.
         - It uses the Flask framework to create a web client that communicates with a server.
-        - The multiprocessing module is used to handle command sending in a separate process.
-        - The Flask app runs in threaded mode to handle multiple HTTP requests concurrently.
+        - The multiprocessing module is used to handle command sending in a separate process, supervised by a SupervisedProcess
+          (restarted if it crashes, see process_supervisor.py).
+        - The Flask app runs in threaded mode to handle multiple HTTP requests concurrently,
+          or on a gevent server if the CLIENT_SERVING_MODE environment variable is "gevent" (see `serve`).
     """
     # Set the start method for multiprocessing to 'spawn'
     multiprocessing.set_start_method("spawn", force=True)
 
+    # Imported here, so that the spawned child processes (which import this module) do not import Flask
+    import flask_client
+
     # Initialize a single multiprocessing queue for communication between gesture_recognizer.py and send_command_to_server.py
     gesture_recognizer_to_socket_queue = multiprocessing.Queue()
     flask_client.gesture_recognizer_to_socket_queue = gesture_recognizer_to_socket_queue
@@ -34,24 +89,36 @@ def main():
     # Initialize a single multiprocessing queue for communication between Flask client and send_command_to_server.py
     server_is_running = multiprocessing.Value(ctypes.c_bool, False)  # Shared boolean
     flask_client.server_is_running = server_is_running
+    # Heartbeat (round-trip time, jitter, time of the last pong) and send counters of every target server
+    target_stats = multiprocessing.Array(ctypes.c_double, len(SERVER_TARGETS) * TARGET_STATS_SIZE)
+    flask_client.target_stats = target_stats
     
-    # Start a separate process to listen to the queue and send commands to the server
-    send_proc = multiprocessing.Process(
-        target=send_command_to_server,
-        args=(gesture_recognizer_to_socket_queue, server_is_running,)
+    # Start a separate process to listen to the queue and send commands to the server.
+    # It is asked to stop with a None in its queue: it sends the commands queued before it, then closes its connections.
+    send_proc = SupervisedProcess(
+        "command sender", send_command_to_server,
+        request_stop=lambda: gesture_recognizer_to_socket_queue.put(None),
+        stop_timeout=3 * DRAIN_TIMEOUT_S,
     )
-    send_proc.start()
+    send_proc.start(args=(gesture_recognizer_to_socket_queue, server_is_running, target_stats,))
+    flask_client.command_sender = send_proc
 
 
     # Start Flask (this blocks until you stop it with CTRL-C)
-    flask_client.app.run(host="0.0.0.0", port=8080, threaded=True)
-    print("[INFO] Flask client started.")
+    serve(flask_client.app, CLIENT_SERVING_MODE)
+    print("[INFO] Flask client stopped.")
+    # Stop the workers of the browser-capture mode, if it was used
+    if flask_client.inference_service is not None:
+        flask_client.inference_service.stop()
+
+    # Stop the recognition process, if the client was stopped with CTRL-C while it was running
+    if flask_client.recognition_active:
+        with flask_client.app.app_context():
+            flask_client.stop_recognition()
 
-    # When Flask stops, signal the command-sending process to terminate
+    # When Flask stops, ask the command-sending process to send the queued commands and stop
     print("[INFO] Stopping client process...")
-    send_proc.terminate()
-    print("[INFO] Waiting for command-sending process to finish...")
-    send_proc.join()
+    send_proc.stop()
     print("[INFO] Client processes stopped.")
 
 if __name__ == "__main__":
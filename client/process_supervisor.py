@@ -0,0 +1,335 @@
+# client/process_supervisor.py
+# -*- coding: utf-8 -*-
+"""
+This module contains the lifecycle of the worker processes of the client (gesture recognition, command sending).
+
+A SupervisedProcess starts its process, restarts it if it crashes, and stops it in a bounded time:
+1. cooperative stop: the process is asked to finish (a stop event passed to its target, or a sentinel put in its queue)
+   and gets `stop_timeout` seconds to release its resources and flush its queues;
+2. SIGTERM (the signal handlers of the workers release the webcam and close the connections);
+3. SIGKILL.
+While waiting, the queues written by the process are drained, so its feeder thread can flush them and the process
+can exit (a process exits only once the data it put in a queue reached the pipe).
+Every transition (start, stop, restart) is timed, and the metrics are served by the /lifecycle endpoint of flask_client.py.
+"""
+
+import collections
+import multiprocessing
+import multiprocessing.connection
+import queue
+import threading
+import time
+
+# Time given to a process to stop by itself, then after SIGTERM, in seconds (SIGKILL is then sent)
+STOP_TIMEOUT_S = 2.0
+TERMINATE_TIMEOUT_S = 1.0
+# Interval between two drains of the queues of a stopping process, in seconds
+DRAIN_INTERVAL_S = 0.02
+# Restarts of a crashed process: at most MAX_RESTARTS within RESTART_WINDOW_S seconds, RESTART_DELAY_S seconds after the crash
+MAX_RESTARTS = 5
+RESTART_WINDOW_S = 60.0
+RESTART_DELAY_S = 0.5
+# Number of transitions kept for the metrics
+TRANSITION_HISTORY = 20
+
+# States of a supervised process
+STATE_STOPPED = "stopped"
+STATE_RUNNING = "running"
+STATE_STOPPING = "stopping"
+STATE_EXITED = "exited"        # The process ended by itself (exit code 0): it is not restarted
+STATE_FAILED = "failed"        # The process crashed too often: it is not restarted anymore
+
+# How a stop ended
+STOP_COOPERATIVE = "cooperative"
+STOP_TERMINATED = "terminated"
+STOP_KILLED = "killed"
+
+
+class SupervisedProcess:
+    """
+    A worker process with a supervised lifecycle: bounded-time stop, automatic restart after a crash, timed transitions.
+
+    The same instance can be started and stopped any number of times (the metrics cover all the cycles).
+    Only the thread that calls `start` and `stop` and the monitor thread of the instance handle the process.
+    """
+
+    def __init__(self, name: str, target: "callable", stop_event_kwarg: str = None, request_stop: "callable" = None,
+                 restart: bool = True, stop_timeout: float = STOP_TIMEOUT_S, on_exit: "callable" = None) -> None:
+        """
+        Creates the supervisor (no process is started).
+        Args:
+            name (str): Name of the process, used in the logs and the metrics.
+            target (callable): Function run by the process (importable, since processes are spawned).
+            stop_event_kwarg (str): If set, a multiprocessing.Event is passed to the target with this keyword argument,
+                and set to ask the process to stop.
+            request_stop (callable): Called (without argument) to ask the process to stop, e.g., to put a sentinel in its queue.
+            restart (bool): True to restart the process when it crashes (exits with a non-zero exit code).
+            stop_timeout (float): Time given to the process to stop by itself, in seconds.
+            on_exit (callable): Called with the state ("exited" or "failed") when the process ended and will not be restarted.
+                It is called from the monitor thread, which stop() joins: it must not call stop() itself.
+        Returns:
+            None
+        """
+        self.name = name
+        self.target = target
+        self.stop_event_kwarg = stop_event_kwarg
+        self.request_stop = request_stop
+        self.restart = restart
+        self.stop_timeout = stop_timeout
+        self.on_exit = on_exit
+        # Spawned like all the processes of the client: the children do not inherit the threads and sockets of Flask
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._process = None
+        self._stop_event = None
+        self._monitor = None
+        # Set by stop(), wakes up the monitor thread waiting to restart the process
+        self._stopping = threading.Event()
+        # Set when no stop is in progress, and the transition of the last stop (returned to the callers that waited for it)
+        self._stop_done = threading.Event()
+        self._stop_done.set()
+        self._last_stop = None
+        self._args = ()
+        self._kwargs = {}
+        self._drain_queues = ()
+        self._state = STATE_STOPPED
+        self._crash_times = collections.deque(maxlen=MAX_RESTARTS)
+        self._transitions = collections.deque(maxlen=TRANSITION_HISTORY)
+        self._counts = {"starts": 0, "stops": 0, "restarts": 0, "crashes": 0}
+        self._last_exit_code = None
+
+    @property
+    def ended(self) -> bool:
+        """True if the process ended by itself or failed, and will not be restarted (stop() was not called)."""
+        return self._state in (STATE_EXITED, STATE_FAILED)
+
+    @property
+    def alive(self) -> bool:
+        """True if the process is running."""
+        process = self._process
+        try:
+            return process is not None and process.exitcode is None
+        except ValueError:
+            # The process was closed by another thread meanwhile
+            return False
+
+    def start(self, args: tuple = (), kwargs: dict = None, drain_queues: tuple = ()) -> "SupervisedProcess":
+        """
+        Starts the process, if it is not running.
+        Args:
+            args (tuple): Positional arguments of the target.
+            kwargs (dict): Keyword arguments of the target.
+            drain_queues (tuple): Queues written by the process, drained while it stops (their content is discarded).
+        Returns:
+            SupervisedProcess: self.
+        """
+        with self._lock:
+            if self._state in (STATE_RUNNING, STATE_STOPPING):
+                return self
+            self._args, self._kwargs, self._drain_queues = args, dict(kwargs or {}), drain_queues
+            self._crash_times.clear()
+            self._stopping.clear()
+            started = time.perf_counter()
+            self._spawn()
+            self._record("start", started)
+            self._counts["starts"] += 1
+        self._monitor = threading.Thread(target=self._watch, name=f"{self.name}-monitor", daemon=True)
+        self._monitor.start()
+        print(f"[INFO] {self.name} process started (pid {self._process.pid}).")
+        return self
+
+    def stop(self, timeout: float = None) -> dict:
+        """
+        Stops the process: asks it to stop, then sends SIGTERM, then SIGKILL, waiting at most `timeout`
+        and TERMINATE_TIMEOUT_S seconds between the steps.
+        If another thread is already stopping the process, waits for that stop to end and returns its transition.
+        Args:
+            timeout (float): Time given to the process to stop by itself, in seconds (None for `stop_timeout`).
+        Returns:
+            dict: The transition: {"transition": "stop", "duration_ms", "how", "exit_code", "t"}
+                (how is "cooperative", "terminated" or "killed", None if the process was not running).
+        """
+        started = time.perf_counter()
+        with self._lock:
+            process = self._process
+            in_progress = self._state == STATE_STOPPING
+            if not in_progress:
+                self._state = STATE_STOPPING
+                self._stop_done.clear()
+        if in_progress:
+            self._stop_done.wait()
+            return self._last_stop
+        self._stopping.set()
+        how = None
+        if process is not None and process.exitcode is None:
+            how = STOP_COOPERATIVE
+            self._ask_to_stop()
+            if not self._wait(process, self.stop_timeout if timeout is None else timeout):
+                how = STOP_TERMINATED
+                process.terminate()
+                if not self._wait(process, TERMINATE_TIMEOUT_S):
+                    how = STOP_KILLED
+                    process.kill()
+                    process.join()
+            print(f"[INFO] {self.name} process stopped ({how}, {(time.perf_counter() - started) * 1000:.0f} ms).")
+        if self._monitor is not None and self._monitor is not threading.current_thread():
+            self._monitor.join()
+        self._monitor = None
+        with self._lock:
+            if process is not None:
+                process.join()
+                self._last_exit_code = process.exitcode
+                # Releases the sentinel and the pipes of the process right away, instead of at garbage collection
+                process.close()
+            self._process = None
+            self._stop_event = None
+            self._drain_queues = ()
+            self._state = STATE_STOPPED
+            self._counts["stops"] += 1
+            self._last_stop = self._record("stop", started, how=how, exit_code=self._last_exit_code)
+            self._stop_done.set()
+            return self._last_stop
+
+    def metrics(self) -> dict:
+        """
+        Returns the state and the metrics of the process.
+        Args:
+            None
+        Returns:
+            dict: {"name", "state", "pid", "starts", "stops", "restarts", "crashes", "last_exit_code",
+                "last_start_ms", "last_stop_ms", "last_stop", "transitions"}, where transitions are the last ones, oldest first.
+        """
+        with self._lock:
+            transitions = list(self._transitions)
+            last = {}
+            for transition in transitions:
+                last[transition["transition"]] = transition
+            process = self._process
+            return {
+                "name": self.name,
+                "state": self._state,
+                "pid": process.pid if process is not None else None,
+                **self._counts,
+                "last_exit_code": self._last_exit_code,
+                "last_start_ms": last["start"]["duration_ms"] if "start" in last else None,
+                "last_stop_ms": last["stop"]["duration_ms"] if "stop" in last else None,
+                "last_stop": last["stop"]["how"] if "stop" in last else None,
+                "transitions": transitions,
+            }
+
+    def _spawn(self) -> None:
+        """Creates and starts a new process (with a new stop event). Called with the lock held."""
+        kwargs = self._kwargs
+        if self.stop_event_kwarg is not None:
+            self._stop_event = self._context.Event()
+            kwargs = {**kwargs, self.stop_event_kwarg: self._stop_event}
+        process = self._context.Process(target=self.target, args=self._args, kwargs=kwargs, name=self.name)
+        # Assigned once started: if the arguments cannot be sent to the process, the supervisor stays as it was
+        process.start()
+        self._process = process
+        self._state = STATE_RUNNING
+
+    def _record(self, transition: str, started: float, **fields) -> dict:
+        """Records a transition that began at `started` (perf_counter time). Called with the lock held."""
+        record = {"transition": transition, "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                  **fields, "t": time.time()}
+        self._transitions.append(record)
+        return record
+
+    def _ask_to_stop(self) -> None:
+        """Asks the process to stop by itself."""
+        if self._stop_event is not None:
+            self._stop_event.set()
+        if self.request_stop is not None:
+            try:
+                self.request_stop()
+            except (ValueError, OSError) as e:
+                # E.g., the queue of the sentinel is already closed: SIGTERM will be sent after the timeout
+                print(f"[ERROR] Cannot ask the {self.name} process to stop: {e}")
+
+    def _wait(self, process: "multiprocessing.Process", timeout: float) -> bool:
+        """
+        Waits for the process to end, draining its queues meanwhile.
+        Args:
+            process (multiprocessing.Process): The process.
+            timeout (float): Maximum time to wait, in seconds.
+        Returns:
+            bool: True if the process ended.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            self._drain()
+            # Waits on the sentinel instead of joining: the monitor thread may be waiting on it too
+            remaining = deadline - time.monotonic()
+            if multiprocessing.connection.wait([process.sentinel], max(0.0, min(DRAIN_INTERVAL_S, remaining))):
+                return True
+            if remaining <= 0:
+                return False
+
+    def _drain(self) -> None:
+        """Discards the content of the queues written by the process, so its feeder thread can flush them."""
+        for drained in self._drain_queues:
+            try:
+                while True:
+                    drained.get_nowait()
+            except (queue.Empty, ValueError, OSError, EOFError):
+                pass
+
+    def _watch(self) -> None:
+        """Body of the monitor thread: restarts the process when it crashes, until it is stopped."""
+        state = self._monitor_loop()
+        if state is not None and self.on_exit is not None:
+            try:
+                self.on_exit(state)
+            except Exception as e:
+                print(f"[ERROR] Exit handler of the {self.name} process failed: {e}")
+
+    def _monitor_loop(self) -> "str | None":
+        """Restarts the process when it crashes. Returns the final state if the process ended by itself or failed, else None."""
+        while True:
+            with self._lock:
+                process = self._process
+                if self._state != STATE_RUNNING or process is None:
+                    return None
+            multiprocessing.connection.wait([process.sentinel])
+            with self._lock:
+                if self._state != STATE_RUNNING or self._process is not process:
+                    # stop() ended the process: it records the transition
+                    return None
+                crashed = time.perf_counter()
+                process.join()
+                self._last_exit_code = process.exitcode
+                process.close()
+                self._process = None
+                if self._last_exit_code == 0:
+                    # The process ended by itself (e.g., no webcam): there is nothing to restart
+                    print(f"[INFO] {self.name} process exited.")
+                    self._state = STATE_EXITED
+                    return STATE_EXITED
+                self._counts["crashes"] += 1
+                now = time.monotonic()
+                self._crash_times.append(now)
+                give_up = not self.restart or (len(self._crash_times) == MAX_RESTARTS
+                                               and now - self._crash_times[0] < RESTART_WINDOW_S)
+                print(f"[ERROR] {self.name} process crashed (exit code {self._last_exit_code})"
+                      f"{', not restarting it' if give_up else ', restarting it'}.")
+                if give_up:
+                    self._state = STATE_FAILED
+                    self._record("crash", crashed, exit_code=self._last_exit_code)
+                    return STATE_FAILED
+            # The delay avoids a restart loop (e.g., a process that fails at once); stop() ends the wait
+            if self._stopping.wait(RESTART_DELAY_S):
+                return None
+            with self._lock:
+                if self._state != STATE_RUNNING:
+                    return None
+                self._drain()
+                try:
+                    self._spawn()
+                except Exception as e:
+                    print(f"[ERROR] Cannot restart the {self.name} process: {e}")
+                    self._state = STATE_FAILED
+                    return STATE_FAILED
+                self._counts["restarts"] += 1
+                self._record("restart", crashed, exit_code=self._last_exit_code)
+            print(f"[INFO] {self.name} process restarted (pid {self._process.pid}).")
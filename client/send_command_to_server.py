@@ -3,39 +3,479 @@
 This module contains the function to send commands to the server over TCP.
 It uses a multiprocessing queue to receive commands from
 the get_result function (a function in gesture_recognizer.py).
+Commands can be sent to several servers at once (e.g., all the display machines of a lecture hall, see SERVER_TARGETS):
+every target has its own connection, thread and outbox, so a slow or unreachable target does not delay the others.
+Every connection is checked with an application-level heartbeat: a "Ping <n>|" frame is sent every HEARTBEAT_INTERVAL_S
+and the server answers "Pong <n>|". The round-trip time, its jitter, the time of the last answer and the send counters
+of every target are published in a shared array, and a connection that does not answer for HEARTBEAT_TIMEOUT_S
+is considered dead and reopened (a half-open connection would otherwise accept commands that never reach the server).
+Built-in commands travel as their ID (see client_constants.COMMAND_REGISTRY), in "#<id>|" frames encoded once at import;
+macro commands are sent as text.
 """
 
 import multiprocessing
+import os
 import socket
 import sys
 import signal
 import ctypes
+import threading
+import time
+from collections import deque
 
-# TCP server configuration
-SERVER_IP = "host.docker.internal"
-SERVER_PORT = 9000
+from client_constants import COMMAND_ID_PREFIX, COMMAND_IDS, COMMAND_REGISTRY
 
+# TCP server configuration (can be overridden with the GESTURE_SERVER_IP and GESTURE_SERVER_PORT environment variables)
+SERVER_IP = os.environ.get("GESTURE_SERVER_IP", "host.docker.internal")
+SERVER_PORT = int(os.environ.get("GESTURE_SERVER_PORT", "9000"))
 
+# Heartbeat configuration: interval between two pings, and time without a pong after which the connection is dead
+HEARTBEAT_INTERVAL_S = 1.0
+HEARTBEAT_TIMEOUT_S = 3.0
+# Time to wait before reconnecting to the server
+RECONNECT_DELAY_S = 1.0
+# Heartbeat frames (must match server.py)
+HEARTBEAT_PING = "Ping"
+HEARTBEAT_PONG = "Pong"
+# Pre-encoded frames of the built-in commands ("#<id>|", must match server.py), by command ID and by command name
+COMMAND_FRAMES = {key: f"{COMMAND_ID_PREFIX}{command_id}|".encode() for name, command_id in COMMAND_IDS.items() for key in (command_id, name)}
+# Maximum number of commands waiting to be sent to a target: when the outbox is full, the oldest command is dropped
+OUTBOX_SIZE = 32
+# Time given to the targets to send the commands of their outbox, then to close their connection, when the process stops, in seconds
+DRAIN_TIMEOUT_S = 1.0
 
-# TCP communication with the command server
-def send_command_to_server(gesture_recognizer_to_socket_queue : "multiprocessing.Queue", server_is_running : "ctypes.c_bool") -> None:
+# Layout of the shared statistics array: TARGET_STATS_SIZE elements (c_double) for every target, in the order of the targets
+HEARTBEAT_RTT_MS = 0     # Round-trip time of the last ping, in milliseconds
+HEARTBEAT_JITTER_MS = 1  # Smoothed mean deviation of the round-trip time (as in RFC 3550), in milliseconds
+HEARTBEAT_LAST_PONG = 2  # time.time() of the last pong (0.0 while disconnected)
+TARGET_SEND_MS = 3       # Smoothed time from the command leaving the queue to the command written to the socket, in milliseconds
+TARGET_SENT = 4          # Commands sent
+TARGET_DROPPED = 5       # Commands dropped (outbox full, or queued while disconnected)
+TARGET_FAILURES = 6      # Failed connection attempts and lost connections
+TARGET_STATS_SIZE = 7
+
+
+def parse_targets(spec: str) -> list:
+    """
+    Parses a list of targets like "192.168.1.10:9000,192.168.1.11,[fd00::2]:9001" (the port defaults to SERVER_PORT).
+    IPv6 addresses with a port are written in brackets; a bare IPv6 address (more than one colon) uses the default port.
+    Invalid entries are reported and skipped: the module is imported by every process of the client, so a typo
+    in GESTURE_SERVER_TARGETS must not prevent it from starting.
+    Args:
+        spec (str): Comma-separated "host[:port]" or "[IPv6 address][:port]" entries.
+    Returns:
+        list: The valid targets, as (host, port) tuples.
+    """
+    targets = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        valid = True
+        if entry.startswith("["):
+            host, _, rest = entry[1:].partition("]")
+            # After the brackets: nothing, or ":port"
+            valid = rest == "" or rest.startswith(":")
+            port = rest[1:]
+        elif entry.count(":") == 1:
+            host, _, port = entry.partition(":")
+        else:
+            host, port = entry, ""
+        if not valid or not host or port and not (port.isascii() and port.isdigit() and 0 < int(port) < 65536):
+            print(f"[ERROR] Invalid server target '{entry}' in GESTURE_SERVER_TARGETS: skipped.")
+            continue
+        targets.append((host, int(port) if port else SERVER_PORT))
+    return targets
+
+
+# Servers the commands are sent to: GESTURE_SERVER_TARGETS, or only SERVER_IP:SERVER_PORT if it is not set
+SERVER_TARGETS = parse_targets(os.environ.get("GESTURE_SERVER_TARGETS", "")) or [(SERVER_IP, SERVER_PORT)]
+
+
+class Heartbeat:
+    """
+    Heartbeat of a connection to the server.
+
+    The sending loop calls `ping` every HEARTBEAT_INTERVAL_S; a reader thread receives the pongs (so the round-trip time
+    is measured when the pong arrives, not when the sending loop wakes up) and updates the shared statistics array.
+    """
+
+    def __init__(self, conn: socket.socket, shared: "multiprocessing.Array" = None, offset: int = 0) -> None:
+        """
+        Initializes the heartbeat of a new connection. The connection is considered alive from now.
+        Args:
+            conn (socket.socket): The connection to the server.
+            shared (multiprocessing.Array): Shared statistics array (see TARGET_STATS_SIZE), or None.
+            offset (int): Index of the first element of the target in the shared array.
+        Returns:
+            None
+        """
+        self.conn = conn
+        self.shared = shared
+        self.offset = offset
+        self._lock = threading.Lock()
+        # Ping number -> time.monotonic() of the ping, for the pings not answered yet
+        self._pending = {}
+        self._seq = 0
+        self._last_pong = time.monotonic()
+        self._rtt = None
+        self._jitter = 0.0
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_pongs, daemon=True)
+        self._reader.start()
+
+    def ping(self) -> None:
+        """
+        Sends a ping (from the sending loop: the socket is only written by one thread).
+        Args:
+            None
+        Returns:
+            None
+        """
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            self._pending[seq] = time.monotonic()
+        self.conn.sendall(f"{HEARTBEAT_PING} {seq}|".encode())
+
+    def alive(self) -> bool:
+        """
+        Checks if the server answered recently.
+        Args:
+            None
+        Returns:
+            bool: False if the server closed the connection or did not answer for HEARTBEAT_TIMEOUT_S.
+        """
+        with self._lock:
+            return not self._closed and time.monotonic() - self._last_pong < HEARTBEAT_TIMEOUT_S
+
+    def close(self) -> None:
+        """
+        Shuts the connection down, which also stops the reader thread.
+        Args:
+            None
+        Returns:
+            None
+        """
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _pong(self, seq: int) -> None:
+        """Records the pong of a ping: updates the round-trip time, the jitter and the shared array."""
+        now = time.monotonic()
+        with self._lock:
+            sent_at = self._pending.pop(seq, None)
+            if sent_at is None:
+                return
+            # Pings sent before this one will not be answered any more (the server answers in order)
+            for old in [old for old in self._pending if old < seq]:
+                del self._pending[old]
+            self._last_pong = now
+            rtt = (now - sent_at) * 1000
+            if self._rtt is not None:
+                self._jitter += (abs(rtt - self._rtt) - self._jitter) / 16
+            self._rtt = rtt
+        if self.shared is not None:
+            with self.shared.get_lock():
+                self.shared[self.offset + HEARTBEAT_RTT_MS] = rtt
+                self.shared[self.offset + HEARTBEAT_JITTER_MS] = self._jitter
+                self.shared[self.offset + HEARTBEAT_LAST_PONG] = time.time()
+
+    def _read_pongs(self) -> None:
+        """Body of the reader thread: parses the "Pong <n>|" frames sent by the server."""
+        buffer = b""
+        try:
+            while True:
+                data = self.conn.recv(1024)
+                if not data:
+                    break
+                buffer += data
+                # Only complete frames are parsed: a frame can be split between two chunks
+                *frames, buffer = buffer.split(b"|")
+                for frame in frames:
+                    name, _, seq = frame.decode("utf-8", "replace").strip().partition(" ")
+                    if name == HEARTBEAT_PONG and seq.isdigit():
+                        self._pong(int(seq))
+        except OSError:
+            pass
+        with self._lock:
+            self._closed = True
+
+
+class TargetSender:
+    """
+    Connection to one target server, with its own thread and outbox.
+
+    The dispatcher (send_command_to_server) puts every command in the outbox of every target without waiting;
+    the thread of the target connects (and reconnects) to the server, sends the commands of its outbox and the pings.
+    A target that is slow or unreachable only fills its own outbox, where the oldest commands are dropped.
+    """
+
+    def __init__(self, host: str, port: int, index: int = 0, shared: "multiprocessing.Array" = None,
+                 on_state_change: "callable" = None) -> None:
+        """
+        Initializes the sender of a target (call `start` to start its thread).
+        Args:
+            host (str): Address of the server.
+            port (int): TCP port of the server.
+            index (int): Index of the target in the shared statistics array.
+            shared (multiprocessing.Array): Shared statistics array (see TARGET_STATS_SIZE), or None.
+            on_state_change (callable): Called without arguments when the target connects or disconnects.
+        Returns:
+            None
+        """
+        self.host = host
+        self.port = port
+        self.name = f"{host}:{port}"
+        self.shared = shared
+        self.offset = index * TARGET_STATS_SIZE
+        self.on_state_change = on_state_change
+        self.connected = False
+        # (command, time.monotonic() when it was taken from the queue)
+        self._outbox = deque()
+        self._condition = threading.Condition()
+        # True while a command taken from the outbox is being written to the socket
+        self._sending = False
+        self._stopping = False
+        self._monitor = None
+        self._send_ms = None
+        self._thread = threading.Thread(target=self._run, name=f"target {self.name}", daemon=True)
+
+    def start(self) -> None:
+        """Starts the thread of the target."""
+        self._thread.start()
+
+    def submit(self, frame: bytes, name: str) -> None:
+        """
+        Puts a command in the outbox (never blocks).
+        Args:
+            frame (bytes): The encoded frame of the command (see `command_frame`).
+            name (str): The command, for the log.
+        Returns:
+            None
+        """
+        with self._condition:
+            if len(self._outbox) >= OUTBOX_SIZE:
+                self._outbox.popleft()
+                self._count(TARGET_DROPPED)
+            self._outbox.append((frame, name, time.monotonic()))
+            self._condition.notify()
+
+    def flush(self, timeout: float) -> bool:
+        """
+        Waits until the commands of the outbox are sent (only while connected: otherwise they would be discarded anyway).
+        Args:
+            timeout (float): Maximum time to wait, in seconds.
+        Returns:
+            bool: True if the outbox is empty.
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while (self._outbox or self._sending) and self.connected:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                # The sending thread does not notify: wake up every 10 ms to check the outbox
+                self._condition.wait(min(remaining, 0.01))
+            return not self._outbox
+
+    def stop(self, timeout: float = None) -> None:
+        """
+        Stops the thread of the target, closing its connection.
+        Args:
+            timeout (float): Maximum time to wait for the thread, in seconds.
+        Returns:
+            None
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._monitor is not None:
+            self._monitor.close()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _count(self, index: int, amount: int = 1) -> None:
+        """Increments a counter of the target in the shared array."""
+        if self.shared is not None:
+            with self.shared.get_lock():
+                self.shared[self.offset + index] += amount
+
+    def _set_connected(self, connected: bool) -> None:
+        """Publishes the state of the connection."""
+        self.connected = connected
+        if not connected and self.shared is not None:
+            with self.shared.get_lock():
+                self.shared[self.offset + HEARTBEAT_LAST_PONG] = 0.0
+        if self.on_state_change is not None:
+            self.on_state_change()
+
+    def _next(self, timeout: float) -> "tuple | None":
+        """Waits up to `timeout` seconds for a command of the outbox: (command, time), or None (timeout or stopping)."""
+        with self._condition:
+            if not self._outbox and not self._stopping:
+                self._condition.wait(timeout)
+            if self._stopping or not self._outbox:
+                return None
+            self._sending = True
+            return self._outbox.popleft()
+
+    def _run(self) -> None:
+        """Body of the thread of the target: connects, sends the commands and the pings, and reconnects."""
+        while not self._stopping:
+            try:
+                with socket.create_connection((self.host, self.port), timeout=HEARTBEAT_TIMEOUT_S) as s:
+                    s.settimeout(None)
+                    print(f"[INFO] Connected to server {self.name} successfully.")
+                    self._serve(s)
+            except (BrokenPipeError, ConnectionResetError) as e:
+                if not self._stopping:
+                    print(f"[ERROR] Lost connection to server {self.name}: {e}")
+                    self._count(TARGET_FAILURES)
+            except Exception as e:
+                if not self._stopping:
+                    print(f"[ERROR] Connection to server {self.name} failed: {e}")
+                    self._count(TARGET_FAILURES)
+            if self.connected:
+                self._set_connected(False)
+            with self._condition:
+                if not self._stopping:
+                    self._condition.wait(RECONNECT_DELAY_S)
+
+    def _serve(self, s: socket.socket) -> None:
+        """Sends the commands of the outbox and the pings over a new connection, until it is lost or the sender stops."""
+        # Commands queued while disconnected are stale
+        with self._condition:
+            removed = len(self._outbox)
+            self._outbox.clear()
+        if removed:
+            print(f"[INFO] Discarded {removed} commands queued for {self.name} while disconnected.")
+            self._count(TARGET_DROPPED, removed)
+        self._monitor = Heartbeat(s, self.shared, self.offset)
+        try:
+            self._monitor.ping()
+            next_ping = time.monotonic() + HEARTBEAT_INTERVAL_S
+            self._set_connected(True)
+            while not self._stopping:
+                # Wait for a command, waking up to send the pings
+                item = self._next(max(next_ping - time.monotonic(), 0.0))
+                try:
+                    if not self._monitor.alive():
+                        if item is not None:
+                            # Put the command back: it is counted with the commands discarded at the reconnection
+                            with self._condition:
+                                self._outbox.appendleft(item)
+                        # Do not send commands into a dead connection: reconnect
+                        raise ConnectionResetError(f"no heartbeat from the server for {HEARTBEAT_TIMEOUT_S} s")
+                    if item is not None:
+                        frame, command, queued_at = item
+                        print(f"[INFO] Sending command to server {self.name}: {command}")
+                        try:
+                            s.sendall(frame)
+                        except OSError:
+                            self._count(TARGET_DROPPED)
+                            raise
+                        self._sent(queued_at)
+                finally:
+                    # Also when the connection is lost: flush() must not wait for a command that will not be sent
+                    self._sending = False
+                if time.monotonic() >= next_ping:
+                    self._monitor.ping()
+                    next_ping = time.monotonic() + HEARTBEAT_INTERVAL_S
+        finally:
+            self._monitor.close()
+
+    def _sent(self, queued_at: float) -> None:
+        """Updates the send counters and the smoothed send time of the target after a command was written."""
+        send_ms = (time.monotonic() - queued_at) * 1000
+        self._send_ms = send_ms if self._send_ms is None else self._send_ms + (send_ms - self._send_ms) / 16
+        if self.shared is not None:
+            with self.shared.get_lock():
+                self.shared[self.offset + TARGET_SEND_MS] = self._send_ms
+                self.shared[self.offset + TARGET_SENT] += 1
+
+
+def command_frame(command: "int | str") -> bytes:
     """
-    Continuously retrieves commands from a multiprocessing queue and sends them to a server over a TCP socket.
+    Returns the frame of a command: the pre-encoded "#<id>|" frame of a built-in command (given by ID or by name),
+    or the text of the command followed by the delimiter (macro commands).
+    Args:
+        command (int | str): The command ID, or the command.
+    Returns:
+        bytes: The frame.
+    Raises:
+        ValueError: If the command is an unknown ID, is not a string, or contains the delimiter.
+    """
+    frame = COMMAND_FRAMES.get(command)
+    if frame is not None:
+        return frame
+    if not isinstance(command, str) or "|" in command:
+        raise ValueError(f"unknown command {command!r}")
+    return (command + "|").encode()
+
+
+def target_metrics(shared: "multiprocessing.Array", targets: list = None) -> list:
+    """
+    Reads the statistics of every target from the shared array.
+    Args:
+        shared (multiprocessing.Array): Shared statistics array, written by send_command_to_server.
+        targets (list): The targets, as (host, port) tuples (defaults to SERVER_TARGETS).
+    Returns:
+        list: One dictionary for every target, with the keys "target", "alive" (True if the server answered a ping
+            in the last HEARTBEAT_TIMEOUT_S seconds), "rtt_ms", "jitter_ms", "heartbeat_age_s" (None if never answered),
+            "send_ms", "sent", "dropped" and "failures".
+    """
+    targets = SERVER_TARGETS if targets is None else targets
+    with shared.get_lock():
+        values = list(shared)
+    now = time.time()
+    metrics = []
+    for index, (host, port) in enumerate(targets):
+        stats = values[index * TARGET_STATS_SIZE:(index + 1) * TARGET_STATS_SIZE]
+        last_pong = stats[HEARTBEAT_LAST_PONG]
+        age = now - last_pong if last_pong > 0 else None
+        metrics.append({
+            "target": f"{host}:{port}",
+            "alive": age is not None and age < HEARTBEAT_TIMEOUT_S,
+            "rtt_ms": round(stats[HEARTBEAT_RTT_MS], 2),
+            "jitter_ms": round(stats[HEARTBEAT_JITTER_MS], 2),
+            "heartbeat_age_s": None if age is None else round(age, 2),
+            "send_ms": round(stats[TARGET_SEND_MS], 3),
+            "sent": int(stats[TARGET_SENT]),
+            "dropped": int(stats[TARGET_DROPPED]),
+            "failures": int(stats[TARGET_FAILURES]),
+        })
+    return metrics
+
+
+# TCP communication with the command servers
+def send_command_to_server(gesture_recognizer_to_socket_queue : "multiprocessing.Queue", server_is_running : "ctypes.c_bool",
+                           target_stats : "multiprocessing.Array" = None, targets : list = None) -> None:
+    """
+    Continuously retrieves commands from a multiprocessing queue and sends them to every target server over TCP.
 
     Args:
         gesture_recognizer_to_socket_queue (multiprocessing.Queue): A queue from which commands are received to be sent to the server.
-        server_is_running (ctypes.c_bool): A shared boolean value indicating whether the server is running. This function will set this value to True when the connection is established and to False if the connection is lost.
+        server_is_running (ctypes.c_bool): A shared boolean value indicating whether the server is running. This function will set this value to True while at least one target is connected and to False otherwise.
+        target_stats (multiprocessing.Array): Shared array of c_double (TARGET_STATS_SIZE elements for every target)
+            where the heartbeat and the send counters of every target are published (None to not publish them).
+        targets (list): The target servers, as (host, port) tuples (defaults to SERVER_TARGETS).
     Returns:
         None
     Behavior:
-        - Connects to the server using SERVER_IP and SERVER_PORT.
-        - Waits for commands from the queue, appends a delimiter '|', and sends them to the server.
-        - If no command is received (i.e., command is None), prints an info message and breaks the loop.
-        - Handles connection errors and prints error messages if the connection fails.
-        - If the connection is lost, it will attempt to reconnect indefinitely.
+        - Starts a TargetSender (thread, connection and outbox) for every target.
+        - Waits for commands from the queue (command IDs, or strings) and puts the frame of every command in the outbox
+          of every target, without waiting for them: every target sends it as soon as its connection is free.
+        - Every target sends a ping every HEARTBEAT_INTERVAL_S, and considers its connection lost if no pong arrives for HEARTBEAT_TIMEOUT_S.
+        - If no command is received (i.e., command is None), prints an info message, lets the targets send the commands
+          of their outbox and stops them, within 2 * DRAIN_TIMEOUT_S seconds (the cooperative stop of process_supervisor.py).
+        - If a connection is lost, its target attempts to reconnect indefinitely (every RECONNECT_DELAY_S),
+          discarding the commands queued while disconnected.
     """
-    
-    
+
+
     def handle_sigterm(signum, frame) -> None:
         """
         Handle the SIGTERM signal by printing an informational message and exiting the program.
@@ -49,38 +489,43 @@ def send_command_to_server(gesture_recognizer_to_socket_queue : "multiprocessing
         """
         print("[INFO] received SIGTERM. Closing connection and exiting...")
         sys.exit(0)
-    
-    
+
+
+    def update_running() -> None:
+        """Publishes whether at least one target is connected."""
+        server_is_running.value = any(sender.connected for sender in senders)
+
+
+    targets = SERVER_TARGETS if targets is None else targets
     # Print server connection details
-    print(f"[INFO] Server IP: {SERVER_IP}, Port: {SERVER_PORT}")
-    # Create a signal handler for SIGTERM to gracefully close the connection
+    print(f"[INFO] Servers: {', '.join(f'{host}:{port}' for host, port in targets)}")
+    # Create a signal handler for SIGTERM to gracefully close the connections
     signal.signal(signal.SIGTERM, handle_sigterm)
-    s = None # Initialize socket to None to avoid UnboundLocalError in case of exception before connection
-    while True:
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.connect((SERVER_IP, SERVER_PORT))
-                print("[INFO] Connected to server successfully.")
-                # Set the server_is_running flag to True to signal that the server is running to flask_client.py
-                server_is_running.value = True
-                while True:
-                    # Wait for a command from the queue
-                    command = gesture_recognizer_to_socket_queue.get()
-                    if command is None:
-                        print("[INFO] Popped argument is None: received, exiting...")
-                        return
-                    print(f"[INFO] Sending command to server: {command}")
-                    s.sendall(command.encode())
-        except SystemExit:
-            # Handle SystemExit to gracefully exit the process
-            if s is not None:
-                try:
-                    s.shutdown(socket.SHUT_RDWR) # Not needed, but can be used to close the socket gracefully
-                except Exception:
-                    pass
-            raise # Pass the SystemExit exception to exit the process
-        except (BrokenPipeError, ConnectionResetError) as e:
-            print(f"[ERROR] Lost connection to server: {e}")
-            server_is_running.value = False
-        except Exception as e:
-            print(f"[ERROR] Connection to server failed: {e}")
\ No newline at end of file
+    senders = [TargetSender(host, port, index, target_stats, update_running) for index, (host, port) in enumerate(targets)]
+    for sender in senders:
+        sender.start()
+    try:
+        while True:
+            command = gesture_recognizer_to_socket_queue.get()
+            if command is None:
+                print("[INFO] Popped argument is None: received, exiting...")
+                # The commands queued before the None were submitted: send them before closing the connections
+                deadline = time.monotonic() + DRAIN_TIMEOUT_S
+                for sender in senders:
+                    sender.flush(max(0.0, deadline - time.monotonic()))
+                return
+            # The frame is encoded once for all the targets
+            try:
+                frame = command_frame(command)
+            except ValueError as e:
+                # E.g., a command ID of a newer client: skip it rather than lose the connections
+                print(f"[ERROR] {e}: skipped.")
+                continue
+            name = COMMAND_REGISTRY[command] if isinstance(command, int) else command
+            for sender in senders:
+                sender.submit(frame, name)
+    finally:
+        # Also on SystemExit (SIGTERM): close the connections gracefully, all the targets within DRAIN_TIMEOUT_S seconds
+        deadline = time.monotonic() + DRAIN_TIMEOUT_S
+        for sender in senders:
+            sender.stop(timeout=max(0.0, deadline - time.monotonic()))
@@ -1,3 +1,10 @@
-from src.gesture_recognizer.gesture_recognizer import start_gesture_recognition
-
+# The gesture recognizer imports MediaPipe and OpenCV, which take more than a second to load:
+# it is imported on first access, so importing a light submodule (e.g., worker) does not load them.
 __all__ = ["start_gesture_recognition"]
+
+
+def __getattr__(name):
+    if name == "start_gesture_recognition":
+        from src.gesture_recognizer.gesture_recognizer import start_gesture_recognition
+        return start_gesture_recognition
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,256 @@
+# client/src/gesture_recognizer/autotune.py
+# -*- coding: utf-8 -*-
+"""
+This module contains the auto-tune command of the recognizer profile.
+It runs the gesture recognizer over a recorded clip with every combination of the given settings
+(model, delegate, number of hands, confidence threshold, capture resolution and frame rate, OpenCV threads)
+on the local CPU, and saves the cheapest profile that meets a target accuracy and latency.
+
+- The capture resolution is simulated by resizing the frames of the clip, and the capture frame rate
+  by skipping frames, so one clip (recorded at the highest resolution and frame rate of interest) covers every combination.
+- Accuracy is the fraction of processed frames whose recognized gesture (of the first hand, or "no hand")
+  is the same as with the reference profile (the most expensive combination: full clip resolution and frame rate,
+  first model and delegate, most hands, lowest threshold).
+- Latency is the 95th percentile of the processing time of a frame plus the capture frame interval
+  (the time a gesture waits for the next frame).
+- The cost of a profile is the fraction of a CPU core it keeps busy: mean processing time times the frame rate.
+
+Usage (from the client directory, with PYTHONPATH=.):
+    python -m src.gesture_recognizer.autotune clip.mp4 --resolutions 320x240 640x480 --fps 15 30 --target-accuracy 0.95
+"""
+
+import argparse
+import itertools
+import json
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+from mediapipe.tasks.python import vision
+
+from src.gesture_recognizer.batch_recognition import DEFAULT_FPS
+from src.gesture_recognizer.recognizer_profile import DEFAULT_PROFILE, PROFILE_PATH, recognizer_options, save_profile, validate_profile
+
+# Gesture recorded for a frame without hands
+NO_HAND = "<no hand>"
+
+# Default targets
+DEFAULT_TARGET_ACCURACY = 0.95
+DEFAULT_TARGET_LATENCY_MS = 100.0
+
+
+def read_clip(video_path: str, max_frames: int = None) -> tuple:
+    """
+    Reads the frames of a clip into memory, so decoding is not measured.
+    Args:
+        video_path (str): Path of the video file.
+        max_frames (int): Maximum number of frames to read (None for all).
+    Returns:
+        tuple: (list of BGR frames, frame rate of the clip).
+    Raises:
+        ValueError: If the video file cannot be opened or has no frames.
+    """
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            raise ValueError(f"Cannot open video file: {video_path}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+        frames = []
+        while max_frames is None or len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+    finally:
+        cap.release()
+    if not frames:
+        raise ValueError(f"No frames in video file: {video_path}")
+    return frames, fps
+
+
+def run_profile(profile: dict, frames: list, clip_fps: float) -> dict:
+    """
+    Runs the recognizer with a profile over the frames of a clip (VIDEO running mode).
+    Args:
+        profile (dict): The profile to measure.
+        frames (list): BGR frames of the clip.
+        clip_fps (float): Frame rate of the clip.
+    Returns:
+        dict: "gestures" (frame index -> recognized gesture, for the processed frames)
+            and "times_ms" (processing time of every processed frame: resize, color conversion and recognition).
+    """
+    cv2.setNumThreads(profile["cv_threads"] if profile["cv_threads"] else -1)
+    # Process one frame every `step` to simulate the capture frame rate
+    step = max(int(round(clip_fps / profile["capture_fps"])), 1)
+    height, width = frames[0].shape[:2]
+    resize = (profile["capture_width"], profile["capture_height"]) != (width, height)
+    gestures, times_ms = {}, []
+    with vision.GestureRecognizer.create_from_options(recognizer_options(profile, vision.RunningMode.VIDEO)) as recognizer:
+        for frame_index in range(0, len(frames), step):
+            start = time.perf_counter()
+            frame = frames[frame_index]
+            if resize:
+                frame = cv2.resize(frame, (profile["capture_width"], profile["capture_height"]), interpolation=cv2.INTER_AREA)
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+            result = recognizer.recognize_for_video(mp_image, int(frame_index * 1000 / clip_fps))
+            times_ms.append((time.perf_counter() - start) * 1000)
+            if result.gestures and result.gestures[0]:
+                gestures[frame_index] = result.gestures[0][0].category_name
+            else:
+                gestures[frame_index] = NO_HAND
+    return {"gestures": gestures, "times_ms": times_ms}
+
+
+def candidate_profiles(base: dict, args) -> list:
+    """
+    Builds every combination of the settings to sweep.
+    Args:
+        base (dict): Profile providing the settings that are not swept.
+        args: Parsed command line arguments (models, delegates, num_hands, confidence, resolutions, fps, threads).
+    Returns:
+        list: The candidate profiles (validated).
+    """
+    candidates = []
+    for model, delegate, num_hands, confidence, resolution, fps, threads in itertools.product(
+            args.models or [base["model"]], args.delegates, args.num_hands, args.confidence, args.resolutions, args.fps, args.threads):
+        width, height = resolution
+        candidates.append(validate_profile(dict(
+            base, model=model, delegate=delegate, num_hands=num_hands,
+            min_detection_confidence=confidence, min_presence_confidence=confidence, min_tracking_confidence=confidence,
+            capture_width=width, capture_height=height, capture_fps=fps, cv_threads=threads,
+        )))
+    return candidates
+
+
+def measure(profile: dict, run: dict, reference: dict) -> dict:
+    """
+    Computes the metrics of a profile run with respect to the reference run.
+    Args:
+        profile (dict): The measured profile.
+        run (dict): The run of the profile (see `run_profile`).
+        reference (dict): The run of the reference profile.
+    Returns:
+        dict: "accuracy", "latency_ms", "mean_ms" and "cpu_cores" (see the module docstring).
+    """
+    times = np.array(run["times_ms"])
+    matches = sum(reference["gestures"].get(index) == gesture for index, gesture in run["gestures"].items())
+    mean_ms = float(times.mean())
+    return {
+        "accuracy": matches / len(run["gestures"]),
+        "latency_ms": float(np.percentile(times, 95)) + 1000.0 / profile["capture_fps"],
+        "mean_ms": mean_ms,
+        "cpu_cores": mean_ms * profile["capture_fps"] / 1000.0,
+    }
+
+
+def autotune(frames: list, clip_fps: float, candidates: list, target_accuracy: float, target_latency_ms: float) -> tuple:
+    """
+    Measures every candidate profile and picks the cheapest one meeting the targets.
+    Args:
+        frames (list): BGR frames of the clip.
+        clip_fps (float): Frame rate of the clip.
+        candidates (list): Candidate profiles.
+        target_accuracy (float): Minimum accuracy.
+        target_latency_ms (float): Maximum latency in milliseconds.
+    Returns:
+        tuple: (best profile or None if no candidate meets the targets, list of (profile, metrics) for every candidate).
+    """
+    height, width = frames[0].shape[:2]
+    # Reference: the most expensive settings, at the resolution and frame rate of the clip
+    reference_profile = dict(
+        candidates[0],
+        num_hands=max(profile["num_hands"] for profile in candidates),
+        min_detection_confidence=min(profile["min_detection_confidence"] for profile in candidates),
+        min_presence_confidence=min(profile["min_presence_confidence"] for profile in candidates),
+        min_tracking_confidence=min(profile["min_tracking_confidence"] for profile in candidates),
+        capture_width=width, capture_height=height, capture_fps=int(round(clip_fps)),
+    )
+    print(f"[INFO] Reference profile: {reference_profile}")
+    reference = run_profile(reference_profile, frames, clip_fps)
+
+    results = []
+    for index, profile in enumerate(candidates, start=1):
+        # Warm-up run (model loading and caches), then the measured run
+        run_profile(profile, frames[:min(len(frames), 10)], clip_fps)
+        metrics = measure(profile, run_profile(profile, frames, clip_fps), reference)
+        results.append((profile, metrics))
+        print(f"[INFO] {index}/{len(candidates)} {describe(profile)}: accuracy {metrics['accuracy']:.3f}, "
+              f"latency {metrics['latency_ms']:.1f} ms, {metrics['cpu_cores']:.2f} CPU cores")
+
+    eligible = [(profile, metrics) for profile, metrics in results
+                if metrics["accuracy"] >= target_accuracy and metrics["latency_ms"] <= target_latency_ms]
+    if not eligible:
+        return None, results
+    best = min(eligible, key=lambda item: (item[1]["cpu_cores"], item[1]["latency_ms"]))
+    return best[0], results
+
+
+def describe(profile: dict) -> str:
+    """Returns a short description of the swept settings of a profile."""
+    return (f"{profile['model']} {profile['delegate']} hands={profile['num_hands']} conf={profile['min_detection_confidence']} "
+            f"{profile['capture_width']}x{profile['capture_height']}@{profile['capture_fps']} threads={profile['cv_threads']}")
+
+
+def parse_resolution(value: str) -> tuple:
+    """Parses a WIDTHxHEIGHT resolution (argparse type)."""
+    try:
+        width, height = value.lower().split("x")
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid resolution {value!r} (expected WIDTHxHEIGHT)")
+
+
+def main(argv: list = None) -> None:
+    """
+    Command line entry point of the auto-tune command.
+    Args:
+        argv (list): Command line arguments (defaults to sys.argv[1:]).
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Find the cheapest recognizer profile meeting a target accuracy and latency.")
+    parser.add_argument("clip", help="Recorded clip of hand gestures (at the highest resolution and frame rate to consider).")
+    parser.add_argument("--models", nargs="+", help="Model files to try (default: the model of the default profile).")
+    parser.add_argument("--delegates", nargs="+", choices=("cpu", "gpu"), default=["cpu"], help="Delegates to try.")
+    parser.add_argument("--num-hands", nargs="+", type=int, default=[1, 2], help="Numbers of hands to try.")
+    parser.add_argument("--confidence", nargs="+", type=float, default=[0.5], help="Confidence thresholds to try.")
+    parser.add_argument("--resolutions", nargs="+", type=parse_resolution, default=[(320, 240), (640, 480)],
+                        help="Capture resolutions to try (WIDTHxHEIGHT).")
+    parser.add_argument("--fps", nargs="+", type=int, default=[15, 30], help="Capture frame rates to try.")
+    parser.add_argument("--threads", nargs="+", type=int, default=[0], help="OpenCV threads to try (0: OpenCV default).")
+    parser.add_argument("--max-frames", type=int, default=None, help="Only use the first frames of the clip.")
+    parser.add_argument("--target-accuracy", type=float, default=DEFAULT_TARGET_ACCURACY, help="Minimum accuracy (0-1).")
+    parser.add_argument("--target-latency-ms", type=float, default=DEFAULT_TARGET_LATENCY_MS, help="Maximum latency in milliseconds.")
+    parser.add_argument("--output", default=PROFILE_PATH, help="Where the chosen profile is saved.")
+    parser.add_argument("--json-output", help="Also write the metrics of every candidate to this JSON file.")
+    parser.add_argument("--dry-run", action="store_true", help="Do not save the chosen profile.")
+    args = parser.parse_args(argv)
+
+    frames, clip_fps = read_clip(args.clip, args.max_frames)
+    height, width = frames[0].shape[:2]
+    # Upscaling or repeating frames would not simulate a real capture
+    args.resolutions = [resolution for resolution in args.resolutions if resolution[0] <= width and resolution[1] <= height]
+    args.fps = [fps for fps in args.fps if fps <= round(clip_fps)]
+    candidates = candidate_profiles(DEFAULT_PROFILE, args)
+    if not candidates:
+        print(f"[ERROR] No candidate fits the clip ({width}x{height} at {clip_fps:.1f} fps).")
+        return
+    print(f"[INFO] {len(frames)} frames ({width}x{height} at {clip_fps:.1f} fps), {len(candidates)} candidate profiles")
+
+    best, results = autotune(frames, clip_fps, candidates, args.target_accuracy, args.target_latency_ms)
+    if args.json_output:
+        with open(args.json_output, "w") as f:
+            json.dump([{"profile": profile, "metrics": metrics} for profile, metrics in results], f, indent=2)
+    if best is None:
+        print(f"[ERROR] No profile reaches accuracy {args.target_accuracy} with latency <= {args.target_latency_ms} ms.")
+        return
+    print(f"[INFO] Chosen profile: {describe(best)}")
+    if not args.dry_run:
+        save_profile(best, args.output)
+        print(f"[INFO] Profile saved to {args.output} (used the next time the recognizer starts)")
+
+
+if __name__ == "__main__":
+    main()
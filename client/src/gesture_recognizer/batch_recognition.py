@@ -0,0 +1,294 @@
+## batch_recognition.py
+# -*- coding: utf-8 -*-
+"""
+This module contains the batch (offline) entry point of the gesture recognizer.
+It runs the MediaPipe gesture recognizer in VIDEO running mode over recorded video files,
+splitting them in segments processed in parallel by a pool of worker processes,
+and writes a per-frame timeline (gesture, score, handedness and landmarks) for every video.
+
+Timelines are written as compressed NumPy archives (.npz) with one array per column,
+so they can be loaded column by column in a notebook without replaying the footage.
+
+Usage (from the client directory, with PYTHONPATH=.):
+    python -m src.gesture_recognizer.batch_recognition recordings/*.mp4 --output-dir timelines
+"""
+
+import argparse
+import concurrent.futures
+import multiprocessing
+import os
+
+import cv2
+import mediapipe as mp
+import numpy as np
+from mediapipe.tasks import python
+from mediapipe.tasks.python import vision
+
+from client_constants import GESTURES
+from src.gesture_recognizer.gesture_recognizer import MODEL_PATH
+
+# Gesture codes stored in the "gesture" column: the index in this tuple.
+# "None" is the category returned by the model when a hand does not make any known gesture.
+GESTURE_VOCABULARY = ("None",) + GESTURES
+# Code stored in the "gesture" column when a frame contains no hands
+NO_HAND = -1
+
+# Codes stored in the "handedness" column
+HANDEDNESS_VOCABULARY = ("Left", "Right")
+
+# Number of landmarks returned for each hand
+NUM_LANDMARKS = 21
+
+# Default frames per second, used when the container does not report it
+DEFAULT_FPS = 30.0
+
+# Columns of a timeline, in the order they are written.
+# Every row is a (frame, hand) pair: frames without hands have one row with hand = -1.
+TIMELINE_COLUMNS = ("frame", "timestamp_ms", "hand", "handedness", "gesture", "score", "landmarks")
+
+
+def get_video_info(video_path: str) -> tuple:
+    """
+    Reads the number of frames and the frame rate of a video file.
+    Args:
+        video_path (str): Path of the video file.
+    Returns:
+        tuple: (frame_count, fps). frame_count is 0 or negative if the container does not report it.
+    Raises:
+        ValueError: If the video file cannot be opened.
+    """
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            raise ValueError(f"Cannot open video file: {video_path}")
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+        return frame_count, fps
+    finally:
+        cap.release()
+
+
+def plan_segments(frame_count: int, fps: float, segment_seconds: float) -> list:
+    """
+    Splits a video in segments of `segment_seconds` seconds.
+    The last segment runs to the end of the video (the frame count of many containers is an estimate),
+    and a video whose frame count is unknown is decoded sequentially in a single segment.
+    Args:
+        frame_count (int): Number of frames reported by the container (0 or negative if unknown).
+        fps (float): Frame rate of the video.
+        segment_seconds (float): Length of the segments in seconds.
+    Returns:
+        list: (start_frame, end_frame) of every segment, where end_frame is None for the segment that runs to the end.
+    """
+    if frame_count <= 0:
+        return [(0, None)]
+    segment_frames = max(1, int(segment_seconds * fps))
+    starts = list(range(0, frame_count, segment_frames))
+    return [(start, next_start) for start, next_start in zip(starts, starts[1:])] + [(starts[-1], None)]
+
+
+def timeline_names(video_paths: list) -> list:
+    """
+    Returns the name of the timeline of every video: its path relative to the common directory of all the videos,
+    without the extension (with it, if two videos differ only by their extension).
+    Videos with the same file name in different directories get different timelines.
+    Args:
+        video_paths (list): Paths of the video files.
+    Returns:
+        list: Relative names, in the same order as `video_paths` (e.g., "day1/cam" for recordings/day1/cam.mp4).
+    """
+    if not video_paths:
+        return []
+    paths = [os.path.abspath(video_path) for video_path in video_paths]
+    base = os.path.commonpath([os.path.dirname(path) for path in paths])
+    names = [os.path.splitext(os.path.relpath(path, base))[0] for path in paths]
+    return [os.path.relpath(path, base) if names.count(name) > 1 else name for path, name in zip(paths, names)]
+
+
+def recognize_segment(video_path: str, start_frame: int, end_frame: "int | None", fps: float, num_hands: int = 2) -> dict:
+    """
+    Runs the gesture recognizer in VIDEO running mode over the frames [start_frame, end_frame) of a video.
+    This function is executed in the worker processes, so every call creates its own recognizer.
+    The frames before `start_frame` are skipped with grab() (decoded but not converted) rather than with a
+    CAP_PROP_POS_FRAMES seek, which lands on the nearest keyframe with many codecs.
+    Args:
+        video_path (str): Path of the video file.
+        start_frame (int): Index of the first frame to process.
+        end_frame (int | None): Index of the first frame not to process, None to process until the end of the video.
+        fps (float): Frame rate of the video, used to compute the frame timestamps.
+        num_hands (int): Maximum number of hands to recognize in each frame.
+    Returns:
+        dict: The timeline columns of the segment (see `TIMELINE_COLUMNS`), as NumPy arrays.
+    """
+    frames, timestamps, hands, handedness, gestures, scores, landmarks = [], [], [], [], [], [], []
+    gesture_codes = {name: code for code, name in enumerate(GESTURE_VOCABULARY)}
+    empty_landmarks = np.full((NUM_LANDMARKS, 3), np.nan, dtype=np.float32)
+
+    options = vision.GestureRecognizerOptions(
+        base_options=python.BaseOptions(model_asset_path=MODEL_PATH),
+        running_mode=vision.RunningMode.VIDEO,
+        num_hands=num_hands
+    )
+    cap = cv2.VideoCapture(video_path)
+    try:
+        for _ in range(start_frame):
+            if not cap.grab():
+                break
+        with vision.GestureRecognizer.create_from_options(options) as recognizer:
+            frame_index = start_frame - 1
+            while end_frame is None or frame_index + 1 < end_frame:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frame_index += 1
+                # Timestamps are computed from the frame index, so they are strictly increasing
+                # as required by the VIDEO running mode.
+                timestamp_ms = int(frame_index * 1000 / fps)
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+                result = recognizer.recognize_for_video(mp_image, timestamp_ms)
+
+                # A frame without hands still gets a row, so that the timeline has no holes
+                if not result.hand_landmarks:
+                    frames.append(frame_index)
+                    timestamps.append(timestamp_ms)
+                    hands.append(-1)
+                    handedness.append(-1)
+                    gestures.append(NO_HAND)
+                    scores.append(0.0)
+                    landmarks.append(empty_landmarks)
+                    continue
+
+                for hand_index, hand_landmarks in enumerate(result.hand_landmarks):
+                    # The first category is the one with the highest score
+                    top_gesture = result.gestures[hand_index][0] if result.gestures[hand_index] else None
+                    top_handedness = result.handedness[hand_index][0] if result.handedness[hand_index] else None
+                    frames.append(frame_index)
+                    timestamps.append(timestamp_ms)
+                    hands.append(hand_index)
+                    handedness.append(HANDEDNESS_VOCABULARY.index(top_handedness.category_name)
+                                      if top_handedness and top_handedness.category_name in HANDEDNESS_VOCABULARY else -1)
+                    gestures.append(gesture_codes.get(top_gesture.category_name, 0) if top_gesture else 0)
+                    scores.append(top_gesture.score if top_gesture else 0.0)
+                    landmarks.append(np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks], dtype=np.float32))
+    finally:
+        cap.release()
+
+    return {
+        "frame": np.array(frames, dtype=np.int32),
+        "timestamp_ms": np.array(timestamps, dtype=np.int64),
+        "hand": np.array(hands, dtype=np.int8),
+        "handedness": np.array(handedness, dtype=np.int8),
+        "gesture": np.array(gestures, dtype=np.int16),
+        "score": np.array(scores, dtype=np.float32),
+        "landmarks": np.array(landmarks, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3),
+    }
+
+
+def write_timeline(output_path: str, segments: list, video_path: str, fps: float) -> None:
+    """
+    Concatenates the segments of a video and writes the resulting timeline to a .npz file.
+    Args:
+        output_path (str): Path of the .npz file to write.
+        segments (list): Timeline columns of each segment (as returned by `recognize_segment`), in frame order.
+        video_path (str): Path of the source video, stored in the timeline for reference.
+        fps (float): Frame rate of the source video.
+    Returns:
+        None
+    """
+    columns = {column: np.concatenate([segment[column] for segment in segments]) for column in TIMELINE_COLUMNS}
+    np.savez_compressed(
+        output_path,
+        gesture_vocabulary=np.array(GESTURE_VOCABULARY),
+        handedness_vocabulary=np.array(HANDEDNESS_VOCABULARY),
+        source=np.array(os.path.abspath(video_path)),
+        fps=np.array(fps),
+        **columns
+    )
+
+
+def load_timeline(path: str) -> dict:
+    """
+    Loads a timeline written by `run_batch`.
+    Args:
+        path (str): Path of the .npz file.
+    Returns:
+        dict: The timeline columns as NumPy arrays, plus the "gesture_vocabulary", "handedness_vocabulary", "source" and "fps" entries.
+    """
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+
+def run_batch(video_paths: list, output_dir: str, workers: int = None, segment_seconds: float = 120.0, num_hands: int = 2) -> list:
+    """
+    Recognizes gestures in one or many recorded videos and writes a timeline for each of them.
+    Every video is split in segments of `segment_seconds` seconds, and all the segments of all the videos
+    are processed in parallel by a pool of worker processes, so a single long recording also uses all the cores.
+    Args:
+        video_paths (list): Paths of the video files.
+        output_dir (str): Directory where the timelines are written, as <name>.timeline.npz where the name
+            is the path of the video relative to the common directory of the videos (see `timeline_names`).
+        workers (int): Number of worker processes. Defaults to the number of CPUs.
+        segment_seconds (float): Length of the segments in seconds. Hand tracking restarts at every segment boundary.
+        num_hands (int): Maximum number of hands to recognize in each frame.
+    Returns:
+        list: Paths of the written timelines, in the same order as `video_paths` (skipped videos excluded).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    # Split every video in segments
+    jobs = []
+    for video_path, name in zip(video_paths, timeline_names(video_paths)):
+        try:
+            frame_count, fps = get_video_info(video_path)
+        except ValueError as e:
+            print(f"[ERROR] {e}, skipping.")
+            continue
+        segments = plan_segments(frame_count, fps, segment_seconds)
+        jobs.append((video_path, name, fps, segments))
+        if frame_count <= 0:
+            print(f"[INFO] {video_path}: frame count unknown, decoding it sequentially in one segment at {fps:.2f} FPS")
+        else:
+            print(f"[INFO] {video_path}: {frame_count} frames at {fps:.2f} FPS, {len(segments)} segment(s)")
+
+    output_paths = []
+    # Use 'spawn' like the rest of the client, so that workers do not inherit MediaPipe state
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [
+            [executor.submit(recognize_segment, video_path, start, end, fps, num_hands) for start, end in segments]
+            for video_path, _, fps, segments in jobs
+        ]
+        for (video_path, name, fps, _), video_futures in zip(jobs, futures):
+            segments = [future.result() for future in video_futures]
+            if not any(len(segment["frame"]) for segment in segments):
+                print(f"[INFO] {video_path} has no frames, skipping.")
+                continue
+            output_path = os.path.join(output_dir, name + ".timeline.npz")
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            write_timeline(output_path, segments, video_path, fps)
+            output_paths.append(output_path)
+            print(f"[INFO] Timeline written to {output_path}")
+    return output_paths
+
+
+def main(argv: list = None) -> None:
+    """
+    Command line entry point of the batch recognizer.
+    Args:
+        argv (list): Command line arguments (defaults to sys.argv[1:]).
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Recognize gestures in recorded videos and write per-frame timelines.")
+    parser.add_argument("videos", nargs="+", help="Video files to process.")
+    parser.add_argument("--output-dir", default="timelines", help="Directory where the timelines are written.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: number of CPUs).")
+    parser.add_argument("--segment-seconds", type=float, default=120.0, help="Length of the segments processed in parallel.")
+    parser.add_argument("--num-hands", type=int, default=2, help="Maximum number of hands to recognize in each frame.")
+    args = parser.parse_args(argv)
+    run_batch(args.videos, args.output_dir, args.workers, args.segment_seconds, args.num_hands)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+## camera_grabber.py
+# -*- coding: utf-8 -*-
+"""
+This module contains the LatestFrameGrabber class, which reads frames from a video capture device
+on a dedicated thread and always keeps only the newest decoded frame.
+Decoupling the capture from the inference loop prevents V4L2 from serving stale buffered frames
+when inference is slower than the camera, and moves reconnection logic out of the recognition loop.
+"""
+
+import threading
+import time as tm
+
+
+class LatestFrameGrabber:
+    """
+    Continuously grabs frames from a capture device on a background thread and exposes
+    the newest one through a single "latest frame" slot.
+
+    Every decoded frame gets an increasing sequence number. Consumers call `read` with the
+    sequence number of the last frame they processed, so they never process the same frame twice
+    and they always get the freshest available image (older frames are simply overwritten).
+
+    If the device stops delivering frames (read failures or a stall longer than `stall_timeout_s`),
+    the capture is released and reopened with an exponential backoff, instead of retrying with a fixed sleep.
+    """
+
+    def __init__(self, open_capture: "callable", stall_timeout_s: float = 2.0,
+                 max_read_failures: int = 10, reconnect_delay_s: float = 0.25,
+                 max_reconnect_delay_s: float = 4.0) -> None:
+        """
+        Initializes the grabber without opening the device.
+        Args:
+            open_capture (callable): A function with no arguments that opens and configures the capture device
+                and returns it (e.g., a configured cv2.VideoCapture).
+            stall_timeout_s (float): Seconds without a decoded frame after which the device is considered stalled and is reopened.
+            max_read_failures (int): Number of consecutive failed reads after which the device is reopened.
+            reconnect_delay_s (float): Initial delay between reconnection attempts.
+            max_reconnect_delay_s (float): Maximum delay between reconnection attempts (the delay doubles after every failed attempt).
+        Returns:
+            None
+        """
+        self._open_capture = open_capture
+        self._stall_timeout_s = stall_timeout_s
+        self._max_read_failures = max_read_failures
+        self._reconnect_delay_s = reconnect_delay_s
+        self._max_reconnect_delay_s = max_reconnect_delay_s
+
+        # Latest frame slot, protected by a condition variable to wake up waiting readers
+        self._condition = threading.Condition()
+        self._frame = None
+        self._seq = 0
+
+        self._cap = None
+        self._stop_event = threading.Event()
+        self._thread = None
+        # Set when the device has been opened at least once (used by wait_until_opened)
+        self._opened_event = threading.Event()
+        # Number of times the device has been reopened after a stall or a failure
+        self.reconnections = 0
+
+    def start(self) -> "LatestFrameGrabber":
+        """
+        Starts the grabber thread.
+        Args:
+            None
+        Returns:
+            LatestFrameGrabber: The grabber itself, to allow chaining.
+        """
+        self._thread = threading.Thread(target=self._run, name="LatestFrameGrabber", daemon=True)
+        self._thread.start()
+        return self
+
+    def wait_until_opened(self, timeout: float) -> bool:
+        """
+        Waits until the capture device has been opened for the first time.
+        Args:
+            timeout (float): Maximum number of seconds to wait.
+        Returns:
+            bool: True if the device has been opened, False if the timeout expired.
+        """
+        return self._opened_event.wait(timeout)
+
+    def read(self, last_seq: int, timeout: float = 1.0) -> tuple:
+        """
+        Returns the newest frame, waiting until a frame newer than `last_seq` is available.
+        Args:
+            last_seq (int): Sequence number of the last frame processed by the caller (0 if none).
+            timeout (float): Maximum number of seconds to wait for a new frame.
+        Returns:
+            tuple: (seq, frame). If no new frame arrived before the timeout, frame is None and seq is `last_seq`.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._seq != last_seq or self._stop_event.is_set(), timeout):
+                return last_seq, None
+            if self._seq == last_seq:
+                return last_seq, None
+            return self._seq, self._frame
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """
+        Stops the grabber thread and releases the capture device.
+        The device is only used by the grabber thread: if the thread is still inside a read after `timeout`,
+        it releases the device itself once the read returns, so two threads never use the capture at the same time.
+        Args:
+            timeout (float): Maximum number of seconds to wait for the thread to finish.
+        Returns:
+            None
+        """
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        if self._thread is not None and self._thread.is_alive():
+            # Blocked in the driver: the thread releases the device in its finally block
+            print("[INFO] Webcam busy: it will be released when the current read returns.")
+            return
+        # The thread never started, or it finished (the device is already released then)
+        self._release()
+
+    def _release(self) -> None:
+        """Releases the capture device if it is open."""
+        cap, self._cap = self._cap, None
+        if cap is not None and cap.isOpened():
+            cap.release()
+            print("[INFO] Webcam released.")
+
+    def _reopen(self, delay: float = 0.0) -> bool:
+        """
+        Opens (or reopens) the capture device, retrying with an exponential backoff until it succeeds
+        or the grabber is stopped.
+        Args:
+            delay (float): Seconds to wait before the first attempt (0 to open immediately).
+        Returns:
+            bool: True if the device is open, False if the grabber has been stopped.
+        """
+        self._release()
+        # Wait on the stop event, so that stop() interrupts the backoff immediately
+        if delay > 0 and self._stop_event.wait(delay):
+            return False
+        delay = max(delay, self._reconnect_delay_s)
+        while not self._stop_event.is_set():
+            self._release()
+            try:
+                self._cap = self._open_capture()
+            except Exception as e:
+                print(f"[ERROR] Failed to open webcam: {e}")
+                self._cap = None
+            if self._cap is not None and self._cap.isOpened():
+                self._opened_event.set()
+                return True
+            print(f"[INFO] Webcam is not opened. Retrying in {delay:.2f} s...")
+            self._stop_event.wait(delay)
+            delay = min(delay * 2, self._max_reconnect_delay_s)
+        return False
+
+    def _run(self) -> None:
+        """
+        Grabber thread body: reads frames as fast as the device delivers them and stores the newest one.
+        """
+        try:
+            if not self._reopen():
+                return
+            failures = 0
+            last_frame_time = tm.monotonic()
+            # Delay before the next reconnection. It grows while reopened devices keep failing
+            # and goes back to zero as soon as a frame is decoded.
+            backoff = 0.0
+            while not self._stop_event.is_set():
+                ret, frame = self._cap.read()
+                now = tm.monotonic()
+                if ret:
+                    failures = 0
+                    backoff = 0.0
+                    last_frame_time = now
+                    with self._condition:
+                        self._frame = frame
+                        self._seq += 1
+                        self._condition.notify_all()
+                    continue
+                failures += 1
+                # The device stopped delivering frames: reopen it instead of spinning on read()
+                if failures >= self._max_read_failures or now - last_frame_time > self._stall_timeout_s:
+                    print("[INFO] Webcam stalled. Reconnecting...")
+                    self.reconnections += 1
+                    if not self._reopen(backoff):
+                        return
+                    backoff = min(max(backoff * 2, self._reconnect_delay_s), self._max_reconnect_delay_s)
+                    failures = 0
+                    last_frame_time = tm.monotonic()
+        finally:
+            self._release()
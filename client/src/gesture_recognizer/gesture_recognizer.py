@@ -16,34 +16,87 @@ import time as tm
 import multiprocessing
 import signal
 import sys
+from queue import Empty
 from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
-from send_command_to_server import send_command_to_server
-from client_constants import COMMANDS
+from gesture_bindings import BINDING_CONTINUOUS, BINDING_DISCRETE, GestureBindings
+from control_channel import ControlSender
+from event_log import (EVENT_LOG_DIR, EventLog, OUTCOME_CONTINUOUS, OUTCOME_NO_CONFIG, OUTCOME_NO_HAND, OUTCOME_NOT_SENT,
+                       OUTCOME_SENT, OUTCOME_UNMAPPED)
+from src.gesture_recognizer.camera_grabber import LatestFrameGrabber
+from src.gesture_recognizer.landmark_classifier import SHARED_LANDMARKS_SIZE, TemplateIndex, landmarks_to_array
+from src.gesture_recognizer.recognizer_profile import DEFAULT_PROFILE, model_path, recognizer_options
 
-def make_sigterm_handler(cap) -> "callable":
+# Path of the default MediaPipe gesture recognizer model
+MODEL_PATH = model_path(DEFAULT_PROFILE)
+
+def open_webcam(profile: dict = DEFAULT_PROFILE) -> "cv2.VideoCapture":
+    """
+    Opens the webcam and configures the video format, resolution and frame rate of a recognizer profile.
+    This function is passed to LatestFrameGrabber, which calls it again every time the webcam has to be reopened.
+    Args:
+        profile (dict): The recognizer profile (see recognizer_profile.py).
+    Returns:
+        cv2.VideoCapture: The configured capture device (check isOpened() to know if it is usable).
+    """
+    # Select a webcam to capture video from.
+    cap = cv2.VideoCapture(0, cv2.CAP_V4L2)
+    # Set the video codec, frame width, height and frame rate.
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, profile["capture_width"])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, profile["capture_height"])
+    cap.set(cv2.CAP_PROP_FPS, profile["capture_fps"])
+    # Keep the driver queue as short as possible: the grabber thread already keeps only the newest frame.
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+def make_sigterm_handler(grabber: LatestFrameGrabber) -> "callable":
     """
-    Creates a SIGTERM signal handler that safely releases a video capture device and closes OpenCV windows.
+    Creates a SIGTERM signal handler that safely stops the frame grabber (releasing the video capture device) and closes OpenCV windows.
     This function is useful for ensuring that resources are cleaned up properly when the program receives a termination signal.
     A termination signal (SIGTERM) is sent by flask_client.py when the user wants to stop recognizing gestures.
     Args:
-        cap: An object representing the video capture device (e.g., cv2.VideoCapture).
+        grabber (LatestFrameGrabber): The grabber that owns the video capture device.
     Returns:
-        callable: A signal handler function that can be registered to handle SIGTERM signals. When invoked, it releases the video capture device if open, destroys all OpenCV windows, and exits the program.
+        callable: A signal handler function that can be registered to handle SIGTERM signals. When invoked, it stops the grabber, destroys all OpenCV windows, and exits the program.
     Note:
         The returned handler function expects to be called with the standard signal handler arguments (signum, frame).
     """
     
     def handle_sigterm(signum, frame):
         print("[INFO] received SIGTERM.")
-        if cap.isOpened():
-            cap.release()
-            print("[INFO] Webcam released.")
+        grabber.stop()
         cv2.destroyAllWindows()
         sys.exit(0)
     return handle_sigterm
 
-def start_gesture_recognition(gesture_to_command: dict, webcam_queue: "multiprocessing.Queue", client_to_server_queue: "multiprocessing.Queue", last_gesture: "multiprocessing.Array") -> None:
+def landmark_preview(result: "GestureRecognizerResult", gestures: list, width: int, height: int) -> dict:
+    """
+    Builds the message of the "landmarks" preview: the landmarks and the gesture of every detected hand,
+    a few hundred bytes that the web interface draws on a canvas instead of receiving the whole frame.
+    Args:
+        result (GestureRecognizerResult): The result of the recognizer.
+        gestures (list): Gesture of every detected hand (custom gestures included), or None for the hands without one.
+        width (int): Width of the recognized frame.
+        height (int): Height of the recognized frame.
+    Returns:
+        dict: {"width", "height", "hands": [{"gesture", "score", "handedness", "points": [x0, y0, x1, y1, ...]}]},
+            where the points are normalized to [0, 1] and rounded to 3 decimals (sub-pixel on a 640x480 canvas).
+    """
+    hands = []
+    for hand_index, landmarks in enumerate(result.hand_landmarks):
+        classifications = result.gestures[hand_index] if hand_index < len(result.gestures) else []
+        handedness = result.handedness[hand_index] if hand_index < len(result.handedness) else []
+        points = np.round(np.array([(landmark.x, landmark.y) for landmark in landmarks]), 3)
+        hands.append({
+            "gesture": gestures[hand_index] if hand_index < len(gestures) else None,
+            "score": round(classifications[0].score, 2) if classifications else 0.0,
+            "handedness": handedness[0].category_name if handedness else None,
+            "points": points.ravel().tolist(),
+        })
+    return {"width": width, "height": height, "hands": hands}
+
+def start_gesture_recognition(gesture_to_command: dict, webcam_queue: "multiprocessing.Queue", client_to_server_queue: "multiprocessing.Queue", last_gesture: "multiprocessing.Array", video_source: str = None, template_queue: "multiprocessing.Queue" = None, hand_landmarks: "multiprocessing.Array" = None, profile: dict = None, event_log_dir: str = EVENT_LOG_DIR, gesture_history: "GestureHistory" = None, stop_event: "multiprocessing.Event" = None) -> None:
     """
     Starts real-time gesture recognition using a webcam and sends associated commands to a server.
     This function initializes a MediaPipe gesture recognizer, captures video frames from the webcam,
@@ -52,9 +105,23 @@ def start_gesture_recognition(gesture_to_command: dict, webcam_queue: "multiproc
     `client_to_server_queue`. Captured frames are also placed into the `webcam_queue` for further use.
     Args:
         gesture_to_command (dict): A dictionary mapping gesture category names (str) to command strings. If None or empty, the gestures will be captured without sending commands to server
-        webcam_queue (multiprocessing.Queue): Queue to send captured webcam frames to the Flask client.
-        client_to_server_queue (multiprocessing.Queue): Queue to send recognized commands to the server.
+        webcam_queue (multiprocessing.Queue): Queue to send captured webcam frames (JPEG-encoded bytes) to the Flask client,
+            and with the "landmarks" preview of the profile, the landmark preview of every result (dict, see landmark_preview).
+        client_to_server_queue (multiprocessing.Queue): Queue to send recognized commands to the server (command IDs, strings for macro commands).
         last_gesture (multiprocessing.Array): Last gesture recognized. This array will be used to communicate that last gesture to flask_client.py.
+        video_source (str, optional): Path of a video file to use instead of the webcam (e.g., for benchmarks). The file is played in a loop.
+        template_queue (multiprocessing.Queue, optional): Queue where flask_client.py puts the templates of the custom gestures
+            (see ConfigStore.templates) every time they change. Hands matching a template are recognized as that custom gesture.
+        hand_landmarks (multiprocessing.Array, optional): Shared array where the landmarks of the first detected hand are published,
+            used by flask_client.py to record templates (see landmark_classifier.SHARED_LANDMARKS_SIZE).
+        profile (dict, optional): Recognizer profile (model, number of hands, thresholds, capture format, threads),
+            see recognizer_profile.py. Defaults to DEFAULT_PROFILE.
+        event_log_dir (str, optional): Directory of the event log where the recognized gestures and their outcome are recorded
+            (see event_log.py). None to disable the event log.
+        gesture_history (GestureHistory, optional): Shared ring where the changes of the gesture of every hand and the commands sent
+            are recorded for the web interface (see gesture_history.py).
+        stop_event (multiprocessing.Event, optional): Set by flask_client.py to stop the recognition: the loop ends
+            at the next frame and the webcam is released (see process_supervisor.py).
     Returns:
         None
     Raises:
@@ -62,15 +129,12 @@ def start_gesture_recognition(gesture_to_command: dict, webcam_queue: "multiproc
     Notes:
         - Requires a compatible MediaPipe gesture recognition model file in the same directory.
         - Uses OpenCV for webcam capture and MediaPipe for gesture recognition.
-        - The function runs an infinite loop until the user presses the 'q' key.
-        - Only every 10th recognitions, the result is processed to reduce command spamming.
+        - The function runs an infinite loop until the user presses the 'q' key or `stop_event` is set.
+        - Commands are only sent for every 10th result, to reduce command spamming (every result is recorded in the event log).
         - Prints information and debug messages to the console.
     """
 
 
-    # Prepare the MediaPipe model path
-    model_path = os.path.join(os.path.dirname(__file__), "gesture_recognizer.task")
-    
     # Initialize MediaPipe tasks and options
     BaseOptions = mp.tasks.BaseOptions
     GestureRecognizer = mp.tasks.vision.GestureRecognizer
@@ -79,10 +143,19 @@ def start_gesture_recognition(gesture_to_command: dict, webcam_queue: "multiproc
     VisionRunningMode = mp.tasks.vision.RunningMode
 
     print("[INFO] gesture_to_command: {}".format(gesture_to_command))
+    profile = DEFAULT_PROFILE if profile is None else profile
+    print("[INFO] Recognizer profile: {}".format(profile))
+    if profile["cv_threads"]:
+        cv2.setNumThreads(profile["cv_threads"])
     
-    # Separate Mediapipe hands for drawing landmarks on frame
+    # With the "landmarks" preview the browser draws the landmarks of the recognizer results,
+    # so frames are neither drawn on nor encoded, except one camera image every preview_image_interval frames
+    landmark_preview_mode = profile["preview"] == "landmarks"
+    # Separate Mediapipe hands for drawing landmarks on frame (only if the profile draws them on the MJPEG preview)
     mp_hands = mp.solutions.hands
-    hands_draw = mp_hands.Hands(static_image_mode=False, max_num_hands=2)
+    hands_draw = mp_hands.Hands(static_image_mode=False, max_num_hands=profile["num_hands"],
+                                min_detection_confidence=profile["min_detection_confidence"],
+                                min_tracking_confidence=profile["min_tracking_confidence"]) if profile["draw_landmarks"] and not landmark_preview_mode else None
     mp_draw = mp.solutions.drawing_utils
     
     # Shared state for visualization (not needed due to AJAX)
@@ -92,21 +165,82 @@ def start_gesture_recognition(gesture_to_command: dict, webcam_queue: "multiproc
     # When the number of recognized gestures is a multiple of 10, the command is sent to the server.
     counter = 0
 
+    # The mapping compiled into tables indexed by gesture ID: a recognized gesture is resolved with one lookup of its ID
+    bindings = GestureBindings(gesture_to_command)
+    # Sender of the continuous-control updates (only created if a gesture is bound to a continuous command)
+    control_sender = ControlSender() if bindings.has_continuous() else None
+
+    # Nearest-neighbour index of the custom gesture templates (replaced when flask_client.py sends new templates)
+    template_index = TemplateIndex()
+
+    # History of the recognized gestures and of their outcome, written by a background thread
+    event_log = EventLog(event_log_dir).start() if event_log_dir is not None else None
+
+    # (gesture, command) of every hand in the previous result and in the current one (-1 for no hand),
+    # so the history records what changed rather than every result
+    previous_events = {}
+    current_events = {}
+
+    def record_event(gesture: "str | None", command: "str | None", outcome: int, score: float = 0.0,
+                     hand: int = -1, handedness: "str | None" = None) -> None:
+        """
+        Records a recognition event in the event log and in the recent-gesture history (the ones enabled).
+        Every event goes to the event log; the history gets the events that change the gesture (or command) of a hand
+        since the previous result, and the commands sent.
+        Args:
+            gesture (str | None): The recognized gesture (None if no hand was detected).
+            command (str | None): The command bound to the gesture (None if there is none).
+            outcome (int): What was done with the gesture (OUTCOME_*).
+            score (float): Score of the gesture.
+            hand (int): Index of the hand in the frame.
+            handedness (str | None): "Left" or "Right".
+        Returns:
+            None
+        """
+        if event_log is not None:
+            event_log.log(gesture, command, outcome, score, hand, handedness)
+        if gesture_history is not None:
+            if outcome == OUTCOME_SENT or previous_events.get(hand) != (gesture, command):
+                gesture_history.append(gesture, outcome, score, hand, handedness, command)
+            current_events[hand] = (gesture, command)
+
+    def update_templates() -> None:
+        """
+        Rebuilds the template index if flask_client.py sent new templates (only the most recent ones are used).
+        Args:
+            None
+        Returns:
+            None
+        """
+        nonlocal template_index
+        templates = None
+        try:
+            while True:
+                templates = template_queue.get_nowait()
+        except Empty:
+            pass
+        if templates is not None:
+            template_index = TemplateIndex.from_templates(templates)
+            print(f"[INFO] Loaded {len(template_index)} custom gesture templates.")
+
     def get_result(result: GestureRecognizerResult, output_image: mp.Image, timestamp_ms: int) -> None:
         """
         Processes the gesture recognition result, sending recognized gesture commands to the server at specified intervals.
         Args:
             result (GestureRecognizerResult): The result object containing recognized gestures.
-            output_image (mp.Image): The output image associated with the recognition (unused in this function. Required by the MediaPipe callback signature).
+            output_image (mp.Image): The output image associated with the recognition (only its size is used, to convert the landmarks).
             timestamp_ms (int): The timestamp in milliseconds when the result was produced (unused in this function. Required by the MediaPipe callback signature).
         Side Effects:
             - Increments a nonlocal counter to control the frequency of command sending.
             - Sends recognized gesture commands to the server via `client_to_server_queue` every 10th call.
+            - Streams continuous-control updates to the server (UDP) on every call, for the hands showing a gesture bound to a continuous command.
+            - Records every result (each recognized gesture and what was done with it) in the event log,
+              and the changes of gesture and the commands sent in the gesture history.
             - Prints information about sent commands or lack of recognized gestures.
         Returns:
             None
         Notes:
-            - Only gestures with a mapped command in `COMMANDS` are sent.
+            - Only gestures bound to a command in `COMMANDS` (sent as its command ID) or to a macro command (MACRO_PREFIX) are sent.
             - If no gestures are recognized, an informational message is printed.
         """
         def save_last_gesture(recognized_gesture) -> None:
@@ -128,78 +262,123 @@ def start_gesture_recognition(gesture_to_command: dict, webcam_queue: "multiproc
             for i in range(len(recognized_gesture), len(last_gesture)):
                 last_gesture[i] = b'\x00'
                 
+        # Landmarks of the detected hands, with x and y in the same unit
+        aspect_ratio = output_image.width / output_image.height
+        hands = [landmarks_to_array(landmarks, aspect_ratio) for landmarks in result.hand_landmarks]
+        left_handed = [bool(handedness) and handedness[0].category_name == "Left" for handedness in result.handedness]
+        # Publish the first hand on every result, so that templates are always recorded from a fresh detection
+        if hand_landmarks is not None and hands:
+            with hand_landmarks.get_lock():
+                hand_landmarks[:SHARED_LANDMARKS_SIZE] = hands[0].ravel().tolist() + [float(left_handed[0]), tm.time()]
+        # Custom gesture of every detected hand (None if the hand matches no template)
+        custom_gestures = [template_index.classify_hand(hand, left)[0] if len(template_index) else None
+                           for hand, left in zip(hands, left_handed)]
+
+        # The landmark preview is streamed on every result, with the gesture shown by every hand
+        if landmark_preview_mode:
+            preview_gestures = [custom or (result.gestures[hand_index][0].category_name
+                                           if hand_index < len(result.gestures) and result.gestures[hand_index] else None)
+                                for hand_index, custom in enumerate(custom_gestures)]
+            webcam_queue.put(landmark_preview(result, preview_gestures, output_image.width, output_image.height))
+
+        # Continuous controls are streamed on every result (not every 10th),
+        # while a hand shows a gesture bound to a continuous command
+        if control_sender is not None:
+            for hand_index, gesture_list in enumerate(result.gestures):
+                if gesture_list and hand_index < len(hands):
+                    gesture_id = bindings.gesture_ids[custom_gestures[hand_index] or gesture_list[0].category_name]
+                    if bindings.kinds[gesture_id] == BINDING_CONTINUOUS:
+                        control_sender.send_hand(bindings.items[gesture_id], hands[hand_index], aspect_ratio)
+
         nonlocal counter
         counter += 1
-        if counter % 10 != 0:
-            return
+        # Commands are sent for one result in 10, the events are logged for every result
+        send = counter % 10 == 0
+        if send and template_queue is not None:
+            update_templates()
         # Print all recognized category_names:
-        for gesture_list in result.gestures:
+        for hand_index, gesture_list in enumerate(result.gestures):
+            # A hand matching a custom gesture template is recognized as that gesture
+            custom_gesture = custom_gestures[hand_index] if hand_index < len(custom_gestures) else None
+            handedness = result.handedness[hand_index][0].category_name if hand_index < len(result.handedness) and result.handedness[hand_index] else None
             for classification in gesture_list:
                 if classification.category_name is not None:
                     # Extract the recognized gesture
-                    recognized_gesture = classification.category_name
-                    save_last_gesture(recognized_gesture)
-                    if gesture_to_command is None or not gesture_to_command:
-                        print("[INFO] gesture_to_command is empty. Sending recognized gesture to flask_client.py...")
+                    recognized_gesture = custom_gesture or classification.category_name
+                    score = 0.0 if custom_gesture else classification.score
+                    if send:
+                        save_last_gesture(recognized_gesture)
+                    if not bindings:
+                        if send:
+                            print("[INFO] gesture_to_command is empty. Sending recognized gesture to flask_client.py...")
+                        record_event(recognized_gesture, None, OUTCOME_NO_CONFIG, score, hand_index, handedness)
                         continue
-                    if gesture_to_command.get(recognized_gesture) is None:
-                        print(f"[INFO] Gesture '{recognized_gesture}' not mapped to any command.")
-                        continue
-                    # Send the recognized gesture to the flask client:
-                    # save_last_gesture(recognized_gesture)
-                    # Send the associated command to the send_command_to_server.py module:
-                    command = gesture_to_command.get(recognized_gesture)
-                    if command in COMMANDS:
-                        print(f"[INFO] Sending associated command: {command}")
-                        client_to_server_queue.put(command)
+                    # Looked up by name: MediaPipe gives no index for the gesture categories (see gesture_bindings.py)
+                    gesture_id = bindings.gesture_ids[recognized_gesture]
+                    kind = bindings.kinds[gesture_id]
+                    if kind == BINDING_DISCRETE:
+                        if not send:
+                            record_event(recognized_gesture, bindings.command_names[gesture_id], OUTCOME_NOT_SENT, score, hand_index, handedness)
+                            continue
+                        # Send the associated command to the send_command_to_server.py module:
+                        # its command ID (macro commands, which have no ID, are sent as strings and parsed by the server)
+                        print(f"[INFO] Sending associated command: {bindings.command_names[gesture_id]}")
+                        client_to_server_queue.put(bindings.items[gesture_id])
+                        record_event(recognized_gesture, bindings.command_names[gesture_id], OUTCOME_SENT, score, hand_index, handedness)
+                    elif kind == BINDING_CONTINUOUS:
+                        record_event(recognized_gesture, bindings.command_names[gesture_id], OUTCOME_CONTINUOUS, score, hand_index, handedness)
+                    else:
+                        if send:
+                            print(f"[INFO] Gesture '{recognized_gesture}' not mapped to any command.")
+                        record_event(recognized_gesture, None, OUTCOME_UNMAPPED, score, hand_index, handedness)
         # If there are no gestures recognized, print a message:
         if not result.gestures:
-            save_last_gesture("None")
-            print("[INFO] No gesture recognized (gesture_recognizer.py)")
+            if send:
+                save_last_gesture("None")
+                print("[INFO] No gesture recognized (gesture_recognizer.py)")
+            record_event(None, None, OUTCOME_NO_HAND)
+        # The hands of this result are compared with the next one (hands that left the frame are forgotten)
+        previous_events.clear()
+        previous_events.update(current_events)
+        current_events.clear()
 
     # Create the GestureRecognizerOptions with the model path and result callback.
     # The result callback is called every time a gesture is recognized.
     # The running mode is set to LIVE_STREAM to process frames from the webcam.
-    # The number of hands is set to 2 to recognize gestures from both hands.
-    # The model asset path is set to the path of the gesture recognizer model file.
-    options = GestureRecognizerOptions(
-        base_options=BaseOptions(model_asset_path=model_path),
-        running_mode=VisionRunningMode.LIVE_STREAM,
-        result_callback=get_result,
-        num_hands=2
-    )
+    # The model, the number of hands and the confidence thresholds are taken from the profile.
+    options = recognizer_options(profile, VisionRunningMode.LIVE_STREAM, get_result)
     
     
 
     with GestureRecognizer.create_from_options(options) as recognizer:
-        # Select a webcam to capture video from.
-        cap = cv2.VideoCapture(0, cv2.CAP_V4L2)
+        # Grab frames on a dedicated thread, so that a slow inference never delays the next grab
+        # and the loop below always works on the freshest image.
+        grabber = LatestFrameGrabber((lambda: open_webcam(profile)) if video_source is None else lambda: cv2.VideoCapture(video_source))
         # Register the SIGTERM signal handler to release the webcam and close OpenCV windows.
-        signal.signal(signal.SIGTERM, make_sigterm_handler(cap))
-        # Set the video codec, frame width, and height.
-        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        # cap.set(cv2.CAP_PROPFPS, 30)
+        signal.signal(signal.SIGTERM, make_sigterm_handler(grabber))
+        grabber.start()
 
-        if not cap.isOpened():
+        if not grabber.wait_until_opened(timeout=5.0):
             print("[INFO] Webcam is not opened. Please check your webcam connection.")
+            grabber.stop()
             return
 
         print("[INFO] Webcam opened correctly!")
 
+        # Sequence number of the last processed frame, and number of processed frames (for the preview images)
+        frame_seq = 0
+        frame_count = 0
         try:
-            while True:
+            while stop_event is None or not stop_event.is_set():
                 # Record start time for FPS
                 # start_time = tm.time()
                 
-                # Read a frame from the webcam.
-                ret, frame = cap.read()
-                # If the frame is not read correctly, print an error message and continue.
-                if not ret:
-                    # Wait for a short time before trying to read the frame again.
-                    tm.sleep(0.1)
+                # Wait for a frame newer than the last processed one.
+                # The grabber handles stalls and reconnections, so if no frame arrives we just wait again.
+                frame_seq, frame = grabber.read(frame_seq, timeout=1.0)
+                if frame is None:
                     continue
+                frame_count += 1
                 
                 # Put the frame into the webcam queue.
                 # webcam_queue.put(frame.copy())
@@ -230,8 +409,8 @@ def start_gesture_recognition(gesture_to_command: dict, webcam_queue: "multiproc
                 #            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
 
                 # Draw hand landmarks for visualization
-                draw_results = hands_draw.process(rgb_frame)
-                if draw_results.multi_hand_landmarks:
+                draw_results = hands_draw.process(rgb_frame) if hands_draw is not None else None
+                if draw_results is not None and draw_results.multi_hand_landmarks:
                     for hand_landmarks in draw_results.multi_hand_landmarks:
                         mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
                 
@@ -261,16 +440,28 @@ def start_gesture_recognition(gesture_to_command: dict, webcam_queue: "multiproc
                 #     # print(f"Font fallback due to: {e}")
                 
                 
-                 # Send processed frame (with overlays) to queue for web interface
-                webcam_queue.put(frame.copy())  # now includes gesture text, landmarks, and FPS
+                 # Send processed frame (with overlays) to queue for web interface.
+                # The frame is sent JPEG-encoded: it is much smaller to transfer than the raw image,
+                # and the Flask process does not need OpenCV to stream it.
+                # With the "landmarks" preview, only one frame every preview_image_interval is encoded (none if 0).
+                image_interval = profile["preview_image_interval"]
+                if not landmark_preview_mode or (image_interval and (frame_count - 1) % image_interval == 0):
+                    ret, jpeg = cv2.imencode(".jpg", frame)
+                    if ret:
+                        webcam_queue.put(jpeg.tobytes())  # now includes gesture text, landmarks, and FPS
 
                 
                 # Break the loop and release the webcam if the user presses the 'q' key.
                 if cv2.waitKey(1) & 0xFF == ord('q'):
                     break
         finally:
-            # Release the webcam and close all OpenCV windows.
-            cap.release()
+            # Stop the grabber (releasing the webcam) and close all OpenCV windows.
+            grabber.stop()
+            # The frames not read yet are not worth waiting for: exit without flushing them to the webcam queue
+            webcam_queue.cancel_join_thread()
+            # Write the buffered events
+            if event_log is not None:
+                event_log.close()
             # Wait for a short time to ensure the webcam is released properly.
             tm.sleep(0.1)
             cv2.destroyAllWindows()
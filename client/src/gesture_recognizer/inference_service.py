@@ -0,0 +1,508 @@
+# client/src/gesture_recognizer/inference_service.py
+# -*- coding: utf-8 -*-
+"""
+This module contains the inference service of the browser-capture mode.
+In this mode the client machines do not run the recognizer: a browser page (templates/capture.html) captures the webcam,
+downscales the frames and posts them as JPEG images to the Flask client, and one InferenceService recognizes the frames
+of all the sessions, so a single powerful host can serve a room of laptops.
+
+The service holds a pool of worker processes, started once and kept warm (MediaPipe loaded, model read,
+a spare recognizer ready for the next session). Every session is assigned to one worker (session affinity)
+for its whole life, because the recognizer of a session runs in VIDEO mode and needs its own strictly increasing
+timestamp stream. A worker wakes up for all the frames queued since its last pass and recognizes only the newest frame
+of every session (older frames of the same session are stale), so a worker multiplexes many sessions without falling behind.
+Results go back to the Flask process, which maps the gestures of every session with the session's own mapping
+and sends the commands to the server like the webcam recognizer does (every COMMAND_INTERVAL results).
+Unlike the webcam recognizer, the workers do not match the custom gesture templates: only the built-in gestures are recognized.
+
+This module only imports MediaPipe and OpenCV inside the worker processes, so the Flask process can import it cheaply.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+
+from gesture_bindings import BINDING_DISCRETE, GestureBindings
+from src.gesture_recognizer.recognizer_profile import DEFAULT_PROFILE, model_path, recognizer_options
+
+# Number of worker processes (CAPTURE_WORKERS environment variable): every worker is a MediaPipe process,
+# so the default is small; raise it on a host that serves many sessions
+CAPTURE_WORKERS = int(os.environ.get("CAPTURE_WORKERS", "0")) or 2
+# Format asked to the browsers: frames are downscaled before they are sent, the recognizer does not need more
+CAPTURE_WIDTH = 320
+CAPTURE_HEIGHT = 240
+CAPTURE_FPS = 10
+CAPTURE_JPEG_QUALITY = 0.7
+# Maximum size of a posted frame, in bytes
+MAX_FRAME_BYTES = 512 * 1024
+# Maximum number of sessions of a worker (every session keeps its own recognizer in the worker)
+MAX_SESSIONS_PER_WORKER = 16
+# Frames waiting in the queue of a worker: when it is full, new frames are dropped (the browser sends a newer one soon)
+WORKER_QUEUE_SIZE = 64
+# A session without frames for this long is closed (the browser tab was closed)
+SESSION_TIMEOUT_S = 10.0
+# A worker releases by itself the recognizer of a session without frames for this many session timeouts,
+# in case the close request of the session never reached it
+WORKER_IDLE_FACTOR = 2
+# Commands are sent every COMMAND_INTERVAL results of a session, like the webcam recognizer (see gesture_recognizer.py)
+COMMAND_INTERVAL = 10
+# Number of latencies kept per session for the statistics
+LATENCY_WINDOW = 256
+
+# Messages of the request queues (Flask process -> worker): (kind, session, payload), or None to stop the worker
+REQUEST_FRAME = "frame"  # payload: (seq, timestamp_ms, jpeg, time.monotonic() when submitted)
+REQUEST_CLOSE = "close"  # payload: None
+# Messages of the result queue (worker -> Flask process): (kind, worker or session, payload)
+RESULT_READY = "ready"    # (RESULT_READY, worker, None)
+RESULT_ERROR = "error"    # (RESULT_ERROR, worker, message): the worker could not start and exited
+RESULT_FRAME = "result"   # (RESULT_FRAME, session, {"seq", "gestures", "submitted", "skipped", "error"})
+
+
+def inference_worker(worker: int, requests: "multiprocessing.Queue", results: "multiprocessing.Queue", profile: dict,
+                     idle_timeout: float = SESSION_TIMEOUT_S * WORKER_IDLE_FACTOR) -> None:
+    """
+    Body of a worker process: recognizes the frames of the sessions assigned to it.
+    Args:
+        worker (int): Index of the worker.
+        requests (multiprocessing.Queue): Requests of the worker (see REQUEST_FRAME and REQUEST_CLOSE).
+        results (multiprocessing.Queue): Queue shared by the workers, where the results are sent.
+        profile (dict): Recognizer profile (see recognizer_profile.py). Capture settings are ignored.
+        idle_timeout (float): Time without frames after which the recognizer of a session is released, in seconds.
+    Returns:
+        None
+    """
+    import cv2
+    import mediapipe as mp
+    import numpy as np
+    from mediapipe.tasks.python import vision
+
+    if profile["cv_threads"]:
+        cv2.setNumThreads(profile["cv_threads"])
+    try:
+        # The model is read once: the recognizers of the sessions are created from memory
+        with open(model_path(profile), "rb") as f:
+            model = f.read()
+        options = recognizer_options(profile, vision.RunningMode.VIDEO, model_buffer=model)
+        spare = vision.GestureRecognizer.create_from_options(options)
+    except Exception as e:
+        results.put((RESULT_ERROR, worker, f"{type(e).__name__}: {e}"))
+        return
+    results.put((RESULT_READY, worker, None))
+
+    # session -> recognizer of the session, and time of the last frame of the session
+    recognizers = {}
+    last_frame = {}
+    stopping = False
+    try:
+        while not stopping:
+            # Take all the requests queued since the last pass (waking up regularly to release the idle sessions)
+            try:
+                batch = [requests.get(timeout=idle_timeout)]
+            except queue.Empty:
+                batch = []
+            try:
+                while True:
+                    batch.append(requests.get_nowait())
+            except queue.Empty:
+                pass
+            # Newest frame of every session, and number of older frames skipped
+            latest = {}
+            skipped = {}
+            for request in batch:
+                if request is None:
+                    stopping = True
+                    continue
+                kind, session, payload = request
+                if kind == REQUEST_CLOSE:
+                    latest.pop(session, None)
+                    last_frame.pop(session, None)
+                    recognizer = recognizers.pop(session, None)
+                    if recognizer is not None:
+                        recognizer.close()
+                    continue
+                if session in latest:
+                    skipped[session] = skipped.get(session, 0) + 1
+                latest[session] = payload
+                last_frame[session] = time.monotonic()
+            for session, (seq, timestamp_ms, jpeg, submitted) in latest.items():
+                recognizer = recognizers.get(session)
+                if recognizer is None:
+                    # A new session takes the warm spare recognizer
+                    recognizer = recognizers[session] = spare if spare is not None else vision.GestureRecognizer.create_from_options(options)
+                    spare = None
+                frame = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if frame is None:
+                    results.put((RESULT_FRAME, session, {"seq": seq, "gestures": [], "submitted": submitted,
+                                                         "skipped": skipped.get(session, 0), "error": "invalid image"}))
+                    continue
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                result = recognizer.recognize_for_video(mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame), timestamp_ms)
+                # (gesture, score, handedness) of every hand, with the category with the highest score
+                gestures = []
+                for hand_index, gesture_list in enumerate(result.gestures):
+                    if not gesture_list:
+                        continue
+                    handedness = result.handedness[hand_index][0].category_name if hand_index < len(result.handedness) and result.handedness[hand_index] else None
+                    gestures.append((gesture_list[0].category_name, float(gesture_list[0].score), handedness))
+                results.put((RESULT_FRAME, session, {"seq": seq, "gestures": gestures, "submitted": submitted,
+                                                     "skipped": skipped.get(session, 0), "error": None}))
+            # Sessions whose close request was lost: the service gave up on them long ago
+            now = time.monotonic()
+            for session in [session for session, seen in last_frame.items() if now - seen > idle_timeout]:
+                del last_frame[session]
+                recognizer = recognizers.pop(session, None)
+                if recognizer is not None:
+                    recognizer.close()
+            # Keep a recognizer ready for the next session, created while the worker is idle
+            if spare is None and not stopping:
+                spare = vision.GestureRecognizer.create_from_options(options)
+    finally:
+        for recognizer in recognizers.values():
+            recognizer.close()
+        if spare is not None:
+            spare.close()
+
+
+class CaptureSession:
+    """State of a browser-capture session in the Flask process."""
+
+    def __init__(self, session_id: str, worker: int, mapping: dict) -> None:
+        """
+        Initializes a session.
+        Args:
+            session_id (str): Identifier of the session.
+            worker (int): Index of the worker the session is assigned to.
+            mapping (dict): Gesture -> command mapping of the session.
+        Returns:
+            None
+        """
+        self.id = session_id
+        self.worker = worker
+        self.mapping = mapping
+        # The mapping compiled into tables indexed by gesture ID (see gesture_bindings.py)
+        self.bindings = GestureBindings(mapping)
+        self.seq = 0
+        self.last_timestamp_ms = -1
+        self.last_seen = time.monotonic()
+        # Counters
+        self.frames = 0
+        self.results = 0
+        self.dropped = 0
+        self.commands = 0
+        # Last result, returned to the browser: {"seq", "gesture", "score", "command"}
+        self.last_result = None
+        # Submit-to-result latencies, in seconds
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+
+class InferenceService:
+    """
+    Pool of warm recognizer workers shared by the browser-capture sessions.
+
+    The Flask routes call `open_session`, `submit_frame` (which never blocks), `latest` and `close_session`;
+    a reader thread receives the results of the workers, sends the commands and closes the idle sessions.
+    """
+
+    def __init__(self, workers: int = CAPTURE_WORKERS, profile: dict = None, command_queue: "multiprocessing.Queue" = None,
+                 session_timeout: float = SESSION_TIMEOUT_S) -> None:
+        """
+        Initializes the service (call `start` to start the workers).
+        Args:
+            workers (int): Number of worker processes.
+            profile (dict): Recognizer profile (defaults to DEFAULT_PROFILE).
+            command_queue (multiprocessing.Queue): Queue of the commands for the server (see send_command_to_server), or None.
+            session_timeout (float): Time without frames after which a session is closed, in seconds.
+        Returns:
+            None
+        """
+        self.workers = workers
+        self.profile = DEFAULT_PROFILE if profile is None else profile
+        self.command_queue = command_queue
+        self.session_timeout = session_timeout
+        self._lock = threading.Lock()
+        # session id -> CaptureSession
+        self._sessions = {}
+        self._processes = []
+        self._requests = []
+        # (worker, session id) of the close requests that did not fit in the queue of their worker, retried by the reader thread
+        self._pending_closes = []
+        self._results = None
+        # Worker -> "starting", "ready" or the error that stopped it
+        self._worker_state = {}
+        self._worker_frames = [0] * workers
+        self._started = None
+        self._stop_event = threading.Event()
+        self._reader = None
+
+    def start(self) -> "InferenceService":
+        """
+        Starts the worker processes and the reader thread.
+        Args:
+            None
+        Returns:
+            InferenceService: The service itself.
+        """
+        context = multiprocessing.get_context("spawn")
+        self._results = context.Queue()
+        for worker in range(self.workers):
+            requests = context.Queue(maxsize=WORKER_QUEUE_SIZE)
+            process = context.Process(target=inference_worker, args=(worker, requests, self._results, self.profile,
+                                                                      self.session_timeout * WORKER_IDLE_FACTOR),
+                                      name=f"inference worker {worker}", daemon=True)
+            process.start()
+            self._requests.append(requests)
+            self._processes.append(process)
+            self._worker_state[worker] = "starting"
+        self._started = time.monotonic()
+        self._reader = threading.Thread(target=self._read_results, name="InferenceService", daemon=True)
+        self._reader.start()
+        print(f"[INFO] Inference service started with {self.workers} workers.")
+        return self
+
+    def wait_until_ready(self, timeout: float = None) -> bool:
+        """
+        Waits until every worker is ready or stopped.
+        Args:
+            timeout (float): Maximum time to wait, in seconds.
+        Returns:
+            bool: True if at least one worker is ready.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while any(state == "starting" for state in self._worker_state.values()):
+            if deadline is not None and time.monotonic() > deadline:
+                break
+            time.sleep(0.05)
+        return any(state == "ready" for state in self._worker_state.values())
+
+    @property
+    def error(self) -> "str | None":
+        """The error of the workers if none of them could start, otherwise None."""
+        states = list(self._worker_state.values())
+        if states and all(state not in ("starting", "ready") for state in states):
+            return states[0]
+        return None
+
+    def open_session(self, mapping: dict) -> "str | None":
+        """
+        Opens a session, assigned to the usable worker with the fewest sessions.
+        Args:
+            mapping (dict): Gesture -> command mapping of the session.
+        Returns:
+            str | None: The identifier of the session, or None if every worker is full or stopped.
+        """
+        with self._lock:
+            load = {worker: 0 for worker, state in self._worker_state.items() if state in ("starting", "ready")}
+            for session in self._sessions.values():
+                if session.worker in load:
+                    load[session.worker] += 1
+            candidates = [worker for worker, count in load.items() if count < MAX_SESSIONS_PER_WORKER]
+            if not candidates:
+                return None
+            worker = min(candidates, key=lambda w: load[w])
+            session = CaptureSession(uuid.uuid4().hex, worker, dict(mapping or {}))
+            self._sessions[session.id] = session
+        print(f"[INFO] Capture session {session.id} opened on worker {worker}.")
+        return session.id
+
+    def submit_frame(self, session_id: str, jpeg: bytes, timestamp_ms: float = None) -> bool:
+        """
+        Queues a frame of a session for its worker (never blocks).
+        Args:
+            session_id (str): Identifier of the session.
+            jpeg (bytes): The JPEG-encoded frame.
+            timestamp_ms (float): Capture time of the frame in the browser, in milliseconds (None to use the arrival time).
+        Returns:
+            bool: True if the frame was queued, False if it was dropped (queue of the worker full).
+        Raises:
+            KeyError: If the session does not exist.
+        """
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions[session_id]
+            session.last_seen = now
+            session.frames += 1
+            # The VIDEO running mode needs strictly increasing timestamps: browser clocks are only trusted to go forward
+            timestamp = int(now * 1000 if timestamp_ms is None else timestamp_ms)
+            timestamp = max(timestamp, session.last_timestamp_ms + 1)
+            session.last_timestamp_ms = timestamp
+            session.seq += 1
+            seq = session.seq
+            worker = session.worker
+        try:
+            self._requests[worker].put_nowait((REQUEST_FRAME, session_id, (seq, timestamp, jpeg, now)))
+            return True
+        except queue.Full:
+            with self._lock:
+                session.dropped += 1
+            return False
+
+    def latest(self, session_id: str) -> "dict | None":
+        """
+        Returns the last result of a session.
+        Args:
+            session_id (str): Identifier of the session.
+        Returns:
+            dict | None: {"seq", "gesture", "score", "command"}, or None if no frame was recognized yet.
+        Raises:
+            KeyError: If the session does not exist.
+        """
+        with self._lock:
+            return self._sessions[session_id].last_result
+
+    def close_session(self, session_id: str) -> bool:
+        """
+        Closes a session, releasing its recognizer in the worker (never blocks: if the queue of the worker is full,
+        the reader thread sends the close request later).
+        Args:
+            session_id (str): Identifier of the session.
+        Returns:
+            bool: True if the session existed.
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        self._send_close(session.worker, session_id)
+        print(f"[INFO] Capture session {session_id} closed.")
+        return True
+
+    def _send_close(self, worker: int, session_id: str) -> None:
+        """Sends the close request of a session to its worker, or keeps it for a retry if the queue of the worker is full."""
+        try:
+            self._requests[worker].put_nowait((REQUEST_CLOSE, session_id, None))
+        except queue.Full:
+            with self._lock:
+                self._pending_closes.append((worker, session_id))
+        except (ValueError, OSError):
+            # The service is stopping: the worker releases all its recognizers
+            pass
+
+    def _retry_closes(self) -> None:
+        """Sends again the close requests that did not fit in the queue of their worker."""
+        with self._lock:
+            pending, self._pending_closes = self._pending_closes, []
+        for worker, session_id in pending:
+            self._send_close(worker, session_id)
+
+    def stats(self) -> dict:
+        """
+        Returns the statistics of the service.
+        Args:
+            None
+        Returns:
+            dict: {"workers": [{"state", "sessions", "frames", "fps"}], "sessions": {id: {...}}}, where the frames of a worker
+                are the frames it recognized, and every session reports its frames, results, dropped frames, commands,
+                result rate and p50/p95 submit-to-result latency.
+        """
+        elapsed = max(time.monotonic() - (self._started or time.monotonic()), 1e-9)
+        with self._lock:
+            sessions = {}
+            for session in self._sessions.values():
+                latencies = sorted(session.latencies)
+                sessions[session.id] = {
+                    "worker": session.worker,
+                    "frames": session.frames,
+                    "results": session.results,
+                    "dropped": session.dropped,
+                    "commands": session.commands,
+                    "latency_p50_ms": round(latencies[len(latencies) // 2] * 1000, 2) if latencies else None,
+                    "latency_p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 2) if latencies else None,
+                }
+            workers = [
+                {"state": self._worker_state.get(worker), "sessions": sum(1 for s in self._sessions.values() if s.worker == worker),
+                 "frames": frames, "fps": round(frames / elapsed, 2)}
+                for worker, frames in enumerate(self._worker_frames)
+            ]
+        return {"workers": workers, "sessions": sessions}
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stops the workers and the reader thread.
+        Args:
+            timeout (float): Maximum time to wait for every worker, in seconds.
+        Returns:
+            None
+        """
+        self._stop_event.set()
+        for requests in self._requests:
+            try:
+                requests.put(None, timeout=1.0)
+            except (queue.Full, ValueError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        if self._reader is not None:
+            self._reader.join(timeout)
+        with self._lock:
+            self._sessions.clear()
+        print("[INFO] Inference service stopped.")
+
+    def _read_results(self) -> None:
+        """Body of the reader thread: handles the messages of the workers and closes the idle sessions."""
+        last_expiry = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                kind, key, payload = self._results.get(timeout=0.5)
+            except queue.Empty:
+                kind = None
+            except (OSError, ValueError, EOFError):
+                break
+            if kind == RESULT_FRAME:
+                self._on_result(key, payload)
+            elif kind == RESULT_READY:
+                self._worker_state[key] = "ready"
+            elif kind == RESULT_ERROR:
+                print(f"[ERROR] Inference worker {key} could not start: {payload}")
+                self._worker_state[key] = payload
+            # Worker processes that died without a message (e.g., killed)
+            for worker, process in enumerate(self._processes):
+                if self._worker_state[worker] in ("starting", "ready") and not process.is_alive() and not self._stop_event.is_set():
+                    self._worker_state[worker] = f"exited with code {process.exitcode}"
+            if time.monotonic() - last_expiry > 1.0:
+                last_expiry = time.monotonic()
+                self._retry_closes()
+                self._expire_sessions()
+
+    def _on_result(self, session_id: str, result: dict) -> None:
+        """Records the result of a frame and sends the commands of the session every COMMAND_INTERVAL results."""
+        commands = []
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                # Result of a session closed in the meantime
+                return
+            self._worker_frames[session.worker] += 1
+            session.results += 1
+            session.dropped += result["skipped"]
+            session.latencies.append(time.monotonic() - result["submitted"])
+            gesture, score = (result["gestures"][0][0], result["gestures"][0][1]) if result["gestures"] else (None, 0.0)
+            command = session.mapping.get(gesture) if gesture is not None else None
+            session.last_result = {"seq": result["seq"], "gesture": gesture, "score": round(score, 3), "command": command,
+                                   "error": result["error"]}
+            if session.results % COMMAND_INTERVAL == 0:
+                bindings = session.bindings
+                for name, _, _ in result["gestures"]:
+                    gesture_id = bindings.gesture_ids[name]
+                    if bindings.kinds[gesture_id] == BINDING_DISCRETE:
+                        # Command IDs (strings for macro commands), like the webcam recognizer
+                        commands.append((bindings.items[gesture_id], bindings.command_names[gesture_id]))
+                session.commands += len(commands)
+        if self.command_queue is not None:
+            for item, command in commands:
+                print(f"[INFO] Sending command of capture session {session_id}: {command}")
+                self.command_queue.put(item)
+
+    def _expire_sessions(self) -> None:
+        """Closes the sessions that did not send frames for `session_timeout` seconds."""
+        now = time.monotonic()
+        with self._lock:
+            idle = [session.id for session in self._sessions.values() if now - session.last_seen > self.session_timeout]
+        for session_id in idle:
+            print(f"[INFO] Capture session {session_id} idle for {self.session_timeout} s.")
+            self.close_session(session_id)
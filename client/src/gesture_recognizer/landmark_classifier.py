@@ -0,0 +1,155 @@
+# client/src/gesture_recognizer/landmark_classifier.py
+# -*- coding: utf-8 -*-
+"""
+This module contains a lightweight classifier of custom gestures, based on the 21 hand landmarks
+that MediaPipe already returns with every GestureRecognizerResult.
+Every custom gesture is defined by one or more templates (landmarks recorded by the user through the web interface).
+A hand is classified by nearest-neighbour matching against all the templates, stored in a single NumPy array,
+after normalizing the landmarks for position, scale, rotation and handedness.
+It only depends on NumPy, so it adds microseconds (not a model inference) to every recognized hand.
+"""
+
+import numpy as np
+
+# Number of hand landmarks returned by MediaPipe, and landmarks used for normalization
+NUM_LANDMARKS = 21
+WRIST = 0
+MIDDLE_FINGER_MCP = 9
+# Length of a normalized landmark vector
+VECTOR_SIZE = NUM_LANDMARKS * 3
+# Maximum distance (root mean square difference of the normalized coordinates) of a match
+DEFAULT_MAX_DISTANCE = 0.25
+
+# Layout of the shared array (multiprocessing.Array of c_double) where the gesture recognizer publishes
+# the landmarks of the first detected hand, read by flask_client.py to record templates:
+# the 63 landmark coordinates, then the handedness (1.0 for a left hand) and the time.time() of the detection.
+SHARED_LEFT_HANDED = VECTOR_SIZE
+SHARED_TIMESTAMP = VECTOR_SIZE + 1
+SHARED_LANDMARKS_SIZE = VECTOR_SIZE + 2
+
+
+def landmarks_to_array(hand_landmarks: list, aspect_ratio: float = 1.0) -> np.ndarray:
+    """
+    Converts the landmarks of a hand (e.g., an element of GestureRecognizerResult.hand_landmarks) into an array.
+    Args:
+        hand_landmarks (list): The 21 landmarks of a hand, objects with x, y, z attributes (x and y normalized by the image size).
+        aspect_ratio (float): Width / height of the image, used to make the x and y coordinates isotropic.
+    Returns:
+        np.ndarray: Array of shape (21, 3).
+    """
+    points = np.array([(landmark.x, landmark.y, landmark.z) for landmark in hand_landmarks], dtype=np.float32)
+    # x is normalized by the image width and y by the image height: rescale x so that both have the same unit
+    points[:, 0] *= aspect_ratio
+    return points
+
+
+def normalize_landmarks(landmarks: np.ndarray, left_handed=False) -> np.ndarray:
+    """
+    Normalizes hand landmarks for position, scale, rotation and handedness:
+    the wrist is moved to the origin, left hands are mirrored into right hands, and the hand is rotated and scaled
+    so that the wrist -> middle finger MCP segment has length 1 and points up in the image plane.
+    Args:
+        landmarks (np.ndarray): Landmarks of one hand (shape (21, 3)) or of many hands (shape (N, 21, 3)).
+        left_handed (bool or np.ndarray): Whether the hand (or every hand) is a left hand.
+    Returns:
+        np.ndarray: Normalized vectors of shape (63,) for one hand or (N, 63) for many hands.
+    """
+    points = np.asarray(landmarks, dtype=np.float32)
+    single = points.ndim == 2
+    points = points.reshape(-1, NUM_LANDMARKS, 3)
+    points = points - points[:, WRIST:WRIST + 1]
+    # -1 for left hands, which are mirrored (x -> -x)
+    mirror = np.where(left_handed, np.float32(-1.0), np.float32(1.0)) * np.ones(len(points), dtype=np.float32)
+
+    axis_x = points[:, MIDDLE_FINGER_MCP, 0] * mirror
+    axis_y = points[:, MIDDLE_FINGER_MCP, 1]
+    scale = np.hypot(axis_x, axis_y)
+    scale[scale == 0] = 1.0
+    ux, uy = axis_x / scale, axis_y / scale
+    # Mirroring, rotation and scaling are applied with a single 3x3 transform per hand.
+    # The rotation maps the unit vector (ux, uy) to (0, -1) (pointing up, since y grows downwards in the image).
+    transform = np.zeros((len(points), 3, 3), dtype=np.float32)
+    transform[:, 0, 0] = -uy * mirror / scale
+    transform[:, 0, 1] = ux / scale
+    transform[:, 1, 0] = -ux * mirror / scale
+    transform[:, 1, 1] = -uy / scale
+    transform[:, 2, 2] = 1.0 / scale
+    points = points @ transform.transpose(0, 2, 1)
+
+    vectors = points.reshape(-1, VECTOR_SIZE)
+    return vectors[0] if single else vectors
+
+
+class TemplateIndex:
+    """
+    Nearest-neighbour index of the gesture templates.
+
+    The normalized template vectors are stacked in a (N, 63) float32 array with their squared norms precomputed,
+    so classifying a hand is a single matrix-vector product.
+    """
+
+    def __init__(self, names: list = (), vectors: np.ndarray = None) -> None:
+        """
+        Initializes the index.
+        Args:
+            names (list): Gesture name of every template.
+            vectors (np.ndarray): Normalized template vectors, shape (N, 63) (see `normalize_landmarks`).
+        Returns:
+            None
+        """
+        self.names = list(names)
+        self.vectors = np.zeros((0, VECTOR_SIZE), dtype=np.float32) if vectors is None else np.asarray(vectors, dtype=np.float32)
+        if len(self.names) != len(self.vectors):
+            raise ValueError("names and vectors must have the same length")
+        self._squared_norms = np.einsum("ij,ij->i", self.vectors, self.vectors)
+
+    @classmethod
+    def from_templates(cls, templates: list) -> "TemplateIndex":
+        """
+        Builds the index from the templates saved in the configuration store.
+        Args:
+            templates (list): (name, landmarks, left_handed) tuples, where landmarks is a sequence of 63 floats
+                (see ConfigStore.templates).
+        Returns:
+            TemplateIndex: The index.
+        """
+        if not templates:
+            return cls()
+        names, landmarks, left_handed = zip(*templates)
+        points = np.array(landmarks, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+        return cls(names, normalize_landmarks(points, np.array(left_handed, dtype=bool)))
+
+    def __len__(self) -> int:
+        """Returns the number of templates."""
+        return len(self.names)
+
+    def classify(self, vector: np.ndarray, max_distance: float = DEFAULT_MAX_DISTANCE) -> tuple:
+        """
+        Finds the template nearest to a normalized hand.
+        Args:
+            vector (np.ndarray): Normalized landmarks of the hand, shape (63,).
+            max_distance (float): Maximum distance of a match.
+        Returns:
+            tuple: (gesture name, distance), where the name is None if no template is within `max_distance`.
+        """
+        if not self.names:
+            return None, float("inf")
+        # |t - v|^2 = |t|^2 + |v|^2 - 2 t.v for all the templates t at once
+        squared = self._squared_norms + np.dot(vector, vector) - 2.0 * (self.vectors @ vector)
+        nearest = int(np.argmin(squared))
+        distance = float(np.sqrt(max(squared[nearest], 0.0) / VECTOR_SIZE))
+        if distance > max_distance:
+            return None, distance
+        return self.names[nearest], distance
+
+    def classify_hand(self, landmarks: np.ndarray, left_handed: bool = False, max_distance: float = DEFAULT_MAX_DISTANCE) -> tuple:
+        """
+        Normalizes the landmarks of a hand and classifies it (see `classify`).
+        Args:
+            landmarks (np.ndarray): Landmarks of the hand, shape (21, 3).
+            left_handed (bool): Whether the hand is a left hand.
+            max_distance (float): Maximum distance of a match.
+        Returns:
+            tuple: (gesture name or None, distance).
+        """
+        return self.classify(normalize_landmarks(landmarks, left_handed), max_distance)
@@ -0,0 +1,177 @@
+# client/src/gesture_recognizer/recognizer_profile.py
+# -*- coding: utf-8 -*-
+"""
+This module contains the recognizer profile: the runtime settings of the gesture recognizer
+(model, number of hands, confidence thresholds, capture resolution and frame rate, threads, landmark preview)
+that used to be hardcoded and that depend on the hardware the client runs on.
+A profile is a dictionary saved as a JSON file in the profiles/ subdirectory of the configuration directory;
+missing keys take the default values.
+Profiles can be written by hand or by the auto-tune command (see autotune.py).
+This module does not import MediaPipe or OpenCV at module level, so the Flask process can load profiles cheaply.
+"""
+
+import json
+import os
+
+# Directory of the models (the .task files) and file of the profile used by the client.
+# The profile is saved in a subdirectory of the configuration directory (CLIENT_CONFIG_DIR, see flask_client.py):
+# the configuration directory itself holds the <name>.json configurations imported by ConfigStore.import_json_dir.
+# The RECOGNIZER_PROFILE environment variable can point to a different file.
+MODELS_DIR = os.path.dirname(__file__)
+CONFIG_DIR = os.environ.get("CLIENT_CONFIG_DIR", os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "..", "static", "configs")))
+PROFILE_PATH = os.environ.get("RECOGNIZER_PROFILE", os.path.join(CONFIG_DIR, "profiles", "recognizer_profile.json"))
+# Where previous versions saved the profile: read if there is no profile at PROFILE_PATH yet
+LEGACY_PROFILE_PATH = os.path.join(CONFIG_DIR, "recognizer_profile.json")
+
+# Default profile (the settings used before profiles existed)
+DEFAULT_PROFILE = {
+    # Model file, in MODELS_DIR (or an absolute path)
+    "model": "gesture_recognizer.task",
+    # MediaPipe delegate: "cpu" or "gpu"
+    "delegate": "cpu",
+    # Maximum number of hands recognized in every frame
+    "num_hands": 2,
+    # Confidence thresholds of the hand detection, of the hand presence and of the hand tracking
+    "min_detection_confidence": 0.5,
+    "min_presence_confidence": 0.5,
+    "min_tracking_confidence": 0.5,
+    # Webcam capture format (the webcam may pick the nearest supported one)
+    "capture_width": 640,
+    "capture_height": 480,
+    "capture_fps": 30,
+    # Threads used by OpenCV for the image conversions and the JPEG encoding (0: OpenCV default).
+    # The Python API of MediaPipe Tasks does not expose the number of inference threads.
+    "cv_threads": 0,
+    # Draw the hand landmarks on the preview (it runs a second hand model on every frame)
+    "draw_landmarks": True,
+    # Preview of the web interface: "mjpeg" streams every frame with the landmarks drawn on it,
+    # "landmarks" streams only the landmarks and the gestures of the hands (drawn by the browser)
+    "preview": "mjpeg",
+    # With the "landmarks" preview, one camera image is streamed every preview_image_interval frames (0: no image)
+    "preview_image_interval": 30,
+}
+
+# Allowed values of every key: (type, minimum, maximum) for numbers, or a tuple of choices
+PROFILE_LIMITS = {
+    "delegate": ("cpu", "gpu"),
+    "num_hands": (int, 1, 4),
+    "min_detection_confidence": (float, 0.0, 1.0),
+    "min_presence_confidence": (float, 0.0, 1.0),
+    "min_tracking_confidence": (float, 0.0, 1.0),
+    "capture_width": (int, 160, 3840),
+    "capture_height": (int, 120, 2160),
+    "capture_fps": (int, 1, 120),
+    "cv_threads": (int, 0, 64),
+    "preview": ("mjpeg", "landmarks"),
+    "preview_image_interval": (int, 0, 3600),
+}
+
+
+def validate_profile(profile: dict) -> dict:
+    """
+    Checks a profile and completes it with the default values.
+    Args:
+        profile (dict): The profile (possibly partial).
+    Returns:
+        dict: The complete profile.
+    Raises:
+        ValueError: If a key is unknown or a value is out of range.
+    """
+    unknown = set(profile) - set(DEFAULT_PROFILE)
+    if unknown:
+        raise ValueError(f"Unknown profile keys: {', '.join(sorted(unknown))}")
+    complete = dict(DEFAULT_PROFILE, **profile)
+    for key, limits in PROFILE_LIMITS.items():
+        value = complete[key]
+        if isinstance(limits[0], str):
+            if value not in limits:
+                raise ValueError(f"{key} must be one of {', '.join(limits)}")
+            continue
+        kind, minimum, maximum = limits
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or (kind is int and value != int(value)):
+            raise ValueError(f"{key} must be a number of type {kind.__name__}")
+        if not minimum <= value <= maximum:
+            raise ValueError(f"{key} must be between {minimum} and {maximum}")
+        complete[key] = kind(value)
+    if not isinstance(complete["model"], str) or not complete["model"]:
+        raise ValueError("model must be a file name")
+    complete["draw_landmarks"] = bool(complete["draw_landmarks"])
+    return complete
+
+
+def load_profile(path: str = PROFILE_PATH) -> dict:
+    """
+    Loads a profile, falling back to the default profile if the file does not exist or is invalid.
+    Args:
+        path (str): Path of the profile file.
+    Returns:
+        dict: The complete profile.
+    """
+    if not os.path.exists(path) and path == PROFILE_PATH and os.path.exists(LEGACY_PROFILE_PATH):
+        path = LEGACY_PROFILE_PATH
+    if not os.path.exists(path):
+        return dict(DEFAULT_PROFILE)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return validate_profile(json.load(f))
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Invalid recognizer profile {path}, using the default profile: {e}")
+        return dict(DEFAULT_PROFILE)
+
+
+def save_profile(profile: dict, path: str = PROFILE_PATH) -> None:
+    """
+    Saves a profile (atomically, so the client never reads a partial file).
+    Args:
+        profile (dict): The profile.
+        path (str): Path of the profile file.
+    Returns:
+        None
+    Raises:
+        ValueError: If the profile is invalid.
+    """
+    profile = validate_profile(profile)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def model_path(profile: dict) -> str:
+    """
+    Returns the path of the model of a profile.
+    Args:
+        profile (dict): The profile.
+    Returns:
+        str: The path of the .task file.
+    """
+    return os.path.join(MODELS_DIR, profile["model"])
+
+
+def recognizer_options(profile: dict, running_mode, result_callback: "callable" = None, model_buffer: bytes = None):
+    """
+    Builds the GestureRecognizerOptions of a profile.
+    Args:
+        profile (dict): The profile.
+        running_mode (mediapipe.tasks.vision.RunningMode): Running mode of the recognizer.
+        result_callback (callable): Result callback (only for the LIVE_STREAM running mode).
+        model_buffer (bytes): Content of the model file, already read (None to read the model file of the profile).
+    Returns:
+        mediapipe.tasks.vision.GestureRecognizerOptions: The options.
+    """
+    from mediapipe.tasks import python
+    from mediapipe.tasks.python import vision
+
+    delegate = python.BaseOptions.Delegate.GPU if profile["delegate"] == "gpu" else python.BaseOptions.Delegate.CPU
+    base_options = (python.BaseOptions(model_asset_path=model_path(profile), delegate=delegate) if model_buffer is None
+                    else python.BaseOptions(model_asset_buffer=model_buffer, delegate=delegate))
+    return vision.GestureRecognizerOptions(
+        base_options=base_options,
+        running_mode=running_mode,
+        num_hands=profile["num_hands"],
+        min_hand_detection_confidence=profile["min_detection_confidence"],
+        min_hand_presence_confidence=profile["min_presence_confidence"],
+        min_tracking_confidence=profile["min_tracking_confidence"],
+        result_callback=result_callback,
+    )
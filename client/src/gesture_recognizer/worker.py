@@ -0,0 +1,19 @@
+# client/src/gesture_recognizer/worker.py
+# -*- coding: utf-8 -*-
+"""
+This module contains the entry point of the gesture recognition process.
+It does not import MediaPipe or OpenCV itself, so the Flask process can reference it as a process target
+without loading the vision stack: gesture_recognizer.py is only imported inside the spawned recognition process.
+"""
+
+
+def run_gesture_recognition(*args, **kwargs) -> None:
+    """
+    Imports the gesture recognizer and runs it. Used as the target of the gesture recognition process.
+    Args:
+        *args, **kwargs: Arguments of `start_gesture_recognition` (see gesture_recognizer.py).
+    Returns:
+        None
+    """
+    from src.gesture_recognizer.gesture_recognizer import start_gesture_recognition
+    start_gesture_recognition(*args, **kwargs)
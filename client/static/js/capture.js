@@ -0,0 +1,142 @@
+"use strict";
+/**
+ * Browser-capture mode (capture.html): captures the webcam of the browser, downscales every frame
+ * to the size asked by the server, and uploads it as a JPEG image to /capture/frame/<session>.
+ * Only one upload is in flight at a time: if the server is slow, frames are skipped instead of queued.
+ */
+
+const COBALT_BLUE = "#0047ab";
+const RED = "rgb(178, 9, 9)";
+
+// State of the capture session
+let captureSession = null;
+let captureTimer = null;
+let captureStream = null;
+let uploadInFlight = false;
+
+/**
+ * Sets the status line of the page.
+ *
+ * @param {string} text - The status.
+ * @param {string} color - The color of the status.
+ */
+function setStatus(text, color) {
+    const status = document.getElementById("capture-status");
+    status.textContent = text;
+    status.style.color = color;
+}
+
+/**
+ * Opens a session, starts the webcam and uploads a frame every 1/fps seconds.
+ *
+ * @async
+ * @returns {Promise<void>} Resolves once the capture is started (or failed).
+ */
+async function startCapture() {
+    const config = document.getElementById("capture-config").value;
+    let session;
+    try {
+        const resp = await fetch("/capture/session", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify(config ? { config: config } : {}),
+        });
+        session = await resp.json();
+        if (!resp.ok) {
+            setStatus(session.message, RED);
+            return;
+        }
+    } catch (err) {
+        setStatus("Network error.", RED);
+        return;
+    }
+    try {
+        captureStream = await navigator.mediaDevices.getUserMedia({ video: { width: 640, height: 480 } });
+    } catch (err) {
+        setStatus("Cannot open the webcam: " + err.message, RED);
+        await fetch("/capture/close/" + session.session, { method: "POST" });
+        return;
+    }
+    captureSession = session;
+    const video = document.getElementById("capture-video");
+    video.srcObject = captureStream;
+    const canvas = document.getElementById("capture-canvas");
+    canvas.width = session.width;
+    canvas.height = session.height;
+    captureTimer = setInterval(uploadFrame, 1000 / session.fps);
+    document.getElementById("capture-start-btn").disabled = true;
+    document.getElementById("capture-stop-btn").disabled = false;
+    setStatus("Active", COBALT_BLUE);
+}
+
+/**
+ * Draws the current webcam frame on the canvas and uploads it, then shows the last result of the session.
+ * Does nothing while the previous upload is in flight.
+ *
+ * @async
+ * @returns {Promise<void>} Resolves once the frame is uploaded.
+ */
+async function uploadFrame() {
+    const video = document.getElementById("capture-video");
+    if (!captureSession || uploadInFlight || video.readyState < 2)
+        return;
+    uploadInFlight = true;
+    try {
+        const canvas = document.getElementById("capture-canvas");
+        canvas.getContext("2d").drawImage(video, 0, 0, canvas.width, canvas.height);
+        const capturedAt = performance.now();
+        const blob = await new Promise(resolve => canvas.toBlob(resolve, "image/jpeg", captureSession.quality));
+        if (!blob || !captureSession)
+            return;
+        const resp = await fetch(`/capture/frame/${captureSession.session}?t=${capturedAt.toFixed(1)}`, {
+            method: "POST",
+            headers: { "Content-Type": "image/jpeg" },
+            body: blob,
+        });
+        const data = await resp.json();
+        if (resp.status === 404) {
+            // The session expired (e.g., the tab was in background): stop, the user can start again
+            stopCapture(false);
+            setStatus("Session expired.", RED);
+            return;
+        }
+        const result = data.result;
+        document.getElementById("capture-gesture").textContent = (result && result.gesture)
+            ? `${result.gesture.replaceAll("_", " ")}${result.command ? " → " + result.command : ""}`
+            : "";
+    } catch (err) {
+        console.error("Error while uploading a frame:", err);
+    } finally {
+        uploadInFlight = false;
+    }
+}
+
+/**
+ * Stops the capture: stops the webcam and the uploads, and closes the session.
+ *
+ * @param {boolean} close - True to close the session on the server.
+ */
+function stopCapture(close = true) {
+    if (captureTimer)
+        clearInterval(captureTimer);
+    captureTimer = null;
+    if (captureStream)
+        captureStream.getTracks().forEach(track => track.stop());
+    captureStream = null;
+    if (captureSession && close)
+        // keepalive: the request is also sent when the page is being closed
+        fetch("/capture/close/" + captureSession.session, { method: "POST", keepalive: true });
+    captureSession = null;
+    document.getElementById("capture-start-btn").disabled = false;
+    document.getElementById("capture-stop-btn").disabled = true;
+    document.getElementById("capture-gesture").textContent = "";
+    setStatus("Inactive", RED);
+}
+
+function init() {
+    document.getElementById("capture-start-btn").addEventListener("click", startCapture);
+    document.getElementById("capture-stop-btn").addEventListener("click", () => stopCapture());
+    window.addEventListener("pagehide", () => stopCapture());
+}
+
+document.addEventListener("DOMContentLoaded", init);
@@ -11,7 +11,24 @@
 
 const COBALT_BLUE = "#0047ab";
 const RED = "rgb(178, 9, 9)";
+// Prefix of the macro commands (see client_constants.MACRO_PREFIX) and value of the "Macro..." option
+const MACRO_PREFIX = "Macro:";
+const MACRO_OPTION = "-- Macro --";
 let gestureFeedbackTimer = null;
+// Connections between the 21 hand landmarks of MediaPipe (wrist, then 4 points per finger from the thumb to the pinky)
+const HAND_CONNECTIONS = [
+    [0, 1], [1, 2], [2, 3], [3, 4],
+    [0, 5], [5, 6], [6, 7], [7, 8],
+    [5, 9], [9, 10], [10, 11], [11, 12],
+    [9, 13], [13, 14], [14, 15], [15, 16],
+    [13, 17], [0, 17], [17, 18], [18, 19], [19, 20],
+];
+// Cursor of the recent recognition events (sequence number of the last event received from /gesture_events)
+let gestureHistoryCursor = 0;
+// Number of events shown in the recent-gesture list
+const GESTURE_HISTORY_SHOWN = 10;
+// EventSource of the landmark preview (/preview_feed), while recognition is active with the "landmarks" preview
+let previewSource = null;
 
 function sortConfigNames() {
 
@@ -71,7 +88,8 @@ async function changeFormFields(e) {
         // This will set the value of each input field to the corresponding value in the JSON file
         for (const key in configData) {
             const input = document.getElementById(key);
-            input.value = configData[key];
+            if (input)
+                setCommand(input, configData[key]);
         }
     } catch (error) {
         console.error("Errore durante il fetch del JSON:", error);
@@ -227,6 +245,267 @@ async function gestureFeedback() {
 }
 
 
+/**
+ * Fetches the recognition events newer than the cursor from /gesture_events and adds them to the recent-gesture list,
+ * newest first, keeping the last GESTURE_HISTORY_SHOWN events. Unlike gestureFeedback, no event is missed between two calls.
+ *
+ * @async
+ * @returns {Promise<void>} Resolves once the list has been updated.
+ */
+async function loadGestureEvents() {
+    const list = document.getElementById("gesture-history");
+    if (!list)
+        return;
+    try {
+        const resp = await fetch(`/gesture_events?after=${gestureHistoryCursor}`);
+        if (!resp.ok)
+            return;
+        const data = await resp.json();
+        gestureHistoryCursor = data.cursor;
+        for (const event of data.events) {
+            if (!event.gesture)
+                continue;
+            const item = document.createElement("li");
+            const time = new Date(event.t * 1000).toLocaleTimeString();
+            item.textContent = `${time} ${event.gesture.replaceAll("_", " ")} (${event.score})` + (event.command ? ` → ${event.command}` : "");
+            if (event.outcome === "sent" || event.outcome === "continuous")
+                item.className = "sent";
+            list.prepend(item);
+        }
+        while (list.children.length > GESTURE_HISTORY_SHOWN)
+            list.lastChild.remove();
+    } catch (err) {
+        console.error("Network error while loading the recent gestures:", err);
+    }
+}
+
+
+/**
+ * Adds a row for a custom gesture to the gesture-command table, if it is not there yet.
+ * The row is a copy of the first row (with the default icon and no command), so it can be bound to a command.
+ *
+ * @param {string} name - The name of the custom gesture.
+ */
+function addGestureRow(name) {
+    if (document.getElementById(name))
+        return;
+    const table = document.getElementById("gesture-table");
+    const firstRow = table ? table.querySelector(".gesture-row") : null;
+    if (!firstRow)
+        return;
+    const row = firstRow.cloneNode(true);
+    const label = row.querySelector("label");
+    label.htmlFor = name;
+    label.innerHTML = '<span class="gesture-icon">❓</span> ' + name.replaceAll("_", " ");
+    const select = row.querySelector("select");
+    select.id = name;
+    select.name = name;
+    select.value = "-- No Command --";
+    table.appendChild(row);
+}
+
+/**
+ * Selects a command in a gesture <select>, adding an option for it first if it is a macro command
+ * (macros are defined by the user, so they are not in the list rendered by Flask).
+ *
+ * @param {HTMLSelectElement} select - The <select> of a gesture.
+ * @param {string} command - The command.
+ */
+function setCommand(select, command) {
+    if (command && command.startsWith(MACRO_PREFIX) && !Array.from(select.options).some(o => o.value === command)) {
+        const option = document.createElement("option");
+        option.value = command;
+        option.textContent = command;
+        select.appendChild(option);
+    }
+    select.value = command;
+}
+
+/**
+ * Asks for the keys of a macro when the "Macro" option of a gesture <select> is chosen,
+ * and binds the gesture to the macro command (e.g., "Macro:ctrl+shift+t").
+ * The macro is checked by the server when it is executed.
+ *
+ * @param {Event} e - The change event of a gesture <select>.
+ */
+function editMacro(e) {
+    const select = e.target;
+    if (!select.classList.contains("gesture-select") || select.value !== MACRO_OPTION)
+        return;
+    const keys = prompt("Keys of the macro, separated by commas (e.g., ctrl+shift+t or ctrl+c,wait 100,ctrl+v):");
+    if (!keys || !keys.trim() || keys.includes("|")) {
+        select.value = "-- No Command --";
+        return;
+    }
+    setCommand(select, MACRO_PREFIX + keys.trim());
+}
+
+/**
+ * Shows a message in the <p id="message"> element for 3 seconds.
+ *
+ * @param {string} text - The message.
+ * @param {string} color - The color of the message.
+ */
+function showMessage(text, color) {
+    const p = document.getElementById("message");
+    p.textContent = text;
+    p.style.color = color;
+    p.style.display = "block";
+    setTimeout(() => {
+        p.style.display = "none";
+    }, 3000);
+}
+
+/**
+ * Fetches the custom gestures from the `/templates` endpoint and lists them in <ul id="template-list">,
+ * with the number of recorded templates and a button to delete each of them.
+ *
+ * @async
+ * @returns {Promise<void>} Resolves once the list has been updated.
+ */
+async function loadTemplates() {
+    const list = document.getElementById("template-list");
+    if (!list)
+        return;
+    try {
+        const resp = await fetch("/templates");
+        if (!resp.ok)
+            return;
+        const data = await resp.json();
+        list.innerHTML = "";
+        for (const [name, count] of Object.entries(data.templates)) {
+            const item = document.createElement("li");
+            item.textContent = `${name} (${count} template${count == 1 ? "" : "s"}) `;
+            const deleteBtn = document.createElement("button");
+            deleteBtn.type = "button";
+            deleteBtn.textContent = "Delete";
+            deleteBtn.addEventListener("click", () => deleteTemplate(name));
+            item.appendChild(deleteBtn);
+            list.appendChild(item);
+            addGestureRow(name);
+        }
+    } catch (err) {
+        console.error("Network error while loading the custom gestures:", err);
+    }
+}
+
+/**
+ * Records a template of the custom gesture named in <input id="template-name">
+ * from the hand currently shown to the webcam (the recognizer must be active).
+ *
+ * @async
+ * @returns {Promise<void>} Resolves once the template has been recorded and the list updated.
+ */
+async function recordTemplate() {
+    const nameInput = document.getElementById("template-name");
+    const name = nameInput.value;
+    if (!/^[a-zA-Z0-9_]+$/.test(name)) {
+        alert("Invalid name: use only letters, numbers, or underscores (no spaces).");
+        return;
+    }
+    const formData = new FormData();
+    formData.set("name", name);
+    try {
+        const resp = await fetch("/record_template", { method: "POST", body: formData });
+        const data = await resp.json();
+        showMessage(data.message, resp.ok ? COBALT_BLUE : RED);
+        if (resp.ok)
+            await loadTemplates();
+    } catch (err) {
+        alert("Network error.");
+    }
+}
+
+/**
+ * Deletes a custom gesture (all its templates) and updates the list.
+ *
+ * @async
+ * @param {string} name - The name of the custom gesture.
+ * @returns {Promise<void>} Resolves once the gesture has been deleted and the list updated.
+ */
+async function deleteTemplate(name) {
+    if (!confirm(`Delete the custom gesture ${name}?`))
+        return;
+    const formData = new FormData();
+    formData.set("name", name);
+    try {
+        const resp = await fetch("/delete_template", { method: "POST", body: formData });
+        const data = await resp.json();
+        showMessage(data.message, resp.ok ? COBALT_BLUE : RED);
+        if (resp.ok) {
+            // Remove the row of the gesture from the gesture-command table
+            const select = document.getElementById(name);
+            if (select)
+                select.closest(".gesture-row").remove();
+            await loadTemplates();
+        }
+    } catch (err) {
+        alert("Network error.");
+    }
+}
+
+
+/**
+ * Draws a landmark preview of /preview_feed on the preview canvas: the connections and the points of every hand,
+ * and the gesture of the hand next to its wrist.
+ *
+ * @param {HTMLCanvasElement} canvas - The preview canvas.
+ * @param {Object} preview - The preview: {width, height, hands: [{gesture, score, handedness, points: [x0, y0, ...]}]},
+ *     with the points normalized to [0, 1].
+ */
+function drawPreview(canvas, preview) {
+    const ctx = canvas.getContext("2d");
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    ctx.lineWidth = 2;
+    ctx.font = "16px sans-serif";
+    for (const hand of preview.hands) {
+        const x = i => hand.points[2 * i] * canvas.width;
+        const y = i => hand.points[2 * i + 1] * canvas.height;
+        ctx.strokeStyle = "rgb(0, 200, 0)";
+        ctx.beginPath();
+        for (const [a, b] of HAND_CONNECTIONS) {
+            ctx.moveTo(x(a), y(a));
+            ctx.lineTo(x(b), y(b));
+        }
+        ctx.stroke();
+        ctx.fillStyle = "rgb(220, 0, 0)";
+        for (let i = 0; i < hand.points.length / 2; i++) {
+            ctx.fillRect(x(i) - 2, y(i) - 2, 4, 4);
+        }
+        if (hand.gesture) {
+            ctx.fillStyle = COBALT_BLUE;
+            ctx.fillText(`${hand.gesture.replaceAll("_", " ")} (${hand.score})`, x(0) + 8, y(0) + 18);
+        }
+    }
+}
+
+/**
+ * Starts drawing the landmark preview: opens the /preview_feed stream and draws every event on the preview canvas.
+ *
+ * @param {HTMLCanvasElement} canvas - The preview canvas.
+ * @param {boolean} overImage - True if the camera image is shown under the canvas, false to draw on a dark background.
+ */
+function startPreview(canvas, overImage) {
+    stopPreview(canvas);
+    canvas.style.display = "block";
+    canvas.style.background = overImage ? "transparent" : "#222";
+    previewSource = new EventSource("/preview_feed");
+    previewSource.onmessage = (event) => drawPreview(canvas, JSON.parse(event.data));
+}
+
+/**
+ * Stops drawing the landmark preview (closing the stream, otherwise the browser would reconnect to it) and hides the canvas.
+ *
+ * @param {HTMLCanvasElement} canvas - The preview canvas.
+ */
+function stopPreview(canvas) {
+    if (previewSource) {
+        previewSource.close();
+        previewSource = null;
+    }
+    canvas.getContext("2d").clearRect(0, 0, canvas.width, canvas.height);
+    canvas.style.display = "none";
+}
 
 /**
  * Starts the recognition process by sending a request to the server and updating the UI accordingly.
@@ -249,7 +528,13 @@ async function startRecognition(startBtn, stopBtn, statusElem, videoElem, applyB
         statusElem.style.color = "green";
         startBtn.style.display = "none";
         stopBtn.style.display = "inline-block";
-        videoElem.style.display = "block";
+        const data = await resp.json();
+        // With the "landmarks" preview, the hands are drawn by the page, over a camera image updated rarely (if at all)
+        const previewCanvas = document.getElementById("preview-canvas");
+        if (data.preview === "landmarks") {
+            startPreview(previewCanvas, data.preview_images);
+        }
+        videoElem.style.display = data.preview_images === false ? "none" : "block";
 
         // This line sets the source of the video element to the video feed URL.
         // Everytime videElem.src is changed (it happens everytime the startRecognition is called,
@@ -259,12 +544,16 @@ async function startRecognition(startBtn, stopBtn, statusElem, videoElem, applyB
         // The ?ts=Date.now() part is used to prevent caching issues, ensuring the
         // browser always fetches the latest video feed.
         // The video element will display the live video feed from the server.
-        videoElem.src = "/video_feed?ts=" + Date.now();
+        // Without camera images (landmarks preview only), the MJPEG stream is not opened at all.
+        if (data.preview_images !== false) {
+            videoElem.src = "/video_feed?ts=" + Date.now();
+        }
         applyBtn.disabled = true;
         saveBtn.disabled = true;
         // Show the recognized gesture in a <p>
         gestureFeedbackTimer = setInterval(async () => {
             await gestureFeedback();
+            await loadGestureEvents();
         }, 333);
     }
 }
@@ -293,6 +582,7 @@ async function stopRecognition(startBtn, stopBtn, statusElem, videoElem, applyBt
         startBtn.style.display = "inline-block";
         videoElem.style.display = "none";
         videoElem.src = "";
+        stopPreview(document.getElementById("preview-canvas"));
         // Interrupt showing gesture feedback
         clearInterval(gestureFeedbackTimer);
         gestureFeedbackTimer = null;
@@ -368,7 +658,14 @@ async function checkIfServerIsRunning() {
         const resp = await fetch("/check_server");
         if (resp.ok) {  
             console.log("Server is running.");
-            serverMessage.innerText = "Server is running.";
+            const data = await resp.json();
+            // Round-trip time and jitter measured by the heartbeat of the connection
+            serverMessage.innerText = (data.rtt_ms !== undefined)
+                ? `Server is running (RTT ${data.rtt_ms.toFixed(1)} ms ± ${data.jitter_ms.toFixed(1)} ms).`
+                : "Server is running.";
+            // Several target servers: show how many of them are reachable (details at /targets)
+            if (data.targets > 1)
+                serverMessage.innerText += ` ${data.targets_up}/${data.targets} targets reachable.`;
             serverMessage.style.color ="rgb(79, 191, 39)";
             // clearInterval(SERVER_CHECK_TIMER);  // Stop checking if the server is running
             SERVER_CHECK_TIMER = null;  // Clear the timer variable
@@ -405,6 +702,8 @@ async function checkIfServerIsRunning() {
  * - webcam-frame
  * - apply-btn
  * - save-btn
+ * - record-template-btn
+ * - template-list
  */
 function init() {
     // Sort the configuration names in the select element
@@ -428,6 +727,12 @@ function init() {
         form.addEventListener("submit", sendFormDataToFlaskClient)
     }
 
+    // Macro commands (the listener is on the table, so it also covers the rows of the custom gestures)
+    const gestureTable = document.getElementById("gesture-table");
+    if (gestureTable) {
+        gestureTable.addEventListener("change", editMacro);
+    }
+
     /*
         Initialize the recognition status and buttons.
         This will set up the event listeners for the start and stop buttons,
@@ -457,6 +762,13 @@ function init() {
         });
     }
 
+    // Custom gestures
+    const recordTemplateBtn = document.getElementById("record-template-btn");
+    if (recordTemplateBtn) {
+        recordTemplateBtn.addEventListener("click", recordTemplate);
+    }
+    loadTemplates();
+
     const stopClientBtn = document.getElementById("stop-client-btn");
     if (stopClientBtn) {
         stopClientBtn.addEventListener("click", stopClient);
@@ -0,0 +1,13 @@
+# client/tests/conftest.py
+# -*- coding: utf-8 -*-
+"""
+The client modules import each other relative to the client directory (like start_client.sh does with PYTHONPATH=.),
+so the tests run with the client directory on the import path.
+"""
+
+import os
+import sys
+
+CLIENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CLIENT_DIR not in sys.path:
+    sys.path.insert(0, CLIENT_DIR)
@@ -0,0 +1,24 @@
+# client/tests/test_batch_recognition.py
+# -*- coding: utf-8 -*-
+"""Tests of the planning of the batch recognizer (segments and timeline names)."""
+
+import os
+
+from src.gesture_recognizer.batch_recognition import plan_segments, timeline_names
+
+
+def test_segments_cover_the_video_and_the_last_one_runs_to_the_end():
+    assert plan_segments(250, 10.0, 10.0) == [(0, 100), (100, 200), (200, None)]
+    assert plan_segments(50, 10.0, 10.0) == [(0, None)]
+
+
+def test_unknown_frame_count_is_decoded_in_one_segment():
+    assert plan_segments(0, 30.0, 120.0) == [(0, None)]
+    assert plan_segments(-1, 30.0, 120.0) == [(0, None)]
+
+
+def test_timeline_names_keep_the_relative_path():
+    names = timeline_names(["rec/day1/cam.mp4", "rec/day2/cam.mp4", "rec/day2/cam.avi", "rec/day2/desk.mp4"])
+    assert names == [os.path.join("day1", "cam"), os.path.join("day2", "cam.mp4"), os.path.join("day2", "cam.avi"),
+                     os.path.join("day2", "desk")]
+    assert timeline_names(["recordings/cam.mp4"]) == ["cam"]
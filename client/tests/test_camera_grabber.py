@@ -0,0 +1,54 @@
+# client/tests/test_camera_grabber.py
+# -*- coding: utf-8 -*-
+"""Tests of the frame grabber (camera_grabber.py) with a fake capture device."""
+
+import threading
+
+from src.gesture_recognizer.camera_grabber import LatestFrameGrabber
+
+
+class FakeCapture:
+    """Capture device returning numbered frames; `read` blocks while `blocked` is clear."""
+
+    def __init__(self) -> None:
+        self.frames = 0
+        self.released_by = None
+        self.blocked = threading.Event()
+        self.blocked.set()
+        self.reading = threading.Event()
+
+    def isOpened(self) -> bool:
+        return self.released_by is None
+
+    def read(self) -> tuple:
+        self.reading.set()
+        self.blocked.wait()
+        self.frames += 1
+        return True, self.frames
+
+    def release(self) -> None:
+        self.released_by = threading.current_thread().name
+
+
+def test_read_returns_only_newer_frames():
+    capture = FakeCapture()
+    grabber = LatestFrameGrabber(lambda: capture).start()
+    seq, frame = grabber.read(0)
+    assert frame is not None
+    newer_seq, newer_frame = grabber.read(seq)
+    assert newer_seq > seq and newer_frame is not None
+    grabber.stop()
+    assert capture.released_by == "LatestFrameGrabber"
+
+
+def test_stop_never_releases_a_capture_in_use():
+    capture = FakeCapture()
+    capture.blocked.clear()
+    grabber = LatestFrameGrabber(lambda: capture).start()
+    assert capture.reading.wait(5.0)
+    # The grabber thread is stuck in read(): stop() must not release the device under it
+    grabber.stop(timeout=0.1)
+    assert capture.released_by is None
+    capture.blocked.set()
+    grabber._thread.join(5.0)
+    assert capture.released_by == "LatestFrameGrabber"
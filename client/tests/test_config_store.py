@@ -0,0 +1,53 @@
+# client/tests/test_config_store.py
+# -*- coding: utf-8 -*-
+"""Tests of the import of the JSON configurations of previous versions (ConfigStore.import_json_dir)."""
+
+import json
+import os
+
+from config_store import ConfigStore
+from src.gesture_recognizer.recognizer_profile import CONFIG_DIR, DEFAULT_PROFILE, PROFILE_PATH, save_profile
+
+
+def test_import_json_dir_skips_recognizer_profile(tmp_path):
+    with open(tmp_path / "Config_a.json", "w") as f:
+        json.dump({"Thumb_Up": "Volume Up", "Open_Palm": "PlayPause"}, f)
+    # A profile saved in the configuration directory by a previous version of the auto-tune command
+    save_profile(DEFAULT_PROFILE, str(tmp_path / "recognizer_profile.json"))
+    store = ConfigStore(str(tmp_path / "configs.sqlite3"))
+    try:
+        assert store.import_json_dir(str(tmp_path)) == 1
+        assert store.names() == ["Config_a"]
+        assert store.get("Config_a") == {"Thumb_Up": "Volume Up", "Open_Palm": "PlayPause"}
+    finally:
+        store.close()
+
+
+def test_profile_is_not_saved_with_the_configurations(tmp_path):
+    if "RECOGNIZER_PROFILE" not in os.environ:
+        assert os.path.dirname(PROFILE_PATH) != CONFIG_DIR
+    # The profiles directory is created on the first save, and is not read by the import
+    path = tmp_path / "profiles" / "recognizer_profile.json"
+    save_profile(DEFAULT_PROFILE, str(path))
+    store = ConfigStore(str(tmp_path / "configs.sqlite3"))
+    try:
+        assert store.import_json_dir(str(tmp_path)) == 0
+        assert len(store) == 0
+    finally:
+        store.close()
+
+
+def test_unbound_gestures_survive_export_and_import(tmp_path):
+    store = ConfigStore(str(tmp_path / "configs.sqlite3"))
+    try:
+        # A configuration saved by a previous version of the save form, with an unbound gesture
+        store.save("Saved", {"Thumb_Up": "Volume Up", "Victory": None})
+        assert store.export_json_dir(str(tmp_path / "json")) == 1
+    finally:
+        store.close()
+    store = ConfigStore(str(tmp_path / "reimported.sqlite3"))
+    try:
+        assert store.import_json_dir(str(tmp_path / "json")) == 1
+        assert store.get("Saved") == {"Thumb_Up": "Volume Up"}
+    finally:
+        store.close()
@@ -0,0 +1,28 @@
+# client/tests/test_control_channel.py
+# -*- coding: utf-8 -*-
+"""Tests of the continuous-control sender (ControlSender) towards IPv4 and IPv6 servers."""
+
+import socket
+
+import pytest
+
+from control_channel import CONTROL_MAGIC, CONTROL_PACKET, CONTROL_SCROLL, ControlSender
+
+
+@pytest.mark.parametrize("family, host", [(socket.AF_INET, "127.0.0.1"), (socket.AF_INET6, "::1")])
+def test_updates_reach_a_server_of_either_family(family, host):
+    try:
+        receiver = socket.socket(family, socket.SOCK_DGRAM)
+        receiver.bind((host, 0))
+    except OSError:
+        pytest.skip(f"{host} is not available")
+    with receiver:
+        receiver.settimeout(5.0)
+        sender = ControlSender(host, receiver.getsockname()[1])
+        try:
+            assert sender.connected
+            assert sender.send(CONTROL_SCROLL, 240.0)
+            magic, kind, _, _, value1, _ = CONTROL_PACKET.unpack(receiver.recv(64))
+            assert (magic, kind, value1) == (CONTROL_MAGIC, CONTROL_SCROLL, 240.0)
+        finally:
+            sender.close()
@@ -0,0 +1,61 @@
+# client/tests/test_event_log.py
+# -*- coding: utf-8 -*-
+"""Tests of the event log: writer (EventLog) and readers (read_event_file, load_events)."""
+
+import os
+
+from client_constants import COMMAND_IDS, GESTURE_IDS
+from event_log import (EVENT_DTYPE, HEADER_SIZE, OUTCOME_NO_HAND, OUTCOME_NOT_SENT, OUTCOME_SENT, OUTCOME_UNMAPPED,
+                       EventLog, event_files, load_events, read_event_file)
+
+
+def test_logged_events_are_read_back(tmp_path):
+    event_log = EventLog(str(tmp_path), flush_interval=60.0).start()
+    event_log.log("Thumb_Up", "Volume Up", OUTCOME_SENT, 0.9, 0, "Right")
+    event_log.log("Thumb_Up", "Volume Up", OUTCOME_NOT_SENT, 0.8, 0, "Right")
+    event_log.log("Wave", None, OUTCOME_UNMAPPED, 0.0, 1, "Left")
+    event_log.log(None, None, OUTCOME_NO_HAND)
+    # Closing writes the buffered events
+    event_log.close()
+    assert event_log.written == 4 and event_log.pending == 0
+
+    [path] = event_files(str(tmp_path))
+    info, records = read_event_file(path)
+    assert os.path.getsize(path) == HEADER_SIZE + 4 * EVENT_DTYPE.itemsize
+    # The custom gesture gets the first ID after the built-in ones
+    assert info["gestures"][records["gesture"][2]] == "Wave"
+    assert records["gesture"][2] == len(GESTURE_IDS)
+
+    log = load_events(str(tmp_path))
+    events = log["events"]
+    assert [log["gestures"][i] if i >= 0 else None for i in events["gesture"]] == ["Thumb_Up", "Thumb_Up", "Wave", None]
+    assert list(events["command"]) == [COMMAND_IDS["Volume Up"], COMMAND_IDS["Volume Up"], -1, -1]
+    assert [log["outcomes"][i] for i in events["outcome"]] == ["sent", "not sent", "unmapped", "no hand"]
+    assert list(events["handedness"]) == [1, 1, 0, -1]
+    assert load_events(str(tmp_path), since=events["t"][-1] + 1)["events"].size == 0
+
+
+def test_custom_names_of_two_files_share_the_loaded_vocabulary(tmp_path):
+    for gesture in ("Wave", "Fist_Pump"):
+        event_log = EventLog(str(tmp_path), flush_interval=60.0).start()
+        event_log.log(gesture, None, OUTCOME_UNMAPPED)
+        event_log.close()
+    # Both files give their custom gesture the same ID: the loader translates them
+    assert len(event_files(str(tmp_path))) == 2
+    log = load_events(str(tmp_path))
+    assert sorted(log["gestures"][i] for i in log["events"]["gesture"]) == ["Fist_Pump", "Wave"]
+
+
+def test_writers_sharing_a_directory_never_share_a_file(tmp_path, monkeypatch):
+    # Both writers start a file in the same second
+    monkeypatch.setattr("event_log.time.strftime", lambda _: "20260101-000000")
+    first = EventLog(str(tmp_path), flush_interval=60.0)
+    second = EventLog(str(tmp_path), flush_interval=60.0)
+    first._rotate()
+    second._rotate()
+    try:
+        assert first._path != second._path
+    finally:
+        first._file.close()
+        second._file.close()
+    assert len(event_files(str(tmp_path))) == 2
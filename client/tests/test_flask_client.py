@@ -0,0 +1,27 @@
+# client/tests/test_flask_client.py
+# -*- coding: utf-8 -*-
+"""Tests of the routes of flask_client.py, with the configurations in a temporary directory."""
+
+import os
+import tempfile
+
+import pytest
+
+# The configuration directory is read when flask_client is imported
+os.environ.setdefault("CLIENT_CONFIG_DIR", tempfile.mkdtemp(prefix="client-configs-"))
+
+import flask_client  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    flask_client.gesture_to_command.clear()
+    return flask_client.app.test_client()
+
+
+def test_save_does_not_store_gestures_missing_from_the_form(client):
+    # Only Thumb_Up is in the form: the other gestures (e.g., recorded after the page was loaded) stay unbound
+    response = client.post("/", data={"action": "save", "config_name_text": "Saved", "Thumb_Up": "Volume Up"})
+    assert response.get_json()["status"] == "ok"
+    assert flask_client.config_store.get("Saved") == {"Thumb_Up": "Volume Up"}
+    assert flask_client.gesture_to_command == {"Thumb_Up": "Volume Up"}
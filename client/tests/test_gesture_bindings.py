@@ -0,0 +1,50 @@
+# client/tests/test_gesture_bindings.py
+# -*- coding: utf-8 -*-
+"""Tests of the compiled gesture bindings (GestureBindings)."""
+
+from client_constants import COMMAND_IDS, GESTURE_IDS, GESTURE_REGISTRY
+from gesture_bindings import BINDING_CONTINUOUS, BINDING_DISCRETE, BINDING_NONE, GestureBindings
+
+
+def test_bindings_resolve_every_kind_of_command():
+    bindings = GestureBindings({
+        "Thumb_Up": "Volume Up",
+        "Victory": "Macro:ctrl+c,wait 100,ctrl+v",
+        "Open_Palm": "Scroll (continuous)",
+        "Closed_Fist": "-- No Command --",
+        "Pointing_Up": None,
+        "Wave": "PlayPause",
+    })
+    # Gestures bound to a command, known or not
+    assert len(bindings) == 5
+    thumb_up = bindings.gesture_ids["Thumb_Up"]
+    assert thumb_up == GESTURE_IDS["Thumb_Up"]
+    assert (bindings.kinds[thumb_up], bindings.items[thumb_up]) == (BINDING_DISCRETE, COMMAND_IDS["Volume Up"])
+    victory = bindings.gesture_ids["Victory"]
+    assert (bindings.kinds[victory], bindings.items[victory], bindings.command_ids[victory]) == (
+        BINDING_DISCRETE, "Macro:ctrl+c,wait 100,ctrl+v", -1)
+    open_palm = bindings.gesture_ids["Open_Palm"]
+    assert (bindings.kinds[open_palm], bindings.items[open_palm]) == (BINDING_CONTINUOUS, "Scroll (continuous)")
+    assert bindings.has_continuous()
+    for gesture in ("Closed_Fist", "Pointing_Up"):
+        assert bindings.kinds[bindings.gesture_ids[gesture]] == BINDING_NONE
+    # Custom gestures get the IDs after the built-in ones
+    wave = bindings.gesture_ids["Wave"]
+    assert wave == len(GESTURE_REGISTRY) and bindings.gesture_names[wave] == "Wave"
+    assert bindings.items[wave] == COMMAND_IDS["PlayPause"]
+
+
+def test_unknown_gestures_resolve_to_an_unbound_id():
+    bindings = GestureBindings({"Thumb_Up": "Volume Up"})
+    for gesture in ("Not_A_Gesture", None):
+        assert bindings.gesture_ids[gesture] == bindings.unknown_id == bindings.gesture_id(gesture)
+    assert bindings.kinds[bindings.unknown_id] == BINDING_NONE
+    assert bindings.items[bindings.unknown_id] is None
+    # The lookup does not add the names
+    assert "Not_A_Gesture" not in bindings.gesture_ids
+
+
+def test_empty_mapping_has_no_bindings():
+    for mapping in (None, {}):
+        bindings = GestureBindings(mapping)
+        assert not bindings and not bindings.has_continuous()
@@ -0,0 +1,59 @@
+# client/tests/test_gesture_history.py
+# -*- coding: utf-8 -*-
+"""Tests of the recent-gesture ring (GestureHistory): cursor, wraparound and overwritten events."""
+
+from event_log import OUTCOME_NO_HAND, OUTCOME_SENT, OUTCOME_UNMAPPED
+from gesture_history import MAX_HISTORY_COMMAND_LENGTH, GestureHistory
+
+
+def gestures(page: dict) -> list:
+    return [event["gesture"] for event in page["events"]]
+
+
+def test_cursor_returns_every_event_once():
+    history = GestureHistory(size=8)
+    assert history.since(0) == {"events": [], "cursor": 0, "missed": 0}
+    history.append("Thumb_Up", OUTCOME_SENT, 0.91, 0, "Right", "Volume Up")
+    history.append(None, OUTCOME_NO_HAND)
+    page = history.since(0)
+    assert page["cursor"] == 2 and page["missed"] == 0
+    assert page["events"][0] == {"seq": 1, "t": page["events"][0]["t"], "gesture": "Thumb_Up", "score": 0.91, "hand": 0,
+                                 "handedness": "Right", "outcome": "sent", "command": "Volume Up"}
+    assert page["events"][1]["gesture"] is None and page["events"][1]["outcome"] == "no hand"
+    history.append("Victory", OUTCOME_UNMAPPED)
+    assert gestures(history.since(page["cursor"])) == ["Victory"]
+    assert history.since(3) == {"events": [], "cursor": 3, "missed": 0}
+
+
+def test_wraparound_reports_the_overwritten_events():
+    history = GestureHistory(size=4)
+    for i in range(1, 11):
+        history.append(f"g{i}", OUTCOME_UNMAPPED)
+    # Events 1 to 6 were overwritten: a reader at cursor 2 missed 3 to 6
+    page = history.since(2)
+    assert gestures(page) == ["g7", "g8", "g9", "g10"]
+    assert page["cursor"] == 10 and page["missed"] == 4
+    assert history.since(0)["missed"] == 6
+
+
+def test_limit_pages_through_the_ring():
+    history = GestureHistory(size=8)
+    for i in range(1, 7):
+        history.append(f"g{i}", OUTCOME_UNMAPPED)
+    first = history.since(0, limit=4)
+    assert gestures(first) == ["g1", "g2", "g3", "g4"] and first["cursor"] == 4
+    assert gestures(history.since(first["cursor"], limit=4)) == ["g5", "g6"]
+
+
+def test_cursor_ahead_of_the_ring_reads_from_the_start():
+    history = GestureHistory(size=4)
+    history.append("Thumb_Up", OUTCOME_SENT)
+    # E.g., the web page kept the cursor of a previous client process
+    assert gestures(history.since(100)) == ["Thumb_Up"]
+
+
+def test_long_commands_are_truncated():
+    history = GestureHistory(size=4)
+    history.append("Thumb_Up", OUTCOME_SENT, command="Macro:" + "a," * MAX_HISTORY_COMMAND_LENGTH)
+    [event] = history.since(0)["events"]
+    assert event["gesture"] == "Thumb_Up" and len(event["command"]) == MAX_HISTORY_COMMAND_LENGTH
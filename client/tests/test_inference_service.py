@@ -0,0 +1,75 @@
+# client/tests/test_inference_service.py
+# -*- coding: utf-8 -*-
+"""Tests of the sessions of the browser-capture inference service, with in-process queues instead of worker processes."""
+
+import queue
+import time
+
+from client_constants import COMMAND_IDS
+from src.gesture_recognizer.inference_service import (COMMAND_INTERVAL, MAX_SESSIONS_PER_WORKER, REQUEST_CLOSE,
+                                                      REQUEST_FRAME, InferenceService)
+
+
+def make_service(workers: int = 2, queue_size: int = 4, command_queue: queue.Queue = None) -> InferenceService:
+    """Returns a service whose workers are plain queues, as if they were started and ready."""
+    service = InferenceService(workers=workers, command_queue=command_queue)
+    service._requests = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+    service._worker_state = {worker: "ready" for worker in range(workers)}
+    return service
+
+
+def result(seq: int, *gestures) -> dict:
+    return {"seq": seq, "gestures": [(gesture, 0.9, "Right") for gesture in gestures], "submitted": time.monotonic(),
+            "skipped": 0, "error": None}
+
+
+def test_sessions_go_to_the_least_loaded_usable_worker():
+    service = make_service()
+    service._worker_state[1] = "exited with code 1"
+    sessions = [service.open_session({}) for _ in range(MAX_SESSIONS_PER_WORKER)]
+    assert {service._sessions[session].worker for session in sessions} == {0}
+    # The only usable worker is full
+    assert service.open_session({}) is None
+
+
+def test_frames_get_increasing_timestamps_and_are_dropped_when_the_worker_is_busy():
+    service = make_service(workers=1, queue_size=2)
+    session = service.open_session({})
+    assert service.submit_frame(session, b"jpeg", 1000.0)
+    # A browser clock going back does not make the timestamps go back
+    assert service.submit_frame(session, b"jpeg", 900.0)
+    assert not service.submit_frame(session, b"jpeg", 1100.0)
+    requests = [service._requests[0].get_nowait() for _ in range(2)]
+    assert [(kind, payload[0], payload[1]) for kind, _, payload in requests] == [(REQUEST_FRAME, 1, 1000), (REQUEST_FRAME, 2, 1001)]
+    assert service.stats()["sessions"][session]["dropped"] == 1
+
+
+def test_close_requests_wait_for_room_in_the_queue_of_the_worker():
+    service = make_service(workers=1, queue_size=1)
+    session = service.open_session({})
+    assert service.submit_frame(session, b"jpeg")
+    # The queue is full: closing does not block and the request is kept
+    assert service.close_session(session)
+    assert service._pending_closes == [(0, session)]
+    service._retry_closes()
+    assert service._pending_closes == [(0, session)]
+    service._requests[0].get_nowait()
+    service._retry_closes()
+    assert service._pending_closes == []
+    assert service._requests[0].get_nowait() == (REQUEST_CLOSE, session, None)
+    assert not service.close_session(session)
+
+
+def test_results_send_the_bound_commands_every_command_interval():
+    commands = queue.Queue()
+    service = make_service(command_queue=commands)
+    session = service.open_session({"Thumb_Up": "Volume Up", "Victory": "Macro:ctrl+c", "Open_Palm": "-- No Command --"})
+    for seq in range(1, COMMAND_INTERVAL + 1):
+        service._on_result(session, result(seq, "Thumb_Up", "Victory", "Open_Palm"))
+    assert service.latest(session)["command"] == "Volume Up"
+    # Built-in commands are sent as their ID, macros as their text
+    assert [commands.get_nowait() for _ in range(commands.qsize())] == [COMMAND_IDS["Volume Up"], "Macro:ctrl+c"]
+    assert service.stats()["sessions"][session]["commands"] == 2
+    # Results of a closed session are ignored
+    service._sessions.clear()
+    service._on_result(session, result(COMMAND_INTERVAL + 1, "Thumb_Up"))
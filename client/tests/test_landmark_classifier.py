@@ -0,0 +1,76 @@
+# client/tests/test_landmark_classifier.py
+# -*- coding: utf-8 -*-
+"""Tests of the landmark normalization and of the custom gesture template index."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.gesture_recognizer.landmark_classifier import (MIDDLE_FINGER_MCP, NUM_LANDMARKS, VECTOR_SIZE, WRIST,
+                                                        TemplateIndex, landmarks_to_array, normalize_landmarks)
+
+rng = np.random.default_rng(0)
+
+
+def random_hand() -> np.ndarray:
+    hand = rng.uniform(0.3, 0.7, size=(NUM_LANDMARKS, 3)).astype(np.float32)
+    hand[:, 2] = rng.uniform(-0.05, 0.05, size=NUM_LANDMARKS)
+    return hand
+
+
+def moved(hand: np.ndarray, angle: float, scale: float, offset: tuple) -> np.ndarray:
+    """Rotates the hand around its wrist in the image plane, scales it and moves it."""
+    rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]], dtype=np.float32)
+    result = hand - hand[WRIST]
+    result[:, :2] = result[:, :2] @ rotation.T
+    return (result * scale + np.array(offset, dtype=np.float32)).astype(np.float32)
+
+
+def test_normalization_ignores_position_scale_and_rotation():
+    hand = random_hand()
+    vector = normalize_landmarks(hand)
+    assert vector.shape == (VECTOR_SIZE,)
+    points = vector.reshape(NUM_LANDMARKS, 3)
+    # The wrist is at the origin and the middle finger MCP points up at distance 1
+    np.testing.assert_allclose(points[WRIST], 0.0, atol=1e-6)
+    np.testing.assert_allclose(points[MIDDLE_FINGER_MCP, :2], (0.0, -1.0), atol=1e-5)
+    np.testing.assert_allclose(normalize_landmarks(moved(hand, 0.7, 2.5, (0.1, -0.2, 0.0))), vector, atol=1e-4)
+
+
+def test_left_hands_are_mirrored_into_right_hands():
+    hand = random_hand()
+    mirrored = hand.copy()
+    mirrored[:, 0] = 1.0 - mirrored[:, 0]
+    np.testing.assert_allclose(normalize_landmarks(mirrored, left_handed=True), normalize_landmarks(hand), atol=1e-5)
+
+
+def test_batch_normalization_matches_single_hands():
+    hands = np.stack([random_hand() for _ in range(4)])
+    left_handed = np.array([False, True, False, True])
+    batch = normalize_landmarks(hands, left_handed)
+    for hand, left, vector in zip(hands, left_handed, batch):
+        np.testing.assert_allclose(normalize_landmarks(hand, left), vector, atol=1e-6)
+
+
+def test_index_returns_the_nearest_template_within_the_distance():
+    wave, fist = random_hand(), random_hand()
+    index = TemplateIndex.from_templates([("Wave", wave.ravel().tolist(), False), ("Fist", fist.ravel().tolist(), False)])
+    assert len(index) == 2
+    name, distance = index.classify_hand(moved(wave, -0.4, 0.5, (0.2, 0.1, 0.0)))
+    assert name == "Wave" and distance < 1e-3
+    # A hand far from every template matches nothing
+    assert index.classify_hand(random_hand(), max_distance=1e-3)[0] is None
+
+
+def test_empty_index_matches_nothing():
+    assert TemplateIndex.from_templates([]).classify(np.zeros(VECTOR_SIZE, dtype=np.float32)) == (None, float("inf"))
+    with pytest.raises(ValueError):
+        TemplateIndex(["Wave"], np.zeros((2, VECTOR_SIZE)))
+
+
+def test_landmarks_to_array_makes_the_coordinates_isotropic():
+    landmarks = [SimpleNamespace(x=0.5, y=0.25, z=0.1)] * NUM_LANDMARKS
+    points = landmarks_to_array(landmarks, aspect_ratio=16 / 9)
+    assert points.shape == (NUM_LANDMARKS, 3)
+    np.testing.assert_allclose(points[0], (0.5 * 16 / 9, 0.25, 0.1), rtol=1e-6)
@@ -0,0 +1,43 @@
+# client/tests/test_process_supervisor.py
+# -*- coding: utf-8 -*-
+"""Tests of the lifecycle of the supervised processes."""
+
+import threading
+import time
+
+from process_supervisor import STATE_EXITED, STOP_COOPERATIVE, SupervisedProcess
+
+
+def finish_at_once() -> None:
+    """Target of a process that ends by itself (like the recognizer when 'q' is pressed)."""
+
+
+def finish_slowly(stop_event=None) -> None:
+    """Target of a process that takes a while to release its resources once asked to stop."""
+    stop_event.wait()
+    time.sleep(0.3)
+
+
+def test_exit_is_reported():
+    exited = threading.Event()
+    states = []
+    supervisor = SupervisedProcess("test", finish_at_once, on_exit=lambda state: (states.append(state), exited.set()))
+    supervisor.start()
+    assert exited.wait(30.0)
+    assert states == [STATE_EXITED] and supervisor.ended
+    assert supervisor.stop()["how"] is None
+    assert not supervisor.ended
+
+
+def test_concurrent_stops_wait_for_the_first_one():
+    supervisor = SupervisedProcess("test", finish_slowly, stop_event_kwarg="stop_event")
+    supervisor.start()
+    transitions = []
+    stoppers = [threading.Thread(target=lambda: transitions.append(supervisor.stop())) for _ in range(2)]
+    for stopper in stoppers:
+        stopper.start()
+    for stopper in stoppers:
+        stopper.join()
+    assert transitions[0] is transitions[1]
+    assert transitions[0]["how"] == STOP_COOPERATIVE
+    assert supervisor.metrics()["stops"] == 1
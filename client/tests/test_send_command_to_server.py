@@ -0,0 +1,61 @@
+# client/tests/test_send_command_to_server.py
+# -*- coding: utf-8 -*-
+"""Tests of the parsing of the target servers (GESTURE_SERVER_TARGETS) and of the command frames."""
+
+import multiprocessing
+import queue
+
+import pytest
+
+import send_command_to_server
+from client_constants import COMMAND_REGISTRY
+from send_command_to_server import SERVER_PORT, command_frame, parse_targets
+
+
+def test_parse_targets():
+    assert parse_targets("192.168.1.10:9001, host ,[fd00::2]:9002,fd00::3,[::1]") == [
+        ("192.168.1.10", 9001), ("host", SERVER_PORT), ("fd00::2", 9002), ("fd00::3", SERVER_PORT), ("::1", SERVER_PORT),
+    ]
+
+
+def test_parse_targets_skips_invalid_entries():
+    assert parse_targets("host:abc,host:²,:9000,[fd00::2]x,host:70000,good:9003") == [("good", 9003)]
+
+
+def test_command_frame_rejects_unknown_commands():
+    assert command_frame(0) == command_frame(COMMAND_REGISTRY[0]) == b"#0|"
+    assert command_frame("Macro:ctrl+c") == b"Macro:ctrl+c|"
+    for command in (len(COMMAND_REGISTRY), 99, -1, 1.5, "Macro:a|b"):
+        with pytest.raises(ValueError):
+            command_frame(command)
+
+
+def test_unknown_command_ids_are_skipped(monkeypatch):
+    submitted = []
+
+    class FakeSender:
+        connected = True
+
+        def __init__(self, *args):
+            pass
+
+        def start(self):
+            pass
+
+        def submit(self, frame, name):
+            submitted.append((frame, name))
+
+        def flush(self, timeout):
+            return True
+
+        def stop(self, timeout=None):
+            pass
+
+    monkeypatch.setattr(send_command_to_server, "TargetSender", FakeSender)
+    monkeypatch.setattr(send_command_to_server.signal, "signal", lambda *args: None)
+    commands = queue.Queue()
+    for command in (99, -1, 0, None):
+        commands.put(command)
+    send_command_to_server.send_command_to_server(commands, multiprocessing.Value("b", False),
+                                                  targets=[("127.0.0.1", SERVER_PORT)])
+    assert submitted == [(b"#0|", COMMAND_REGISTRY[0])]
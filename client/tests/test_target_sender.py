@@ -0,0 +1,57 @@
+# client/tests/test_target_sender.py
+# -*- coding: utf-8 -*-
+"""Tests of the connection to a target server (TargetSender) against a server that never answers the pings."""
+
+import ctypes
+import multiprocessing
+import socket
+import threading
+import time
+
+import send_command_to_server
+from send_command_to_server import TARGET_DROPPED, TARGET_FAILURES, TARGET_STATS_SIZE, TargetSender, command_frame
+
+
+def silent_server() -> socket.socket:
+    """Listens on a free port and accepts every connection, reading and ignoring the frames (no pong is sent)."""
+    listener = socket.create_server(("127.0.0.1", 0))
+
+    def accept():
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=lambda: [None for _ in iter(lambda: conn.recv(1024), b"")], daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    return listener
+
+
+def test_command_taken_when_the_heartbeat_expires_is_counted_as_dropped(monkeypatch):
+    monkeypatch.setattr(send_command_to_server, "HEARTBEAT_TIMEOUT_S", 0.2)
+    monkeypatch.setattr(send_command_to_server, "HEARTBEAT_INTERVAL_S", 10.0)
+    monkeypatch.setattr(send_command_to_server, "RECONNECT_DELAY_S", 0.05)
+    listener = silent_server()
+    shared = multiprocessing.Array(ctypes.c_double, TARGET_STATS_SIZE)
+    sender = TargetSender(*listener.getsockname(), shared=shared)
+    sender.start()
+    try:
+        deadline = time.monotonic() + 5.0
+        while not sender.connected:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        # The server never answers: the command wakes the sender up after the heartbeat expired
+        time.sleep(0.4)
+        sender.submit(command_frame(0), "Volume Up")
+        while shared[TARGET_FAILURES] < 1 or not sender.connected:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert shared[TARGET_DROPPED] == 1
+        # Nothing is being sent on the new connection: flush does not wait for its timeout
+        started = time.monotonic()
+        assert sender.flush(2.0)
+        assert time.monotonic() - started < 0.5
+    finally:
+        sender.stop(timeout=1.0)
+        listener.close()
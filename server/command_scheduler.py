@@ -0,0 +1,303 @@
+# command_scheduler.py
+# -*- coding: utf-8 -*-
+"""This module contains the admission control of the command server (server.py).
+Every connection is handled by its own thread, so without coordination a single client sending commands
+in a loop (e.g., a recognizer stuck on "Scroll Down") could flood the host with input events and starve the other clients.
+
+Every command goes through a CommandScheduler before being executed:
+- Token buckets limit the rate of every client (all its connections together) and of every command of a client.
+  A command over the limit is not executed and is counted as throttled. Only the known commands get their own bucket:
+  any other string a client sends shares one bucket, so arbitrary input cannot grow the state of the scheduler.
+- Execution slots are granted round-robin across the clients waiting for one, so a busy client gets one turn
+  like any other client, instead of one turn per command it sent. There are a few slots, so the commands of different
+  kiosks run side by side while the host is idle, and a command that waits (a macro, a program starting) lends its slot.
+A client is identified by its IP address.
+"""
+
+import threading
+import time
+from collections import deque
+
+# Default rate limits, in commands per second, and bursts (commands accepted back to back after an idle period).
+# A recognizer sends a discrete command at most every few hundred milliseconds, so these limits only stop floods.
+DEFAULT_CLIENT_RATE = 20.0
+DEFAULT_CLIENT_BURST = 20
+DEFAULT_COMMAND_RATE = 10.0
+DEFAULT_COMMAND_BURST = 10
+# Commands that start programs or capture the screen get a lower limit: (rate, burst)
+COMMAND_LIMITS = {
+    "Open Calculator": (1.0, 2),
+    "Task Manager": (1.0, 2),
+    "Screenshot": (2.0, 2),
+}
+# Number of commands that can be executed at the same time
+DEFAULT_EXECUTION_SLOTS = 4
+# Key of the bucket shared by the commands without their own bucket (unknown commands)
+OTHER_COMMANDS = "*"
+
+# Reasons a command is throttled
+THROTTLED_CLIENT = "client"
+THROTTLED_COMMAND = "command"
+
+
+class TokenBucket:
+    """
+    Token bucket: `rate` tokens per second are added, up to `burst` tokens, and every command takes one.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """
+        Initializes a full bucket.
+        Args:
+            rate (float): Tokens added per second.
+            burst (int): Maximum number of tokens.
+        Returns:
+            None
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def ready(self, now: float) -> bool:
+        """
+        Adds the tokens accumulated since the last call and checks if a token is available (without taking it).
+        Args:
+            now (float): Current time.monotonic().
+        Returns:
+            bool: True if a token is available.
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens >= 1.0
+
+    def take(self) -> None:
+        """Takes a token (call `ready` first)."""
+        self.tokens -= 1.0
+
+
+class ClientState:
+    """Rate limits, waiting connections and counters of a client."""
+
+    def __init__(self, client_bucket: "TokenBucket | None") -> None:
+        """
+        Initializes the state of a client.
+        Args:
+            client_bucket (TokenBucket | None): Token bucket of the client (None if the client rate is not limited).
+        Returns:
+            None
+        """
+        self.bucket = client_bucket
+        # command (a known command or OTHER_COMMANDS) -> TokenBucket
+        self.command_buckets = {}
+        # Events of the connection threads waiting for an execution slot, in arrival order
+        self.waiters = deque()
+        # Counters
+        self.executed = 0
+        self.throttled = {THROTTLED_CLIENT: 0, THROTTLED_COMMAND: 0}
+
+
+class CommandScheduler:
+    """
+    Rate limiter and fair scheduler of the commands of all the connections.
+
+    A connection thread calls `admit` for every received command; if the command is admitted, it calls `acquire`
+    before executing it and `release` after. A command that waits while it is executed (a macro) calls `pause`,
+    so the other clients are not blocked during the wait. Clients waiting for a slot are served round-robin, one command per turn.
+    The caller is the executor thread of a connection (see server.handle_client): the connection keeps answering
+    the heartbeats while its commands wait.
+    """
+
+    def __init__(self, client_rate: float = DEFAULT_CLIENT_RATE, client_burst: int = DEFAULT_CLIENT_BURST,
+                 command_rate: float = DEFAULT_COMMAND_RATE, command_burst: int = DEFAULT_COMMAND_BURST,
+                 command_limits: dict = None, slots: int = DEFAULT_EXECUTION_SLOTS, commands: "tuple | None" = None) -> None:
+        """
+        Initializes the scheduler.
+        Args:
+            client_rate (float): Commands per second of a client (0 for no limit).
+            client_burst (int): Burst of a client.
+            command_rate (float): Commands per second of every command of a client (0 for no limit).
+            command_burst (int): Burst of every command of a client.
+            command_limits (dict): command -> (rate, burst) overriding the command limit (defaults to COMMAND_LIMITS).
+            slots (int): Number of commands that can be executed at the same time.
+            commands (tuple | None): The commands with their own bucket (defaults to the keys of `command_limits`).
+                Any other command shares the OTHER_COMMANDS bucket of its client.
+        Returns:
+            None
+        """
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.command_rate = command_rate
+        self.command_burst = command_burst
+        self.command_limits = COMMAND_LIMITS if command_limits is None else command_limits
+        self.commands = frozenset(self.command_limits if commands is None else commands)
+        self.slots = slots
+        self._lock = threading.Lock()
+        # client (IP address) -> ClientState
+        self._clients = {}
+        # Clients with waiting connections, in the order they will get a slot (every client appears once)
+        self._turns = deque()
+        self._busy = 0
+
+    def _client(self, client: str) -> ClientState:
+        """Returns the state of a client, creating it on first use (call with the lock held)."""
+        state = self._clients.get(client)
+        if state is None:
+            bucket = TokenBucket(self.client_rate, self.client_burst) if self.client_rate > 0 else None
+            state = self._clients[client] = ClientState(bucket)
+        return state
+
+    def _command_bucket(self, state: ClientState, command: str) -> "TokenBucket | None":
+        """Returns the token bucket of a command of a client, creating it on first use (call with the lock held)."""
+        if command not in self.commands:
+            command = OTHER_COMMANDS
+        if command not in state.command_buckets:
+            rate, burst = self.command_limits.get(command, (self.command_rate, self.command_burst))
+            state.command_buckets[command] = TokenBucket(rate, burst) if rate > 0 else None
+        return state.command_buckets[command]
+
+    def admit(self, client: str, command: str) -> "str | None":
+        """
+        Checks the rate limits of a command, taking a token from the client and command buckets if it is admitted.
+        Args:
+            client (str): The client (IP address) that sent the command.
+            command (str): The command.
+        Returns:
+            str | None: None if the command is admitted, otherwise the reason it is throttled
+                (THROTTLED_CLIENT or THROTTLED_COMMAND).
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._client(client)
+            command_bucket = self._command_bucket(state, command)
+            if state.bucket is not None and not state.bucket.ready(now):
+                reason = THROTTLED_CLIENT
+            elif command_bucket is not None and not command_bucket.ready(now):
+                reason = THROTTLED_COMMAND
+            else:
+                if state.bucket is not None:
+                    state.bucket.take()
+                if command_bucket is not None:
+                    command_bucket.take()
+                return None
+            state.throttled[reason] += 1
+            return reason
+
+    def acquire(self, client: str) -> None:
+        """
+        Waits for an execution slot. Slots are granted round-robin across the waiting clients.
+        Args:
+            client (str): The client (IP address) of the calling connection.
+        Returns:
+            None
+        """
+        with self._lock:
+            # Fast path: a free slot and nobody waiting
+            if self._busy < self.slots and not self._turns:
+                self._busy += 1
+                return
+            state = self._client(client)
+            event = threading.Event()
+            if not state.waiters:
+                self._turns.append(client)
+            state.waiters.append(event)
+        event.wait()
+
+    def release(self, client: str) -> None:
+        """
+        Releases the execution slot of a connection and hands it over to the next waiting client, if any.
+        Args:
+            client (str): The client (IP address) of the calling connection.
+        Returns:
+            None
+        """
+        with self._lock:
+            self._client(client).executed += 1
+            event = self._hand_over()
+        if event is not None:
+            event.set()
+
+    def pause(self, client: str, seconds: float) -> None:
+        """
+        Lends the execution slot of a connection to the waiting clients for `seconds` (e.g., during the waits of a macro),
+        then waits for a slot again, after the clients already waiting.
+        Args:
+            client (str): The client (IP address) of the calling connection.
+            seconds (float): Time to wait, in seconds.
+        Returns:
+            None
+        """
+        with self._lock:
+            event = self._hand_over()
+        if event is not None:
+            event.set()
+        time.sleep(seconds)
+        self.acquire(client)
+
+    def _hand_over(self) -> "threading.Event | None":
+        """
+        Passes the slot of the calling connection directly to the first connection of the next client in turn,
+        or frees it if nobody is waiting (call with the lock held).
+        Returns:
+            threading.Event | None: The event of the connection that got the slot (set it after releasing the lock), or None.
+        """
+        if not self._turns:
+            self._busy -= 1
+            return None
+        next_client = self._turns.popleft()
+        state = self._clients[next_client]
+        event = state.waiters.popleft()
+        if state.waiters:
+            self._turns.append(next_client)
+        return event
+
+    def stats(self) -> dict:
+        """
+        Returns the counters of every client.
+        Args:
+            None
+        Returns:
+            dict: client -> {"executed": int, "throttled_client": int, "throttled_command": int, "waiting": int}.
+        """
+        with self._lock:
+            return {
+                client: {
+                    "executed": state.executed,
+                    "throttled_client": state.throttled[THROTTLED_CLIENT],
+                    "throttled_command": state.throttled[THROTTLED_COMMAND],
+                    "waiting": len(state.waiters),
+                }
+                for client, state in self._clients.items()
+            }
+
+    def snapshot(self) -> dict:
+        """
+        Returns the state of the scheduler, served to the clients that ask for it (see server.py STATS_REQUEST).
+        Args:
+            None
+        Returns:
+            dict: {"slots", "busy", "waiting", "throttled", "clients"}, where busy is the number of slots in use,
+                waiting the number of connections waiting for one, throttled the number of commands throttled
+                since the server started, and clients the counters of every client (see `stats`).
+        """
+        clients = self.stats()
+        with self._lock:
+            busy = self._busy
+        return {
+            "slots": self.slots,
+            "busy": busy,
+            "waiting": sum(counters["waiting"] for counters in clients.values()),
+            "throttled": sum(counters["throttled_client"] + counters["throttled_command"] for counters in clients.values()),
+            "clients": clients,
+        }
+
+    def throttled_total(self) -> int:
+        """Returns the number of commands throttled since the server started."""
+        with self._lock:
+            return sum(sum(state.throttled.values()) for state in self._clients.values())
+
+    def print_stats(self) -> None:
+        """Prints the counters of every client."""
+        for client, counters in self.stats().items():
+            print(f"[STATS] {client}: {counters['executed']} executed, {counters['throttled_client']} throttled by the client limit, "
+                  f"{counters['throttled_command']} throttled by the command limit")
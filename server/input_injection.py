@@ -0,0 +1,328 @@
+# input_injection.py
+# -*- coding: utf-8 -*-
+"""This module contains the input injection of the command server (server.py).
+Keyboard and mouse actions are built as arrays of INPUT structures and submitted with a single SendInput call,
+instead of one keybd_event / mouse_event call per key edge: a command costs one system call, and the events
+of a batch are inserted in the input stream together, so no other input (e.g., the real keyboard) can interleave
+with a chord like Ctrl+Shift+T.
+
+It also compiles macro commands: user-defined key sequences sent as a single protocol message, e.g.
+"Macro:ctrl+shift+t" or "Macro:ctrl+c,wait 100,ctrl+v" (see compile_macro).
+The structures and the macro compiler work on every platform; only send_inputs needs Windows.
+"""
+
+import ctypes
+import time
+from functools import lru_cache
+
+# Prefix of the macro commands (must match client/client_constants.py)
+MACRO_PREFIX = "Macro:"
+# Limits of a macro: a macro holds the execution slot of the scheduler (see command_scheduler.py) while it runs
+MAX_MACRO_INPUTS = 128
+MAX_MACRO_WAIT_S = 10.0
+# Number of compiled macros kept in memory (a gesture sends the same macro again and again)
+MACRO_CACHE_SIZE = 256
+
+# INPUT types and flags (winuser.h)
+INPUT_MOUSE = 0
+INPUT_KEYBOARD = 1
+INPUT_HARDWARE = 2
+KEYEVENTF_EXTENDEDKEY = 0x0001
+KEYEVENTF_KEYUP = 0x0002
+MOUSEEVENTF_MOVE = 0x0001
+MOUSEEVENTF_WHEEL = 0x0800
+MOUSEEVENTF_ABSOLUTE = 0x8000
+# Absolute mouse coordinates are normalized to 0 - 65535 over the primary screen
+ABSOLUTE_RANGE = 65535
+
+# Windows types with their Windows sizes (fixed-width types, so the layout is the same when built on other platforms)
+LONG = ctypes.c_int32
+DWORD = ctypes.c_uint32
+WORD = ctypes.c_uint16
+ULONG_PTR = ctypes.c_size_t
+
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [("dx", LONG), ("dy", LONG), ("mouseData", DWORD), ("dwFlags", DWORD),
+                ("time", DWORD), ("dwExtraInfo", ULONG_PTR)]
+
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [("wVk", WORD), ("wScan", WORD), ("dwFlags", DWORD), ("time", DWORD), ("dwExtraInfo", ULONG_PTR)]
+
+
+class HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [("uMsg", DWORD), ("wParamL", WORD), ("wParamH", WORD)]
+
+
+class _INPUT_UNION(ctypes.Union):
+    _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT), ("hi", HARDWAREINPUT)]
+
+
+class INPUT(ctypes.Structure):
+    _anonymous_ = ("u",)
+    _fields_ = [("type", DWORD), ("u", _INPUT_UNION)]
+
+
+# Key names accepted in macros -> Virtual-Key codes
+KEY_CODES = {
+    "backspace": 0x08, "tab": 0x09, "enter": 0x0D, "shift": 0x10, "ctrl": 0x11, "alt": 0x12, "pause": 0x13,
+    "capslock": 0x14, "esc": 0x1B, "space": 0x20, "pageup": 0x21, "pagedown": 0x22, "end": 0x23, "home": 0x24,
+    "left": 0x25, "up": 0x26, "right": 0x27, "down": 0x28, "printscreen": 0x2C, "insert": 0x2D, "delete": 0x2E,
+    "win": 0x5B, "apps": 0x5D,
+    "volumemute": 0xAD, "volumedown": 0xAE, "volumeup": 0xAF,
+    "nexttrack": 0xB0, "prevtrack": 0xB1, "stop": 0xB2, "playpause": 0xB3,
+}
+KEY_CODES.update({chr(c): c for c in range(ord("A"), ord("Z") + 1)})
+KEY_CODES.update({chr(c).lower(): c for c in range(ord("A"), ord("Z") + 1)})
+KEY_CODES.update({str(d): 0x30 + d for d in range(10)})
+KEY_CODES.update({f"f{n}": 0x6F + n for n in range(1, 25)})
+# Aliases
+KEY_CODES.update({"control": KEY_CODES["ctrl"], "menu": KEY_CODES["alt"], "escape": KEY_CODES["esc"],
+                  "return": KEY_CODES["enter"], "del": KEY_CODES["delete"], "ins": KEY_CODES["insert"],
+                  "pgup": KEY_CODES["pageup"], "pgdn": KEY_CODES["pagedown"], "prtsc": KEY_CODES["printscreen"]})
+# Keys of the extended part of the keyboard: without KEYEVENTF_EXTENDEDKEY, Windows takes them for the numeric keypad
+EXTENDED_KEYS = frozenset({0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x2C, 0x2D, 0x2E, 0x5B, 0x5D})
+
+_user32 = None
+
+
+def _send_input():
+    """Returns the SendInput function of user32.dll (loaded on first use, Windows only)."""
+    global _user32
+    if _user32 is None:
+        _user32 = ctypes.WinDLL("user32", use_last_error=True)
+        _user32.SendInput.argtypes = (ctypes.c_uint, ctypes.POINTER(INPUT), ctypes.c_int)
+        _user32.SendInput.restype = ctypes.c_uint
+    return _user32.SendInput
+
+
+def key_input(vk: int, up: bool = False) -> INPUT:
+    """
+    Builds the INPUT of a key press or release.
+    Args:
+        vk (int): Virtual-Key code of the key.
+        up (bool): True for the release.
+    Returns:
+        INPUT: The keyboard input.
+    """
+    flags = (KEYEVENTF_KEYUP if up else 0) | (KEYEVENTF_EXTENDEDKEY if vk in EXTENDED_KEYS else 0)
+    event = INPUT(type=INPUT_KEYBOARD)
+    event.ki = KEYBDINPUT(wVk=vk, wScan=0, dwFlags=flags, time=0, dwExtraInfo=0)
+    return event
+
+
+def wheel_input(amount: int) -> INPUT:
+    """
+    Builds the INPUT of a mouse wheel rotation.
+    Args:
+        amount (int): Wheel units (120 per notch), positive to scroll up.
+    Returns:
+        INPUT: The mouse input.
+    """
+    event = INPUT(type=INPUT_MOUSE)
+    # mouseData is a DWORD: a negative amount is passed as its two's complement
+    event.mi = MOUSEINPUT(dx=0, dy=0, mouseData=amount & 0xFFFFFFFF, dwFlags=MOUSEEVENTF_WHEEL, time=0, dwExtraInfo=0)
+    return event
+
+
+def move_input(x: float, y: float) -> INPUT:
+    """
+    Builds the INPUT of an absolute pointer move on the primary screen.
+    Args:
+        x (float): Horizontal position, from 0.0 (left) to 1.0 (right).
+        y (float): Vertical position, from 0.0 (top) to 1.0 (bottom).
+    Returns:
+        INPUT: The mouse input.
+    """
+    event = INPUT(type=INPUT_MOUSE)
+    event.mi = MOUSEINPUT(dx=round(min(max(x, 0.0), 1.0) * ABSOLUTE_RANGE), dy=round(min(max(y, 0.0), 1.0) * ABSOLUTE_RANGE),
+                          mouseData=0, dwFlags=MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE, time=0, dwExtraInfo=0)
+    return event
+
+
+def send_inputs(inputs: "ctypes.Array") -> None:
+    """
+    Submits an array of INPUT structures with one SendInput call.
+    Args:
+        inputs (ctypes.Array): Array of INPUT (see InputBatch.array).
+    Returns:
+        None
+    Raises:
+        OSError: If the inputs could not be inserted (e.g., blocked by a higher-integrity window).
+    """
+    if not len(inputs):
+        return
+    inserted = _send_input()(len(inputs), inputs, ctypes.sizeof(INPUT))
+    if inserted != len(inputs):
+        raise OSError(ctypes.get_last_error(), f"SendInput inserted {inserted} of {len(inputs)} inputs")
+
+
+class InputBatch:
+    """
+    Builder of a batch of keyboard and mouse inputs, submitted together with one SendInput call.
+    The methods return the batch, so calls can be chained: InputBatch().tap(VK).send().
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty batch."""
+        self.inputs = []
+
+    def key_down(self, vk: int) -> "InputBatch":
+        """Adds the press of a key (Virtual-Key code)."""
+        self.inputs.append(key_input(vk))
+        return self
+
+    def key_up(self, vk: int) -> "InputBatch":
+        """Adds the release of a key (Virtual-Key code)."""
+        self.inputs.append(key_input(vk, up=True))
+        return self
+
+    def tap(self, vk: int, times: int = 1) -> "InputBatch":
+        """Adds `times` presses and releases of a key (Virtual-Key code)."""
+        for _ in range(times):
+            self.key_down(vk).key_up(vk)
+        return self
+
+    def chord(self, vks: list) -> "InputBatch":
+        """Adds a chord: the keys are pressed in order and released in reverse order (e.g., [ctrl, shift, t])."""
+        for vk in vks:
+            self.key_down(vk)
+        for vk in reversed(vks):
+            self.key_up(vk)
+        return self
+
+    def wheel(self, amount: int) -> "InputBatch":
+        """Adds a mouse wheel rotation of `amount` wheel units."""
+        self.inputs.append(wheel_input(amount))
+        return self
+
+    def move(self, x: float, y: float) -> "InputBatch":
+        """Adds an absolute pointer move (0.0 - 1.0 of the primary screen)."""
+        self.inputs.append(move_input(x, y))
+        return self
+
+    def array(self) -> "ctypes.Array":
+        """Returns the inputs of the batch as an array of INPUT, ready for SendInput."""
+        return (INPUT * len(self.inputs))(*self.inputs)
+
+    def send(self) -> None:
+        """Submits the batch with one SendInput call (see send_inputs)."""
+        send_inputs(self.array())
+
+
+def key_code(name: str) -> int:
+    """
+    Returns the Virtual-Key code of a key name of a macro.
+    Args:
+        name (str): Key name (see KEY_CODES), or a hexadecimal Virtual-Key code like "0xB3".
+    Returns:
+        int: The Virtual-Key code.
+    Raises:
+        ValueError: If the key is unknown.
+    """
+    name = name.strip()
+    vk = KEY_CODES.get(name, KEY_CODES.get(name.lower()))
+    if vk is not None:
+        return vk
+    if name.lower().startswith("0x"):
+        try:
+            vk = int(name, 16)
+        except ValueError:
+            vk = 0
+        if 0 < vk < 0xFF:
+            return vk
+    raise ValueError(f"unknown key '{name}'")
+
+
+@lru_cache(maxsize=MACRO_CACHE_SIZE)
+def compile_macro(spec: str) -> tuple:
+    """
+    Compiles a macro into the SendInput batches to submit and the waits between them.
+    A macro is a comma-separated list of steps:
+    - a key or a chord of keys joined by "+" ("f5", "ctrl+shift+t"): pressed in order, released in reverse order;
+    - "down <key>" / "up <key>": press or release a key (to hold a key across waits);
+    - "wait <ms>": pause for a number of milliseconds.
+    Consecutive key steps are submitted in the same batch. Keys still held at the end of the macro are released.
+    Compiled macros are cached, so a macro sent repeatedly is parsed once.
+    Args:
+        spec (str): The macro, without MACRO_PREFIX (e.g., "ctrl+c,wait 100,ctrl+v").
+    Returns:
+        tuple: The steps, in order: arrays of INPUT (see send_inputs) and waits in seconds (float).
+    Raises:
+        ValueError: If the macro is invalid or over the limits (MAX_MACRO_INPUTS, MAX_MACRO_WAIT_S).
+    """
+    steps = []
+    batch = InputBatch()
+    held = []
+    inputs = 0
+    total_wait = 0.0
+    for step in spec.split(","):
+        step = step.strip()
+        if not step:
+            raise ValueError("empty step")
+        words = step.split()
+        if words[0].lower() == "wait" and len(words) == 2:
+            try:
+                wait = float(words[1]) / 1000
+            except ValueError:
+                raise ValueError(f"invalid wait '{step}'")
+            if not wait >= 0:
+                raise ValueError(f"invalid wait '{step}'")
+            total_wait += wait
+            if batch.inputs:
+                steps.append(batch.array())
+                batch = InputBatch()
+            steps.append(wait)
+        elif words[0].lower() == "down" and len(words) == 2:
+            vk = key_code(words[1])
+            if vk in held:
+                raise ValueError(f"key '{words[1]}' is already down")
+            held.append(vk)
+            batch.key_down(vk)
+        elif words[0].lower() == "up" and len(words) == 2:
+            vk = key_code(words[1])
+            if vk not in held:
+                raise ValueError(f"key '{words[1]}' is not down")
+            held.remove(vk)
+            batch.key_up(vk)
+        else:
+            batch.chord([key_code(key) for key in step.split("+")])
+        inputs = sum(len(s) for s in steps if not isinstance(s, float)) + len(batch.inputs)
+        if inputs > MAX_MACRO_INPUTS:
+            raise ValueError(f"more than {MAX_MACRO_INPUTS} inputs")
+        if total_wait > MAX_MACRO_WAIT_S:
+            raise ValueError(f"waits longer than {MAX_MACRO_WAIT_S:g} s in total")
+    # Never leave a key stuck down
+    for vk in reversed(held):
+        batch.key_up(vk)
+    if batch.inputs:
+        steps.append(batch.array())
+    if not inputs:
+        raise ValueError("no keys")
+    return tuple(steps)
+
+
+def run_macro(steps: tuple, wait: "callable" = time.sleep) -> None:
+    """
+    Runs a compiled macro (see compile_macro): submits its batches and waits between them.
+    Args:
+        steps (tuple): The compiled macro.
+        wait (callable): Called with the duration of every wait, in seconds (e.g., to lend the execution slot
+            of the server to the other clients meanwhile).
+    Returns:
+        None
+    Raises:
+        OSError: If a batch could not be inserted.
+    """
+    for step in steps:
+        if isinstance(step, float):
+            wait(step)
+        else:
+            send_inputs(step)
+
+
+def macro_inputs(steps: tuple) -> int:
+    """Returns the number of inputs of a compiled macro (the keybd_event calls it would have taken)."""
+    return sum(len(step) for step in steps if not isinstance(step, float))
+
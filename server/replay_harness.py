@@ -0,0 +1,345 @@
+# replay_harness.py
+# -*- coding: utf-8 -*-
+"""This module implements a load-testing harness for the command server (server.py).
+It opens one or many TCP connections to the server and sends either a recorded command stream
+(a JSON Lines file written by the server's recording backend) or a synthetic stream with a configurable
+rate and burst shape, then reports throughput, lost commands and latency percentiles.
+
+To run it entirely on Linux, start the server with the recording backend on the same host:
+    python server.py --backend recording --record-file recorded_commands.jsonl
+    python replay_harness.py --connections 8 --rate 50 --duration 10 --server-record-file recorded_commands.jsonl
+
+The latency of a command is the time between the harness sending it and the recording backend receiving it,
+so it is only reported when --server-record-file is given (both processes must share the same clock).
+"""
+
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+
+# Commands sent by the synthetic stream (the commands of client_constants.COMMANDS that are safe to execute repeatedly)
+DEFAULT_COMMANDS = ("Volume Up", "Volume Down", "PlayPause", "Scroll Up", "Scroll Down")
+
+# Burst shapes of the synthetic stream
+BURST_SHAPES = ("steady", "burst", "poisson")
+
+
+def synthetic_schedule(rate: float, duration: float, burst_shape: str = "steady", burst_size: int = 5,
+                       commands: tuple = DEFAULT_COMMANDS, seed: int = None) -> list:
+    """
+    Builds a synthetic command schedule for one connection.
+    Args:
+        rate (float): Average number of commands per second.
+        duration (float): Length of the schedule in seconds.
+        burst_shape (str): "steady" (evenly spaced commands), "burst" (groups of `burst_size` commands sent back to back,
+            with the same average rate) or "poisson" (exponentially distributed inter-arrival times).
+        burst_size (int): Number of commands in a group, for the "burst" shape.
+        commands (tuple): Commands to send, in round-robin order.
+        seed (int): Seed of the random generator, for the "poisson" shape.
+    Returns:
+        list: (offset in seconds from the start, command) tuples, sorted by offset.
+    """
+    rng = random.Random(seed)
+    schedule = []
+    offset = 0.0
+    index = 0
+    while offset < duration:
+        if burst_shape == "burst":
+            for _ in range(burst_size):
+                schedule.append((offset, commands[index % len(commands)]))
+                index += 1
+            offset += burst_size / rate
+            continue
+        schedule.append((offset, commands[index % len(commands)]))
+        index += 1
+        offset += rng.expovariate(rate) if burst_shape == "poisson" else 1.0 / rate
+    return schedule
+
+
+def recorded_schedules(path: str, connections: int) -> list:
+    """
+    Builds the command schedules from a recorded stream (a file written by the recording backend).
+    Every recorded peer is replayed on its own connection, preserving the recorded inter-arrival times.
+    If the recording has a single peer, its stream is replayed on every one of the `connections` connections.
+    Args:
+        path (str): Path of the recorded JSON Lines file.
+        connections (int): Number of connections, used when the recording has a single peer.
+    Returns:
+        list: One schedule per connection (see `synthetic_schedule`).
+    """
+    streams = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            # Throttled commands were sent by the client too
+            command = record.get("command", record.get("throttled"))
+            if command is not None:
+                streams.setdefault(record.get("peer", ""), []).append((record["t"], command))
+    if not streams:
+        return []
+    first = min(stream[0][0] for stream in streams.values())
+    schedules = [[(t - first, command) for t, command in stream] for stream in streams.values()]
+    if len(schedules) == 1:
+        schedules = schedules * connections
+    return schedules
+
+
+def run_connection(host: str, port: int, schedule: list, start_time: float, result: dict, source_address: tuple = None) -> None:
+    """
+    Sends a command schedule over a new TCP connection.
+    Args:
+        host (str): Server address.
+        port (int): Server port.
+        schedule (list): (offset, command) tuples to send.
+        start_time (float): UNIX time corresponding to offset 0.
+        result (dict): Filled with "peer" (the local "ip:port" of the connection, as seen by the server),
+            "sent" ((send time, command) tuples) and "error" (the error that interrupted the connection, if any).
+        source_address (tuple): Local (ip, port) to bind the connection to (e.g., ("127.0.0.2", 0) to look like another client
+            to the server's rate limits). None for the default.
+    Returns:
+        None
+    """
+    result["sent"] = []
+    result["error"] = None
+    try:
+        with socket.create_connection((host, port), source_address=source_address) as s:
+            # Send every command in its own segment, like a real client sending at a low rate
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            local_ip, local_port = s.getsockname()[:2]
+            result["peer"] = f"{local_ip}:{local_port}"
+            for offset, command in schedule:
+                delay = start_time + offset - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                sent_at = time.time()
+                s.sendall((command + "|").encode())
+                result["sent"].append((sent_at, command))
+    except OSError as e:
+        result["error"] = str(e)
+
+
+def read_server_records(path: str, since: float) -> dict:
+    """
+    Reads the records written by the recording backend after a given time, grouped by peer.
+    Args:
+        path (str): Path of the server's record file.
+        since (float): Records older than this UNIX time are ignored.
+    Returns:
+        dict: peer -> list of (receive time, frame, executed) tuples, in the order the frames were received.
+            `executed` is False for frames that were discarded by the server, and None for commands that were throttled.
+    """
+    records = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            # Skip old records and continuous-control updates (they are not TCP frames)
+            if record["t"] < since or "control" in record:
+                continue
+            frames = records.setdefault(record["peer"], [])
+            if "command" in record:
+                frames.append((record["t"], record["command"], True))
+            elif "throttled" in record:
+                frames.append((record["t"], record["throttled"], None))
+            else:
+                frames.extend((record["t"], frame, False) for frame in record.get("discarded", []))
+    return records
+
+
+def match_frames(sent: list, frames: list) -> dict:
+    """
+    Matches the frames received by the server with the commands sent on the same connection.
+    TCP delivers the frames in order, so the n-th received frame is the n-th sent command, unless a command
+    was split between two chunks: its two halves are then received as two frames that match no command
+    (they are counted as "corrupted" and the sent command is skipped).
+    Args:
+        sent (list): (send time, command) tuples.
+        frames (list): (receive time, frame, executed) tuples, as returned by `read_server_records`.
+    Returns:
+        dict: "executed" (number of sent commands executed by the server), "merged" (number of sent commands
+            received but discarded because they arrived in the same chunk as another command),
+            "throttled" (number of sent commands not executed because of the server's rate limits),
+            "corrupted" (number of frames matching no command) and "latencies" (latencies in seconds of the executed commands).
+    """
+    report = {"executed": 0, "merged": 0, "throttled": 0, "corrupted": 0, "latencies": []}
+    i = 0
+    for received_at, frame, executed in frames:
+        if i < len(sent) and frame == sent[i][1]:
+            if executed:
+                report["executed"] += 1
+                report["latencies"].append(received_at - sent[i][0])
+            elif executed is None:
+                report["throttled"] += 1
+            else:
+                report["merged"] += 1
+            i += 1
+            continue
+        report["corrupted"] += 1
+        # The second half of a split command: move on to the next sent command
+        if i < len(sent) and sent[i][1].endswith(frame):
+            i += 1
+    return report
+
+
+def percentile(values: list, p: float) -> float:
+    """
+    Computes a percentile with linear interpolation.
+    Args:
+        values (list): Sorted values.
+        p (float): Percentile, between 0 and 100.
+    Returns:
+        float: The percentile, or 0.0 if `values` is empty.
+    """
+    if not values:
+        return 0.0
+    k = (len(values) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (k - lower)
+
+
+def run_load_test(host: str, port: int, schedules: list, server_record_file: str = None, settle: float = 1.0) -> dict:
+    """
+    Runs the schedules concurrently (one connection each) and builds the report.
+    Args:
+        host (str): Server address.
+        port (int): Server port.
+        schedules (list): One schedule per connection.
+        server_record_file (str): Record file of a server running the recording backend on the same host.
+            If None, only the sending side is measured.
+        settle (float): Seconds to wait after the last command before reading the server's record file.
+    Returns:
+        dict: The report (see `print_report`).
+    """
+    results = [{} for _ in schedules]
+    # Leave time to open all the connections before the first command
+    start_time = time.time() + 0.2
+    threads = [threading.Thread(target=run_connection, args=(host, port, schedule, start_time, result))
+               for schedule, result in zip(schedules, results)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    end_time = time.time()
+
+    sent = sum(len(result["sent"]) for result in results)
+    report = {
+        "connections": len(schedules),
+        "errors": [result["error"] for result in results if result["error"]],
+        "sent": sent,
+        "send_duration_s": end_time - start_time,
+        "send_rate": sent / (end_time - start_time) if end_time > start_time else 0.0,
+    }
+    if server_record_file is None:
+        return report
+
+    time.sleep(settle)
+    records = read_server_records(server_record_file, start_time)
+    executed = merged = throttled = corrupted = 0
+    latencies = []
+    last_received_at = start_time
+    for result in results:
+        frames = records.get(result.get("peer"), [])
+        matched = match_frames(result["sent"], frames)
+        executed += matched["executed"]
+        merged += matched["merged"]
+        throttled += matched["throttled"]
+        corrupted += matched["corrupted"]
+        latencies.extend(matched["latencies"])
+        if frames:
+            last_received_at = max(last_received_at, frames[-1][0])
+    latencies.sort()
+    report.update({
+        # Commands executed by the server's backend
+        "received": executed,
+        # Commands that reached the server in the same chunk as another command and were not executed
+        "merged": merged,
+        # Commands that were not executed because the client was over the server's rate limits
+        "throttled": throttled,
+        # Commands that were not executed for any other reason (never received, or split between two chunks)
+        "dropped": max(sent - executed - merged - throttled, 0),
+        # Frames that did not match any sent command (halves of split commands)
+        "corrupted": corrupted,
+        "throughput": executed / (last_received_at - start_time) if last_received_at > start_time else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1000,
+            "p90": percentile(latencies, 90) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "max": (latencies[-1] if latencies else 0.0) * 1000,
+        },
+    })
+    return report
+
+
+def print_report(report: dict) -> None:
+    """
+    Prints a human-readable report.
+    Args:
+        report (dict): The report returned by `run_load_test`.
+    Returns:
+        None
+    """
+    print(f"[REPORT] Connections: {report['connections']} ({len(report['errors'])} failed)")
+    for error in report["errors"]:
+        print(f"[ERROR] {error}")
+    print(f"[REPORT] Sent: {report['sent']} commands in {report['send_duration_s']:.2f} s ({report['send_rate']:.1f} commands/s)")
+    if "received" not in report:
+        return
+    print(f"[REPORT] Executed: {report['received']} (merged: {report['merged']}, throttled: {report['throttled']}, dropped: {report['dropped']}, "
+          f"corrupted frames: {report['corrupted']})")
+    print(f"[REPORT] Throughput: {report['throughput']:.1f} commands/s")
+    latency = report["latency_ms"]
+    print(f"[REPORT] Latency: p50 {latency['p50']:.2f} ms, p90 {latency['p90']:.2f} ms, "
+          f"p99 {latency['p99']:.2f} ms, max {latency['max']:.2f} ms")
+
+
+def main(argv: list = None) -> None:
+    """
+    Command line entry point of the harness.
+    Args:
+        argv (list): Command line arguments (defaults to sys.argv[1:]).
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Load-test the gesture command server.")
+    parser.add_argument("--host", default="127.0.0.1", help="Server address.")
+    parser.add_argument("--port", type=int, default=9000, help="Server port.")
+    parser.add_argument("--connections", type=int, default=1, help="Number of concurrent connections.")
+    parser.add_argument("--replay", help="Recorded stream to replay (a file written by the recording backend). "
+                                         "If omitted, a synthetic stream is sent.")
+    parser.add_argument("--rate", type=float, default=10.0, help="Synthetic stream: commands per second on each connection.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Synthetic stream: duration in seconds.")
+    parser.add_argument("--burst-shape", choices=BURST_SHAPES, default="steady", help="Synthetic stream: burst shape.")
+    parser.add_argument("--burst-size", type=int, default=5, help="Synthetic stream: commands in a burst.")
+    parser.add_argument("--commands", nargs="+", default=list(DEFAULT_COMMANDS), help="Synthetic stream: commands to send.")
+    parser.add_argument("--server-record-file", help="Record file of a server started with --backend recording on this host.")
+    parser.add_argument("--settle", type=float, default=1.0, help="Seconds to wait for the server before reading its record file.")
+    parser.add_argument("--json-output", help="Also write the report to this JSON file.")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        schedules = recorded_schedules(args.replay, args.connections)
+    else:
+        schedules = [synthetic_schedule(args.rate, args.duration, args.burst_shape, args.burst_size, tuple(args.commands), seed=i)
+                     for i in range(args.connections)]
+    if not schedules:
+        print("[ERROR] Nothing to send.")
+        return
+
+    report = run_load_test(args.host, args.port, schedules, args.server_record_file, args.settle)
+    print_report(report)
+    if args.json_output:
+        with open(args.json_output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,25 +5,90 @@ It supports commands such as volume control, opening applications, simulating ke
 The server uses Python's socket library for networking, threading for handling multiple clients, and pycaw for audio control on Windows.
 It also uses psutil to check if certain applications are already running before executing commands to avoid duplicates.
 The server runs indefinitely, accepting connections and processing commands until it is manually stopped.
+It also listens for continuous-control updates (scroll velocity, volume level, pointer position) on a UDP port:
+only the newest update of every kind is applied, so control stays responsive even if updates arrive faster than they are applied.
+Commands go through a CommandScheduler (command_scheduler.py), which rate-limits every client and command
+and shares the execution between the clients, so a single flooding client cannot starve the others.
+Key presses and mouse actions are injected with one SendInput call per command (input_injection.py),
+and macro commands ("Macro:<keys>") send user-defined key sequences and chords.
+Clients send the built-in commands as their ID ("#<id>|" frames, see COMMAND_REGISTRY); text frames are still accepted.
 """
 
+import argparse
+import json
 import socket
+import struct
+import sys
 import threading
-import pythoncom
 import ctypes
 import time
-import psutil
 import subprocess
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+from collections import deque
 from ctypes import cast, POINTER
-from comtypes import CLSCTX_ALL
 
-# Server configuration
-HOST = '0.0.0.0'
+from command_scheduler import (COMMAND_LIMITS, CommandScheduler, DEFAULT_CLIENT_BURST, DEFAULT_CLIENT_RATE, DEFAULT_COMMAND_BURST,
+                               DEFAULT_COMMAND_RATE, DEFAULT_EXECUTION_SLOTS)
+from input_injection import MACRO_PREFIX, InputBatch, compile_macro, run_macro
+
+# The Windows action backend needs Windows-only packages.
+# They are not imported on other platforms, where only the recording backend is available.
+if sys.platform == "win32":
+    import pythoncom
+    import psutil
+    from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+    from comtypes import CLSCTX_ALL
+
+# Server configuration: an empty host listens on all the interfaces, IPv6 and IPv4 (dual stack) where IPv6 is available
+HOST = ''
 PORT = 9000
 
-# Constants for mouse events
-MOUSEEVENTF_WHEEL = 0x0800
+# Default file written by the recording backend
+DEFAULT_RECORD_FILE = "recorded_commands.jsonl"
+# Heartbeat frames (must match client/send_command_to_server.py): the server answers "Ping <n>|" with "Pong <n>|"
+HEARTBEAT_PING = "Ping"
+HEARTBEAT_PONG = "Pong"
+# A client that sent pings is disconnected if it sends nothing for this long (it pings every second)
+HEARTBEAT_TIMEOUT_S = 5.0
+# Statistics request: the server answers a "Stats|" frame with "Stats <JSON>|", the state of the scheduler
+# (see CommandScheduler.snapshot), e.g. printf 'Stats|' | nc -q 1 <server> 9000
+STATS_REQUEST = "Stats"
+# Interval between two prints of the scheduler counters (only printed if commands were throttled)
+STATS_INTERVAL_S = 60.0
+# Commands of a connection waiting to be executed: a command received while the backlog is full is discarded
+# (the rate limits admit far fewer commands, so only a flood fills it)
+COMMAND_BACKLOG = 32
+
+# Command IDs (must match client/client_constants.py COMMAND_REGISTRY: only append, server/tests checks it):
+# "#<id>" frames carry the index in this tuple
+COMMAND_REGISTRY = ("Volume Up", "Volume Down", "Open Calculator", "Screenshot", "AltTab", "PlayPause", "Scroll Up",
+                    "Scroll Down", "Task Manager", "Scroll (continuous)", "Volume (continuous)", "Pointer (continuous)")
+COMMAND_ID_PREFIX = "#"
+
+# Rate limit of the macro commands of a client: (rate, burst). All the macros of a client share one bucket,
+# so a client cannot get around the limit by changing the macro slightly.
+MACRO_LIMIT = (1.0, 3)
+
+# Per-thread state of the command being executed: "wait" is the function the commands wait with
+# (set by handle_client to lend the execution slot of the connection to the other clients meanwhile)
+execution = threading.local()
+
+# Mouse wheel units of a notch
+WHEEL_DELTA = 120
+# Key presses of the Alt+Tab command: Alt is held for 2.5 seconds, so that the user can pick a window in the switcher
+ALT_TAB_STEPS = compile_macro("down alt,tab,wait 2500,up alt")
+
+# Continuous-control datagrams (must match client/control_channel.py):
+# magic b"GC", kind, session, sequence number, two float32 values
+CONTROL_PACKET = struct.Struct("!2sBIIff")
+CONTROL_MAGIC = b"GC"
+CONTROL_SCROLL = 1   # value1: scroll velocity in wheel units per second
+CONTROL_VOLUME = 2   # value1: absolute master volume level (0.0 - 1.0)
+CONTROL_POINTER = 3  # value1, value2: absolute pointer position (0.0 - 1.0 of the screen)
+CONTROL_NAMES = {CONTROL_SCROLL: "scroll", CONTROL_VOLUME: "volume", CONTROL_POINTER: "pointer"}
+# The scroll velocity is applied until it is this old (the client stops sending updates when the gesture ends)
+CONTROL_TIMEOUT_S = 0.25
+# Interval between two scroll steps while scrolling
+CONTROL_TICK_S = 1 / 120
 
 
 def calculator_already_running() -> bool: 
@@ -83,6 +148,23 @@ def get_master_volume() -> int:
         return 0
 
 
+def set_master_volume(level: float) -> None:
+    """
+    Sets the master volume level of the system.
+    Args:
+        level (float): The volume level, from 0.0 to 1.0.
+    Returns:
+        None
+    """
+    try:
+        devices = AudioUtilities.GetSpeakers()
+        interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+        volume = cast(interface, POINTER(IAudioEndpointVolume))
+        volume.SetMasterVolumeLevelScalar(min(max(level, 0.0), 1.0), None)
+    except Exception as e:
+        print(f"[ERROR] Failed to set master volume: {e}")
+
+
 def simulate_volume_key(key: str, steps: int = 3) -> None:
     """
     Simulates pressing the system volume up or down key a specified number of times.
@@ -93,6 +175,7 @@ def simulate_volume_key(key: str, steps: int = 3) -> None:
         None
     Note:
         This function uses Windows-specific APIs via ctypes and will only work on Windows platforms.
+        All the key presses are sent with one SendInput call.
     """
     # Virtual-Key codes for volume control
     VK_VOLUME_UP = 0xAF
@@ -107,10 +190,8 @@ def simulate_volume_key(key: str, steps: int = 3) -> None:
         # Invalid key, return without doing anything
         return
 
-    # Simulate key press and release for the specified number of steps
-    for _ in range(steps):
-        ctypes.windll.user32.keybd_event(vk, 0, 0, 0)   # Key down
-        ctypes.windll.user32.keybd_event(vk, 0, 2, 0)   # Key up
+    # Simulate key press and release for the specified number of steps, in a single batch
+    InputBatch().tap(vk, steps).send()
 
 def volume_up() -> str:
     """
@@ -153,23 +234,18 @@ def simulate_alt_tab() -> None:
     """
     Simulates the "Alt+Tab" keyboard shortcut on Windows to switch between open applications.
     This function programmatically presses and holds the Alt key, then presses the Tab key to open the window switcher.
-    It waits for a short period (2.5 seconds) to allow the user to select a window, then releases both keys.
+    It waits for a short period (2.5 seconds) to allow the user to select a window, then releases the Alt key.
     Useful for automating window switching in GUI automation tasks.
     Args:
         None
     Returns:
         None
     Note:
-        This function is intended for use on Windows systems and requires the `ctypes` and `time` modules.
+        This function is intended for use on Windows systems (see input_injection.py).
     """
     try:
-        VK_MENU = 0x12
-        VK_TAB = 0x09
-        ctypes.windll.user32.keybd_event(VK_MENU, 0, 0, 0)
-        ctypes.windll.user32.keybd_event(VK_TAB, 0, 0, 0)
-        time.sleep(2.5)
-        ctypes.windll.user32.keybd_event(VK_TAB, 0, 2, 0)
-        ctypes.windll.user32.keybd_event(VK_MENU, 0, 2, 0)
+        # Two batches: Alt down + Tab press, then Alt up
+        run_macro(ALT_TAB_STEPS, command_wait)
     except Exception as e:
         print(f"[ERROR] simulate_alt_tab failed: {e}")
 
@@ -189,8 +265,7 @@ def simulate_media_play_pause() -> None:
     """
     try:
         VK_MEDIA_PLAY_PAUSE = 0xB3
-        ctypes.windll.user32.keybd_event(VK_MEDIA_PLAY_PAUSE, 0, 0, 0)
-        ctypes.windll.user32.keybd_event(VK_MEDIA_PLAY_PAUSE, 0, 0x0002, 0)
+        InputBatch().tap(VK_MEDIA_PLAY_PAUSE).send()
     except Exception as e:
         print(f"[ERROR] simulate_media_play_pause failed: {e}")
 
@@ -200,10 +275,11 @@ def open_calculator() -> None:
     Opens the Windows Calculator application and waits for 3 seconds.
     This function launches 'calc.exe' using a subprocess and then pauses execution for 3 seconds.
     To give time for the application to open before proceeding with any further actions.
+    The wait lends the execution slot to the other clients (see command_wait).
     """
     try:
         subprocess.Popen("calc.exe")
-        time.sleep(3)
+        command_wait(3)
     except Exception as e:
         print(f"[ERROR] Failed to open calculator: {e}")
 
@@ -215,8 +291,7 @@ def simulate_print_screen() -> None:
     """
     try:
         VK_SNAPSHOT = 0x2C
-        ctypes.windll.user32.keybd_event(VK_SNAPSHOT, 0, 0, 0)
-        ctypes.windll.user32.keybd_event(VK_SNAPSHOT, 0, 2, 0)
+        InputBatch().tap(VK_SNAPSHOT).send()
     except Exception as e:
         print(f"[ERROR] simulate_print_screen failed: {e}")
 
@@ -232,11 +307,62 @@ def scroll_mouse(amount: int) -> None:
         None
     """
     try:
-        ctypes.windll.user32.mouse_event(MOUSEEVENTF_WHEEL, 0, 0, amount, 0)
+        InputBatch().wheel(amount).send()
     except Exception as e:
         print(f"[ERROR] scroll_mouse failed: {e}")
 
 
+def move_pointer(x: float, y: float) -> None:
+    """
+    Moves the mouse pointer to an absolute position of the primary screen.
+    Args:
+        x (float): Horizontal position, from 0.0 (left) to 1.0 (right).
+        y (float): Vertical position, from 0.0 (top) to 1.0 (bottom).
+    Returns:
+        None
+    """
+    try:
+        # An absolute move is given in normalized coordinates, so the screen size is not needed
+        InputBatch().move(x, y).send()
+    except Exception as e:
+        print(f"[ERROR] move_pointer failed: {e}")
+
+
+def command_wait(seconds: float) -> None:
+    """
+    Waits while a command is executed (between two batches of a macro, while a program starts):
+    with the wait function of the executing thread (see handle_client), which lends the execution slot, or time.sleep.
+    Args:
+        seconds (float): Time to wait, in seconds.
+    Returns:
+        None
+    """
+    getattr(execution, "wait", time.sleep)(seconds)
+
+
+def run_macro_command(command: str) -> str:
+    """
+    Runs a macro command: a user-defined sequence of keys, chords and waits (see input_injection.compile_macro).
+    Every run of keys without a wait in between is sent with one SendInput call.
+    Args:
+        command (str): The command, MACRO_PREFIX followed by the macro (e.g., "Macro:ctrl+shift+t").
+    Returns:
+        str: A message describing the result.
+    """
+    spec = command[len(MACRO_PREFIX):]
+    try:
+        steps = compile_macro(spec)
+    except ValueError as e:
+        print(f"[ERROR] Invalid macro '{spec}': {e}")
+        return f"Invalid macro: {e}"
+    try:
+        run_macro(steps, command_wait)
+    except OSError as e:
+        print(f"[ERROR] Macro '{spec}' failed: {e}")
+        return "Macro failed"
+    return f"Macro sent: {spec}"
+
+
 def open_task_manager() -> None:
     """
     Opens the Windows Task Manager by launching 'taskmgr.exe' as a separate process.
@@ -252,125 +378,666 @@ def open_task_manager() -> None:
     except Exception as e:
         print(f"[ERROR] Failed to open Task Manager: {e}")
 
+def command_name(frame: str) -> str:
+    """
+    Resolves the command of a frame: a "#<id>" frame gives the command with that ID in COMMAND_REGISTRY,
+    any other frame (a command sent as text, a macro command) is the command itself.
+    Args:
+        frame (str): The frame, without the delimiter.
+    Returns:
+        str: The command (the frame itself if the ID is unknown).
+    """
+    if frame.startswith(COMMAND_ID_PREFIX):
+        command_id = frame[len(COMMAND_ID_PREFIX):]
+        # isdigit also accepts non-ASCII digits (e.g. "²"), which int() rejects
+        if command_id.isascii() and command_id.isdigit() and int(command_id) < len(COMMAND_REGISTRY):
+            return COMMAND_REGISTRY[int(command_id)]
+    return frame
+
+
+# Dispatch table of the discrete commands: command -> (action, message, already_running).
+# The message is returned once the action is done (None: the action returns the message itself),
+# and the command is skipped if already_running (when given) returns True.
+COMMAND_ACTIONS = {
+    "Volume Up": (volume_up, None, None),
+    "Volume Down": (volume_down, None, None),
+    "AltTab": (simulate_alt_tab, "Alt+Tab sent", None),
+    "PlayPause": (simulate_media_play_pause, "Media play/pause triggered", None),
+    "Open Calculator": (open_calculator, "Calculator opened", calculator_already_running),
+    "Screenshot": (simulate_print_screen, "Screenshot key (Print Screen) sent", None),
+    "Scroll Up": (lambda: scroll_mouse(WHEEL_DELTA), "Mouse scrolled up", None),
+    "Scroll Down": (lambda: scroll_mouse(-WHEEL_DELTA), "Mouse scrolled down", None),
+    "Task Manager": (open_task_manager, "Task Manager opened", task_manager_already_running),
+}
+
+
+# Action backends
+class WindowsActionBackend:
+    """
+    Action backend that executes commands as system-level actions on Windows
+    (volume control, key presses, mouse scroll, opening applications).
+    """
+
+    name = "windows"
+
+    def thread_init(self) -> None:
+        """
+        Prepares the calling thread to execute commands (initializes COM, needed by pycaw).
+        Args:
+            None
+        Returns:
+            None
+        """
+        pythoncom.CoInitialize()
+
+    def thread_cleanup(self) -> None:
+        """
+        Releases the per-thread resources acquired by thread_init (deinitializes COM).
+        Args:
+            None
+        Returns:
+            None
+        """
+        pythoncom.CoUninitialize()
+
+    def execute(self, command: str, addr) -> "str | None":
+        """
+        Executes a command.
+        Args:
+            command (str): The command to execute (one of the commands in client_constants.COMMANDS, or a macro command).
+            addr: The address of the client that sent the command.
+        Returns:
+            str | None: A message describing the executed action, or None if the command was skipped.
+        """
+        action = COMMAND_ACTIONS.get(command)
+        if action is not None:
+            run, message, already_running = action
+            if already_running is not None and already_running():
+                print(f"[INFO] {command}: already running, skipping command")
+                return None
+            result = run()
+            return result if message is None else message
+        if command.startswith(MACRO_PREFIX):
+            return run_macro_command(command)
+        return f"Unknown command: {command}"
+
+    def apply_control(self, kind: int, values: tuple, addr, seq: int) -> None:
+        """
+        Applies a continuous-control update.
+        Args:
+            kind (int): CONTROL_SCROLL (values[0] is the number of wheel units to scroll),
+                CONTROL_VOLUME (values[0] is the volume level) or CONTROL_POINTER (values is the pointer position).
+            values (tuple): The values of the update.
+            addr: The address of the client that sent the update.
+            seq (int): The sequence number of the update.
+        Returns:
+            None
+        """
+        if kind == CONTROL_SCROLL:
+            scroll_mouse(int(values[0]))
+        elif kind == CONTROL_VOLUME:
+            set_master_volume(values[0])
+        elif kind == CONTROL_POINTER:
+            move_pointer(values[0], values[1])
+
+    def frames_discarded(self, frames: list, addr) -> None:
+        """
+        Called when frames received in the same chunk as a command are discarded.
+        Args:
+            frames (list): The discarded frames.
+            addr: The address of the client that sent them.
+        Returns:
+            None
+        """
+        pass
+
+    def command_throttled(self, command: str, reason: str, addr) -> None:
+        """
+        Called when a command is not executed because the client is over a rate limit (counted by the scheduler).
+        Args:
+            command (str): The throttled command.
+            reason (str): The limit that was exceeded ("client" or "command").
+            addr: The address of the client that sent the command.
+        Returns:
+            None
+        """
+        pass
+
+
+class RecordingActionBackend:
+    """
+    Action backend that does not execute commands, but records them (with the time they were received)
+    to a JSON Lines file. It works on every platform, so the server can be load-tested on Linux
+    (see replay_harness.py), and its output can be replayed by the harness.
+    Every line is a JSON object with the keys "t" (UNIX time in seconds), "peer" ("ip:port") and either
+    "command" (an executed command), "discarded" (a list of frames that were received but not executed),
+    "throttled" (a command over a rate limit, with the "reason") or "control" (an applied continuous-control update,
+    with its "values" and "seq").
+    """
+
+    name = "recording"
+
+    def __init__(self, path: str) -> None:
+        """
+        Opens the record file in append mode.
+        Args:
+            path (str): Path of the JSON Lines file to write.
+        Returns:
+            None
+        """
+        self.path = path
+        # Line buffering: every record is visible to readers as soon as it is written
+        self._file = open(path, "a", buffering=1, encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def thread_init(self) -> None:
+        """Nothing to initialize for the recording backend."""
+        pass
+
+    def thread_cleanup(self) -> None:
+        """Nothing to release for the recording backend."""
+        pass
+
+    def _write(self, record: dict, addr) -> None:
+        """Writes a record to the record file, adding the receive time and the peer address."""
+        record = {"t": time.time(), "peer": f"{addr[0]}:{addr[1]}", **record}
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def execute(self, command: str, addr) -> str:
+        """
+        Records a command instead of executing it.
+        Args:
+            command (str): The received command.
+            addr: The address of the client that sent the command.
+        Returns:
+            str: A message describing the recorded command.
+        """
+        self._write({"command": command}, addr)
+        return f"Recorded: {command}"
+
+    def apply_control(self, kind: int, values: tuple, addr, seq: int) -> None:
+        """
+        Records a continuous-control update instead of applying it.
+        Args:
+            kind (int): Kind of control (see CONTROL_NAMES).
+            values (tuple): The values of the update.
+            addr: The address of the client that sent the update.
+            seq (int): The sequence number of the update.
+        Returns:
+            None
+        """
+        self._write({"control": CONTROL_NAMES[kind], "values": list(values), "seq": seq}, addr)
+
+    def frames_discarded(self, frames: list, addr) -> None:
+        """
+        Records frames that were received but not executed.
+        Args:
+            frames (list): The discarded frames.
+            addr: The address of the client that sent them.
+        Returns:
+            None
+        """
+        self._write({"discarded": frames}, addr)
+
+    def command_throttled(self, command: str, reason: str, addr) -> None:
+        """
+        Records a command that was not executed because the client is over a rate limit.
+        Args:
+            command (str): The throttled command.
+            reason (str): The limit that was exceeded ("client" or "command").
+            addr: The address of the client that sent the command.
+        Returns:
+            None
+        """
+        self._write({"throttled": command, "reason": reason}, addr)
+
+    def close(self) -> None:
+        """Closes the record file."""
+        with self._lock:
+            self._file.close()
+
+
 # TCP Server
-def handle_client(conn, addr) -> None:
+def listening_socket(host: str, port: int, kind: int = socket.SOCK_STREAM) -> socket.socket:
+    """
+    Creates a socket bound to an address, of the address family of the host (IPv4 or IPv6).
+    IPv6 sockets are dual stack: bound to "::", the socket also accepts IPv4 clients (as IPv4-mapped addresses).
+    Args:
+        host (str): Address to listen on: an IPv4 or IPv6 address, a host name, or '' for all the interfaces
+            (dual stack, or IPv4 only if IPv6 is not available).
+        port (int): Port to listen on.
+        kind (int): socket.SOCK_STREAM (the command connections) or socket.SOCK_DGRAM (the continuous-control channel).
+    Returns:
+        socket.socket: The bound socket (TCP sockets are not listening yet).
+    Raises:
+        OSError: If the address cannot be resolved or bound.
+    """
+    if not host:
+        try:
+            return listening_socket("::", port, kind)
+        except OSError:
+            # No IPv6 on this machine
+            host = "0.0.0.0"
+    family, _, _, _, address = socket.getaddrinfo(host, port, socket.AF_UNSPEC, kind, 0, socket.AI_PASSIVE)[0]
+    sock = socket.socket(family, kind)
+    try:
+        if kind == socket.SOCK_STREAM:
+            # Allow address reuse
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if family == socket.AF_INET6:
+            sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 0)
+        sock.bind(address)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def client_address(addr: tuple) -> tuple:
+    """
+    Returns the (ip, port) of a peer, with the IPv4-mapped addresses of a dual-stack socket ("::ffff:192.168.1.10")
+    written as IPv4 addresses, so a client has the same address (rate limits, records) whatever the server listens on.
+    Args:
+        addr (tuple): Address returned by accept or recvfrom.
+    Returns:
+        tuple: (ip, port).
+    """
+    ip = addr[0]
+    if ip.startswith("::ffff:") and "." in ip:
+        ip = ip[len("::ffff:"):]
+    return ip, addr[1]
+
+
+def handle_client(conn, addr, backend, scheduler: CommandScheduler = None) -> None:
     """
     Handles a client connection, processes incoming commands, and sends appropriate responses.
 
-    This function listens for commands sent by the client over the given connection,
-    executes corresponding system actions (such as adjusting volume, simulating key presses,
-    opening applications, etc.), and sends a response back to the client. It maintains the
-    state of the last command to avoid redundant actions (e.g., not opening Calculator or
-    Task Manager if already running). The function also handles decoding errors and ensures
-    COM initialization and cleanup for thread safety.
+    This function listens for commands sent by the client over the given connection and
+    executes them through the given action backend (e.g., system actions such as adjusting volume,
+    simulating key presses, opening applications, etc.). The backend avoids redundant actions
+    (e.g., not opening Calculator or Task Manager if already running). The function also handles
+    decoding errors and lets the backend initialize and clean up per-thread resources
+    (e.g., COM initialization for thread safety).
+    If a scheduler is given, commands over the rate limits of the client are not executed,
+    and the other ones wait for their turn to be executed.
+    The connection thread only reads: the commands are executed by an executor thread of the connection (see execute_commands),
+    so heartbeat pings are answered immediately even while a command runs or waits for an execution slot
+    (they are neither executed nor counted as discarded). Once a client has sent a ping, the connection is closed
+    if the client sends nothing for HEARTBEAT_TIMEOUT_S (it is half-open).
+    "Stats|" frames are answered with the state of the scheduler (see STATS_REQUEST).
+    At most COMMAND_BACKLOG commands wait for the executor: a command received while the backlog is full is discarded.
 
     Args:
         conn: The socket connection object to communicate with the client.
         addr: The address of the connected client.
+        backend: The action backend executing the commands (WindowsActionBackend or RecordingActionBackend).
+        scheduler (CommandScheduler): The scheduler shared by all the connections (None to execute commands immediately).
 
     Returns:
         None
     """
-    pythoncom.CoInitialize()
     print(f"[INFO] Connection from {addr}")
+    # Commands waiting for the executor: [command, discarded frames] in arrival order, None when the connection ends
+    backlog = deque()
+    condition = threading.Condition()
+    executor = threading.Thread(target=execute_commands, args=(backlog, condition, addr, backend, scheduler),
+                                name=f"executor {addr}", daemon=True)
+    executor.start()
     try:
         with conn:
             while True:
                 # Set a timeout for receiving data to avoid blocking indefinitely
-                data = conn.recv(1024)
+                try:
+                    data = conn.recv(1024)
+                except socket.timeout:
+                    print(f"[INFO] No heartbeat from {addr} for {HEARTBEAT_TIMEOUT_S} s, closing the connection")
+                    break
+                except OSError:
+                    break
+                # An empty chunk means that the client closed the connection
+                if not data:
+                    print(f"[INFO] Connection closed by {addr}")
+                    break
                 try:
                     # Split by '|' into an array and take the first element.
                     # To avoid issues where tcp buffers commands and sends them in chunks
-                    command = data.decode('utf-8').strip().split('|')[0] 
+                    frames = data.decode('utf-8').strip().split('|')
                 except UnicodeDecodeError:
                     print(f"[ERROR] Failed to decode data from {addr}")
                     continue
+                # Answer the heartbeat pings, and remove them from the frames
+                pongs = [HEARTBEAT_PONG + frame[len(HEARTBEAT_PING):] + "|" for frame in frames if frame.startswith(HEARTBEAT_PING + " ")]
+                if pongs:
+                    frames = [frame for frame in frames if not frame.startswith(HEARTBEAT_PING + " ")] or [""]
+                    try:
+                        conn.sendall("".join(pongs).encode())
+                    except OSError:
+                        break
+                    # The client sends heartbeats: from now on, a silent connection is dead
+                    conn.settimeout(HEARTBEAT_TIMEOUT_S)
+                # Answer the statistics requests, and remove them from the frames
+                if STATS_REQUEST in frames:
+                    frames = [frame for frame in frames if frame != STATS_REQUEST] or [""]
+                    stats = scheduler.snapshot() if scheduler is not None else {}
+                    try:
+                        conn.sendall(f"{STATS_REQUEST} {json.dumps(stats)}|".encode())
+                    except OSError:
+                        break
+                # Frames carrying a command ID are resolved to the command
+                command = command_name(frames[0])
+                # The other frames received in the same chunk are not executed
+                discarded = [command_name(frame) for frame in frames[1:] if frame]
                 # If command is empty, skip processing to speed up the loop
                 if not command:
                     continue
-                    
-                print(f"[RECEIVED] {command}")
-                
-                # Process the command
-                if command == "Volume Up":
-                    response = volume_up()
-                elif command == "Volume Down":
-                    response = volume_down()
-                elif command == "AltTab":
-                    simulate_alt_tab()
-                    response = "Alt+Tab sent"
-                elif command == "PlayPause":
-                    simulate_media_play_pause()
-                    response = "Media play/pause triggered"
-                elif command == "Open Calculator":
-                    if calculator_already_running():
-                        print("[INFO] Calculator already running, skipping command")
-                        continue
-                    open_calculator()
-                    response = "Calculator opened"
-                elif command == "Screenshot":
-                    simulate_print_screen()
-                    response = "Screenshot key (Print Screen) sent"
-                elif command == "Scroll Up":
-                    scroll_mouse(120)
-                    response = "Mouse scrolled up"
-                elif command == "Scroll Down":
-                    scroll_mouse(-120)
-                    response = "Mouse scrolled down"
-                elif command == "Task Manager":
-                    if task_manager_already_running():
-                        print("[INFO] Task Manager already running, skipping command")
-                        continue
-                    open_task_manager()
-                    response = "Task Manager opened"
+                with condition:
+                    if len(backlog) < COMMAND_BACKLOG:
+                        backlog.append([command, discarded])
+                        condition.notify()
+                    else:
+                        # Reported after the last waiting command, so the discarded frames keep the order they were received in
+                        backlog[-1][1].extend([command] + discarded)
+    finally:
+        # The executor runs the commands already received, then ends
+        with condition:
+            backlog.append(None)
+            condition.notify()
+        executor.join()
+
+
+def execute_commands(backlog: deque, condition: threading.Condition, addr, backend, scheduler: CommandScheduler = None) -> None:
+    """
+    Body of the executor thread of a connection: executes the commands received by handle_client, in order.
+    Args:
+        backlog (deque): The commands waiting to be executed, as [command, discarded frames], and None at the end of the connection.
+        condition (threading.Condition): Condition protecting `backlog`, notified when an item is appended.
+        addr: The address of the client.
+        backend: The action backend executing the commands.
+        scheduler (CommandScheduler): The scheduler shared by all the connections (None to execute commands immediately).
+    Returns:
+        None
+    """
+    backend.thread_init()
+    if scheduler is not None:
+        # A command does not keep the execution slot while it waits: the commands of the other clients run meanwhile
+        execution.wait = lambda seconds: scheduler.pause(addr[0], seconds)
+    try:
+        while True:
+            with condition:
+                while not backlog:
+                    condition.wait()
+                item = backlog.popleft()
+            if item is None:
+                return
+            command, discarded = item
+            print(f"[RECEIVED] {command}")
+
+            if scheduler is None:
+                response = backend.execute(command, addr)
+            else:
+                # All the macros of a client share the MACRO_PREFIX bucket
+                throttled = scheduler.admit(addr[0], MACRO_PREFIX if command.startswith(MACRO_PREFIX) else command)
+                if throttled is None:
+                    # Wait for the turn of this client, then process the command
+                    scheduler.acquire(addr[0])
+                    try:
+                        response = backend.execute(command, addr)
+                    finally:
+                        scheduler.release(addr[0])
                 else:
-                    response = f"Unknown command: {command}"
-                
-                print(f"[RESPONSE] {response}")
+                    backend.command_throttled(command, throttled, addr)
+                    response = None
+            # Report the discarded frames after the command, in the order they were received
+            if discarded:
+                backend.frames_discarded(discarded, addr)
+            if response is None:
+                continue
+
+            print(f"[RESPONSE] {response}")
     finally:
-        # Deinitialize COM to clean up resources
-        pythoncom.CoUninitialize()
-        
+        # Release the per-thread resources of the backend (e.g., deinitialize COM)
+        backend.thread_cleanup()
 
-def main():
+
+# Continuous-control channel (UDP)
+class ControlChannel:
+    """
+    Receives the continuous-control datagrams and applies them through the action backend.
+
+    A receiver thread keeps only the newest update of every kind (updates older than the last received one,
+    e.g. reordered datagrams, are dropped); an applier thread applies the pending updates as soon as they arrive.
+    If applying is slower than receiving, the intermediate updates are coalesced instead of queued,
+    so the applied state is never behind the hand.
+    The scroll velocity is integrated over time by the applier thread, so scrolling is smooth
+    whatever the update rate, and it stops CONTROL_TIMEOUT_S after the last update.
+    """
+
+    def __init__(self, backend, host: str, port: int) -> None:
+        """
+        Binds the UDP socket.
+        Args:
+            backend: The action backend applying the updates.
+            host (str): Address to listen on ('' for all the interfaces, see listening_socket).
+            port (int): UDP port to listen on.
+        Returns:
+            None
+        """
+        self.backend = backend
+        self._socket = listening_socket(host, port, socket.SOCK_DGRAM)
+        # Timeout to check the stop event
+        self._socket.settimeout(1.0)
+        self._lock = threading.Lock()
+        self._updated = threading.Event()
+        self._stop_event = threading.Event()
+        # kind -> (session, seq, values, addr, receive time) of the newest update
+        self._latest = {}
+        # Kinds with an update not applied yet
+        self._pending = set()
+        # Counters: received datagrams, applied updates, updates replaced by a newer one before being applied,
+        # out-of-order updates and invalid datagrams (updated by both threads: always under the lock)
+        self.received = 0
+        self.applied = 0
+        self.coalesced = 0
+        self.stale = 0
+        self.invalid = 0
+        self._threads = []
+
+    def start(self) -> None:
+        """
+        Starts the receiver and applier threads.
+        Args:
+            None
+        Returns:
+            None
+        """
+        for target in (self._receive, self._apply):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """
+        Stops the threads and closes the socket.
+        Args:
+            None
+        Returns:
+            None
+        """
+        self._stop_event.set()
+        self._updated.set()
+        for thread in self._threads:
+            thread.join(2.0)
+        self._socket.close()
+        with self._lock:
+            print(f"[INFO] Continuous control: {self.received} updates received, {self.applied} applied, "
+                  f"{self.coalesced} coalesced, {self.stale} stale, {self.invalid} invalid")
+
+    def _receive(self) -> None:
+        """Body of the receiver thread: keeps the newest update of every kind."""
+        while not self._stop_event.is_set():
+            try:
+                data, addr = self._socket.recvfrom(64)
+                addr = client_address(addr)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if len(data) != CONTROL_PACKET.size:
+                with self._lock:
+                    self.invalid += 1
+                continue
+            magic, kind, session, seq, value1, value2 = CONTROL_PACKET.unpack(data)
+            if magic != CONTROL_MAGIC or kind not in CONTROL_NAMES:
+                with self._lock:
+                    self.invalid += 1
+                continue
+            with self._lock:
+                self.received += 1
+                latest = self._latest.get(kind)
+                # Drop duplicates and updates older than the newest one of the same sender (sequence numbers wrap around at 2^32)
+                if latest is not None and latest[0] == session and (latest[1] - seq) % 2**32 < 2**31:
+                    self.stale += 1
+                    continue
+                if kind in self._pending:
+                    self.coalesced += 1
+                self._latest[kind] = (session, seq, (value1, value2), addr, time.monotonic())
+                self._pending.add(kind)
+            self._updated.set()
+
+    def _apply(self) -> None:
+        """Body of the applier thread: applies the pending updates and integrates the scroll velocity."""
+        self.backend.thread_init()
+        try:
+            scroll = None  # (velocity, seq, addr, receive time) of the active scroll
+            remainder = 0.0  # Fraction of wheel unit not scrolled yet
+            last_tick = time.monotonic()
+            while not self._stop_event.is_set():
+                # Idle: wait for an update. Scrolling: wake up every tick.
+                self._updated.wait(CONTROL_TICK_S if scroll else 1.0)
+                self._updated.clear()
+                with self._lock:
+                    pending = {kind: self._latest[kind] for kind in self._pending}
+                    self._pending.clear()
+                now = time.monotonic()
+                for kind, (_, seq, values, addr, received_at) in pending.items():
+                    if kind == CONTROL_SCROLL:
+                        scroll = (values[0], seq, addr, received_at) if values[0] else None
+                        continue
+                    self.backend.apply_control(kind, values, addr, seq)
+                    with self._lock:
+                        self.applied += 1
+                if scroll is not None and now - scroll[3] > CONTROL_TIMEOUT_S:
+                    scroll = None
+                if scroll is None:
+                    remainder = 0.0
+                else:
+                    velocity, seq, addr, _ = scroll
+                    remainder += velocity * (now - last_tick)
+                    amount = int(remainder)
+                    if amount:
+                        remainder -= amount
+                        self.backend.apply_control(CONTROL_SCROLL, (amount, 0.0), addr, seq)
+                        with self._lock:
+                            self.applied += 1
+                last_tick = now
+        finally:
+            self.backend.thread_cleanup()
+
+
+def main(argv: list = None):
     """
     Starts a TCP server that listens for incoming client connections on the specified HOST and PORT.
     For each accepted connection, a new daemon thread is spawned to handle the client using the handle_client function.
     The server socket is configured to allow address reuse and has a timeout for accepting connections.
     Logs server start, accepted connections, errors, and server shutdown events.
     Args:
-        None
+        argv (list): Command line arguments (defaults to sys.argv[1:]).
+            --backend selects the action backend: "windows" (default) executes the commands,
+            "recording" records them to --record-file (useful to load-test the server on any platform).
+            --control-port is the UDP port of the continuous-control channel (defaults to --port, 0 to disable it).
+            --client-rate, --client-burst, --command-rate and --command-burst set the rate limits of every client
+            (a rate of 0 disables the limit), --execution-slots the number of commands executed at the same time.
     Returns:
         None
     """
-    # Initialize the server socket
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        # Set socket options to allow address reuse
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        # Bind the socket to the specified host and port
-        s.bind((HOST, PORT))
+    parser = argparse.ArgumentParser(description="Gesture command server.")
+    parser.add_argument("--backend", choices=("windows", "recording"), default="windows", help="Action backend executing the commands.")
+    parser.add_argument("--record-file", default=DEFAULT_RECORD_FILE, help="File written by the recording backend.")
+    parser.add_argument("--host", default=HOST, help="Address to listen on (IPv4 or IPv6; all the interfaces, dual stack, by default).")
+    parser.add_argument("--port", type=int, default=PORT, help="TCP port to listen on.")
+    parser.add_argument("--control-port", type=int, default=None,
+                        help="UDP port of the continuous-control channel (defaults to --port, 0 to disable it).")
+    parser.add_argument("--client-rate", type=float, default=DEFAULT_CLIENT_RATE, help="Commands per second of a client (0 for no limit).")
+    parser.add_argument("--client-burst", type=int, default=DEFAULT_CLIENT_BURST, help="Commands a client can send back to back.")
+    parser.add_argument("--command-rate", type=float, default=DEFAULT_COMMAND_RATE, help="Commands per second of every command of a client (0 for no limit).")
+    parser.add_argument("--command-burst", type=int, default=DEFAULT_COMMAND_BURST, help="Same command a client can send back to back.")
+    parser.add_argument("--execution-slots", type=int, default=DEFAULT_EXECUTION_SLOTS, help="Commands executed at the same time.")
+    args = parser.parse_args(argv)
+    # The control channel listens on the UDP port with the number of the TCP port, unless another one is given
+    if args.control_port is None:
+        args.control_port = args.port
+
+    if args.backend == "recording":
+        backend = RecordingActionBackend(args.record_file)
+        print(f"[INFO] Recording backend: commands are recorded to {args.record_file}")
+    else:
+        if sys.platform != "win32":
+            print("[ERROR] The windows backend is only available on Windows. Use --backend recording.")
+            return
+        backend = WindowsActionBackend()
+
+    scheduler = CommandScheduler(args.client_rate, args.client_burst, args.command_rate, args.command_burst,
+                                 command_limits={**COMMAND_LIMITS, MACRO_PREFIX: MACRO_LIMIT},
+                                 slots=args.execution_slots, commands=(*COMMAND_ACTIONS, MACRO_PREFIX))
+    next_stats = time.monotonic() + STATS_INTERVAL_S
+    printed_throttled = 0
+
+    # Start the continuous-control channel
+    control_channel = None
+    if args.control_port:
+        control_channel = ControlChannel(backend, args.host, args.control_port)
+        control_channel.start()
+        print(f"[START] Continuous control listening on {args.host or '*'}:{args.control_port} (UDP)")
+
+    # Initialize the server socket, bound to the specified host and port (dual stack for IPv6, see listening_socket)
+    with listening_socket(args.host, args.port) as s:
         # Start listening for incoming connections
         s.listen()
         # Set a timeout for accepting connections to avoid blocking indefinitely and accept Ctrl+C
         s.settimeout(1.0)
-        print(f"[START] Server listening on {HOST}:{PORT}")
+        print(f"[START] Server listening on {args.host or '*'}:{args.port}")
         while True:
             try:
                 # Accept a new client connection
                 conn, addr = s.accept()
+                addr = client_address(addr)
                 print(f"[INFO] Accepted connection from {addr}")
                 # Create a new thread to handle the client connection
                 # Use daemon threads so they will exit when the main thread exits
-                thread = threading.Thread(target=handle_client, args=(conn, addr), daemon=True)
+                thread = threading.Thread(target=handle_client, args=(conn, addr, backend, scheduler), daemon=True)
                 thread.start()
             except socket.timeout:
-                # If no connection is accepted within the timeout, continue to check for new connections
+                # If no connection is accepted within the timeout, print the counters if commands were throttled
+                # and continue to check for new connections
+                if time.monotonic() >= next_stats:
+                    next_stats = time.monotonic() + STATS_INTERVAL_S
+                    throttled = scheduler.throttled_total()
+                    if throttled != printed_throttled:
+                        printed_throttled = throttled
+                        scheduler.print_stats()
                 continue
             except Exception as e:
                 # Catch any other exceptions (like KeyboardInterrupt, launched with CTRL+C) and print an error message
                 print(f"[ERROR] {e}")
                 break
         print("[STOP] Server arrested")
+        scheduler.print_stats()
+    if control_channel is not None:
+        control_channel.stop()
+    if isinstance(backend, RecordingActionBackend):
+        backend.close()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
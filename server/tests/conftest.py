@@ -0,0 +1,13 @@
+# server/tests/conftest.py
+# -*- coding: utf-8 -*-
+"""
+The server modules import each other relative to the server directory (the server is started from it),
+so the tests run with the server directory on the import path.
+"""
+
+import os
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
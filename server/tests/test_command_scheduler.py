@@ -0,0 +1,111 @@
+# server/tests/test_command_scheduler.py
+# -*- coding: utf-8 -*-
+"""Tests of the rate limits and of the fair scheduling of the commands (command_scheduler.py)."""
+
+import threading
+import time
+
+from command_scheduler import OTHER_COMMANDS, THROTTLED_CLIENT, THROTTLED_COMMAND, CommandScheduler, TokenBucket
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(rate=10.0, burst=2)
+    now = bucket.updated
+    for _ in range(2):
+        assert bucket.ready(now)
+        bucket.take()
+    assert not bucket.ready(now)
+    assert not bucket.ready(now + 0.05)
+    assert bucket.ready(now + 0.1)
+    # The bucket never holds more than its burst
+    assert bucket.ready(now + 100.0) and bucket.tokens == 2
+
+
+def test_admit_applies_the_client_and_command_limits():
+    scheduler = CommandScheduler(client_rate=1e-6, client_burst=3, command_rate=1e-6, command_burst=2,
+                                 commands=("Volume Up", "Volume Down"))
+    assert scheduler.admit("a", "Volume Up") is None
+    assert scheduler.admit("a", "Volume Up") is None
+    assert scheduler.admit("a", "Volume Up") == THROTTLED_COMMAND
+    assert scheduler.admit("a", "Volume Down") is None
+    assert scheduler.admit("a", "Volume Down") == THROTTLED_CLIENT
+    # Every client has its own buckets
+    assert scheduler.admit("b", "Volume Up") is None
+    stats = scheduler.stats()
+    assert stats["a"]["throttled_command"] == 1 and stats["a"]["throttled_client"] == 1
+    assert stats["b"]["throttled_command"] == 0
+
+
+def test_unknown_commands_share_one_bucket():
+    scheduler = CommandScheduler(commands=("Volume Up",))
+    for i in range(100):
+        scheduler.admit("a", f"junk {i}")
+    scheduler.admit("a", "Volume Up")
+    assert set(scheduler._clients["a"].command_buckets) == {OTHER_COMMANDS, "Volume Up"}
+
+
+def run_in_thread(target, *args) -> threading.Thread:
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def wait_for_waiters(scheduler: CommandScheduler, count: int) -> None:
+    deadline = time.monotonic() + 5.0
+    while scheduler.snapshot()["waiting"] < count:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_waiting_clients_take_turns():
+    scheduler = CommandScheduler(slots=1)
+    scheduler.acquire("busy")
+    order = []
+
+    def execute(client):
+        scheduler.acquire(client)
+        order.append(client)
+        scheduler.release(client)
+
+    threads = []
+    # The noisy client queues three commands before the quiet one queues its only command
+    for client in ("noisy", "noisy", "noisy", "quiet"):
+        threads.append(run_in_thread(execute, client))
+        wait_for_waiters(scheduler, len(threads))
+    scheduler.release("busy")
+    for thread in threads:
+        thread.join(5.0)
+    assert order == ["noisy", "quiet", "noisy", "noisy"]
+    assert scheduler.snapshot()["busy"] == 0
+
+
+def test_pause_lends_the_slot():
+    scheduler = CommandScheduler(slots=1)
+    scheduler.acquire("macro")
+    executed = threading.Event()
+
+    def other():
+        scheduler.acquire("other")
+        executed.set()
+        scheduler.release("other")
+
+    thread = run_in_thread(other)
+    wait_for_waiters(scheduler, 1)
+    # The other client runs during the wait of the macro, then the macro gets its slot back
+    scheduler.pause("macro", 0.2)
+    assert executed.is_set()
+    scheduler.release("macro")
+    thread.join(5.0)
+    assert scheduler.snapshot()["busy"] == 0
+
+
+def test_clients_run_side_by_side_with_the_default_slots():
+    scheduler = CommandScheduler()
+    assert scheduler.slots > 1
+    scheduler.acquire("kiosk 1")
+    acquired = threading.Event()
+    thread = run_in_thread(lambda: (scheduler.acquire("kiosk 2"), acquired.set()))
+    assert acquired.wait(1.0)
+    thread.join()
+    snapshot = scheduler.snapshot()
+    assert snapshot["busy"] == 2 and snapshot["waiting"] == 0
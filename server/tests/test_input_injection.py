@@ -0,0 +1,62 @@
+# server/tests/test_input_injection.py
+# -*- coding: utf-8 -*-
+"""Tests of the macro compiler (compile_macro) and runner (run_macro): no input is injected, SendInput is replaced."""
+
+import pytest
+
+import input_injection
+from input_injection import (KEY_CODES, KEYEVENTF_EXTENDEDKEY, KEYEVENTF_KEYUP, MAX_MACRO_INPUTS, MAX_MACRO_WAIT_S,
+                             compile_macro, macro_inputs, run_macro)
+
+
+def keys(batch) -> list:
+    """Returns the key events of a batch as (lowercase key name, "down"/"up")."""
+    # The first name of every code is the main one (the aliases and the lowercase letters are added after it)
+    names = {vk: name.lower() for name, vk in reversed(list(KEY_CODES.items()))}
+    return [(names[event.ki.wVk], "up" if event.ki.dwFlags & KEYEVENTF_KEYUP else "down") for event in batch]
+
+
+def test_chords_are_released_in_reverse_order_and_batched_between_waits():
+    steps = compile_macro("ctrl+c, wait 250, ctrl+v, F5")
+    assert len(steps) == 3
+    assert keys(steps[0]) == [("ctrl", "down"), ("c", "down"), ("c", "up"), ("ctrl", "up")]
+    assert steps[1] == 0.25
+    # Consecutive key steps share a batch
+    assert keys(steps[2]) == [("ctrl", "down"), ("v", "down"), ("v", "up"), ("ctrl", "up"), ("f5", "down"), ("f5", "up")]
+    assert macro_inputs(steps) == 10
+
+
+def test_held_keys_are_released_at_the_end():
+    steps = compile_macro("down alt, tab, wait 100, tab")
+    assert keys(steps[-1]) == [("tab", "down"), ("tab", "up"), ("alt", "up")]
+
+
+def test_extended_keys_are_flagged():
+    [batch] = compile_macro("left")
+    assert all(event.ki.dwFlags & KEYEVENTF_EXTENDEDKEY for event in batch)
+
+
+@pytest.mark.parametrize("spec", [
+    "", "ctrl+c,,ctrl+v", "wait 100", "wait -5", "wait nan", "wait soon", "nokey", "up shift",
+    "down shift, down shift", "0x00", "+".join(["a"] * (MAX_MACRO_INPUTS // 2 + 1)),
+    f"a, wait {MAX_MACRO_WAIT_S * 1000 / 2:g}, wait {MAX_MACRO_WAIT_S * 1000 / 2 + 1:g}",
+])
+def test_invalid_macros_are_rejected(spec):
+    with pytest.raises(ValueError):
+        compile_macro(spec)
+
+
+def test_waits_up_to_the_limit_are_accepted():
+    steps = compile_macro(f"a, wait {MAX_MACRO_WAIT_S * 1000:g}, b")
+    assert steps[1] == MAX_MACRO_WAIT_S
+
+
+def test_run_macro_submits_the_batches_and_calls_the_wait(monkeypatch):
+    calls = []
+    monkeypatch.setattr(input_injection, "send_inputs", lambda batch: calls.append(("send", len(batch))))
+    run_macro(compile_macro("ctrl+c, wait 50, wait 20, ctrl+v"), lambda seconds: calls.append(("wait", seconds)))
+    assert calls == [("send", 4), ("wait", 0.05), ("wait", 0.02), ("send", 4)]
+
+
+def test_compiled_macros_are_cached():
+    assert compile_macro("ctrl+shift+t") is compile_macro("ctrl+shift+t")
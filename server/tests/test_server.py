@@ -0,0 +1,173 @@
+# server/tests/test_server.py
+# -*- coding: utf-8 -*-
+"""Tests of the command frames and of the connections of server.py."""
+
+import importlib.util
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+import server
+from command_scheduler import CommandScheduler
+
+CLIENT_CONSTANTS = os.path.join(os.path.dirname(server.__file__), "..", "client", "client_constants.py")
+
+
+def test_command_registry_matches_client():
+    # The client and the server are installed separately: the registry is duplicated, and must stay identical
+    spec = importlib.util.spec_from_file_location("client_constants", CLIENT_CONSTANTS)
+    client_constants = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(client_constants)
+    assert server.COMMAND_REGISTRY == client_constants.COMMAND_REGISTRY
+
+
+def test_command_name_resolves_ids_and_keeps_other_frames():
+    assert server.command_name("#0") == server.COMMAND_REGISTRY[0]
+    assert server.command_name(f"#{len(server.COMMAND_REGISTRY)}") == f"#{len(server.COMMAND_REGISTRY)}"
+    # Non-ASCII digits are not IDs: the frame is kept as a (unknown) command instead of raising
+    assert server.command_name("#²") == "#²"
+    assert server.command_name("#١") == "#١"
+    assert server.command_name("Macro:ctrl+c") == "Macro:ctrl+c"
+
+
+class FakeBackend:
+    """Action backend recording the executed commands, taking `delay` seconds per command."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.executed = []
+
+    def thread_init(self):
+        pass
+
+    def thread_cleanup(self):
+        pass
+
+    def execute(self, command, addr):
+        time.sleep(self.delay)
+        self.executed.append(command)
+        return f"Executed: {command}"
+
+    def frames_discarded(self, frames, addr):
+        pass
+
+    def command_throttled(self, command, reason, addr):
+        pass
+
+
+def serve(backend, scheduler) -> tuple:
+    """Runs handle_client on one end of a socket pair; returns the other end and the thread."""
+    server_end, client_end = socket.socketpair()
+    thread = threading.Thread(target=server.handle_client, args=(server_end, ("127.0.0.1", 0), backend, scheduler), daemon=True)
+    thread.start()
+    client_end.settimeout(5.0)
+    return client_end, thread
+
+
+def test_stats_request_returns_the_scheduler_state():
+    backend = FakeBackend()
+    connection, thread = serve(backend, CommandScheduler())
+    with connection:
+        connection.sendall(b"#0|")
+        deadline = time.monotonic() + 5.0
+        while not backend.executed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        connection.sendall(b"Stats|")
+        reply = connection.recv(4096).decode()
+    thread.join(5.0)
+    assert reply.startswith(server.STATS_REQUEST + " ") and reply.endswith("|")
+    stats = json.loads(reply[len(server.STATS_REQUEST) + 1:-1])
+    assert stats["clients"]["127.0.0.1"]["executed"] == 1
+    assert stats["slots"] == CommandScheduler().slots
+    # The request is answered, not executed
+    assert backend.executed == [server.COMMAND_REGISTRY[0]]
+
+
+def test_open_calculator_lends_the_slot_while_it_waits(monkeypatch):
+    waits = []
+    monkeypatch.setattr(server.subprocess, "Popen", lambda *args, **kwargs: None)
+    monkeypatch.setattr(server.execution, "wait", waits.append, raising=False)
+    server.open_calculator()
+    assert waits == [3]
+
+
+def test_pings_are_answered_while_a_command_runs():
+    backend = FakeBackend(delay=1.0)
+    connection, thread = serve(backend, CommandScheduler())
+    with connection:
+        connection.sendall(b"#0|")
+        time.sleep(0.1)
+        # The command runs for 1 s: the pong must not wait for it
+        sent = time.monotonic()
+        connection.sendall(b"Ping 1|")
+        assert connection.recv(64) == b"Pong 1|"
+        assert time.monotonic() - sent < 0.5
+        assert backend.executed == []
+    thread.join(5.0)
+    # The command received before the connection closed is still executed
+    assert backend.executed == [server.COMMAND_REGISTRY[0]]
+
+
+def test_commands_over_the_backlog_are_discarded_in_order():
+    class Recorder(FakeBackend):
+        def __init__(self):
+            super().__init__(delay=0.05)
+            self.events = []
+
+        def execute(self, command, addr):
+            self.events.append(("executed", command))
+            return super().execute(command, addr)
+
+        def frames_discarded(self, frames, addr):
+            self.events.extend(("discarded", frame) for frame in frames)
+
+    backend = Recorder()
+    connection, thread = serve(backend, None)
+    with connection:
+        # All the frames arrive while the first command runs
+        connection.sendall("".join(f"command {i}|" for i in range(server.COMMAND_BACKLOG + 3)).encode())
+    thread.join(30.0)
+    commands = [command for _, command in backend.events]
+    assert commands == [f"command {i}" for i in range(server.COMMAND_BACKLOG + 3)]
+    assert any(kind == "discarded" for kind, _ in backend.events)
+
+
+def ipv6_available() -> bool:
+    try:
+        with socket.socket(socket.AF_INET6, socket.SOCK_STREAM) as probe:
+            probe.bind(("::1", 0))
+        return True
+    except OSError:
+        return False
+
+
+@pytest.mark.skipif(not ipv6_available(), reason="IPv6 is not available")
+def test_default_host_accepts_ipv4_and_ipv6_clients():
+    with server.listening_socket(server.HOST, 0) as listener:
+        listener.listen()
+        port = listener.getsockname()[1]
+        for client_host in ("127.0.0.1", "::1"):
+            with socket.create_connection((client_host, port), timeout=5):
+                conn, addr = listener.accept()
+                conn.close()
+            # IPv4 clients keep their IPv4 address
+            assert server.client_address(addr)[0] == client_host
+
+
+@pytest.mark.skipif(not ipv6_available(), reason="IPv6 is not available")
+def test_control_channel_listens_on_an_ipv6_address():
+    channel = server.ControlChannel(FakeBackend(), "::1", 0)
+    try:
+        assert channel._socket.family == socket.AF_INET6
+    finally:
+        channel._socket.close()
+
+
+def test_client_address_unmaps_ipv4_mapped_addresses():
+    assert server.client_address(("::ffff:192.168.1.10", 50000, 0, 0)) == ("192.168.1.10", 50000)
+    assert server.client_address(("fd00::2", 50000, 0, 0)) == ("fd00::2", 50000)
+    assert server.client_address(("127.0.0.1", 50000)) == ("127.0.0.1", 50000)